@@ -1,38 +1,113 @@
 from typing import Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
-from app.schemas.media import MediaDetailResponse, MediaListResponse
-from app.services.media_service import get_media_detail_by_id, get_media_list
+from app.schemas.media import MediaDetailResponse, MediaListResponse, MediaPageResponse
+from app.services.media_response_cache import cached_response
+from app.services.media_service import (
+    DEFAULT_PAGE_SIZE,
+    get_media_detail_json,
+    get_media_list,
+    get_media_page,
+    search_media,
+)
 
 router = APIRouter(prefix="/api/v1", tags=["media"])
 
 
-@router.get("/media", response_model=MediaListResponse)
+@router.get("/media", response_model=MediaListResponse | MediaPageResponse)
 async def list_media(
+    request: Request,
     type: Literal["movie", "series"] | None = Query(
         default=None, description="Filter by type: movie or series"
     ),
     status: str | None = Query(default=None, description="Filter by watch status"),
     jellyfin_user_id: str | None = Query(default=None, description="Jellyfin user ID (UUID)"),
+    genre: str | None = Query(default=None, description="Filter by genre"),
+    year: int | None = Query(default=None, description="Filter by release year"),
+    sort: Literal["title", "year", "rating", "added", "watched"] = Query(
+        default="title",
+        description="Sort order: title, year, rating, added (recently added) "
+        "or watched (recently watched)",
+    ),
+    limit: int | None = Query(
+        default=None,
+        ge=1,
+        le=500,
+        description="Page size; without limit and cursor the whole list is returned",
+    ),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=True, description="Count all matching items"),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    async def build() -> MediaListResponse | MediaPageResponse:
+        if limit is None and cursor is None:
+            return await get_media_list(
+                session=session,
+                media_type=type,
+                status=status,
+                jellyfin_user_id=jellyfin_user_id,
+                genre=genre,
+                year=year,
+                sort=sort,
+            )
+        return await get_media_page(
+            session=session,
+            media_type=type,
+            status=status,
+            jellyfin_user_id=jellyfin_user_id,
+            genre=genre,
+            year=year,
+            sort=sort,
+            limit=limit or DEFAULT_PAGE_SIZE,
+            cursor=cursor,
+            include_total=include_total,
+        )
+
+    return await cached_response(request, build)
+
+
+@router.get("/media/search", response_model=MediaPageResponse)
+async def search_media_titles(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200, description="Search text"),
+    type: Literal["movie", "series"] | None = Query(
+        default=None, description="Filter by type: movie or series"
+    ),
+    status: str | None = Query(default=None, description="Filter by watch status"),
+    jellyfin_user_id: str | None = Query(default=None, description="Jellyfin user ID (UUID)"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=500, description="Page size"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=True, description="Count all matching items"),
     session: AsyncSession = Depends(get_session),
-) -> MediaListResponse:
-    return await get_media_list(
-        session=session,
-        media_type=type,
-        status=status,
-        jellyfin_user_id=jellyfin_user_id,
+) -> Response:
+    return await cached_response(
+        request,
+        lambda: search_media(
+            session=session,
+            q=q,
+            media_type=type,
+            status=status,
+            jellyfin_user_id=jellyfin_user_id,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+        ),
     )
 
 
 @router.get("/media/{media_id}", response_model=MediaDetailResponse)
 async def get_media_detail(
+    request: Request,
     media_id: int,
     jellyfin_user_id: str | None = Query(default=None, description="Jellyfin user ID (UUID)"),
     session: AsyncSession = Depends(get_session),
-) -> MediaDetailResponse:
-    return await get_media_detail_by_id(
-        session=session, media_id=media_id, jellyfin_user_id=jellyfin_user_id
+) -> Response:
+    return await cached_response(
+        request,
+        lambda: get_media_detail_json(
+            session=session, media_id=media_id, jellyfin_user_id=jellyfin_user_id
+        ),
     )
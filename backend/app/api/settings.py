@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.client.http_pool import http_clients
 from app.database import get_session
 from app.models.schedule import ServiceConfig, ServiceType
 from app.schemas.service_config import (
@@ -86,6 +87,7 @@ async def upsert_service(
 
     config = await config_repo.upsert_config(session, service, url, api_key)
     await session.commit()
+    # The pooled client is rebuilt by its next get(), which sees the new url/api_key
     await session.refresh(config)
     return _to_response(config)
 
@@ -100,6 +102,7 @@ async def delete_service(
     if not deleted:
         raise HTTPException(status_code=404, detail="Service config not found")
     await session.commit()
+    await http_clients.invalidate(service.value)
 
 
 @router.post("/{service}/test", response_model=ServiceTestResponse)
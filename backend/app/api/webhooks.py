@@ -0,0 +1,100 @@
+"""Webhook receivers for push notifications from the media services.
+
+Webhooks are not behind the JWT login. Each sender authenticates with a shared
+secret, either by signing the raw body (HMAC-SHA256,
+``X-Webhook-Signature: sha256=<hex>``) or, for senders that cannot sign such as
+Sonarr/Radarr Connect, as the password of HTTP Basic auth.
+"""
+
+import base64
+import binascii
+import hmac
+import json
+import os
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+
+from app.schemas.jellyfin import JellyfinWebhookResponse
+from app.schemas.radarr import RadarrWebhookResponse
+from app.schemas.sonarr import SonarrWebhookResponse
+from app.services.arr_webhook_service import (
+    handle_arr_event,
+    parse_radarr_event,
+    parse_sonarr_event,
+)
+from app.services.jellyfin_webhook_service import parse_webhook_event, watch_event_queue
+from app.utils.security import verify_webhook_signature
+
+router = APIRouter(prefix="/api/v1/webhooks", tags=["Webhooks"])
+
+
+def _basic_auth_password(request: Request) -> str | None:
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "basic" or not credentials:
+        return None
+    try:
+        decoded = base64.b64decode(credentials, validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return decoded.partition(":")[2]
+
+
+async def _read_authenticated_json(request: Request, secret_env: str) -> object:
+    secret = os.getenv(secret_env)
+    if not secret:
+        raise HTTPException(status_code=503, detail="Webhook is not configured")
+
+    body = await request.body()
+    signature = request.headers.get("X-Webhook-Signature")
+    password = _basic_auth_password(request)
+    authenticated = (
+        verify_webhook_signature(body, signature, secret)
+        if signature is not None
+        else password is not None and hmac.compare_digest(password.encode(), secret.encode())
+    )
+    if not authenticated:
+        raise HTTPException(status_code=401, detail="Invalid webhook credentials")
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Malformed webhook payload") from e
+
+
+@router.post("/jellyfin", status_code=202, response_model=JellyfinWebhookResponse)
+async def jellyfin_webhook(request: Request) -> JellyfinWebhookResponse:
+    """Accept PlaybackStop/UserDataSaved notifications from the Jellyfin Webhook plugin."""
+    payload = await _read_authenticated_json(request, "JELLYFIN_WEBHOOK_SECRET")
+    event = parse_webhook_event(payload) if isinstance(payload, dict) else None
+    if event is None:
+        return JellyfinWebhookResponse(accepted=False)
+
+    watch_event_queue.put(event)
+    return JellyfinWebhookResponse(accepted=True)
+
+
+@router.post("/radarr", status_code=202, response_model=RadarrWebhookResponse)
+async def radarr_webhook(
+    request: Request, background_tasks: BackgroundTasks
+) -> RadarrWebhookResponse:
+    """Import or detach the single movie named by a Radarr Connect notification."""
+    payload = await _read_authenticated_json(request, "RADARR_WEBHOOK_SECRET")
+    event = parse_radarr_event(payload) if isinstance(payload, dict) else None
+    if event is None:
+        return RadarrWebhookResponse(accepted=False)
+
+    background_tasks.add_task(handle_arr_event, event)
+    return RadarrWebhookResponse(accepted=True)
+
+
+@router.post("/sonarr", status_code=202, response_model=SonarrWebhookResponse)
+async def sonarr_webhook(
+    request: Request, background_tasks: BackgroundTasks
+) -> SonarrWebhookResponse:
+    """Import or detach the single series named by a Sonarr Connect notification."""
+    payload = await _read_authenticated_json(request, "SONARR_WEBHOOK_SECRET")
+    event = parse_sonarr_event(payload) if isinstance(payload, dict) else None
+    if event is None:
+        return SonarrWebhookResponse(accepted=False)
+
+    background_tasks.add_task(handle_arr_event, event)
+    return SonarrWebhookResponse(accepted=True)
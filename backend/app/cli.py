@@ -1,7 +1,8 @@
-"""Emergency CLI password reset.
+"""Emergency CLI password reset and maintenance commands.
 
 Usage:
     python -m app.cli reset-password --new-password <new_password>
+    python -m app.cli rebuild-series-progress
 
 Docker:
     docker exec media-tracker python -m app.cli reset-password --new-password newpass123
@@ -14,6 +15,7 @@ from sqlalchemy import select
 
 from app.database import AsyncSessionLocal
 from app.models.auth import AppUser
+from app.services.series_progress_repository import rebuild_series_progress
 from app.utils.security import generate_recovery_code, hash_password, hash_token
 
 
@@ -32,14 +34,24 @@ async def reset_password_cli(new_password: str) -> None:
         print(f"New recovery code: {new_code}")
 
 
+async def rebuild_series_progress_cli() -> None:
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_series_progress(session)
+        await session.commit()
+        print(f"Series progress rebuilt: {rows} rows")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Media Tracker CLI")
     subparsers = parser.add_subparsers(dest="command")
     reset_cmd = subparsers.add_parser("reset-password")
     reset_cmd.add_argument("--new-password", required=True)
+    subparsers.add_parser("rebuild-series-progress")
     args = parser.parse_args()
     if args.command == "reset-password":
         asyncio.run(reset_password_cli(args.new_password))
+    elif args.command == "rebuild-series-progress":
+        asyncio.run(rebuild_series_progress_cli())
     else:
         parser.print_help()
 
@@ -0,0 +1,178 @@
+"""Adaptive rate-limited scheduler for TMDB Bridge requests.
+
+All Bridge traffic of a metadata run goes through one ``BridgeScheduler``: it keeps
+an AIMD concurrency window (grow by one request per window of successes, halve on
+HTTP 429), pauses every caller while a ``Retry-After`` is in effect and requeues
+rate-limited requests with exponential backoff instead of reporting them as failed.
+"""
+
+import asyncio
+import contextlib
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from app.client.http_pool import POOL_SETTINGS, TMDB_BRIDGE_POOL
+from app.client.tmdb_bridge_client import TmdbBridgeClientError
+from app.config import logger
+from app.schemas.error_codes import TmdbBridgeErrorCode
+
+T = TypeVar("T")
+
+# Completions older than this are not counted in the throughput figure
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class BridgeSchedulerStats:
+    """Point-in-time view of a scheduler."""
+
+    window: int
+    in_flight: int
+    completed: int
+    rate_limited: int
+    retried: int
+    throughput: float  # completed requests per second over the last minute
+
+
+class BridgeScheduler:
+    """Gate Bridge requests through an AIMD window with Retry-After aware requeueing."""
+
+    def __init__(
+        self,
+        *,
+        initial_window: int = 10,
+        min_window: int = 1,
+        max_window: int = POOL_SETTINGS[TMDB_BRIDGE_POOL].max_connections,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window = float(min(max(initial_window, min_window), max_window))
+        self._min_window = min_window
+        self._max_window = max_window
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._clock = clock
+
+        self._cond = asyncio.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._started_at = clock()
+
+        self._completed = 0
+        self._rate_limited = 0
+        self._retried = 0
+        self._recent: deque[float] = deque()
+
+    @property
+    def window(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return max(self._min_window, int(self._window))
+
+    @property
+    def throughput(self) -> float:
+        """Completed requests per second over the last THROUGHPUT_WINDOW_SECONDS."""
+        now = self._clock()
+        self._trim_recent(now)
+        span = min(THROUGHPUT_WINDOW_SECONDS, now - self._started_at)
+        return len(self._recent) / span if span > 0 else 0.0
+
+    def stats(self) -> BridgeSchedulerStats:
+        return BridgeSchedulerStats(
+            window=self.window,
+            in_flight=self._in_flight,
+            completed=self._completed,
+            rate_limited=self._rate_limited,
+            retried=self._retried,
+            throughput=self.throughput,
+        )
+
+    async def run(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a Bridge request inside the window, retrying it while Bridge answers 429.
+
+        Raises:
+            TmdbBridgeClientError: any non rate-limit error at once, or the last
+                RATE_LIMIT_ERROR once ``max_retries`` requeues are used up
+        """
+        attempt = 0
+        while True:
+            started = await self._acquire()
+            try:
+                result = await request()
+            except TmdbBridgeClientError as e:
+                if e.code != TmdbBridgeErrorCode.RATE_LIMIT_ERROR:
+                    raise
+                self._on_rate_limited(started, e.retry_after)
+                if attempt >= self._max_retries:
+                    raise
+                delay = self._backoff(attempt, e.retry_after)
+            else:
+                self._on_success()
+                return result
+            finally:
+                await self._release()
+
+            attempt += 1
+            self._retried += 1
+            logger.info(
+                "TMDB Bridge rate limited, requeued in %.1fs (attempt %d, window %d)",
+                delay,
+                attempt,
+                self.window,
+            )
+            await asyncio.sleep(delay)
+
+    async def _acquire(self) -> float:
+        async with self._cond:
+            while True:
+                pause = self._paused_until - self._clock()
+                if pause > 0:
+                    # Retry-After is in effect: nobody starts a request until it is over
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._cond.wait(), pause)
+                    continue
+                if self._in_flight < self.window:
+                    self._in_flight += 1
+                    return self._clock()
+                await self._cond.wait()
+
+    async def _release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _on_success(self) -> None:
+        # Additive increase: about +1 slot after a full window of successful requests
+        self._window = min(float(self._max_window), self._window + 1.0 / self._window)
+        now = self._clock()
+        self._completed += 1
+        self._recent.append(now)
+        self._trim_recent(now)
+
+    def _on_rate_limited(self, started: float, retry_after: float | None) -> None:
+        now = self._clock()
+        self._rate_limited += 1
+        # Multiplicative decrease, once per congestion event: requests sent before the
+        # previous decrease were already accounted for by it
+        if started >= self._last_decrease:
+            self._window = max(float(self._min_window), self._window / 2)
+            self._last_decrease = now
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        delay: float = min(self._backoff_max, self._backoff_base * 2**attempt)
+        delay *= random.uniform(1.0, 1.5)  # jitter so requeued requests do not return in a burst
+        return max(delay, retry_after or 0.0)
+
+    def _trim_recent(self, now: float) -> None:
+        while self._recent and now - self._recent[0] > THROUGHPUT_WINDOW_SECONDS:
+            self._recent.popleft()
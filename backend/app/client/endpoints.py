@@ -1,5 +1,7 @@
 RADARR_MOVIES = "/api/v3/movie"
+RADARR_MOVIE = "/api/v3/movie/{movie_id}"
 SONARR_SERIES = "/api/v3/series"
+SONARR_SERIES_ITEM = "/api/v3/series/{series_id}"
 JELLYFIN_USERS = "/Users"
 TMDB_BRIDGE_MOVIE = "/tmdb/movie/{tmdb_id}"
 TMDB_BRIDGE_TV = "/tmdb/tv/{series_id}"
@@ -0,0 +1,225 @@
+"""Process-wide pooled HTTP clients for external services.
+
+One keep-alive ``httpx.AsyncClient`` is kept per service, so repeated calls
+(e.g. one Sonarr episode request per series) reuse open connections instead
+of paying a fresh TCP/TLS handshake each time. Clients of services with a
+retry/breaker policy send their requests through ``ResilientTransport``.
+"""
+
+import asyncio
+import hashlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import cast
+
+import httpx
+
+from app.client.resilience import BreakerPolicy, CircuitBreaker, ResilientTransport, RetryPolicy
+from app.config import logger
+from app.models.schedule import ServiceType
+
+TMDB_BRIDGE_POOL = "tmdb_bridge"
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool limits and default timeouts for one service."""
+
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    timeout: float
+    connect_timeout: float = 10.0
+    retry: RetryPolicy | None = field(default_factory=RetryPolicy)
+    breaker: BreakerPolicy | None = field(default_factory=BreakerPolicy)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeouts(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+POOL_SETTINGS: dict[str, PoolSettings] = {
+    ServiceType.JELLYFIN.value: PoolSettings(
+        max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0, timeout=60.0
+    ),
+    ServiceType.SONARR.value: PoolSettings(
+        max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0, timeout=30.0
+    ),
+    ServiceType.RADARR.value: PoolSettings(
+        max_connections=5, max_keepalive_connections=5, keepalive_expiry=30.0, timeout=30.0
+    ),
+    # Bridge rate limiting and retries are handled by BridgeScheduler
+    TMDB_BRIDGE_POOL: PoolSettings(
+        max_connections=20,
+        max_keepalive_connections=20,
+        keepalive_expiry=60.0,
+        timeout=15.0,
+        retry=None,
+        breaker=None,
+    ),
+}
+
+
+def _fingerprint(base_url: str, api_key: str) -> str:
+    return hashlib.sha256(f"{base_url}\x00{api_key}".encode()).hexdigest()
+
+
+def _build_transport(service: str, settings: PoolSettings) -> httpx.AsyncBaseTransport:
+    transport = httpx.AsyncHTTPTransport(limits=settings.limits())
+    if settings.retry is None and settings.breaker is None:
+        return transport
+    breaker = CircuitBreaker(service, settings.breaker) if settings.breaker else None
+    return ResilientTransport(transport, service=service, retry=settings.retry, breaker=breaker)
+
+
+def build_probe_client(service: str) -> httpx.AsyncClient:
+    """
+    A short-lived client with the service's pool settings, for testing unsaved credentials.
+
+    It has no retries or breaker, so an unreachable url fails after one timeout, and it
+    leaves the pooled client of the service alone. Close it after use.
+    """
+    settings = POOL_SETTINGS[service]
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(limits=settings.limits()), timeout=settings.timeouts()
+    )
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that reports to its transport once it is closed."""
+
+    def __init__(
+        self, stream: httpx.AsyncByteStream, release: Callable[[], Awaitable[None]]
+    ) -> None:
+        self._stream = stream
+        self._release: Callable[[], Awaitable[None]] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                await release()
+
+
+class _InFlightTransport(httpx.AsyncBaseTransport):
+    """
+    Counts requests whose response is not closed yet.
+
+    ``on_drained`` is awaited once the count drops to zero; the registry sets it on a
+    retired client to close that client after its last request.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+        self.in_flight = 0
+        self.on_drained: Callable[[], Awaitable[None]] | None = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            await self._release()
+            raise
+        response.stream = _ReleasingStream(
+            cast(httpx.AsyncByteStream, response.stream), self._release
+        )
+        return response
+
+    async def _release(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0 and self.on_drained is not None:
+            on_drained, self.on_drained = self.on_drained, None
+            await on_drained()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+@dataclass(eq=False)
+class _PooledClient:
+    fingerprint: str
+    client: httpx.AsyncClient
+    transport: _InFlightTransport
+
+
+class HttpClientRegistry:
+    """
+    Keeps one pooled client per service, rebuilt when its url or api_key changes.
+
+    A replaced or invalidated client may still be in use by a request that got it
+    before the change, so it is retired: closed right away when idle, otherwise once
+    its last in-flight request is done (or by ``aclose``).
+    """
+
+    def __init__(self, settings: dict[str, PoolSettings] | None = None) -> None:
+        self._settings = settings if settings is not None else POOL_SETTINGS
+        self._clients: dict[str, _PooledClient] = {}
+        self._retired: list[_PooledClient] = []
+        self._lock = asyncio.Lock()
+
+    async def get(self, service: str, base_url: str = "", api_key: str = "") -> httpx.AsyncClient:
+        """Return the pooled client for a service, creating or rebuilding it if needed."""
+        fingerprint = _fingerprint(base_url, api_key)
+        pooled = self._clients.get(service)
+        if pooled is not None and pooled.fingerprint == fingerprint:
+            return pooled.client
+
+        async with self._lock:
+            # Another caller may have built the client while we waited for the lock
+            pooled = self._clients.get(service)
+            if pooled is not None:
+                if pooled.fingerprint == fingerprint:
+                    return pooled.client
+                logger.info("Rebuilding %s HTTP client: connection settings changed", service)
+                await self._retire(pooled)
+
+            settings = self._settings[service]
+            transport = _InFlightTransport(_build_transport(service, settings))
+            client = httpx.AsyncClient(transport=transport, timeout=settings.timeouts())
+            self._clients[service] = _PooledClient(fingerprint, client, transport)
+            return client
+
+    async def invalidate(self, service: str) -> None:
+        """Forget the client for a service (e.g. after its config was deleted) and retire it."""
+        async with self._lock:
+            pooled = self._clients.pop(service, None)
+            if pooled is not None:
+                await self._retire(pooled)
+
+    async def _retire(self, pooled: _PooledClient) -> None:
+        if pooled.transport.in_flight == 0:
+            await pooled.client.aclose()
+            return
+
+        async def close_when_drained() -> None:
+            if pooled in self._retired:
+                self._retired.remove(pooled)
+            await pooled.client.aclose()
+
+        self._retired.append(pooled)
+        pooled.transport.on_drained = close_when_drained
+
+    async def aclose(self) -> None:
+        """Close every pooled client, including the retired ones."""
+        async with self._lock:
+            clients = [pooled.client for pooled in [*self._clients.values(), *self._retired]]
+            self._clients.clear()
+            self._retired = []
+        for client in clients:
+            await client.aclose()
+
+
+http_clients = HttpClientRegistry()
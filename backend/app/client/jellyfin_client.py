@@ -1,13 +1,17 @@
 """Jellyfin API client (refactored)."""
 
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime
 from typing import Any
 
 import httpx
 
 from app.client.endpoints import JELLYFIN_USERS
-from app.client.pagination import fetch_paginated, fetch_paginated_simple
+from app.client.http_pool import http_clients
+from app.client.pagination import fetch_paginated, fetch_paginated_simple, iter_paginated
 from app.config import logger
 from app.exceptions.client_errors import ClientError
+from app.models.schedule import ServiceType
 from app.schemas.error_codes import JellyfinErrorCode
 
 
@@ -48,76 +52,107 @@ async def _handle_jellyfin_error(error: Exception) -> None:
         ) from error
 
 
+def _changed_since(param: str, since: datetime | None) -> dict[str, str]:
+    """Jellyfin MinDateLastSaved* filter, empty for a full listing."""
+    if since is None:
+        return {}
+    return {param: since.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+
+# Item ids per request when listing items by id, keeps the query string short
+_IDS_CHUNK_SIZE = 50
+
+
+def _user_item_filters(since: datetime | None, ids: Sequence[str] | None) -> list[dict[str, str]]:
+    """Filters of the per-user listings: changed since ``since``, or the ``ids`` in chunks."""
+    if ids is None:
+        return [_changed_since("MinDateLastSavedForUser", since)]
+    return [
+        {"Ids": ",".join(ids[i : i + _IDS_CHUNK_SIZE])} for i in range(0, len(ids), _IDS_CHUNK_SIZE)
+    ]
+
+
 async def fetch_jellyfin_users(url: str, api_key: str) -> list[dict[str, Any]]:
     """Fetch all users from Jellyfin."""
     headers = {"X-Emby-Token": api_key}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            users = await fetch_paginated_simple(
-                client=client,
-                url=f"{url}{JELLYFIN_USERS}",
-                headers=headers,
-                service_name="Jellyfin Users",
-            )
-            return users
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise  # Never reached, but makes mypy happy
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        users = await fetch_paginated_simple(
+            client=client,
+            url=f"{url}{JELLYFIN_USERS}",
+            headers=headers,
+            service_name="Jellyfin Users",
+        )
+        return users
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise  # Never reached, but makes mypy happy
 
 
-async def fetch_jellyfin_movies(url: str, api_key: str) -> list[dict[str, Any]]:
-    """Fetch ALL movies from Jellyfin with pagination."""
+async def fetch_jellyfin_movies(
+    url: str, api_key: str, min_date_last_saved: datetime | None = None
+) -> list[dict[str, Any]]:
+    """Fetch ALL movies from Jellyfin with pagination (only changed ones when a date is given)."""
     headers = {"X-Emby-Token": api_key}
     base_url = f"{url}/Items/?api_key={api_key}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            items = await fetch_paginated(
-                client=client,
-                url=base_url,
-                headers=headers,
-                params={
-                    "IncludeItemTypes": "Movie",
-                    "Recursive": "true",
-                    "Fields": "ProviderIds",
-                    "ImageTypeLimit": "0",
-                },
-                limit=100,
-                timeout=60.0,
-                service_name="Jellyfin Movies",
-            )
-            return items
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        items = await fetch_paginated(
+            client=client,
+            url=base_url,
+            headers=headers,
+            params={
+                "IncludeItemTypes": "Movie",
+                "Recursive": "true",
+                "Fields": "ProviderIds",
+                "ImageTypeLimit": "0",
+                **_changed_since("MinDateLastSaved", min_date_last_saved),
+            },
+            limit=100,
+            timeout=60.0,
+            service_name="Jellyfin Movies",
+        )
+        return items
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
 
 
-async def fetch_jellyfin_series(url: str, api_key: str) -> list[dict[str, Any]]:
-    """Fetch ALL series from Jellyfin with pagination."""
+async def iter_jellyfin_series(
+    url: str, api_key: str, min_date_last_saved: datetime | None = None
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Iterate over ALL series from Jellyfin page by page (only changed ones if a date is given)."""
     headers = {"X-Emby-Token": api_key}
     base_url = f"{url}/Items/?api_key={api_key}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            items = await fetch_paginated(
-                client=client,
-                url=base_url,
-                headers=headers,
-                params={
-                    "IncludeItemTypes": "Series",
-                    "Recursive": "true",
-                    "Fields": "ProviderIds",
-                    "ImageTypeLimit": "0",
-                },
-                limit=100,
-                timeout=60.0,
-                service_name="Jellyfin Series",
-            )
-            return items
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        async for page in iter_paginated(
+            client=client,
+            url=base_url,
+            headers=headers,
+            params={
+                "IncludeItemTypes": "Series",
+                "Recursive": "true",
+                "Fields": "ProviderIds",
+                "ImageTypeLimit": "0",
+                **_changed_since("MinDateLastSaved", min_date_last_saved),
+            },
+            limit=100,
+            timeout=60.0,
+            service_name="Jellyfin Series",
+        ):
+            yield page
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
+
+
+async def fetch_jellyfin_series(url: str, api_key: str) -> list[dict[str, Any]]:
+    """Fetch ALL series from Jellyfin with pagination."""
+    return [item async for page in iter_jellyfin_series(url, api_key) for item in page]
 
 
 async def fetch_jellyfin_seasons(
@@ -127,23 +162,23 @@ async def fetch_jellyfin_seasons(
     headers = {"X-Emby-Token": api_key}
     base_url = f"{url}/Shows/{series_jellyfin_id}/Seasons"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            items = await fetch_paginated(
-                client=client,
-                url=base_url,
-                headers=headers,
-                params={
-                    "ImageTypeLimit": "0",
-                },
-                limit=100,
-                timeout=60.0,
-                service_name="Jellyfin Seasons",
-            )
-            return items
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        items = await fetch_paginated(
+            client=client,
+            url=base_url,
+            headers=headers,
+            params={
+                "ImageTypeLimit": "0",
+            },
+            limit=100,
+            timeout=60.0,
+            service_name="Jellyfin Seasons",
+        )
+        return items
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
 
 
 async def fetch_jellyfin_episodes(
@@ -153,35 +188,78 @@ async def fetch_jellyfin_episodes(
     headers = {"X-Emby-Token": api_key}
     base_url = f"{url}/Shows/{series_jellyfin_id}/Episodes"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            items = await fetch_paginated(
-                client=client,
-                url=base_url,
-                headers=headers,
-                params={
-                    "ImageTypeLimit": "0",
-                },
-                limit=100,
-                timeout=60.0,
-                service_name="Jellyfin Episodes",
-            )
-            return items
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        items = await fetch_paginated(
+            client=client,
+            url=base_url,
+            headers=headers,
+            params={
+                "ImageTypeLimit": "0",
+            },
+            limit=100,
+            timeout=60.0,
+            service_name="Jellyfin Episodes",
+        )
+        return items
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
 
 
-async def fetch_jellyfin_movies_for_user_all(
-    url: str, api_key: str, user_jellyfin_id: str
-) -> list[dict[str, Any]]:
-    """Fetch ALL movies for a user from Jellyfin (both watched and unwatched)."""
+async def iter_jellyfin_library_episodes(
+    url: str, api_key: str, min_date_last_saved: datetime | None = None
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Iterate over ALL episodes of the library from Jellyfin page by page.
+
+    One recursive /Items query replaces a /Shows/{id}/Episodes request per series;
+    every item carries SeriesId so callers can group episodes by series.
+    """
+    headers = {"X-Emby-Token": api_key}
+    base_url = f"{url}/Items"
+
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        async for page in iter_paginated(
+            client=client,
+            url=base_url,
+            headers=headers,
+            params={
+                "IncludeItemTypes": "Episode",
+                "Recursive": "true",
+                "Fields": "ParentIndexNumber,IndexNumber,SeriesId,SeasonId",
+                "ImageTypeLimit": "0",
+                **_changed_since("MinDateLastSaved", min_date_last_saved),
+            },
+            limit=500,
+            timeout=60.0,
+            service_name="Jellyfin Library Episodes",
+        ):
+            yield page
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
+
+
+async def iter_jellyfin_movies_for_user(
+    url: str,
+    api_key: str,
+    user_jellyfin_id: str,
+    min_date_last_saved_for_user: datetime | None = None,
+    ids: Sequence[str] | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Iterate over ALL movies for a user from Jellyfin page by page.
+
+    With ``min_date_last_saved_for_user`` only movies whose user data changed since are listed,
+    with ``ids`` only the movies with these Jellyfin ids.
+    """
     headers = {"X-Emby-Token": api_key}
     base_url = f"{url}/Users/{user_jellyfin_id}/Items"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            items = await fetch_paginated(
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        for filters in _user_item_filters(min_date_last_saved_for_user, ids):
+            async for page in iter_paginated(
                 client=client,
                 url=base_url,
                 headers=headers,
@@ -190,44 +268,81 @@ async def fetch_jellyfin_movies_for_user_all(
                     "Recursive": "true",
                     "Fields": "ProviderIds,UserData",
                     "ImageTypeLimit": "0",
+                    **filters,
                 },
                 limit=100,
                 timeout=60.0,
                 service_name=f"Jellyfin Movies for User {user_jellyfin_id}",
-            )
-            return items
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+            ):
+                yield page
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
 
 
-async def fetch_jellyfin_episodes_for_user_all(
+async def fetch_jellyfin_movies_for_user_all(
     url: str, api_key: str, user_jellyfin_id: str
 ) -> list[dict[str, Any]]:
-    """Fetch ALL episodes for a user from Jellyfin (both watched and unwatched)."""
+    """Fetch ALL movies for a user from Jellyfin (both watched and unwatched)."""
+    return [
+        item
+        async for page in iter_jellyfin_movies_for_user(url, api_key, user_jellyfin_id)
+        for item in page
+    ]
+
+
+async def iter_jellyfin_episodes_for_user(
+    url: str,
+    api_key: str,
+    user_jellyfin_id: str,
+    min_date_last_saved_for_user: datetime | None = None,
+    ids: Sequence[str] | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Iterate over ALL episodes for a user from Jellyfin page by page.
+
+    Sorted by series so that the episodes of one series mostly share a page. With
+    ``min_date_last_saved_for_user`` only episodes whose user data changed since then are listed,
+    with ``ids`` only the episodes with these Jellyfin ids.
+    """
     headers = {"X-Emby-Token": api_key}
     base_url = f"{url}/Users/{user_jellyfin_id}/Items"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            items = await fetch_paginated(
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        for filters in _user_item_filters(min_date_last_saved_for_user, ids):
+            async for page in iter_paginated(
                 client=client,
                 url=base_url,
                 headers=headers,
                 params={
                     "IncludeItemTypes": "Episode",
                     "Recursive": "true",
-                    "Fields": "UserData,ProviderIds,ParentIndexNumber,IndexNumber,SeriesId,SeasonId",
+                    "Fields": (
+                        "UserData,ProviderIds,ParentIndexNumber,IndexNumber,SeriesId,SeasonId"
+                    ),
+                    "SortBy": "SeriesSortName,ParentIndexNumber,IndexNumber",
                     "ImageTypeLimit": "0",
+                    **filters,
                 },
                 limit=100,
                 timeout=60.0,
                 service_name=f"Jellyfin Episodes for User {user_jellyfin_id}",
-            )
-            return items
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+            ):
+                yield page
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
+
+
+async def fetch_jellyfin_episodes_for_user_all(
+    url: str, api_key: str, user_jellyfin_id: str
+) -> list[dict[str, Any]]:
+    """Fetch ALL episodes for a user from Jellyfin (both watched and unwatched)."""
+    return [
+        item
+        async for page in iter_jellyfin_episodes_for_user(url, api_key, user_jellyfin_id)
+        for item in page
+    ]
 
 
 async def fetch_jellyfin_series_by_ids(
@@ -244,26 +359,26 @@ async def fetch_jellyfin_series_by_ids(
     base_url = f"{url}/Users/{user_jellyfin_id}/Items"
     all_items: list[dict[str, Any]] = []
 
-    async with httpx.AsyncClient() as client:
-        try:
-            for i in range(0, len(series_jellyfin_ids), chunk_size):
-                chunk = series_jellyfin_ids[i : i + chunk_size]
-                items = await fetch_paginated(
-                    client=client,
-                    url=base_url,
-                    headers=headers,
-                    params={
-                        "Ids": ",".join(chunk),
-                        "IncludeItemTypes": "Series",
-                        "Fields": "ProviderIds",
-                        "ImageTypeLimit": "0",
-                    },
-                    limit=100,
-                    timeout=60.0,
-                    service_name=f"Jellyfin Series by IDs (chunk {i // chunk_size + 1})",
-                )
-                all_items.extend(items)
-        except Exception as e:
-            await _handle_jellyfin_error(e)
-            raise
+    client = await http_clients.get(ServiceType.JELLYFIN.value, url, api_key)
+    try:
+        for i in range(0, len(series_jellyfin_ids), chunk_size):
+            chunk = series_jellyfin_ids[i : i + chunk_size]
+            items = await fetch_paginated(
+                client=client,
+                url=base_url,
+                headers=headers,
+                params={
+                    "Ids": ",".join(chunk),
+                    "IncludeItemTypes": "Series",
+                    "Fields": "ProviderIds",
+                    "ImageTypeLimit": "0",
+                },
+                limit=100,
+                timeout=60.0,
+                service_name=f"Jellyfin Series by IDs (chunk {i // chunk_size + 1})",
+            )
+            all_items.extend(items)
+    except Exception as e:
+        await _handle_jellyfin_error(e)
+        raise
     return all_items
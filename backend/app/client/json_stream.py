@@ -0,0 +1,104 @@
+"""Incremental decoding of large JSON array responses."""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _project(item: Any, fields: frozenset[str] | None) -> Any:
+    if fields is None or not isinstance(item, dict):
+        return item
+    return {key: value for key, value in item.items() if key in fields}
+
+
+class _ArrayDecoder:
+    """
+    Push-style decoder for a top-level JSON array.
+
+    Text is fed in arbitrary chunks; every element that is complete so far is
+    returned, and only the unfinished tail of the text is kept in the buffer.
+    """
+
+    def __init__(self, fields: frozenset[str] | None) -> None:
+        self._fields = fields
+        self._buffer = ""
+        self._state = "start"  # start -> first -> (value <-> separator) -> end
+
+    def feed(self, chunk: str, final: bool = False) -> list[Any]:
+        buffer = self._buffer + chunk
+        pos = 0
+        items: list[Any] = []
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            char = buffer[pos]
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                self._state = "first"
+                pos += 1
+            elif self._state == "first" and char == "]":
+                self._state = "end"
+                pos += 1
+            elif self._state in ("first", "value"):
+                try:
+                    item, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # element is not complete yet — wait for more text
+                if end == len(buffer) and not final and not isinstance(item, dict | list):
+                    break  # a scalar at the end of the buffer may still be truncated
+                items.append(_project(item, self._fields))
+                self._state = "separator"
+                pos = end
+            elif self._state == "separator":
+                if char == ",":
+                    self._state = "value"
+                elif char == "]":
+                    self._state = "end"
+                else:
+                    raise ValueError(f"Unexpected {char!r} between JSON array elements")
+                pos += 1
+            else:
+                raise ValueError("Unexpected data after the end of the JSON array")
+
+        self._buffer = buffer[pos:]
+        if final and self._state != "end":
+            raise ValueError("JSON array is truncated")
+        return items
+
+
+async def iter_json_array(
+    chunks: AsyncIterator[str],
+    fields: frozenset[str] | None = None,
+) -> AsyncIterator[Any]:
+    """
+    Decode a JSON array from text chunks, yielding one element at a time.
+
+    Only the current element and the unread tail of the text are held in memory,
+    never the whole body or the whole decoded list.
+
+    Args:
+        chunks: Text chunks of the body, e.g. ``response.aiter_text()``
+        fields: Keep only these keys of object elements (None keeps everything)
+
+    Yields:
+        Decoded array elements
+
+    Raises:
+        ValueError: The body is not a well-formed JSON array
+    """
+    decoder = _ArrayDecoder(fields)
+    async for chunk in chunks:
+        for item in decoder.feed(chunk):
+            yield item
+    for item in decoder.feed("", final=True):
+        yield item
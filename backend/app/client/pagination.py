@@ -1,13 +1,66 @@
 """Pagination utilities for external APIs."""
 
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from itertools import islice
 from typing import Any
 
 import httpx
 
+from app.client.json_stream import iter_json_array
 from app.config import logger
 
+PAGINATION_MAX_CONCURRENCY = int(os.getenv("PAGINATION_MAX_CONCURRENCY", "4"))
 
-async def fetch_paginated(
+# Page size tuning targets: a page should take about this long / weigh about this much
+TARGET_PAGE_SECONDS = 2.0
+TARGET_PAGE_BYTES = 4 * 1024 * 1024
+MIN_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+def tune_page_size(
+    item_count: int,
+    elapsed: float,
+    payload_bytes: int | None,
+    min_limit: int = MIN_PAGE_SIZE,
+    max_limit: int = MAX_PAGE_SIZE,
+) -> int:
+    """
+    Pick a page size from the latency and payload size of an observed page.
+
+    The observed page is scaled so the next pages land near TARGET_PAGE_SECONDS
+    and TARGET_PAGE_BYTES, whichever is hit first, clamped to [min_limit, max_limit].
+
+    Args:
+        item_count: Number of items in the observed page
+        elapsed: Observed response time in seconds
+        payload_bytes: Observed response body size, None if unknown
+        min_limit: Lower bound for the page size
+        max_limit: Upper bound for the page size
+
+    Returns:
+        Page size to use for the remaining requests
+    """
+    if item_count <= 0:
+        return min_limit
+
+    scale = TARGET_PAGE_SECONDS / max(elapsed, 1e-3)
+    if payload_bytes:
+        scale = min(scale, TARGET_PAGE_BYTES / payload_bytes)
+
+    return max(min_limit, min(max_limit, int(item_count * scale)))
+
+
+def _payload_size(response: httpx.Response) -> int | None:
+    content = response.content
+    return len(content) if isinstance(content, bytes) else None
+
+
+async def iter_paginated(
     client: httpx.AsyncClient,
     url: str,
     headers: dict[str, str],
@@ -19,49 +72,58 @@ async def fetch_paginated(
     start_index_param: str = "StartIndex",
     limit_param: str = "Limit",
     service_name: str = "API",
-) -> list[dict[str, Any]]:
+    max_concurrency: int | None = None,
+    max_limit: int = MAX_PAGE_SIZE,
+) -> AsyncIterator[list[dict[str, Any]]]:
     """
-    Fetch all items from a paginated API.
+    Iterate over a paginated API page by page.
 
     Generic pagination utility that works with Jellyfin-style APIs.
+    The first page is fetched with ``limit`` to learn the total count; the
+    remaining windows are then prefetched concurrently (at most
+    ``max_concurrency`` requests in flight) with a page size tuned from the
+    first page's latency and payload size. Pages are yielded in server order,
+    so a caller only ever holds the page it is processing plus the prefetched
+    ones, not the whole library.
 
     Args:
         client: httpx AsyncClient instance
         url: API endpoint URL
         headers: Request headers
         params: Base query parameters
-        limit: Items per page
+        limit: Items per page for the first request
         timeout: Request timeout in seconds
         item_key: Key in response containing items list
         total_key: Key in response containing total count
         start_index_param: Query param name for start index
         limit_param: Query param name for limit
         service_name: Service name for logging
+        max_concurrency: Max requests in flight (default PAGINATION_MAX_CONCURRENCY)
+        max_limit: Upper bound for the tuned page size
 
-    Returns:
-        List of all fetched items
+    Yields:
+        Lists of items, one per page
 
     Examples:
-        >>> async with httpx.AsyncClient() as client:
-        ...     items = await fetch_paginated(
-        ...         client=client,
-        ...         url="https://api.example.com/items",
-        ...         headers={"Authorization": "Bearer token"},
-        ...         params={"filter": "movies"},
-        ...         service_name="Example API",
-        ...     )
+        >>> async for page in iter_paginated(
+        ...     client=client,
+        ...     url="https://api.example.com/items",
+        ...     headers={"Authorization": "Bearer token"},
+        ...     params={"filter": "movies"},
+        ...     service_name="Example API",
+        ... ):
+        ...     await process(page)
     """
-    all_items: list[dict[str, Any]] = []
-    start_index = 0
 
-    while True:
-        # Add pagination params
+    async def _get_page(
+        start_index: int, page_limit: int
+    ) -> tuple[dict[str, Any], float, int | None]:
         current_params = {
             **params,
             start_index_param: start_index,
-            limit_param: limit,
+            limit_param: page_limit,
         }
-
+        started = time.perf_counter()
         response = await client.get(
             url=url,
             headers=headers,
@@ -69,30 +131,141 @@ async def fetch_paginated(
             timeout=timeout,
         )
         response.raise_for_status()
-        data = response.json()
+        elapsed = time.perf_counter() - started
+        return response.json(), elapsed, _payload_size(response)
 
-        # Extract items
-        items = data.get(item_key, [])
-        all_items.extend(items)
+    first_page, elapsed, payload_bytes = await _get_page(0, limit)
+    first_items: list[dict[str, Any]] = first_page.get(item_key, [])
+    total = first_page.get(total_key, 0)
 
-        # Check if we've fetched everything
-        total = data.get(total_key, 0)
-        fetched = len(all_items)
+    logger.debug("Fetched %d/%d items from %s", len(first_items), total, service_name)
 
-        logger.debug(
-            "Fetched %d/%d items from %s",
-            fetched,
-            total,
-            service_name,
-        )
+    # Stop if we've fetched all items. A short first page alone is not the end:
+    # servers with a hard page cap return fewer items than requested.
+    if not first_items or len(first_items) >= total:
+        logger.info("Fetched %d items from %s", len(first_items), service_name)
+        if first_items:
+            yield first_items
+        return
+
+    page_size = tune_page_size(
+        len(first_items),
+        elapsed,
+        payload_bytes,
+        min_limit=min(MIN_PAGE_SIZE, limit, max_limit),
+        max_limit=max_limit,
+    )
+
+    async def _fetch_window(start_index: int, size: int) -> list[dict[str, Any]]:
+        # A server may cap the page below what we asked for — keep reading until
+        # the window is filled or the data runs out.
+        window: list[dict[str, Any]] = []
+        while len(window) < size:
+            data, _, _ = await _get_page(start_index + len(window), size - len(window))
+            items: list[dict[str, Any]] = data.get(item_key, [])
+            if not items:
+                break
+            window.extend(items)
+        return window
+
+    windows = iter(
+        [
+            (start, min(page_size, total - start))
+            for start in range(len(first_items), total, page_size)
+        ]
+    )
+    logger.debug("Fetching remaining pages of %d items from %s", page_size, service_name)
+
+    # Sliding lookahead: keep up to max_concurrency windows in flight, hand them
+    # out in order and schedule the next one as soon as a slot frees up.
+    in_flight: deque[asyncio.Task[list[dict[str, Any]]]] = deque(
+        asyncio.create_task(_fetch_window(start, size))
+        for start, size in islice(windows, max_concurrency or PAGINATION_MAX_CONCURRENCY)
+    )
+    fetched = len(first_items)
+    try:
+        yield first_items
+        while in_flight:
+            page = await in_flight.popleft()
+            for start, size in islice(windows, 1):
+                in_flight.append(asyncio.create_task(_fetch_window(start, size)))
+            if page:
+                fetched += len(page)
+                yield page
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+    logger.info("Fetched %d items from %s", fetched, service_name)
 
-        # Stop if we've fetched all items or received less than requested
-        if fetched >= total or len(items) < limit:
-            break
 
-        start_index += limit
+async def fetch_paginated(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str],
+    params: dict[str, Any],
+    limit: int = 100,
+    timeout: float = 60.0,
+    item_key: str = "Items",
+    total_key: str = "TotalRecordCount",
+    start_index_param: str = "StartIndex",
+    limit_param: str = "Limit",
+    service_name: str = "API",
+    max_concurrency: int | None = None,
+    max_limit: int = MAX_PAGE_SIZE,
+) -> list[dict[str, Any]]:
+    """
+    Fetch all items from a paginated API.
+
+    Collects every page of :func:`iter_paginated` into one list. Prefer
+    ``iter_paginated`` for large libraries where the caller can work page by page.
 
-    logger.info("Fetched %d items from %s", len(all_items), service_name)
+    Args:
+        client: httpx AsyncClient instance
+        url: API endpoint URL
+        headers: Request headers
+        params: Base query parameters
+        limit: Items per page for the first request
+        timeout: Request timeout in seconds
+        item_key: Key in response containing items list
+        total_key: Key in response containing total count
+        start_index_param: Query param name for start index
+        limit_param: Query param name for limit
+        service_name: Service name for logging
+        max_concurrency: Max requests in flight (default PAGINATION_MAX_CONCURRENCY)
+        max_limit: Upper bound for the tuned page size
+
+    Returns:
+        List of all fetched items
+
+    Examples:
+        >>> async with httpx.AsyncClient() as client:
+        ...     items = await fetch_paginated(
+        ...         client=client,
+        ...         url="https://api.example.com/items",
+        ...         headers={"Authorization": "Bearer token"},
+        ...         params={"filter": "movies"},
+        ...         service_name="Example API",
+        ...     )
+    """
+    all_items: list[dict[str, Any]] = []
+    async for page in iter_paginated(
+        client=client,
+        url=url,
+        headers=headers,
+        params=params,
+        limit=limit,
+        timeout=timeout,
+        item_key=item_key,
+        total_key=total_key,
+        start_index_param=start_index_param,
+        limit_param=limit_param,
+        service_name=service_name,
+        max_concurrency=max_concurrency,
+        max_limit=max_limit,
+    ):
+        all_items.extend(page)
     return all_items
 
 
@@ -140,3 +313,59 @@ async def fetch_paginated_simple(
 
     logger.info("Fetched %d items from %s", len(items), service_name)
     return items  # type: ignore[no-any-return]
+
+
+async def iter_paginated_simple(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str],
+    params: dict[str, Any] | None = None,
+    timeout: float = 30.0,
+    service_name: str = "API",
+    fields: frozenset[str] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Stream items from a non-paginated API (returns list directly).
+
+    Streaming counterpart of :func:`fetch_paginated_simple`: the body is read
+    and decoded incrementally and items are yielded one at a time, so neither
+    the raw body nor the full decoded list is held in memory.
+
+    Args:
+        client: httpx AsyncClient instance
+        url: API endpoint URL
+        headers: Request headers
+        params: Query parameters
+        timeout: Request timeout in seconds
+        service_name: Service name for logging
+        fields: Keep only these keys of each item (None keeps everything)
+
+    Yields:
+        Items of the response list
+
+    Examples:
+        >>> async for movie in iter_paginated_simple(
+        ...     client=client,
+        ...     url="https://api.example.com/movies",
+        ...     headers={"X-Api-Key": "key"},
+        ...     service_name="Radarr",
+        ...     fields=frozenset({"id", "title"}),
+        ... ):
+        ...     await process(movie)
+    """
+    count = 0
+    async with client.stream(
+        "GET",
+        url,
+        headers=headers,
+        params=params or {},
+        timeout=timeout,
+    ) as response:
+        if response.is_error:
+            await response.aread()  # error handlers log the body
+        response.raise_for_status()
+        async for item in iter_json_array(response.aiter_text(), fields):
+            count += 1
+            yield item
+
+    logger.info("Fetched %d items from %s", count, service_name)
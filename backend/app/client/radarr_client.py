@@ -1,13 +1,16 @@
 """Radarr API client (refactored)."""
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
-from app.client.endpoints import RADARR_MOVIES
-from app.client.pagination import fetch_paginated_simple
+from app.client.endpoints import RADARR_MOVIE, RADARR_MOVIES
+from app.client.http_pool import http_clients
+from app.client.pagination import fetch_paginated_simple, iter_paginated_simple
 from app.config import logger
 from app.exceptions.client_errors import ClientError
+from app.models.schedule import ServiceType
 from app.schemas.error_codes import RadarrErrorCode
 
 
@@ -20,6 +23,23 @@ class RadarrClientError(ClientError):
         super().__init__(code=code, message=message)
 
 
+# Fields of a Radarr movie that radarr_service reads; everything else is dropped while streaming
+RADARR_MOVIE_FIELDS = frozenset(
+    {
+        "id",
+        "title",
+        "tmdbId",
+        "imdbId",
+        "inCinemas",
+        "status",
+        "images",
+        "year",
+        "genres",
+        "ratings",
+    }
+)
+
+
 async def _handle_radarr_error(error: Exception) -> None:
     """Handle Radarr API errors uniformly."""
     if isinstance(error, httpx.RequestError):
@@ -52,16 +72,55 @@ async def fetch_radarr_movies(url: str, api_key: str) -> list[dict[str, Any]]:
     """Fetch the list of movies from the Radarr API."""
     headers = {"X-Api-Key": api_key}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            movies = await fetch_paginated_simple(
-                client=client,
-                url=f"{url}{RADARR_MOVIES}",
-                headers=headers,
-                timeout=30.0,
-                service_name="Radarr",
-            )
-            return movies
-        except Exception as e:
-            await _handle_radarr_error(e)
-            raise  # Never reached, but makes mypy happy
+    client = await http_clients.get(ServiceType.RADARR.value, url, api_key)
+    try:
+        movies = await fetch_paginated_simple(
+            client=client,
+            url=f"{url}{RADARR_MOVIES}",
+            headers=headers,
+            timeout=30.0,
+            service_name="Radarr",
+        )
+        return movies
+    except Exception as e:
+        await _handle_radarr_error(e)
+        raise  # Never reached, but makes mypy happy
+
+
+async def iter_radarr_movies(url: str, api_key: str) -> AsyncIterator[dict[str, Any]]:
+    """Stream movies from the Radarr API one at a time, trimmed to RADARR_MOVIE_FIELDS."""
+    headers = {"X-Api-Key": api_key}
+
+    client = await http_clients.get(ServiceType.RADARR.value, url, api_key)
+    try:
+        async for item in iter_paginated_simple(
+            client=client,
+            url=f"{url}{RADARR_MOVIES}",
+            headers=headers,
+            timeout=30.0,
+            service_name="Radarr",
+            fields=RADARR_MOVIE_FIELDS,
+        ):
+            yield item
+    except Exception as e:
+        await _handle_radarr_error(e)
+        raise
+
+
+async def fetch_radarr_movie(url: str, api_key: str, movie_id: int) -> dict[str, Any] | None:
+    """Fetch one movie from the Radarr API; None when Radarr no longer has it."""
+    headers = {"X-Api-Key": api_key}
+
+    client = await http_clients.get(ServiceType.RADARR.value, url, api_key)
+    try:
+        response = await client.get(
+            f"{url}{RADARR_MOVIE.format(movie_id=movie_id)}", headers=headers, timeout=30.0
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        movie: dict[str, Any] = response.json()
+        return movie
+    except Exception as e:
+        await _handle_radarr_error(e)
+        raise
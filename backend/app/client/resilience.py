@@ -0,0 +1,224 @@
+"""Retries and circuit breaking for pooled service clients.
+
+``ResilientTransport`` wraps the transport of a pooled ``httpx.AsyncClient``, so
+every request of a service client goes through it without changes at call sites:
+
+* idempotent requests (GET/HEAD/OPTIONS) are retried on transport errors and on
+  429/502/503/504 with jittered exponential backoff, honouring ``Retry-After``;
+* a per-service ``CircuitBreaker`` counts consecutive failed attempts and, once
+  open, rejects requests at once with ``CircuitOpenError`` instead of letting
+  every request wait out its timeout against a service that is down.
+
+Only establishing the response is retried: an error while a streamed body is
+being read surfaces to the caller as before.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+
+import httpx
+
+from app.config import logger
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the service's circuit is open.
+
+    Subclasses ``httpx.TransportError`` so client error handlers treat it as a
+    network error of that service.
+    """
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How idempotent requests are retried."""
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Backoff before retry number ``attempt + 1`` (full jitter, Retry-After wins)."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """When a service's circuit opens and how long it stays open."""
+
+    failure_threshold: int = 5
+    recovery_timeout: float = 30.0
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse Retry-After given either as delta-seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(
+        self,
+        service: str,
+        policy: BreakerPolicy,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.service = service
+        self._policy = policy
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._policy.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def before_request(self, request: httpx.Request) -> None:
+        """Admit a request or raise CircuitOpenError."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        if state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+            # Let one request through to find out whether the service is back
+            self._probe_in_flight = True
+            return
+        retry_in = max(0.0, self._opened_at + self._policy.recovery_timeout - self._clock())
+        raise CircuitOpenError(
+            f"{self.service} circuit is open, failing fast (next probe in {retry_in:.0f}s)",
+            request=request,
+        )
+
+    def record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info("%s circuit closed: service is responding again", self.service)
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == CircuitState.HALF_OPEN or (
+            self._state == CircuitState.CLOSED and self._failures >= self._policy.failure_threshold
+        ):
+            logger.warning(
+                "%s circuit opened after %d consecutive failures", self.service, self._failures
+            )
+            self._state = CircuitState.OPEN
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Forget an admitted request that ended without a verdict (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper adding idempotent retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        *,
+        service: str,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._transport = transport
+        self._service = service
+        self._retry = retry
+        self.breaker = breaker
+        self._sleep = sleep
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retry = self._retry if request.method in IDEMPOTENT_METHODS else None
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_request(request)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                self._record(failed=True)
+                if retry is None or attempt >= retry.max_retries:
+                    raise
+                delay = retry.delay(attempt)
+                reason = f"{type(e).__name__}: {e}"
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.release()
+                raise
+            else:
+                self._record(failed=response.status_code >= 500)
+                if (
+                    retry is None
+                    or attempt >= retry.max_retries
+                    or response.status_code not in retry.retry_statuses
+                ):
+                    return response
+                delay = retry.delay(attempt, retry_after_seconds(response))
+                reason = f"HTTP {response.status_code}"
+                await response.aclose()
+
+            attempt += 1
+            logger.warning(
+                "%s %s %s failed (%s), retry %d/%d in %.1fs",
+                self._service,
+                request.method,
+                request.url.copy_with(query=None),
+                reason,
+                attempt,
+                retry.max_retries,
+                delay,
+            )
+            await self._sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def _record(self, *, failed: bool) -> None:
+        if self.breaker is None:
+            return
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
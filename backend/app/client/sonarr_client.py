@@ -1,13 +1,16 @@
 """Sonarr API client (refactored)."""
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
-from app.client.endpoints import SONARR_SERIES
-from app.client.pagination import fetch_paginated_simple
+from app.client.endpoints import SONARR_SERIES, SONARR_SERIES_ITEM
+from app.client.http_pool import http_clients
+from app.client.pagination import fetch_paginated_simple, iter_paginated_simple
 from app.config import logger
 from app.exceptions.client_errors import ClientError
+from app.models.schedule import ServiceType
 from app.schemas.error_codes import SonarrErrorCode
 
 
@@ -20,6 +23,25 @@ class SonarrClientError(ClientError):
         super().__init__(code=code, message=message)
 
 
+# Fields of a Sonarr series that sonarr_service reads; everything else is dropped while streaming
+SONARR_SERIES_FIELDS = frozenset(
+    {
+        "id",
+        "title",
+        "tmdbId",
+        "imdbId",
+        "tvdbId",
+        "firstAired",
+        "status",
+        "images",
+        "year",
+        "genres",
+        "ratings",
+        "seasons",
+    }
+)
+
+
 async def _handle_sonarr_error(error: Exception) -> None:
     """Handle Sonarr API errors uniformly."""
     if isinstance(error, httpx.RequestError):
@@ -52,36 +74,75 @@ async def fetch_sonarr_series(url: str, api_key: str) -> list[dict[str, Any]]:
     """Fetch the list of series from the Sonarr API."""
     headers = {"X-Api-Key": api_key}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            series = await fetch_paginated_simple(
-                client=client,
-                url=f"{url}{SONARR_SERIES}",
-                headers=headers,
-                timeout=30.0,
-                service_name="Sonarr Series",
-            )
-            return series
-        except Exception as e:
-            await _handle_sonarr_error(e)
-            raise
+    client = await http_clients.get(ServiceType.SONARR.value, url, api_key)
+    try:
+        series = await fetch_paginated_simple(
+            client=client,
+            url=f"{url}{SONARR_SERIES}",
+            headers=headers,
+            timeout=30.0,
+            service_name="Sonarr Series",
+        )
+        return series
+    except Exception as e:
+        await _handle_sonarr_error(e)
+        raise
+
+
+async def iter_sonarr_series(url: str, api_key: str) -> AsyncIterator[dict[str, Any]]:
+    """Stream series from the Sonarr API one at a time, trimmed to SONARR_SERIES_FIELDS."""
+    headers = {"X-Api-Key": api_key}
+
+    client = await http_clients.get(ServiceType.SONARR.value, url, api_key)
+    try:
+        async for item in iter_paginated_simple(
+            client=client,
+            url=f"{url}{SONARR_SERIES}",
+            headers=headers,
+            timeout=30.0,
+            service_name="Sonarr Series",
+            fields=SONARR_SERIES_FIELDS,
+        ):
+            yield item
+    except Exception as e:
+        await _handle_sonarr_error(e)
+        raise
+
+
+async def fetch_sonarr_series_item(url: str, api_key: str, series_id: int) -> dict[str, Any] | None:
+    """Fetch one series from the Sonarr API; None when Sonarr no longer has it."""
+    headers = {"X-Api-Key": api_key}
+
+    client = await http_clients.get(ServiceType.SONARR.value, url, api_key)
+    try:
+        response = await client.get(
+            f"{url}{SONARR_SERIES_ITEM.format(series_id=series_id)}", headers=headers, timeout=30.0
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        series: dict[str, Any] = response.json()
+        return series
+    except Exception as e:
+        await _handle_sonarr_error(e)
+        raise
 
 
 async def fetch_sonarr_episodes(url: str, api_key: str, series_id: int) -> list[dict[str, Any]]:
     """Fetch all episodes for a given series from Sonarr API."""
     headers = {"X-Api-Key": api_key}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            episode_url = f"{url}/api/v3/episode?seriesId={series_id}"
-            episodes = await fetch_paginated_simple(
-                client=client,
-                url=episode_url,
-                headers=headers,
-                timeout=30.0,
-                service_name=f"Sonarr Episodes (series_id={series_id})",
-            )
-            return episodes
-        except Exception as e:
-            await _handle_sonarr_error(e)
-            raise
+    client = await http_clients.get(ServiceType.SONARR.value, url, api_key)
+    try:
+        episode_url = f"{url}/api/v3/episode?seriesId={series_id}"
+        episodes = await fetch_paginated_simple(
+            client=client,
+            url=episode_url,
+            headers=headers,
+            timeout=30.0,
+            service_name=f"Sonarr Episodes (series_id={series_id})",
+        )
+        return episodes
+    except Exception as e:
+        await _handle_sonarr_error(e)
+        raise
@@ -1,123 +1,178 @@
 """TMDB Bridge API client (public, no auth)."""
 
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
 
 from app.client.endpoints import TMDB_BRIDGE_MOVIE, TMDB_BRIDGE_TV
+from app.client.resilience import retry_after_seconds
 from app.config import logger
 from app.exceptions.client_errors import ClientError
 from app.schemas.error_codes import TmdbBridgeErrorCode
 
-BRIDGE_BASE_URL = "https://bridge.mediatrackr.org"
+BRIDGE_BASE_URL = os.getenv("BRIDGE_BASE_URL", "https://bridge.mediatrackr.org").rstrip("/")
 
 
 class TmdbBridgeClientError(ClientError):
-    def __init__(self, code: TmdbBridgeErrorCode, message: str):
+    def __init__(self, code: TmdbBridgeErrorCode, message: str, retry_after: float | None = None):
         self.code = code
         self.message = message
+        # Seconds Bridge asked to wait (Retry-After), set for rate-limit errors
+        self.retry_after = retry_after
         super().__init__(code=code, message=message)
 
 
-async def fetch_tmdb_movie(
-    tmdb_id: str,
-    *,
-    client: httpx.AsyncClient,
-    timeout: float = 15.0,
-) -> dict[str, Any] | None:
-    """Fetch movie metadata from Bridge.
+@dataclass(frozen=True)
+class BridgeValidators:
+    """HTTP cache validators of a previously received Bridge response."""
 
-    Returns:
-        dict on 200; None on 404 (movie not in TMDB — skip silently).
+    etag: str | None = None
+    last_modified: str | None = None
 
-    Raises:
-        TmdbBridgeClientError: on network/timeout/HTTP errors.
+    def request_headers(self) -> dict[str, str]:
+        """Conditional request headers that let Bridge answer 304 Not Modified."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(frozen=True)
+class BridgeResponse:
+    """Bridge answer for one URL.
+
+    ``data`` is None when Bridge replied 304 Not Modified; ``digest`` is a hash of
+    the canonical JSON body and lets callers detect an unchanged 200 response.
     """
-    url = f"{BRIDGE_BASE_URL}{TMDB_BRIDGE_MOVIE.format(tmdb_id=tmdb_id)}"
+
+    url: str
+    data: dict[str, Any] | None
+    validators: BridgeValidators = field(default_factory=BridgeValidators)
+    digest: str | None = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.data is None
+
+
+def tmdb_movie_url(tmdb_id: str) -> str:
+    return f"{BRIDGE_BASE_URL}{TMDB_BRIDGE_MOVIE.format(tmdb_id=tmdb_id)}"
+
+
+def tmdb_series_url(series_id: str) -> str:
+    return f"{BRIDGE_BASE_URL}{TMDB_BRIDGE_TV.format(series_id=series_id)}"
+
+
+def _body_digest(data: dict[str, Any]) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def _fetch_bridge(
+    url: str,
+    *,
+    label: str,
+    client: httpx.AsyncClient,
+    timeout: float,
+    validators: BridgeValidators | None,
+) -> BridgeResponse | None:
+    """GET a Bridge resource, conditionally when validators are known."""
+    headers = validators.request_headers() if validators else None
     try:
-        response = await client.get(url, timeout=timeout)
+        response = await client.get(url, headers=headers, timeout=timeout)
         if response.status_code == 404:
-            logger.info("TMDB Bridge: movie tmdb_id=%s not found", tmdb_id)
+            logger.info("TMDB Bridge: %s not found", label)
             return None
+        if response.status_code == 304 and validators is not None:
+            return BridgeResponse(url=url, data=None, validators=validators)
         response.raise_for_status()
         data: dict[str, Any] = response.json()
-        return data
+        return BridgeResponse(
+            url=url,
+            data=data,
+            validators=BridgeValidators(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            ),
+            digest=_body_digest(data),
+        )
     except httpx.TimeoutException as e:
-        logger.warning("TMDB Bridge timeout for tmdb_id=%s: %s", tmdb_id, e)
+        logger.warning("TMDB Bridge timeout for %s: %s", label, e)
         raise TmdbBridgeClientError(
             code=TmdbBridgeErrorCode.TIMEOUT_ERROR,
-            message=f"Bridge timeout for tmdb_id={tmdb_id}",
+            message=f"Bridge timeout for {label}",
         ) from e
     except httpx.RequestError as e:
-        logger.warning("TMDB Bridge network error for tmdb_id=%s: %s", tmdb_id, e)
+        logger.warning("TMDB Bridge network error for %s: %s", label, e)
         raise TmdbBridgeClientError(
             code=TmdbBridgeErrorCode.NETWORK_ERROR,
-            message=f"Bridge unreachable for tmdb_id={tmdb_id}",
+            message=f"Bridge unreachable for {label}",
         ) from e
     except httpx.HTTPStatusError as e:
-        logger.warning(
-            "TMDB Bridge HTTP %s for tmdb_id=%s",
-            e.response.status_code,
-            tmdb_id,
-        )
-        code = (
-            TmdbBridgeErrorCode.RATE_LIMIT_ERROR
-            if e.response.status_code == 429
-            else TmdbBridgeErrorCode.FETCH_FAILED
-        )
+        logger.warning("TMDB Bridge HTTP %s for %s", e.response.status_code, label)
+        if e.response.status_code == 429:
+            raise TmdbBridgeClientError(
+                code=TmdbBridgeErrorCode.RATE_LIMIT_ERROR,
+                message=f"Bridge HTTP 429 for {label}",
+                retry_after=retry_after_seconds(e.response),
+            ) from e
         raise TmdbBridgeClientError(
-            code=code,
-            message=f"Bridge HTTP {e.response.status_code} for tmdb_id={tmdb_id}",
+            code=TmdbBridgeErrorCode.FETCH_FAILED,
+            message=f"Bridge HTTP {e.response.status_code} for {label}",
         ) from e
 
 
+async def fetch_tmdb_movie(
+    tmdb_id: str,
+    *,
+    client: httpx.AsyncClient,
+    timeout: float = 15.0,
+    validators: BridgeValidators | None = None,
+) -> BridgeResponse | None:
+    """Fetch movie metadata from Bridge.
+
+    Returns:
+        BridgeResponse on 200 or, when ``validators`` are given, on 304 (``data`` is None);
+        None on 404 (movie not in TMDB — skip silently).
+
+    Raises:
+        TmdbBridgeClientError: on network/timeout/HTTP errors.
+    """
+    return await _fetch_bridge(
+        tmdb_movie_url(tmdb_id),
+        label=f"tmdb_id={tmdb_id}",
+        client=client,
+        timeout=timeout,
+        validators=validators,
+    )
+
+
 async def fetch_tmdb_series(
     series_id: str,
     *,
     client: httpx.AsyncClient,
     timeout: float = 15.0,
-) -> dict[str, Any] | None:
+    validators: BridgeValidators | None = None,
+) -> BridgeResponse | None:
     """Fetch series metadata from Bridge.
 
     Returns:
-        dict on 200; None on 404 (series not in TMDB — skip silently).
+        BridgeResponse on 200 or, when ``validators`` are given, on 304 (``data`` is None);
+        None on 404 (series not in TMDB — skip silently).
 
     Raises:
         TmdbBridgeClientError: on network/timeout/HTTP errors.
     """
-    url = f"{BRIDGE_BASE_URL}{TMDB_BRIDGE_TV.format(series_id=series_id)}"
-    try:
-        response = await client.get(url, timeout=timeout)
-        if response.status_code == 404:
-            logger.info("TMDB Bridge: series series_id=%s not found", series_id)
-            return None
-        response.raise_for_status()
-        data: dict[str, Any] = response.json()
-        return data
-    except httpx.TimeoutException as e:
-        logger.warning("TMDB Bridge timeout for series_id=%s: %s", series_id, e)
-        raise TmdbBridgeClientError(
-            code=TmdbBridgeErrorCode.TIMEOUT_ERROR,
-            message=f"Bridge timeout for series_id={series_id}",
-        ) from e
-    except httpx.RequestError as e:
-        logger.warning("TMDB Bridge network error for series_id=%s: %s", series_id, e)
-        raise TmdbBridgeClientError(
-            code=TmdbBridgeErrorCode.NETWORK_ERROR,
-            message=f"Bridge unreachable for series_id={series_id}",
-        ) from e
-    except httpx.HTTPStatusError as e:
-        logger.warning(
-            "TMDB Bridge HTTP %s for series_id=%s",
-            e.response.status_code,
-            series_id,
-        )
-        code = (
-            TmdbBridgeErrorCode.RATE_LIMIT_ERROR
-            if e.response.status_code == 429
-            else TmdbBridgeErrorCode.FETCH_FAILED
-        )
-        raise TmdbBridgeClientError(
-            code=code,
-            message=f"Bridge HTTP {e.response.status_code} for series_id={series_id}",
-        ) from e
+    return await _fetch_bridge(
+        tmdb_series_url(series_id),
+        label=f"series_id={series_id}",
+        client=client,
+        timeout=timeout,
+        validators=validators,
+    )
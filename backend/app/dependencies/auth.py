@@ -1,6 +1,11 @@
+from itertools import chain
+from typing import Any
+
 import jwt
 from fastapi import Depends, HTTPException, Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction, UOWTransaction
 
 from app.database import get_session
 from app.models.auth import AppUser
@@ -27,31 +32,89 @@ def _extract_token(request: Request) -> str | None:
     return token
 
 
-async def get_current_user(
-    request: Request,
-    session: AsyncSession = Depends(get_session),
-) -> AppUser:
+def _token_user_id(request: Request) -> int:
     token = _extract_token(request)
     if token is None:
         raise HTTPException(status_code=401, detail={"code": AuthErrorCode.TOKEN_INVALID})
     payload = _decode_token(token)
-    user_id = int(str(payload["sub"]))
-    user = await session.get(AppUser, user_id)
+    return int(str(payload["sub"]))
+
+
+async def get_current_user(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> AppUser:
+    user = await session.get(AppUser, _token_user_id(request))
     if user is None or not user.is_active:
         raise HTTPException(status_code=401, detail={"code": AuthErrorCode.USER_INACTIVE})
     return user
 
 
+# Ids of app users already found active. Cleared when a session commits a change to
+# app_users, so deactivating a user takes effect on their next request. Per process,
+# like the media response cache
+_active_user_ids: set[int] = set()
+
+# Session.info flag: the current transaction wrote to app_users
+_APP_USERS_CHANGED = "app_users_changed"
+
+
+async def get_current_user_id(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> int:
+    """
+    Like get_current_user for routes that need no AppUser object, e.g. the cached media
+    responses: a user found active before is not looked up again, so a 304 needs no query.
+    """
+    user_id = _token_user_id(request)
+    if user_id in _active_user_ids:
+        return user_id
+    user = await session.get(AppUser, user_id)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail={"code": AuthErrorCode.USER_INACTIVE})
+    _active_user_ids.add(user_id)
+    return user_id
+
+
+def forget_active_users() -> None:
+    _active_user_ids.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_app_users(session: Session, flush_context: UOWTransaction) -> None:
+    objects = chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, AppUser) for obj in objects):
+        session.info[_APP_USERS_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_app_users(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table: Any = getattr(orm_execute_state.statement, "table", None)
+        if getattr(table, "name", None) == AppUser.__tablename__:
+            orm_execute_state.session.info[_APP_USERS_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_active_users_on_commit(session: Session) -> None:
+    if session.info.pop(_APP_USERS_CHANGED, False):
+        forget_active_users()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_rolled_back_app_users(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_APP_USERS_CHANGED, None)
+
+
 async def get_optional_user(
     request: Request,
     session: AsyncSession = Depends(get_session),
 ) -> AppUser | None:
-    token = _extract_token(request)
-    if token is None:
+    if _extract_token(request) is None:
         return None
-    payload = _decode_token(token)
-    user_id = int(str(payload["sub"]))
-    user = await session.get(AppUser, user_id)
+    user = await session.get(AppUser, _token_user_id(request))
     if user is None or not user.is_active:
         raise HTTPException(status_code=401, detail={"code": AuthErrorCode.USER_INACTIVE})
     return user
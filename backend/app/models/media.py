@@ -2,7 +2,20 @@ import enum
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import JSON, DateTime, Enum, Float, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    JSON,
+    Computed,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -34,6 +47,19 @@ class SeriesStatus(enum.Enum):
 
 class Media(Base):
     __tablename__ = "media"
+    __table_args__ = (
+        # Keyset pagination of the media list by title and by recently added
+        Index("ix_media_title_id", "title", "id"),
+        Index("ix_media_created_at_id", "created_at", "id"),
+        # /api/v1/media/search: full-text and typo-tolerant (pg_trgm) title matching
+        Index("ix_media_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_media_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     media_type: Mapped[MediaType] = mapped_column(Enum(MediaType), nullable=False)
@@ -42,6 +68,9 @@ class Media(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed("setweight(to_tsvector('simple', title), 'A')"), deferred=True
+    )
 
     series: Mapped[Optional["Series"]] = relationship(
         "Series", back_populates="media", uselist=False
@@ -51,6 +80,7 @@ class Media(Base):
 
 class Series(Base):
     __tablename__ = "series"
+    __table_args__ = (Index("ix_series_search_vector", "search_vector", postgresql_using="gin"),)
 
     id: Mapped[int] = mapped_column(Integer, ForeignKey("media.id"), primary_key=True)
     sonarr_id: Mapped[int | None] = mapped_column(Integer, nullable=True, unique=True)
@@ -72,8 +102,18 @@ class Series(Base):
     tmdb_metadata_fetched_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Digest of the Bridge body last applied to this row; cleared when an import changes it
+    tmdb_metadata_digest: Mapped[str | None] = mapped_column(String(64), nullable=True)
     number_of_seasons: Mapped[int | None] = mapped_column(Integer, nullable=True)
     number_of_episodes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', COALESCE(original_name, '')), 'B') || "
+            "setweight(to_tsvector('simple', COALESCE(overview, '')), 'C')"
+        ),
+        deferred=True,
+    )
 
     media: Mapped["Media"] = relationship("Media", back_populates="series")
     seasons: Mapped[list["Season"]] = relationship("Season", back_populates="series")
@@ -81,6 +121,7 @@ class Series(Base):
 
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (Index("ix_movies_search_vector", "search_vector", postgresql_using="gin"),)
 
     id: Mapped[int] = mapped_column(Integer, ForeignKey("media.id"), primary_key=True)
     radarr_id: Mapped[int | None] = mapped_column(Integer, nullable=True, unique=True)
@@ -99,12 +140,23 @@ class Movie(Base):
     tmdb_metadata_fetched_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Digest of the Bridge body last applied to this row; cleared when an import changes it
+    tmdb_metadata_digest: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', COALESCE(original_title, '')), 'B') || "
+            "setweight(to_tsvector('simple', COALESCE(overview, '')), 'C')"
+        ),
+        deferred=True,
+    )
 
     media: Mapped["Media"] = relationship("Media", back_populates="movie")
 
 
 class Season(Base):
     __tablename__ = "seasons"
+    __table_args__ = (UniqueConstraint("series_id", "number", name="uq_seasons_series_number"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     series_id: Mapped[int] = mapped_column(Integer, ForeignKey("series.id"), nullable=False)
@@ -122,6 +174,7 @@ class Season(Base):
 
 class Episode(Base):
     __tablename__ = "episodes"
+    __table_args__ = (Index("ix_episodes_season_id_number", "season_id", "number"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     season_id: Mapped[int] = mapped_column(ForeignKey("seasons.id"))
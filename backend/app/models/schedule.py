@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, Integer, String, func
+from sqlalchemy import JSON, Boolean, DateTime, Enum, Integer, String, UniqueConstraint, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -51,6 +51,36 @@ class SyncSchedule(Base):
     )
 
 
+class SyncWatermark(Base):
+    """Start time of the last successful run of a sync job, per scope (e.g. Jellyfin user).
+
+    Incremental runs only ask the source for items changed since ``watermark``, plus the
+    ``pending_ids`` the previous run could not resolve yet (e.g. not imported at that time);
+    ``last_full_sync_at`` tracks the periodic full reconciliation.
+    """
+
+    __tablename__ = "sync_watermarks"
+    __table_args__ = (UniqueConstraint("job_type", "scope", name="uq_sync_watermark_job_scope"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_type: Mapped[SyncJobType] = mapped_column(Enum(SyncJobType), nullable=False)
+    # "" for library-wide jobs, the Jellyfin user id for per-user syncs
+    scope: Mapped[str] = mapped_column(String(64), nullable=False, default="")
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_full_sync_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    pending_ids: Mapped[list[str]] = mapped_column(
+        JSON, nullable=False, default=list, server_default=text("'[]'")
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
 class ServiceConfig(Base):
     __tablename__ = "service_configs"
 
@@ -86,3 +86,26 @@ class WatchHistory(Base):
     user: Mapped["User"] = relationship("User", back_populates="watch_history")
     media: Mapped["Media"] = relationship("Media")
     episode: Mapped[Optional["Episode"]] = relationship("Episode")
+
+
+class SeriesProgress(Base):
+    """Episode counts of a series for one user, kept up to date by the writers of
+    ``watch_history`` and ``episodes`` (see ``series_progress_repository``).
+
+    Read by the media list and detail instead of aggregating the episodes of every
+    series on each request.
+    """
+
+    __tablename__ = "series_progress"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    series_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("series.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    watched: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    watching: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    dropped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_watched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -46,3 +46,7 @@ class JellyfinWatchedSeriesResponse(BaseModel):
     watched_added: int | None = None
     watched_updated: int | None = None
     unwatched_marked: int | None = None
+
+
+class JellyfinWebhookResponse(BaseModel):
+    accepted: bool
@@ -45,6 +45,14 @@ class MediaListResponse(BaseModel):
     total: int
 
 
+class MediaPageResponse(BaseModel):
+    """One page of the media list; ``total`` is None when the count was skipped."""
+
+    items: list[MediaItem]
+    total: int | None = None
+    next_cursor: str | None = None
+
+
 class MediaDetailResponse(BaseModel):
     id: int
     media_type: Literal["movie", "series"]
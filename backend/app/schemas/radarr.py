@@ -8,3 +8,7 @@ class RadarrImportResponse(BaseModel):
     imported_count: int = 0
     updated_count: int = 0
     error: ErrorDetail | None = None
+
+
+class RadarrWebhookResponse(BaseModel):
+    accepted: bool
@@ -9,3 +9,7 @@ class SonarrImportResponse(BaseModel):
     new_episodes: int | None = None
     updated_episodes: int | None = None
     error: ErrorDetail | None = None
+
+
+class SonarrWebhookResponse(BaseModel):
+    accepted: bool
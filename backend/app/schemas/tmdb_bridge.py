@@ -39,6 +39,7 @@ class TmdbMetadataUpdateResponse(BaseModel):
     status: str = "success"
     processed_count: int = 0
     updated_count: int = 0
+    unchanged_count: int = 0
     skipped_count: int = 0
     failed_count: int = 0
     error: ErrorDetail | None = None
@@ -0,0 +1,106 @@
+"""
+Targeted imports triggered by Radarr/Sonarr Connect webhooks.
+
+A Connect notification names a single movie or series; instead of re-scanning the
+whole library, only that item is fetched from the *arr API and run through the same
+create/update logic as the full import. Deleted items are detached (their *arr id is
+cleared) rather than removed, since they may still carry Jellyfin watch history.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import logger
+from app.database import AsyncSessionLocal
+from app.models.schedule import ServiceType
+from app.services.radarr_service import detach_radarr_movie, import_radarr_movie
+from app.services.sonarr_service import detach_sonarr_series, import_sonarr_series_item
+
+RADARR_IMPORT_EVENTS = frozenset({"MovieAdded", "Download", "Rename"})
+RADARR_DELETE_EVENTS = frozenset({"MovieDelete"})
+SONARR_IMPORT_EVENTS = frozenset({"SeriesAdd", "Download", "Rename"})
+SONARR_DELETE_EVENTS = frozenset({"SeriesDelete"})
+
+
+@dataclass(frozen=True)
+class ArrWebhookEvent:
+    """A Connect notification reduced to the affected *arr item."""
+
+    service: ServiceType
+    event_type: str
+    item_id: int
+    delete: bool = False
+
+
+def _parse_event(
+    payload: dict[str, Any],
+    service: ServiceType,
+    item_key: str,
+    import_events: frozenset[str],
+    delete_events: frozenset[str],
+) -> ArrWebhookEvent | None:
+    event_type = payload.get("eventType")
+    if event_type not in import_events and event_type not in delete_events:
+        return None
+    item = payload.get(item_key) or {}
+    item_id = item.get("id") if isinstance(item, dict) else None
+    if not isinstance(item_id, int):
+        logger.warning("%s webhook %s without %s id, skipping", service.value, event_type, item_key)
+        return None
+    return ArrWebhookEvent(
+        service=service,
+        event_type=event_type,
+        item_id=item_id,
+        delete=event_type in delete_events,
+    )
+
+
+def parse_radarr_event(payload: dict[str, Any]) -> ArrWebhookEvent | None:
+    """Build an event from a Radarr Connect payload; None for events that change nothing here."""
+    return _parse_event(
+        payload, ServiceType.RADARR, "movie", RADARR_IMPORT_EVENTS, RADARR_DELETE_EVENTS
+    )
+
+
+def parse_sonarr_event(payload: dict[str, Any]) -> ArrWebhookEvent | None:
+    """Build an event from a Sonarr Connect payload; None for events that change nothing here."""
+    return _parse_event(
+        payload, ServiceType.SONARR, "series", SONARR_IMPORT_EVENTS, SONARR_DELETE_EVENTS
+    )
+
+
+async def _apply_event(session: AsyncSession, event: ArrWebhookEvent) -> None:
+    if event.service == ServiceType.RADARR:
+        if event.delete:
+            await detach_radarr_movie(session, event.item_id)
+        else:
+            await import_radarr_movie(session, event.item_id)
+    elif event.delete:
+        await detach_sonarr_series(session, event.item_id)
+    else:
+        await import_sonarr_series_item(session, event.item_id)
+
+
+async def handle_arr_event(
+    event: ArrWebhookEvent,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> None:
+    """Apply one Connect event in its own session; runs after the webhook has been answered."""
+    async with session_factory() as session:
+        try:
+            await _apply_event(session, event)
+        except Exception as e:
+            # The scheduled full import reconciles whatever a failed event missed
+            logger.error(
+                "%s webhook %s for id=%s failed: %s",
+                event.service.value,
+                event.event_type,
+                event.item_id,
+                e,
+            )
+            return
+    logger.info(
+        "%s webhook %s applied for id=%s", event.service.value, event.event_type, event.item_id
+    )
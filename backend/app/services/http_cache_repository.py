@@ -0,0 +1,84 @@
+"""Repository for the persistent HTTP response cache (conditional Bridge requests)."""
+
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.client.tmdb_bridge_client import BridgeResponse, BridgeValidators
+from app.models.http_cache import HttpResponseCache
+
+
+async def load_cache_entries(
+    session: AsyncSession, urls: Sequence[str]
+) -> dict[str, HttpResponseCache]:
+    """Load cache entries for the given URLs, keyed by URL."""
+    if not urls:
+        return {}
+    entries = await session.scalars(
+        select(HttpResponseCache).where(HttpResponseCache.url.in_(urls))
+    )
+    return {entry.url: entry for entry in entries}
+
+
+def cached_validators(
+    entry: HttpResponseCache | None, applied_digest: str | None
+) -> BridgeValidators | None:
+    """
+    Validators to send with a conditional request, None if nothing usable is cached.
+
+    A 304 only says the body is the cached one, so validators are sent only while that
+    body is the one applied to the row (``applied_digest``); a row changed by an import
+    since then gets the full body again.
+    """
+    if entry is None or not (entry.etag or entry.last_modified):
+        return None
+    if applied_digest is None or entry.body_digest != applied_digest:
+        return None
+    return BridgeValidators(etag=entry.etag, last_modified=entry.last_modified)
+
+
+def is_unchanged(response: BridgeResponse, applied_digest: str | None) -> bool:
+    """True when the response body is the one already applied to the row (304 or same digest)."""
+    if response.not_modified:
+        return True
+    return applied_digest is not None and response.digest == applied_digest
+
+
+def needs_save(response: BridgeResponse, entry: HttpResponseCache | None) -> bool:
+    """True when the cache entry for the response is missing or stale."""
+    if response.not_modified or response.digest is None:
+        return False
+    return entry is None or (
+        entry.body_digest != response.digest
+        or entry.etag != response.validators.etag
+        or entry.last_modified != response.validators.last_modified
+    )
+
+
+async def save_cache_entries(session: AsyncSession, responses: Iterable[BridgeResponse]) -> None:
+    """Upsert cache entries for applied responses in one statement."""
+    rows = {
+        response.url: {
+            "url": response.url,
+            "etag": response.validators.etag,
+            "last_modified": response.validators.last_modified,
+            "body_digest": response.digest,
+        }
+        for response in responses
+        if response.digest is not None
+    }
+    if not rows:
+        return
+    stmt = insert(HttpResponseCache).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[HttpResponseCache.url],
+        set_={
+            "etag": stmt.excluded.etag,
+            "last_modified": stmt.excluded.last_modified,
+            "body_digest": stmt.excluded.body_digest,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
@@ -1,18 +1,56 @@
+from typing import Any
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.client.jellyfin_client import fetch_jellyfin_movies
 from app.config import logger
-from app.models.schedule import ServiceType
+from app.models.media import Movie
+from app.models.schedule import ServiceType, SyncJobType
 from app.schemas.jellyfin import JellyfinImportMoviesResponse
 from app.services.movie_utils import (
-    create_new_movie,
-    find_movie_by_external_ids,
-    find_movie_by_jellyfin_id,
+    MovieIndexes,
+    build_new_movie,
+    insert_new_movies,
+    load_movie_indexes,
     update_existing_movie,
 )
 from app.services.service_config_repository import get_decrypted_config
+from app.services.sync_watermark_repository import begin_sync, complete_sync
 from app.utils.datetime_utils import parse_iso_datetime
 
+# Ids per IN lookup query; keeps the statement well below the driver's parameter limit
+RESOLVE_BATCH_SIZE = 1000
+
+
+def _jellyfin_ids(movie_data: dict[str, Any]) -> tuple[str | None, str | None, str | None]:
+    """(jellyfin_id, tmdb_id, imdb_id) of a Jellyfin item, as strings."""
+    provider_ids = movie_data.get("ProviderIds") or {}
+    jellyfin_id_raw = movie_data.get("Id")
+    tmdb_id_raw = provider_ids.get("Tmdb")
+    imdb_id_raw = provider_ids.get("Imdb")
+    return (
+        str(jellyfin_id_raw) if jellyfin_id_raw is not None else None,
+        str(tmdb_id_raw) if tmdb_id_raw is not None else None,
+        str(imdb_id_raw) if imdb_id_raw is not None else None,
+    )
+
+
+async def _load_jellyfin_indexes(
+    session: AsyncSession, movies: list[dict[str, Any]]
+) -> MovieIndexes:
+    """Known movies matching any id of the fetched items, in RESOLVE_BATCH_SIZE chunks."""
+    indexes = MovieIndexes()
+    for start in range(0, len(movies), RESOLVE_BATCH_SIZE):
+        ids = [_jellyfin_ids(m) for m in movies[start : start + RESOLVE_BATCH_SIZE]]
+        indexes = await load_movie_indexes(
+            session,
+            jellyfin_ids=[jf for jf, _, _ in ids if jf],
+            tmdb_ids=[tmdb for _, tmdb, _ in ids if tmdb],
+            imdb_ids=[imdb for _, _, imdb in ids if imdb],
+            into=indexes,
+        )
+    return indexes
+
 
 async def import_jellyfin_movies(session: AsyncSession) -> JellyfinImportMoviesResponse:
     """Import movies from Jellyfin into the database."""
@@ -21,37 +59,32 @@ async def import_jellyfin_movies(session: AsyncSession) -> JellyfinImportMoviesR
         logger.info("Jellyfin is not configured, skipping import")
         return JellyfinImportMoviesResponse(imported_count=0, updated_count=0)
     url, api_key = config
-    movies = await fetch_jellyfin_movies(url, api_key)
+    # After the first run only movies saved since the last successful run are fetched
+    window = await begin_sync(session, SyncJobType.JELLYFIN_MOVIES_IMPORT)
+    movies = await fetch_jellyfin_movies(url, api_key, min_date_last_saved=window.since)
     imported = 0
     updated = 0
 
     try:
+        indexes = await _load_jellyfin_indexes(session, movies)
+        new_movies: list[Movie] = []
+
         for movie_data in movies:
-            jellyfin_id_raw = movie_data.get("Id")
-            jellyfin_id = str(jellyfin_id_raw) if jellyfin_id_raw is not None else None
+            jellyfin_id, tmdb_id, imdb_id = _jellyfin_ids(movie_data)
             title = movie_data.get("Name", "Unknown Title")
             release_date = parse_iso_datetime(movie_data.get("PremiereDate"), context=title)
-            tmdb_id_raw = movie_data.get("ProviderIds", {}).get("Tmdb")
-            tmdb_id = str(tmdb_id_raw) if tmdb_id_raw is not None else None
-            imdb_id_raw = movie_data.get("ProviderIds", {}).get("Imdb")
-            imdb_id = str(imdb_id_raw) if imdb_id_raw is not None else None
 
             # Skip if no identifiers are provided
             if not jellyfin_id and not tmdb_id and not imdb_id:
                 logger.warning("Skipping movie without any IDs: %s", title)
                 continue
 
-            existing_movie = None
-
-            # 1. First, search by jellyfin_id (if available)
-            if jellyfin_id:
-                existing_movie = await find_movie_by_jellyfin_id(session, jellyfin_id)
-
-            # 2. If not found by jellyfin_id, search by external IDs
-            if not existing_movie:
-                existing_movie = await find_movie_by_external_ids(session, tmdb_id, imdb_id)
+            # jellyfin_id first, then external IDs; movies created earlier in this run
+            # are indexed too, so duplicates in the library update the pending row
+            existing_movie = indexes.resolve(
+                jellyfin_id=jellyfin_id, tmdb_id=tmdb_id, imdb_id=imdb_id
+            )
 
-            # 3. Update existing movie
             if existing_movie:
                 if update_existing_movie(
                     movie=existing_movie,
@@ -65,21 +98,22 @@ async def import_jellyfin_movies(session: AsyncSession) -> JellyfinImportMoviesR
                     source="Jellyfin",
                 ):
                     updated += 1
+                indexes.add(existing_movie)
             else:
-                # 4. Create new movie
-                await create_new_movie(
-                    session=session,
+                new_movie = build_new_movie(
                     title=title,
                     radarr_id=None,
                     jellyfin_id=jellyfin_id,
                     tmdb_id=tmdb_id,
                     imdb_id=imdb_id,
                     release_date=release_date,
-                    status=None,
-                    source="Jellyfin",
                 )
-                imported += 1
+                new_movies.append(new_movie)
+                indexes.add(new_movie)
 
+        await insert_new_movies(session, new_movies, source="Jellyfin")
+        imported = len(new_movies)
+        await complete_sync(session, SyncJobType.JELLYFIN_MOVIES_IMPORT, window)
         await session.commit()
 
     except Exception as e:
@@ -87,5 +121,10 @@ async def import_jellyfin_movies(session: AsyncSession) -> JellyfinImportMoviesR
         await session.rollback()
         raise
 
-    logger.info("Jellyfin import completed: %d imported, %d updated", imported, updated)
+    logger.info(
+        "Jellyfin import completed (%s): %d imported, %d updated",
+        "full" if window.full else "incremental",
+        imported,
+        updated,
+    )
     return JellyfinImportMoviesResponse(imported_count=imported, updated_count=updated)
@@ -1,160 +1,242 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.client.jellyfin_client import (
-    fetch_jellyfin_episodes,
-    fetch_jellyfin_series,
+    iter_jellyfin_library_episodes,
+    iter_jellyfin_series,
 )
 from app.config import logger
-from app.models.media import Episode, Season, Series
-from app.models.schedule import ServiceType
+from app.models.media import Episode, Series
+from app.models.schedule import ServiceType, SyncJobType
 from app.schemas.jellyfin import JellyfinImportSeriesResponse
+from app.services.season_episode_repository import (
+    bulk_upsert,
+    load_episode_keys,
+    load_episode_series_ids,
+    upsert_seasons,
+)
+from app.services.series_progress_repository import refresh_series_progress
 from app.services.series_utils import (
+    SeriesIndexes,
     create_new_series,
-    find_series_by_external_ids,
+    forget_tmdb_metadata,
+    load_series_indexes,
     map_jellyfin_series_status,
     update_existing_series,
 )
 from app.services.service_config_repository import get_decrypted_config
+from app.services.sync_watermark_repository import begin_sync, complete_sync
 from app.utils.datetime_utils import parse_iso_datetime
 
-
-async def _find_series_by_jellyfin_id(session: AsyncSession, jellyfin_id: str) -> Series | None:
-    """Find series by Jellyfin ID."""
-    query = (
-        select(Series).where(Series.jellyfin_id == jellyfin_id).options(selectinload(Series.media))
+# Keys of a Jellyfin episode read by _process_seasons_and_episodes; the rest is dropped on grouping
+_EPISODE_KEYS = ("Id", "ParentIndexNumber", "IndexNumber", "Name", "PremiereDate", "SeasonId")
+
+
+async def _load_page_indexes(session: AsyncSession, page: list[dict[str, Any]]) -> SeriesIndexes:
+    """Known series matching any id of one page of Jellyfin series, in one query."""
+    jellyfin_ids: list[str] = []
+    tvdb_ids: list[str] = []
+    imdb_ids: list[str] = []
+    tmdb_ids: list[str] = []
+    for raw in page:
+        if raw.get("Id"):
+            jellyfin_ids.append(str(raw["Id"]))
+        provider_ids = raw.get("ProviderIds") or {}
+        if provider_ids.get("Tvdb"):
+            tvdb_ids.append(provider_ids["Tvdb"])
+        if provider_ids.get("Imdb"):
+            imdb_ids.append(provider_ids["Imdb"])
+        if provider_ids.get("Tmdb"):
+            tmdb_ids.append(str(provider_ids["Tmdb"]))
+    return await load_series_indexes(
+        session,
+        jellyfin_ids=jellyfin_ids,
+        tvdb_ids=tvdb_ids,
+        imdb_ids=imdb_ids,
+        tmdb_ids=tmdb_ids,
     )
-    result = await session.execute(query)
-    return result.scalar_one_or_none()
+
+
+async def _fetch_episodes_by_series(
+    url: str, api_key: str, since: datetime | None = None
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch library episodes (changed since ``since`` if given) and group them by SeriesId."""
+    episodes_by_series: dict[str, list[dict[str, Any]]] = {}
+    async for page in iter_jellyfin_library_episodes(url, api_key, min_date_last_saved=since):
+        for ep_raw in page:
+            series_id = ep_raw.get("SeriesId")
+            if not series_id:
+                continue
+            episodes_by_series.setdefault(str(series_id), []).append(
+                {key: ep_raw.get(key) for key in _EPISODE_KEYS}
+            )
+    logger.info("Fetched Jellyfin episodes for %d series", len(episodes_by_series))
+    return episodes_by_series
 
 
 async def _process_seasons_and_episodes(
     session: AsyncSession,
-    series: Series,
-    jellyfin_series_id: str,
-    jellyfin_url: str,
-    jellyfin_api_key: str,
+    items: list[tuple[Series, list[dict[str, Any]]]],
 ) -> tuple[int, int]:
-    """Process seasons and episodes from Jellyfin episodes."""
-    episodes_raw = await fetch_jellyfin_episodes(jellyfin_url, jellyfin_api_key, jellyfin_series_id)
-    if not episodes_raw:
-        return 0, 0
+    """
+    Write seasons and episodes of a batch of series from their Jellyfin episodes.
+
+    Seasons are upserted on (series_id, number). Episodes already stored under the batch's
+    seasons are matched by jellyfin_id, then by (season_id, number), and updated by id; the
+    rest are upserted on jellyfin_id. A few set-based statements per batch.
+    """
+    episodes: list[tuple[tuple[int, int], str, int, str, datetime | None]] = []
+    season_jellyfin_ids: dict[tuple[int, int], str | None] = {}
+    season_first_air: dict[tuple[int, int], datetime] = {}
+
+    for series, episodes_raw in items:
+        for ep_raw in episodes_raw:
+            ep_jellyfin_id = ep_raw.get("Id")
+            season_num_raw = ep_raw.get("ParentIndexNumber")
+            ep_num_raw = ep_raw.get("IndexNumber")
+            ep_title = ep_raw.get("Name")
+            season_jellyfin_id = ep_raw.get("SeasonId")
+
+            # Проверяем типы и наличие обязательных полей
+            if (
+                not ep_jellyfin_id
+                or not isinstance(season_num_raw, int)
+                or not isinstance(ep_num_raw, int)
+                or not ep_title
+            ):
+                continue
 
-    # Load existing seasons by number
-    existing_seasons_result = await session.scalars(
-        select(Season).where(Season.series_id == series.id)
-    )
-    existing_seasons: dict[int, Season] = {s.number: s for s in existing_seasons_result}
+            season_key = (series.id, season_num_raw)
+            air_date = parse_iso_datetime(ep_raw.get("PremiereDate"))
+            if air_date and (
+                season_key not in season_first_air or air_date < season_first_air[season_key]
+            ):
+                season_first_air[season_key] = air_date
+            if season_jellyfin_ids.get(season_key) is None:
+                season_jellyfin_ids[season_key] = season_jellyfin_id
 
-    # Load existing episodes by jellyfin_id and by (season_id, number) for deduplication
-    existing_eps_result = await session.scalars(
-        select(Episode).where(Episode.season_id.in_([s.id for s in existing_seasons.values()]))
+            episodes.append((season_key, ep_jellyfin_id, ep_num_raw, ep_title, air_date))
+
+    if not episodes:
+        return 0, 0
+
+    # Create missing seasons, fill their jellyfin_id and release_date if missing
+    seasons = await upsert_seasons(
+        session,
+        [
+            {
+                "series_id": series_id,
+                "number": number,
+                "jellyfin_id": season_jellyfin_id,
+                "release_date": season_first_air.get((series_id, number)),
+            }
+            for (series_id, number), season_jellyfin_id in season_jellyfin_ids.items()
+        ],
+        fill=("jellyfin_id", "release_date"),
     )
-    existing_eps_by_jellyfin: dict[str, Episode] = {}
-    existing_eps_by_num: dict[tuple[int, int], Episode] = {}
-    for ep in existing_eps_result:
-        if ep.jellyfin_id is not None:
-            existing_eps_by_jellyfin[ep.jellyfin_id] = ep
-        existing_eps_by_num[(ep.season_id, ep.number)] = ep
-
-    new_ep_cnt = upd_ep_cnt = 0
-    season_first_air: dict[int, datetime] = {}
-
-    for ep_raw in episodes_raw:
-        ep_jellyfin_id = ep_raw.get("Id")
-        season_num_raw = ep_raw.get("ParentIndexNumber")
-        ep_num_raw = ep_raw.get("IndexNumber")
-        ep_title = ep_raw.get("Name")
-        air_str = ep_raw.get("PremiereDate")
-        season_jellyfin_id = ep_raw.get("SeasonId")
-
-        # Проверяем типы и наличие обязательных полей
-        if (
-            not ep_jellyfin_id
-            or not isinstance(season_num_raw, int)
-            or not isinstance(ep_num_raw, int)
-            or not ep_title
-        ):
-            continue
-
-        season_num: int = season_num_raw
-        ep_num: int = ep_num_raw
-
-        air_date = parse_iso_datetime(air_str)
-        if air_date and (
-            season_num not in season_first_air or air_date < season_first_air[season_num]
-        ):
-            season_first_air[season_num] = air_date
-
-        # Get or create season by number
-        season = existing_seasons.get(season_num)
-        if not season:
-            season = Season(
-                series_id=series.id,
-                number=season_num,
-                jellyfin_id=season_jellyfin_id,
-            )
-            session.add(season)
-            await session.flush()
-            existing_seasons[season_num] = season
-        elif season.jellyfin_id is None and season_jellyfin_id:
-            season.jellyfin_id = season_jellyfin_id
-
-        # Update season release_date if missing
-        if season.release_date is None and season_num in season_first_air:
-            season.release_date = season_first_air[season_num]
-
-        # Find existing episode: first by jellyfin_id, then by (season_id, number)
-        existing = existing_eps_by_jellyfin.get(ep_jellyfin_id) or existing_eps_by_num.get(
-            (season.id, ep_num)
+    season_ids = seasons.ids
+
+    # Existing episodes by jellyfin_id and by (season_id, number) for deduplication
+    existing_by_jellyfin: dict[str, tuple[int, int]] = {}
+    existing_by_num: dict[tuple[int, int], tuple[int, int]] = {}
+    for ep_id, season_id, number, jellyfin_id in await load_episode_keys(
+        session, season_ids.values()
+    ):
+        if jellyfin_id is not None:
+            existing_by_jellyfin[jellyfin_id] = (ep_id, season_id)
+        existing_by_num[(season_id, number)] = (ep_id, season_id)
+
+    matched_rows: list[dict[str, Any]] = []
+    new_rows: dict[tuple[int, int], dict[str, Any]] = {}
+    for season_key, ep_jellyfin_id, ep_num, ep_title, air_date in episodes:
+        season_id = season_ids[season_key]
+        existing = existing_by_jellyfin.get(ep_jellyfin_id) or existing_by_num.get(
+            (season_id, ep_num)
         )
         if existing:
-            updated = False
-            if existing.jellyfin_id is None:
-                existing.jellyfin_id = ep_jellyfin_id
-                existing_eps_by_jellyfin[ep_jellyfin_id] = existing
-                updated = True
-            if existing.number != ep_num:
-                existing.number = ep_num
-                updated = True
-            if existing.title != ep_title:
-                existing.title = ep_title
-                updated = True
-            if existing.air_date != air_date:
-                existing.air_date = air_date
-                updated = True
-            if updated:
-                upd_ep_cnt += 1
+            ep_id, existing_season_id = existing
+            matched_rows.append(
+                {
+                    "id": ep_id,
+                    "season_id": existing_season_id,
+                    "jellyfin_id": ep_jellyfin_id,
+                    "number": ep_num,
+                    "title": ep_title,
+                    "air_date": air_date,
+                }
+            )
         else:
-            episode = Episode(
-                season_id=season.id,
-                jellyfin_id=ep_jellyfin_id,
-                number=ep_num,
-                title=ep_title,
-                air_date=air_date,
+            new_rows.setdefault(
+                (season_id, ep_num),
+                {
+                    "season_id": season_id,
+                    "jellyfin_id": ep_jellyfin_id,
+                    "number": ep_num,
+                    "title": ep_title,
+                    "air_date": air_date,
+                },
             )
-            session.add(episode)
-            new_ep_cnt += 1
-            existing_eps_by_jellyfin[ep_jellyfin_id] = episode
-            existing_eps_by_num[(season.id, ep_num)] = episode
 
-    if new_ep_cnt or upd_ep_cnt:
-        await session.flush()
-        logger.info(
-            "Series '%s': +%d episodes, ±%d updates",
-            series.media.title,
-            new_ep_cnt,
-            upd_ep_cnt,
-        )
+    matched = await bulk_upsert(
+        session,
+        Episode,
+        matched_rows,
+        index_elements=("id",),
+        overwrite=("number", "title", "air_date"),
+        fill=("jellyfin_id",),
+    )
+    # An episode stored under another series' season is moved here by its jellyfin_id;
+    # that series loses the episode, so its progress is refreshed too
+    previous_series_ids = await load_episode_series_ids(
+        session, Episode.jellyfin_id, (row["jellyfin_id"] for row in new_rows.values())
+    )
+    created = await bulk_upsert(
+        session,
+        Episode,
+        new_rows.values(),
+        index_elements=("jellyfin_id",),
+        overwrite=("season_id", "number", "title", "air_date"),
+    )
 
+    new_ep_cnt = matched.inserted + created.inserted
+    upd_ep_cnt = matched.updated + created.updated
+    if seasons.inserted or seasons.updated or new_ep_cnt or upd_ep_cnt:
+        forget_tmdb_metadata(series for series, _ in items)
+    if created.inserted or created.updated:
+        # Episode totals of the batch changed
+        await refresh_series_progress(
+            session, {series.id for series, _ in items} | previous_series_ids
+        )
+    if new_ep_cnt or upd_ep_cnt:
+        logger.info("%d series: +%d episodes, ±%d updates", len(items), new_ep_cnt, upd_ep_cnt)
     return new_ep_cnt, upd_ep_cnt
 
 
+async def _process_remaining_episodes(
+    session: AsyncSession, episodes_by_series: dict[str, list[dict[str, Any]]]
+) -> tuple[int, int]:
+    """Apply episodes of series not listed themselves (e.g. a new episode of an unchanged series)."""
+    if not episodes_by_series:
+        return 0, 0
+    series_result = await session.scalars(
+        select(Series)
+        .where(Series.jellyfin_id.in_(list(episodes_by_series)))
+        .options(selectinload(Series.media))
+    )
+    items = [
+        (series, episodes_by_series.pop(series.jellyfin_id, []))
+        for series in series_result
+        if series.jellyfin_id is not None
+    ]
+    return await _process_seasons_and_episodes(session, items)
+
+
 async def import_jellyfin_series(session: AsyncSession) -> JellyfinImportSeriesResponse:
     """Import series from Jellyfin: add missing data, link by jellyfin_id."""
     logger.info("Starting Jellyfin series import...")
@@ -168,44 +250,75 @@ async def import_jellyfin_series(session: AsyncSession) -> JellyfinImportSeriesR
             updated_episodes=0,
         )
     url, api_key = config
-    jellyfin_series = await fetch_jellyfin_series(url, api_key)
 
     total_new_series = total_updated_series = 0
     total_new_episodes = total_updated_episodes = 0
 
     try:
-        for raw in jellyfin_series:
-            jellyfin_id_raw = raw.get("Id")
-            title = raw.get("Name")
-
-            if not jellyfin_id_raw or not title:
-                logger.warning("Skipping series - missing Id or Name")
-                continue
-
-            jellyfin_id = str(jellyfin_id_raw)
-
-            provider_ids = raw.get("ProviderIds", {})
-            tvdb_id = provider_ids.get("Tvdb")
-            imdb_id = provider_ids.get("Imdb")
-            tmdb_id = str(provider_ids.get("Tmdb")) if provider_ids.get("Tmdb") else None
-            release_date = parse_iso_datetime(raw.get("PremiereDate"))
-            status = map_jellyfin_series_status(raw.get("Status"))
-            year = raw.get("ProductionYear")
-
-            # 1. Search by jellyfin_id
-            existing_series = await _find_series_by_jellyfin_id(session, jellyfin_id)
-
-            # 2. Search by external IDs
-            if not existing_series:
-                existing_series = await find_series_by_external_ids(
-                    session, tmdb_id, imdb_id, tvdb_id
+        # After the first run only series and episodes saved since the last successful run
+        # are fetched; every FULL_SYNC_INTERVAL the whole library is read again
+        window = await begin_sync(session, SyncJobType.JELLYFIN_SERIES_IMPORT)
+
+        # Episodes of the whole library come from one paginated query, grouped by series
+        episodes_by_series = await _fetch_episodes_by_series(url, api_key, window.since)
+
+        # Series are streamed page by page and each page is committed on its own
+        async for page in iter_jellyfin_series(url, api_key, min_date_last_saved=window.since):
+            indexes = await _load_page_indexes(session, page)
+            # Seasons and episodes of the page are written together once its series are in
+            page_items: list[tuple[Series, list[dict[str, Any]]]] = []
+            for raw in page:
+                jellyfin_id_raw = raw.get("Id")
+                title = raw.get("Name")
+
+                if not jellyfin_id_raw or not title:
+                    logger.warning("Skipping series - missing Id or Name")
+                    continue
+
+                jellyfin_id = str(jellyfin_id_raw)
+
+                provider_ids = raw.get("ProviderIds") or {}
+                tvdb_id = provider_ids.get("Tvdb")
+                imdb_id = provider_ids.get("Imdb")
+                tmdb_id = str(provider_ids.get("Tmdb")) if provider_ids.get("Tmdb") else None
+                release_date = parse_iso_datetime(raw.get("PremiereDate"))
+                status = map_jellyfin_series_status(raw.get("Status"))
+                year = raw.get("ProductionYear")
+
+                # 1-2. Search by jellyfin_id, then by external IDs
+                existing_series = indexes.resolve(
+                    jellyfin_id=jellyfin_id, tvdb_id=tvdb_id, imdb_id=imdb_id, tmdb_id=tmdb_id
                 )
 
-            # 3. Update existing
-            if existing_series:
-                if update_existing_series(
-                    series=existing_series,
+                # 3. Update existing
+                if existing_series:
+                    if update_existing_series(
+                        series=existing_series,
+                        title=title,
+                        jellyfin_id=jellyfin_id,
+                        tvdb_id=tvdb_id,
+                        imdb_id=imdb_id,
+                        tmdb_id=tmdb_id,
+                        release_date=release_date,
+                        status=status,
+                        year=year,
+                        source="Jellyfin",
+                    ):
+                        total_updated_series += 1
+                    indexes.add(existing_series)
+                    page_items.append((existing_series, episodes_by_series.pop(jellyfin_id, [])))
+                    continue
+
+                # 4. Skip if no identifiers
+                if not (jellyfin_id or tvdb_id or imdb_id or tmdb_id):
+                    logger.warning("Skipping series '%s' - no identifiers", title)
+                    continue
+
+                # 5. Create new
+                new_series = await create_new_series(
+                    session=session,
                     title=title,
+                    sonarr_id=None,
                     jellyfin_id=jellyfin_id,
                     tvdb_id=tvdb_id,
                     imdb_id=imdb_id,
@@ -213,51 +326,32 @@ async def import_jellyfin_series(session: AsyncSession) -> JellyfinImportSeriesR
                     release_date=release_date,
                     status=status,
                     year=year,
+                    poster_url=None,
+                    genres=None,
+                    rating_value=None,
+                    rating_votes=None,
                     source="Jellyfin",
-                ):
-                    total_updated_series += 1
-
-                new_eps, upd_eps = await _process_seasons_and_episodes(
-                    session, existing_series, jellyfin_id, url, api_key
                 )
-                total_new_episodes += new_eps
-                total_updated_episodes += upd_eps
-                continue
-
-            # 4. Skip if no identifiers
-            if not (jellyfin_id or tvdb_id or imdb_id or tmdb_id):
-                logger.warning("Skipping series '%s' - no identifiers", title)
-                continue
+                total_new_series += 1
+                indexes.add(new_series)
+                page_items.append((new_series, episodes_by_series.pop(jellyfin_id, [])))
 
-            # 5. Create new
-            new_series = await create_new_series(
-                session=session,
-                title=title,
-                sonarr_id=None,
-                jellyfin_id=jellyfin_id,
-                tvdb_id=tvdb_id,
-                imdb_id=imdb_id,
-                tmdb_id=tmdb_id,
-                release_date=release_date,
-                status=status,
-                year=year,
-                poster_url=None,
-                genres=None,
-                rating_value=None,
-                rating_votes=None,
-                source="Jellyfin",
-            )
-            total_new_series += 1
-
-            new_eps, upd_eps = await _process_seasons_and_episodes(
-                session, new_series, jellyfin_id, url, api_key
-            )
+            new_eps, upd_eps = await _process_seasons_and_episodes(session, page_items)
             total_new_episodes += new_eps
             total_updated_episodes += upd_eps
+            await session.commit()
 
+        new_eps, upd_eps = await _process_remaining_episodes(session, episodes_by_series)
+        total_new_episodes += new_eps
+        total_updated_episodes += upd_eps
+
+        # The watermark only moves once every page went through
+        await complete_sync(session, SyncJobType.JELLYFIN_SERIES_IMPORT, window)
         await session.commit()
+
         logger.info(
-            "Jellyfin import completed: %d new, %d updated, %d new episodes, %d updated",
+            "Jellyfin import completed (%s): %d new, %d updated, %d new episodes, %d updated",
+            "full" if window.full else "incremental",
             total_new_series,
             total_updated_series,
             total_new_episodes,
@@ -1,4 +1,5 @@
-from sqlalchemy import select
+from sqlalchemy import Boolean, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.client.jellyfin_client import fetch_jellyfin_users
@@ -6,6 +7,7 @@ from app.config import logger
 from app.models.schedule import ServiceType
 from app.models.user import User
 from app.schemas.jellyfin import JellyfinUsersResponse
+from app.services.series_progress_repository import refresh_series_progress
 from app.services.service_config_repository import get_decrypted_config
 
 
@@ -21,6 +23,15 @@ async def import_jellyfin_users(session: AsyncSession) -> JellyfinUsersResponse:
     updated = 0
 
     try:
+        # Current usernames by jellyfin_user_id, loaded once for the whole import
+        existing = await session.execute(
+            select(User.jellyfin_user_id, User.username).where(User.jellyfin_user_id.is_not(None))
+        )
+        known_names: dict[str | None, str] = dict(existing.tuples().all())
+
+        # New users and renames; the last entry wins for a repeated Id, since one statement
+        # can't touch the same row twice
+        rows: dict[str, dict[str, str]] = {}
         for u in users:
             user_id = u.get("Id")
             user_name = u.get("Name")
@@ -37,36 +48,38 @@ async def import_jellyfin_users(session: AsyncSession) -> JellyfinUsersResponse:
                 )
                 continue
 
-            query = select(User).where(User.jellyfin_user_id == user_id)
-            result = await session.execute(query)
-            user = result.scalars().first()
-
-            if user is None:
-                user_obj = User(
-                    username=user_name,
-                    jellyfin_user_id=user_id,
+            if known_names.get(user_id) == user_name:
+                logger.debug(
+                    "User %s (jellyfin_user_id: %s) already up-to-date", user_name, user_id
                 )
-                session.add(user_obj)
-                await session.flush()
-                logger.info("Added new user: %s (jellyfin_user_id: %s)", user_name, user_id)
-                imported += 1
+                continue
+            rows[user_id] = {"jellyfin_user_id": user_id, "username": user_name}
 
-            else:
-                if user.username != user_name:
-                    user.username = user_name
-                    session.add(user)
-                    await session.flush()
+        if rows:
+            stmt = insert(User).values(list(rows.values()))
+            upsert = stmt.on_conflict_do_update(
+                index_elements=[User.jellyfin_user_id],
+                set_={"username": stmt.excluded.username},
+                where=User.username.is_distinct_from(stmt.excluded.username),
+            ).returning(User.jellyfin_user_id, literal_column("xmax = 0", Boolean), User.id)
+            # Inserted rows have xmax = 0; users renamed meanwhile to the same name are not returned
+            new_user_ids: list[int] = []
+            for user_id, inserted, internal_id in await session.execute(upsert):
+                user_name = rows[user_id]["username"]
+                if inserted:
+                    logger.info("Added new user: %s (jellyfin_user_id: %s)", user_name, user_id)
+                    imported += 1
+                    new_user_ids.append(internal_id)
+                else:
                     logger.info(
                         "Updated username for jellyfin_user_id %s: %s -> %s",
                         user_id,
-                        user.username,
+                        known_names.get(user_id),
                         user_name,
                     )
                     updated += 1
-                else:
-                    logger.debug(
-                        "User %s (jellyfin_user_id: %s) already up-to-date", user_name, user_id
-                    )
+            # New users get a progress row for every series
+            await refresh_series_progress(session, user_ids=new_user_ids)
 
         await session.commit()
         logger.info("Imported %s, updated %s users from Jellyfin", imported, updated)
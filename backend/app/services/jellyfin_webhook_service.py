@@ -0,0 +1,311 @@
+"""
+Real-time watch state from the Jellyfin Webhook plugin.
+
+PlaybackStop and UserDataSaved notifications are parsed into ``JellyfinWatchEvent``s
+and put on an in-process ``WatchEventQueue``. The queue coalesces events per
+(user, item) — a burst of progress saves for one episode becomes one write — and a
+background worker applies each batch with one upsert of ``WatchHistory`` per event,
+so a finished movie shows up as watched within seconds instead of after the nightly
+poll of every movie for every user.
+"""
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import Executable, case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import logger
+from app.database import AsyncSessionLocal
+from app.models.media import Episode, Movie, Season
+from app.models.user import User, WatchHistory, WatchStatus
+from app.services.series_progress_repository import refresh_series_progress
+from app.utils.datetime import parse_datetime
+
+PLAYBACK_STOP = "PlaybackStop"
+USER_DATA_SAVED = "UserDataSaved"
+WEBHOOK_NOTIFICATION_TYPES = frozenset({PLAYBACK_STOP, USER_DATA_SAVED})
+WEBHOOK_ITEM_TYPES = frozenset({"Movie", "Episode"})
+
+
+@dataclass(frozen=True)
+class JellyfinWatchEvent:
+    """Watch state of one item for one Jellyfin user, as reported by a webhook.
+
+    ``played`` is None when the notification does not tell whether the item is
+    played (playback stopped before the end).
+    """
+
+    jellyfin_user_id: str
+    item_id: str
+    item_type: str
+    played: bool | None
+    playback_position_ticks: int = 0
+    last_played_at: datetime | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.jellyfin_user_id, self.item_id
+
+    @property
+    def status(self) -> WatchStatus:
+        if self.played:
+            return WatchStatus.WATCHED
+        if self.playback_position_ticks > 0:
+            return WatchStatus.WATCHING
+        return WatchStatus.PLANNED
+
+
+def _normalize_id(value: Any) -> str | None:
+    """Jellyfin ids are GUIDs; the plugin may send them with dashes, the API never does."""
+    if not value:
+        return None
+    return str(value).replace("-", "").lower()
+
+
+def _parse_ticks(value: Any) -> int:
+    """PlaybackPositionTicks as an int; a malformed value counts as no position."""
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning("Jellyfin webhook with malformed PlaybackPositionTicks %r", value)
+        return 0
+
+
+def parse_webhook_event(payload: dict[str, Any]) -> JellyfinWatchEvent | None:
+    """Build a watch event from a Webhook plugin payload; None for irrelevant notifications."""
+    notification = payload.get("NotificationType")
+    item_type = payload.get("ItemType")
+    if notification not in WEBHOOK_NOTIFICATION_TYPES or item_type not in WEBHOOK_ITEM_TYPES:
+        return None
+
+    user_id = _normalize_id(payload.get("UserId"))
+    item_id = _normalize_id(payload.get("ItemId"))
+    if not user_id or not item_id:
+        logger.warning("Jellyfin webhook %s without UserId/ItemId, skipping", notification)
+        return None
+
+    ticks = _parse_ticks(payload.get("PlaybackPositionTicks"))
+    if notification == PLAYBACK_STOP:
+        played = True if payload.get("PlayedToCompletion") else None
+        if played is None and not ticks:
+            return None  # stopped right away: nothing to record
+    else:
+        played = bool(payload.get("Played"))
+
+    last_played = payload.get("LastPlayedDate") or payload.get("UtcTimestamp")
+    return JellyfinWatchEvent(
+        jellyfin_user_id=user_id,
+        item_id=item_id,
+        item_type=item_type,
+        played=played,
+        playback_position_ticks=ticks,
+        last_played_at=parse_datetime(last_played) if last_played else None,
+    )
+
+
+def _upsert_statement(
+    event: JellyfinWatchEvent, user_id: int, media_id: int, episode_id: int | None
+) -> Executable:
+    status = event.status
+    if status == WatchStatus.PLANNED:
+        # Marked unplayed: only an existing row can change, nothing to insert
+        return (
+            update(WatchHistory)
+            .where(
+                WatchHistory.user_id == user_id,
+                WatchHistory.media_id == media_id,
+                (
+                    WatchHistory.episode_id.is_(None)
+                    if episode_id is None
+                    else WatchHistory.episode_id == episode_id
+                ),
+                WatchHistory.is_manual.is_(False),
+            )
+            .values(status=status, playback_position_ticks=0)
+        )
+
+    watched_at = (event.last_played_at or datetime.now(UTC)) if event.played else None
+    stmt = insert(WatchHistory).values(
+        user_id=user_id,
+        media_id=media_id,
+        episode_id=episode_id,
+        status=status,
+        is_manual=False,
+        playback_position_ticks=event.playback_position_ticks,
+        watched_at=watched_at,
+    )
+    new_status: Any = stmt.excluded.status
+    if event.played is None:
+        # Stopping a rewatch half-way does not make a finished item unwatched
+        new_status = case(
+            (WatchHistory.status == WatchStatus.WATCHED, WatchHistory.status),
+            else_=stmt.excluded.status,
+        )
+    set_ = {
+        "status": new_status,
+        "playback_position_ticks": stmt.excluded.playback_position_ticks,
+        "watched_at": func.coalesce(stmt.excluded.watched_at, WatchHistory.watched_at),
+        "updated_at": func.now(),
+    }
+    # Manual statuses always win over Jellyfin
+    if episode_id is None:
+        return stmt.on_conflict_do_update(
+            index_elements=["user_id", "media_id"],
+            index_where=WatchHistory.episode_id.is_(None),
+            set_=set_,
+            where=WatchHistory.is_manual.is_(False),
+        )
+    return stmt.on_conflict_do_update(
+        constraint="uq_watch_history_user_media_episode",
+        set_=set_,
+        where=WatchHistory.is_manual.is_(False),
+    )
+
+
+async def apply_watch_events(session: AsyncSession, events: list[JellyfinWatchEvent]) -> int:
+    """
+    Upsert WatchHistory for a batch of webhook events and commit.
+
+    Users and items are resolved with one query each (by jellyfin ids); events for
+    users or items that are not imported yet are skipped. Returns the number of
+    events applied.
+    """
+    if not events:
+        return 0
+
+    user_ids = {e.jellyfin_user_id for e in events}
+    movie_ids = {e.item_id for e in events if e.item_type == "Movie"}
+    episode_ids = {e.item_id for e in events if e.item_type == "Episode"}
+
+    users_result = await session.execute(
+        select(User.jellyfin_user_id, User.id).where(User.jellyfin_user_id.in_(user_ids))
+    )
+    users: dict[str, int] = {jf_id: uid for jf_id, uid in users_result.all() if jf_id}
+
+    # item jellyfin_id -> (media_id, episode_id)
+    items: dict[str, tuple[int, int | None]] = {}
+    if movie_ids:
+        movies_result = await session.execute(
+            select(Movie.jellyfin_id, Movie.id).where(Movie.jellyfin_id.in_(movie_ids))
+        )
+        items.update({jf_id: (mid, None) for jf_id, mid in movies_result.all() if jf_id})
+    if episode_ids:
+        episodes_result = await session.execute(
+            select(Episode.jellyfin_id, Season.series_id, Episode.id)
+            .join(Season, Episode.season_id == Season.id)
+            .where(Episode.jellyfin_id.in_(episode_ids))
+        )
+        items.update(
+            {jf_id: (series_id, eid) for jf_id, series_id, eid in episodes_result.all() if jf_id}
+        )
+
+    applied = 0
+    watched_series: set[int] = set()
+    watching_users: set[int] = set()
+    for event in events:
+        user_id = users.get(event.jellyfin_user_id)
+        item = items.get(event.item_id)
+        if user_id is None or item is None:
+            logger.debug(
+                "Jellyfin webhook: unknown user=%s or %s=%s, skipping",
+                event.jellyfin_user_id,
+                event.item_type,
+                event.item_id,
+            )
+            continue
+        media_id, episode_id = item
+        await session.execute(_upsert_statement(event, user_id, media_id, episode_id))
+        applied += 1
+        if episode_id is not None:
+            watched_series.add(media_id)
+            watching_users.add(user_id)
+
+    await refresh_series_progress(session, watched_series, watching_users)
+    await session.commit()
+    return applied
+
+
+class WatchEventQueue:
+    """In-process queue that coalesces webhook events and applies them in batches.
+
+    Only the latest state per (user, item) is kept until the next flush. The worker
+    waits ``flush_delay`` seconds after the first event of a batch so bursts (the
+    plugin sends several notifications per playback) collapse into one write.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        flush_delay: float = 1.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self._flush_delay = flush_delay
+        self._pending: dict[tuple[str, str], JellyfinWatchEvent] = {}
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def put(self, event: JellyfinWatchEvent) -> None:
+        previous = self._pending.get(event.key)
+        if previous is not None and event.played is None:
+            # Keep a played/unplayed verdict that the newer event does not carry
+            event = replace(
+                event,
+                played=previous.played,
+                last_played_at=event.last_played_at or previous.last_played_at,
+            )
+        self._pending[event.key] = event
+        self._wakeup.set()
+        self._ensure_worker()
+
+    async def flush(self) -> int:
+        """Apply everything pending now; returns the number of events applied."""
+        batch, self._pending = list(self._pending.values()), {}
+        if not batch:
+            return 0
+        async with self._session_factory() as session:
+            try:
+                applied = await apply_watch_events(session, batch)
+            except Exception:
+                await session.rollback()
+                raise
+        logger.info("Jellyfin webhook: applied %d of %d watch events", applied, len(batch))
+        return applied
+
+    async def aclose(self) -> None:
+        """Stop the worker and apply what is still pending."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+        await self.flush()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self._flush_delay)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Events of a failed batch are dropped; the nightly sync reconciles them
+                logger.error("Jellyfin webhook batch failed: %s", e)
+
+
+watch_event_queue = WatchEventQueue()
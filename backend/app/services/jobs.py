@@ -97,8 +97,8 @@ async def _run_jellyfin_sync_series_watch_history() -> None:
 
 @log_job_execution
 async def _run_tmdb_metadata_update() -> None:
-    async with AsyncSessionLocal() as session:
-        await update_tmdb_metadata(session)
+    # Movie and series phases run concurrently, each in its own session
+    await update_tmdb_metadata(AsyncSessionLocal)
 
 
 async def tmdb_metadata_update_job() -> None:
@@ -0,0 +1,152 @@
+"""
+In-process cache of ``/api/v1/media`` responses.
+
+Entries hold the serialized JSON body and a strong ETag, keyed by path and query
+string (which includes ``jellyfin_user_id``). The media data only changes when a
+session that wrote to the media or watch tables commits — a sync job, a webhook
+batch or a watch-history endpoint — so the session hooks below bump ``version`` on
+such commits and the cache starts over. ``If-None-Match`` requests matching a
+cached ETag are answered with 304 without touching the database.
+
+The cache is per process: run a single worker, or each worker only sees the
+writes it committed itself.
+"""
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction, UOWTransaction
+
+from app.models.media import Episode, Media, Movie, Season, Series
+from app.models.user import SeriesProgress, User, WatchHistory
+
+MEDIA_TABLES = frozenset(
+    model.__tablename__
+    for model in (Media, Movie, Series, Season, Episode, User, WatchHistory, SeriesProgress)
+)
+DEFAULT_MAX_ENTRIES = 512
+
+# Session.info flag: the current transaction wrote to MEDIA_TABLES
+_MEDIA_CHANGED = "media_changed"
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+class MediaResponseCache:
+    """LRU of serialized responses, valid for one data ``version``."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, body: bytes, version: int) -> CachedResponse:
+        """Store ``body`` built from data of ``version``; stale bodies are not stored."""
+        entry = CachedResponse(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        if version == self.version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._entries.clear()
+
+
+media_response_cache = MediaResponseCache()
+
+
+def cache_key(request: Request) -> CacheKey:
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _to_response(request: Request, entry: CachedResponse) -> Response:
+    # no-cache: clients keep the body but revalidate it with If-None-Match every time
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def cached_response(
+    request: Request,
+    build: Callable[[], Awaitable[BaseModel | bytes]],
+    cache: MediaResponseCache = media_response_cache,
+) -> Response:
+    """
+    Serve the response for ``request`` from the cache, building it on a miss.
+
+    ``build`` returns a model to serialize, or a body that is already JSON bytes.
+    """
+    key = cache_key(request)
+    entry = cache.get(key)
+    if entry is None:
+        version = cache.version
+        result = await build()
+        body = result if isinstance(result, bytes) else result.model_dump_json().encode()
+        entry = cache.put(key, body, version)
+    return _to_response(request, entry)
+
+
+def _touches_media(tables: Iterable[str | None]) -> bool:
+    return any(table in MEDIA_TABLES for table in tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_changes(session: Session, flush_context: UOWTransaction) -> None:
+    objects = chain(session.new, session.dirty, session.deleted)
+    if _touches_media(getattr(obj, "__tablename__", None) for obj in objects):
+        session.info[_MEDIA_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    # INSERT / UPDATE / DELETE statements bypass the unit of work and after_flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table: Any = getattr(orm_execute_state.statement, "table", None)
+        if _touches_media([getattr(table, "name", None)]):
+            orm_execute_state.session.info[_MEDIA_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(_MEDIA_CHANGED, False):
+        media_response_cache.invalidate()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_rolled_back_changes(session: Session, transaction: SessionTransaction) -> None:
+    # A savepoint rollback keeps the flag: earlier writes of the transaction may still commit
+    if transaction.parent is None:
+        session.info.pop(_MEDIA_CHANGED, None)
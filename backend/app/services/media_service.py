@@ -1,18 +1,17 @@
-from collections import defaultdict
+import base64
+import json
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, Literal, cast
 
 from fastapi import HTTPException
-from sqlalchemy import select, text
+from sqlalchemy import TextClause, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, WatchStatus
-from app.schemas.media import (
-    EpisodeDetail,
-    MediaDetailResponse,
-    MediaItem,
-    MediaListResponse,
-    SeasonDetail,
-)
+from app.schemas.media import MediaItem, MediaListResponse, MediaPageResponse
 
 STATUS_PRIORITY = {
     WatchStatus.WATCHED: 4,
@@ -55,12 +54,177 @@ def compute_series_status(watched: int, watching: int, dropped: int, total: int)
     return "planned"
 
 
-async def get_media_list(
+MediaSort = Literal["title", "year", "rating", "added", "watched"]
+
+DEFAULT_PAGE_SIZE = 50
+
+
+@dataclass(frozen=True)
+class _SortSpec:
+    """SQL of a sort key, its order and how a cursor value is turned back into a bind value."""
+
+    expression: str
+    sql_type: str
+    descending: bool
+    parse: Callable[[Any], Any]
+
+
+# Keys never are NULL, so (key, id) row comparisons work for keyset pagination;
+# items without a year, rating or watch date go last
+_SORTS: dict[str, _SortSpec] = {
+    "title": _SortSpec("m.title", "VARCHAR", False, str),
+    "year": _SortSpec("COALESCE(mov.year, s.year, 0)", "INTEGER", True, int),
+    "rating": _SortSpec(
+        "COALESCE(mov.rating_value, s.rating_value, -1)", "DOUBLE PRECISION", True, float
+    ),
+    "added": _SortSpec("m.created_at", "TIMESTAMPTZ", True, datetime.fromisoformat),
+    "watched": _SortSpec(
+        "COALESCE(movie_wh.watched_at, ep_stats.last_watched_at, CAST('epoch' AS TIMESTAMPTZ))",
+        "TIMESTAMPTZ",
+        True,
+        datetime.fromisoformat,
+    ),
+}
+
+# series_progress only has rows for existing users, so a series nobody has a row for yet
+# (no users at all, or a user imported before the series) counts its episodes directly.
+# COALESCE evaluates the subquery only when there is no progress row
+_SERIES_TOTAL_FALLBACK = """(
+    SELECT COUNT(*)
+    FROM episodes e
+    JOIN seasons sea ON sea.id = e.season_id
+    WHERE sea.series_id = m.id
+)"""
+
+# Shared by the list, count and search queries, joined to ``media m``. The watch status
+# is computed in SQL so the status filter runs in the database; it mirrors
+# _pick_movie_status and compute_series_status. Episode counts come from the
+# series_progress read model (one row per user and series); without a user the counts
+# of all users are summed
+_MEDIA_JOINS = f"""
+    LEFT JOIN movies mov ON mov.id = m.id
+    LEFT JOIN series s ON s.id = m.id
+    LEFT JOIN LATERAL (
+        SELECT wh.status, wh.is_manual, wh.watched_at
+        FROM watch_history wh
+        WHERE wh.media_id = m.id
+            AND wh.episode_id IS NULL
+            AND (CAST(:user_id AS INTEGER) IS NULL OR wh.user_id = CAST(:user_id AS INTEGER))
+        ORDER BY CASE wh.status
+            WHEN 'WATCHED' THEN 4
+            WHEN 'WATCHING' THEN 3
+            WHEN 'PLANNED' THEN 2
+            ELSE 1
+        END DESC
+        LIMIT 1
+    ) movie_wh ON m.media_type = 'MOVIE'
+    LEFT JOIN LATERAL (
+        SELECT
+            COALESCE(MAX(sp.total), {_SERIES_TOTAL_FALLBACK}) AS total_count,
+            COALESCE(SUM(sp.watched), 0) AS watched_count,
+            COALESCE(SUM(sp.watching), 0) AS watching_count,
+            COALESCE(SUM(sp.dropped), 0) AS dropped_count,
+            MAX(sp.last_watched_at) AS last_watched_at
+        FROM series_progress sp
+        WHERE sp.series_id = m.id
+            AND (CAST(:user_id AS INTEGER) IS NULL OR sp.user_id = CAST(:user_id AS INTEGER))
+    ) ep_stats ON m.media_type = 'SERIES'
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN m.media_type = 'MOVIE' THEN LOWER(CAST(movie_wh.status AS VARCHAR))
+            WHEN ep_stats.total_count = 0 THEN NULL
+            WHEN ep_stats.watched_count = ep_stats.total_count THEN 'watched'
+            WHEN ep_stats.dropped_count > 0 THEN 'dropped'
+            WHEN ep_stats.watched_count > 0 OR ep_stats.watching_count > 0 THEN 'watching'
+            ELSE 'planned'
+        END AS watch_status
+    ) st
+"""
+
+_MEDIA_FILTERS = """
+    WHERE (CAST(:type AS VARCHAR) IS NULL OR m.media_type = CAST(:type AS mediatype))
+        AND (CAST(:status AS VARCHAR) IS NULL OR st.watch_status = CAST(:status AS VARCHAR))
+        AND (CAST(:year AS INTEGER) IS NULL OR COALESCE(mov.year, s.year) = CAST(:year AS INTEGER))
+        AND (
+            CAST(:genre AS VARCHAR) IS NULL
+            OR CAST(COALESCE(mov.genres, s.genres) AS JSONB)
+                @> jsonb_build_array(CAST(:genre AS VARCHAR))
+        )
+"""
+
+_MEDIA_LIST_FROM = f"FROM media m {_MEDIA_JOINS} {_MEDIA_FILTERS}"
+
+_MEDIA_COLUMNS = """
+    m.id,
+    m.title,
+    m.media_type,
+    COALESCE(mov.year, s.year) AS year,
+    COALESCE(mov.genres, s.genres) AS genres,
+    COALESCE(mov.poster_url, s.poster_url) AS poster_url,
+    COALESCE(mov.rating_value, s.rating_value) AS rating,
+    movie_wh.status AS movie_status,
+    movie_wh.is_manual AS movie_is_manual,
+    ep_stats.total_count,
+    ep_stats.watched_count,
+    ep_stats.watching_count,
+    ep_stats.dropped_count
+"""
+
+
+def _keyset_clause(spec: _SortSpec) -> str:
+    op = "<" if spec.descending else ">"
+    return (
+        f"AND ({spec.expression}, m.id) {op} "
+        f"(CAST(:cursor_key AS {spec.sql_type}), CAST(:cursor_id AS INTEGER))"
+    )
+
+
+def _order_clause(spec: _SortSpec) -> str:
+    direction = "DESC" if spec.descending else "ASC"
+    return f"ORDER BY {spec.expression} {direction}, m.id {direction}"
+
+
+def _media_list_query(sort: str, *, after: bool = False, limit: bool = False) -> TextClause:
+    spec = _SORTS[sort]
+    return text(
+        f"""
+        SELECT {_MEDIA_COLUMNS}, {spec.expression} AS sort_key
+        {_MEDIA_LIST_FROM}
+        {_keyset_clause(spec) if after else ""}
+        {_order_clause(spec)}
+        {"LIMIT :limit" if limit else ""}
+        """
+    )
+
+
+def _encode_cursor(sort: str, key: Any, media_id: int) -> str:
+    value = key.isoformat() if isinstance(key, datetime) else key
+    payload = json.dumps([sort, value, media_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str, spec: _SortSpec | None = None) -> tuple[Any, int]:
+    """(sort key, media id) of the last item of the previous page."""
+    spec = spec or _SORTS.get(sort)
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, media_id = json.loads(payload)
+        if cursor_sort != sort or spec is None:
+            raise ValueError("cursor of another sort order")
+        return spec.parse(value), int(media_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+async def _filter_params(
     session: AsyncSession,
-    media_type: str | None = None,
-    status: str | None = None,
-    jellyfin_user_id: str | None = None,
-) -> MediaListResponse:
+    media_type: str | None,
+    status: str | None,
+    jellyfin_user_id: str | None,
+    genre: str | None,
+    year: int | None,
+) -> dict[str, Any] | None:
+    """Bind parameters of the list filters; None when the Jellyfin user is unknown."""
     internal_user_id: int | None = None
     if jellyfin_user_id:
         result = await session.execute(
@@ -68,325 +232,395 @@ async def get_media_list(
         )
         internal_user_id = result.scalar_one_or_none()
         if internal_user_id is None:
-            return MediaListResponse(items=[], total=0)
+            return None
+    return {
+        "user_id": internal_user_id,
+        "type": media_type.upper() if media_type else None,
+        "status": status,
+        "genre": genre,
+        "year": year,
+    }
+
+
+def _to_media_item(row: Any) -> MediaItem:
+    media_type_val = row["media_type"]
+    if media_type_val == "SERIES":
+        watch_status = compute_series_status(
+            row["watched_count"] or 0,
+            row["watching_count"] or 0,
+            row["dropped_count"] or 0,
+            row["total_count"] or 0,
+        )
+    else:
+        watch_status = _pick_movie_status([row])
 
-    query = text(
-        """
-        SELECT
-            m.id,
-            m.title,
-            m.media_type,
-            COALESCE(mov.year, s.year) AS year,
-            COALESCE(mov.genres, s.genres) AS genres,
-            COALESCE(mov.poster_url, s.poster_url) AS poster_url,
-            COALESCE(mov.rating_value, s.rating_value) AS rating,
-            movie_wh.status AS movie_status,
-            movie_wh.is_manual AS movie_is_manual,
-            movie_wh.user_id AS movie_wh_user_id,
-            ep_stats.total_count,
-            ep_stats.watched_count,
-            ep_stats.watching_count,
-            ep_stats.dropped_count
-        FROM media m
-        LEFT JOIN movies mov ON mov.id = m.id
-        LEFT JOIN series s ON s.id = m.id
-        LEFT JOIN watch_history movie_wh
-            ON movie_wh.media_id = m.id
-            AND movie_wh.episode_id IS NULL
-            AND (CAST(:user_id AS INTEGER) IS NULL OR movie_wh.user_id = CAST(:user_id AS INTEGER))
-        LEFT JOIN LATERAL (
-            SELECT
-                COUNT(e.id) AS total_count,
-                COUNT(*) FILTER (WHERE wh.status = 'WATCHED') AS watched_count,
-                COUNT(*) FILTER (WHERE wh.status = 'WATCHING') AS watching_count,
-                COUNT(*) FILTER (WHERE wh.status = 'DROPPED') AS dropped_count
-            FROM seasons sea
-            JOIN episodes e ON e.season_id = sea.id
-            LEFT JOIN watch_history wh
-                ON wh.episode_id = e.id
-                AND (CAST(:user_id AS INTEGER) IS NULL OR wh.user_id = CAST(:user_id AS INTEGER))
-            WHERE sea.series_id = m.id
-        ) ep_stats ON m.media_type = 'SERIES'
-        WHERE (CAST(:type AS VARCHAR) IS NULL OR m.media_type = CAST(:type AS mediatype))
-        ORDER BY m.title
-    """
+    media_type_item = cast(Literal["movie", "series"], media_type_val.lower())
+    watch_status_item = cast(
+        Literal["watched", "watching", "planned", "dropped"] | None, watch_status
     )
-
-    rows = (
-        (
-            await session.execute(
-                query,
-                {
-                    "user_id": internal_user_id,
-                    "type": media_type.upper() if media_type else None,
-                },
-            )
-        )
-        .mappings()
-        .all()
+    return MediaItem(
+        id=row["id"],
+        title=row["title"],
+        media_type=media_type_item,
+        year=row["year"],
+        genres=row["genres"] or [],
+        poster_url=row["poster_url"],
+        rating=row["rating"],
+        watch_status=watch_status_item,
+        total_episodes=row["total_count"] if media_type_val == "SERIES" else None,
+        watched_episodes=(row["watched_count"] or 0) if media_type_val == "SERIES" else None,
+        is_manual=bool(row["movie_is_manual"]) if media_type_val != "SERIES" else False,
     )
 
-    grouped: dict[int, list[Any]] = defaultdict(list)
-    for row in rows:
-        grouped[row["id"]].append(row)
-
-    items: list[MediaItem] = []
-    for media_id, media_rows in grouped.items():
-        row = media_rows[0]
-        media_type_val = row["media_type"]
-
-        if media_type_val == "SERIES":
-            total = row["total_count"] or 0
-            watched = sum(r["watched_count"] or 0 for r in media_rows)
-            watching = sum(r["watching_count"] or 0 for r in media_rows)
-            dropped = sum(r["dropped_count"] or 0 for r in media_rows)
-            watch_status = compute_series_status(watched, watching, dropped, total)
-        else:
-            watch_status = _pick_movie_status(media_rows)
-
-        if status and watch_status != status:
-            continue
-
-        genres = row["genres"] or []
-        media_type_item = cast(Literal["movie", "series"], media_type_val.lower())
-        watch_status_item = cast(
-            Literal["watched", "watching", "planned", "dropped"] | None, watch_status
-        )
-        items.append(
-            MediaItem(
-                id=media_id,
-                title=row["title"],
-                media_type=media_type_item,
-                year=row["year"],
-                genres=genres,
-                poster_url=row["poster_url"],
-                rating=row["rating"],
-                watch_status=watch_status_item,
-                total_episodes=row["total_count"] if media_type_val == "SERIES" else None,
-                watched_episodes=(
-                    (row["watched_count"] or 0) if media_type_val == "SERIES" else None
-                ),
-                is_manual=bool(row["movie_is_manual"]) if media_type_val != "SERIES" else False,
-            )
-        )
 
+async def get_media_list(
+    session: AsyncSession,
+    media_type: str | None = None,
+    status: str | None = None,
+    jellyfin_user_id: str | None = None,
+    genre: str | None = None,
+    year: int | None = None,
+    sort: MediaSort = "title",
+) -> MediaListResponse:
+    """The whole filtered library in one response; see get_media_page for pages."""
+    params = await _filter_params(session, media_type, status, jellyfin_user_id, genre, year)
+    if params is None:
+        return MediaListResponse(items=[], total=0)
+
+    rows = (await session.execute(_media_list_query(sort), params)).mappings().all()
+    items = [_to_media_item(row) for row in rows]
     return MediaListResponse(items=items, total=len(items))
 
 
-async def get_media_detail_by_id(
+async def get_media_page(
     session: AsyncSession,
-    media_id: int,
+    media_type: str | None = None,
+    status: str | None = None,
     jellyfin_user_id: str | None = None,
-) -> MediaDetailResponse:
-    internal_user_id: int | None = None
-    if jellyfin_user_id:
-        result = await session.execute(
-            select(User.id).where(User.jellyfin_user_id == jellyfin_user_id)
-        )
-        internal_user_id = result.scalar_one_or_none()
+    genre: str | None = None,
+    year: int | None = None,
+    sort: MediaSort = "title",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> MediaPageResponse:
+    """
+    One page of the filtered library, keyset-paginated on (sort key, id).
 
-    query = text(
-        """
-        SELECT
-            m.id,
-            m.title,
-            m.media_type,
-            COALESCE(mov.year, s.year) AS year,
-            COALESCE(mov.genres, s.genres) AS genres,
-            COALESCE(mov.poster_url, s.poster_url) AS poster_url,
-            COALESCE(mov.backdrop_path, s.backdrop_path) AS backdrop_path,
-            COALESCE(mov.overview, s.overview) AS overview,
-            COALESCE(mov.rating_value, s.rating_value) AS rating_value,
-            COALESCE(mov.tmdb_id, s.tmdb_id) AS tmdb_id,
-            COALESCE(mov.imdb_id, s.imdb_id) AS imdb_id,
-            s.tvdb_id AS tvdb_id,
-            mov.status AS movie_release_status,
-            s.status AS series_status,
-            movie_wh.status AS movie_status,
-            movie_wh.is_manual AS movie_is_manual,
-            movie_wh.watched_at AS movie_watched_at,
-            ep_stats.total_count,
-            ep_stats.watched_count,
-            ep_stats.watching_count,
-            ep_stats.dropped_count
-        FROM media m
-        LEFT JOIN movies mov ON mov.id = m.id
-        LEFT JOIN series s ON s.id = m.id
-        LEFT JOIN watch_history movie_wh
-            ON movie_wh.media_id = m.id
-            AND movie_wh.episode_id IS NULL
-            AND (CAST(:user_id AS INTEGER) IS NULL OR movie_wh.user_id = CAST(:user_id AS INTEGER))
-        LEFT JOIN LATERAL (
-            SELECT
-                COUNT(e.id) AS total_count,
-                COUNT(*) FILTER (WHERE wh.status = 'WATCHED') AS watched_count,
-                COUNT(*) FILTER (WHERE wh.status = 'WATCHING') AS watching_count,
-                COUNT(*) FILTER (WHERE wh.status = 'DROPPED') AS dropped_count
-            FROM seasons sea
-            JOIN episodes e ON e.season_id = sea.id
-            LEFT JOIN watch_history wh
-                ON wh.episode_id = e.id
-                AND (CAST(:user_id AS INTEGER) IS NULL OR wh.user_id = CAST(:user_id AS INTEGER))
-            WHERE sea.series_id = m.id
-        ) ep_stats ON m.media_type = 'SERIES'
-        WHERE m.id = :media_id
-        """
+    ``next_cursor`` of the response fetches the following page; it is None on the last
+    one. The total count of matching items is a separate query, skipped when
+    ``include_total`` is false.
+    """
+    after = _decode_cursor(cursor, sort) if cursor else None
+    params = await _filter_params(session, media_type, status, jellyfin_user_id, genre, year)
+    if params is None:
+        return MediaPageResponse(items=[], total=0 if include_total else None)
+
+    return await _fetch_page(
+        session,
+        _media_list_query(sort, after=after is not None, limit=True),
+        text(f"SELECT COUNT(*) {_MEDIA_LIST_FROM}") if include_total else None,
+        params,
+        sort,
+        limit,
+        after,
     )
 
-    rows = (
-        (await session.execute(query, {"media_id": media_id, "user_id": internal_user_id}))
-        .mappings()
-        .all()
+
+async def _fetch_page(
+    session: AsyncSession,
+    query: TextClause,
+    count_query: TextClause | None,
+    params: dict[str, Any],
+    sort: str,
+    limit: int,
+    after: tuple[Any, int] | None,
+) -> MediaPageResponse:
+    page_params = {**params, "limit": limit + 1}
+    if after is not None:
+        page_params["cursor_key"], page_params["cursor_id"] = after
+    rows = (await session.execute(query, page_params)).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(sort, rows[-1]["sort_key"], rows[-1]["id"])
+
+    total = None
+    if count_query is not None:
+        total = (await session.execute(count_query, params)).scalar_one()
+
+    return MediaPageResponse(
+        items=[_to_media_item(row) for row in rows], total=total, next_cursor=next_cursor
     )
 
-    if not rows:
-        raise HTTPException(status_code=404, detail="Media not found")
 
-    row = rows[0]
-    media_type_val: str = row["media_type"]
-    media_type_lower = media_type_val.lower()
+SEARCH_SORT = "relevance"
 
-    if media_type_val == "MOVIE":
-        raw_status = row["movie_release_status"]
-        status_val = None if raw_status is None else raw_status.lower()
-        watch_status = _pick_movie_status(list(rows))
-        tvdb_id = None
-    else:
-        raw_status = row["series_status"]
-        status_val = None if raw_status is None else raw_status.lower()
-        total = row["total_count"] or 0
-        watched = row["watched_count"] or 0
-        watching = row["watching_count"] or 0
-        dropped = row["dropped_count"] or 0
-        watch_status = compute_series_status(watched, watching, dropped, total)
-        tvdb_id = row["tvdb_id"]
-
-    seasons: list[SeasonDetail] = []
-    if media_type_val == "SERIES":
-        seasons_query = text(
-            """
-            SELECT
-                sea.id,
-                sea.number,
-                sea.poster_url,
-                sea.vote_average,
-                sea.release_date,
-                COUNT(e.id) AS total_episodes,
-                COUNT(*) FILTER (WHERE wh.status = 'WATCHED') AS watched_episodes
-            FROM seasons sea
-            LEFT JOIN episodes e ON e.season_id = sea.id
-            LEFT JOIN watch_history wh
-                ON wh.episode_id = e.id
-                AND (CAST(:user_id AS INTEGER) IS NULL OR wh.user_id = CAST(:user_id AS INTEGER))
-            WHERE sea.series_id = :media_id
-            GROUP BY sea.id, sea.number, sea.poster_url, sea.vote_average, sea.release_date
-            ORDER BY sea.number
-            """
-        )
-        episodes_query = text(
-            """
-            SELECT
-                sea.number AS season_number,
-                e.id AS episode_id,
-                e.number AS episode_number,
-                e.title,
-                e.air_date,
-                e.still_url,
-                MAX(wh.watched_at) AS watched_at,
-                CASE
-                    WHEN bool_or(wh.status = 'WATCHED') THEN 'WATCHED'
-                    WHEN bool_or(wh.status = 'WATCHING') THEN 'WATCHING'
-                    WHEN bool_or(wh.status = 'DROPPED') THEN 'DROPPED'
-                    WHEN bool_or(wh.status = 'PLANNED') THEN 'PLANNED'
-                    ELSE NULL
-                END AS episode_status,
-                bool_or(wh.is_manual) AS episode_is_manual
-            FROM seasons sea
-            JOIN episodes e ON e.season_id = sea.id
-            LEFT JOIN watch_history wh
-                ON wh.episode_id = e.id
-                AND (CAST(:user_id AS INTEGER) IS NULL OR wh.user_id = CAST(:user_id AS INTEGER))
-            WHERE sea.series_id = :media_id
-            GROUP BY sea.id, sea.number, e.id, e.number, e.title, e.air_date, e.still_url
-            ORDER BY sea.number, e.number
-            """
-        )
-        season_rows = (
-            (
-                await session.execute(
-                    seasons_query, {"media_id": media_id, "user_id": internal_user_id}
-                )
-            )
-            .mappings()
-            .all()
-        )
-        episode_rows = (
-            (
-                await session.execute(
-                    episodes_query, {"media_id": media_id, "user_id": internal_user_id}
-                )
-            )
-            .mappings()
-            .all()
-        )
+# Weighted full-text rank (title > original title > overview) plus trigram similarity
+# of the title, so typo matches found only by pg_trgm still get a rank
+_RELEVANCE = _SortSpec("ranked.rank", "DOUBLE PRECISION", True, float)
 
-        episodes_by_season: dict[int, list[EpisodeDetail]] = defaultdict(list)
-        for ep in episode_rows:
-            raw_ep_status = ep["episode_status"]
-            ep_status = raw_ep_status.lower() if raw_ep_status else None
-            episodes_by_season[ep["season_number"]].append(
-                EpisodeDetail(
-                    id=ep["episode_id"],
-                    episode_number=ep["episode_number"],
-                    title=ep["title"],
-                    air_date=ep["air_date"],
-                    thumbnail_url=ep["still_url"],
-                    watch_status=cast(
-                        Literal["watched", "watching", "planned", "dropped"] | None, ep_status
-                    ),
-                    is_manual=(
-                        bool(ep["episode_is_manual"])
-                        if ep["episode_is_manual"] is not None
-                        else False
-                    ),
-                    watched_at=ep["watched_at"],
-                )
-            )
+_SEARCH_TOKEN = re.compile(r"[^\W_]+")
 
-        seasons = [
-            SeasonDetail(
-                id=s["id"],
-                number=s["number"],
-                poster_url=s["poster_url"],
-                vote_average=s["vote_average"],
-                release_date=s["release_date"],
-                total_episodes=s["total_episodes"] or 0,
-                watched_episodes=s["watched_episodes"] or 0,
-                episodes=episodes_by_season.get(s["number"], []),
-            )
-            for s in season_rows
-        ]
+# Each branch is answered by its own GIN index: the search_vector columns of media,
+# movies and series, and the pg_trgm index of media.title
+_SEARCH_HITS = """
+    WITH hits AS (
+        SELECT id FROM media WHERE search_vector @@ to_tsquery('simple', :tsquery)
+        UNION
+        SELECT id FROM movies WHERE search_vector @@ to_tsquery('simple', :tsquery)
+        UNION
+        SELECT id FROM series WHERE search_vector @@ to_tsquery('simple', :tsquery)
+        UNION
+        SELECT id FROM media WHERE CAST(:q AS TEXT) <% title
+    )
+"""
+
+_SEARCH_FROM = f"""
+    FROM hits
+    JOIN media m ON m.id = hits.id
+    {_MEDIA_JOINS}
+    CROSS JOIN LATERAL (
+        SELECT CAST(
+            ts_rank(
+                m.search_vector
+                    || COALESCE(mov.search_vector, s.search_vector, CAST('' AS TSVECTOR)),
+                to_tsquery('simple', :tsquery)
+            ) + word_similarity(CAST(:q AS TEXT), m.title)
+            AS DOUBLE PRECISION
+        ) AS rank
+    ) ranked
+    {_MEDIA_FILTERS}
+"""
+
+
+def _prefix_tsquery(q: str) -> str | None:
+    """``breaking ba`` -> ``breaking:* & ba:*``; None when there are no words."""
+    return " & ".join(f"{token}:*" for token in _SEARCH_TOKEN.findall(q.lower())) or None
+
+
+def _media_search_query(*, after: bool = False) -> TextClause:
+    return text(
+        f"""
+        {_SEARCH_HITS}
+        SELECT {_MEDIA_COLUMNS}, {_RELEVANCE.expression} AS sort_key
+        {_SEARCH_FROM}
+        {_keyset_clause(_RELEVANCE) if after else ""}
+        {_order_clause(_RELEVANCE)}
+        LIMIT :limit
+        """
+    )
 
-    media_type_typed = cast(Literal["movie", "series"], media_type_lower)
-    watch_status_typed = cast(
-        Literal["watched", "watching", "planned", "dropped"] | None, watch_status
+
+async def search_media(
+    session: AsyncSession,
+    q: str,
+    media_type: str | None = None,
+    status: str | None = None,
+    jellyfin_user_id: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> MediaPageResponse:
+    """
+    Titles matching ``q``, most relevant first, keyset-paginated like get_media_page.
+
+    Every word of ``q`` is matched as a prefix against the title, original title and
+    overview; titles similar to ``q`` (typos) match through pg_trgm.
+    """
+    after = _decode_cursor(cursor, SEARCH_SORT, _RELEVANCE) if cursor else None
+    tsquery = _prefix_tsquery(q)
+    params = await _filter_params(session, media_type, status, jellyfin_user_id, None, None)
+    if params is None or tsquery is None:
+        return MediaPageResponse(items=[], total=0 if include_total else None)
+
+    params = {**params, "q": q, "tsquery": tsquery}
+    return await _fetch_page(
+        session,
+        _media_search_query(after=after is not None),
+        text(f"{_SEARCH_HITS} SELECT COUNT(*) {_SEARCH_FROM}") if include_total else None,
+        params,
+        SEARCH_SORT,
+        limit,
+        after,
     )
-    return MediaDetailResponse(
-        id=row["id"],
-        media_type=media_type_typed,
-        title=row["title"],
-        year=row["year"],
-        poster_url=row["poster_url"],
-        backdrop_path=row["backdrop_path"],
-        overview=row["overview"],
-        genres=row["genres"] or [],
-        status=status_val,
-        tmdb_rating_percent=_to_percent(row["rating_value"]),
-        watch_status=watch_status_typed,
-        is_manual=bool(row["movie_is_manual"]) if media_type_val == "MOVIE" else False,
-        watched_at=row["movie_watched_at"] if media_type_val == "MOVIE" else None,
-        tmdb_id=row["tmdb_id"],
-        imdb_id=row["imdb_id"],
-        tvdb_id=tvdb_id,
-        seasons=seasons,
+
+
+def _utc_json(expression: str) -> str:
+    """
+    A timestamptz as ISO 8601 in UTC, whatever the session time zone is.
+
+    Formatted like Pydantic does: the fraction is left out for whole seconds.
+    """
+    utc = f"{expression} AT TIME ZONE 'UTC'"
+    return f"""CASE
+        WHEN date_trunc('second', {utc}) = {utc}
+            THEN to_char({utc}, 'YYYY-MM-DD"T"HH24:MI:SS"Z"')
+        ELSE to_char({utc}, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')
+    END"""
+
+
+def _round_half_even(expression: str) -> str:
+    """
+    A double precision value rounded to an integer like Python's round().
+
+    ROUND(double precision) breaks ties the way the platform does, so ties are resolved
+    explicitly: halving a tie gives no tie, and doubling that rounds to the even neighbour.
+    """
+    return f"""CAST(CASE
+        WHEN {expression} - FLOOR({expression}) = 0.5 THEN 2 * ROUND({expression} / 2)
+        ELSE ROUND({expression})
+    END AS INTEGER)"""
+
+
+# The whole MediaDetailResponse document, built by Postgres in one statement. Keys follow
+# the schema's field order; statuses mirror _pick_movie_status and compute_series_status.
+# It parses to the same JSON values as MediaDetailResponse.model_dump_json(), while the
+# whitespace and float literals (8 for 8.0) are Postgres' own
+_MEDIA_DETAIL_QUERY = f"""
+    WITH viewer AS (
+        SELECT (
+            SELECT id FROM users WHERE jellyfin_user_id = CAST(:jellyfin_user_id AS VARCHAR)
+        ) AS user_id
     )
+    SELECT CAST(json_build_object(
+        'id', m.id,
+        'media_type', LOWER(CAST(m.media_type AS VARCHAR)),
+        'title', m.title,
+        'year', COALESCE(mov.year, s.year),
+        'poster_url', COALESCE(mov.poster_url, s.poster_url),
+        'backdrop_path', COALESCE(mov.backdrop_path, s.backdrop_path),
+        'overview', COALESCE(mov.overview, s.overview),
+        'genres', CASE json_typeof(COALESCE(mov.genres, s.genres))
+            WHEN 'array' THEN COALESCE(mov.genres, s.genres)
+            ELSE CAST('[]' AS JSON)
+        END,
+        'status', LOWER(COALESCE(CAST(mov.status AS VARCHAR), CAST(s.status AS VARCHAR))),
+        'tmdb_rating_percent',
+            {_round_half_even("COALESCE(mov.rating_value, s.rating_value) * 10")},
+        'watch_status', CASE
+            WHEN m.media_type = 'MOVIE' THEN LOWER(CAST(movie_wh.status AS VARCHAR))
+            WHEN ep_stats.total_count = 0 THEN NULL
+            WHEN ep_stats.watched_count = ep_stats.total_count THEN 'watched'
+            WHEN ep_stats.dropped_count > 0 THEN 'dropped'
+            WHEN ep_stats.watched_count > 0 OR ep_stats.watching_count > 0 THEN 'watching'
+            ELSE 'planned'
+        END,
+        'is_manual', COALESCE(movie_wh.is_manual, false),
+        'watched_at', {_utc_json("movie_wh.watched_at")},
+        'tmdb_id', COALESCE(mov.tmdb_id, s.tmdb_id),
+        'imdb_id', COALESCE(mov.imdb_id, s.imdb_id),
+        'tvdb_id', s.tvdb_id,
+        'seasons', COALESCE(seasons.items, CAST('[]' AS JSON))
+    ) AS TEXT)
+    FROM media m
+    CROSS JOIN viewer
+    LEFT JOIN movies mov ON mov.id = m.id
+    LEFT JOIN series s ON s.id = m.id
+    LEFT JOIN LATERAL (
+        SELECT wh.status, wh.is_manual, wh.watched_at
+        FROM watch_history wh
+        WHERE wh.media_id = m.id
+            AND wh.episode_id IS NULL
+            AND (viewer.user_id IS NULL OR wh.user_id = viewer.user_id)
+        ORDER BY CASE wh.status
+            WHEN 'WATCHED' THEN 4
+            WHEN 'WATCHING' THEN 3
+            WHEN 'PLANNED' THEN 2
+            ELSE 1
+        END DESC
+        LIMIT 1
+    ) movie_wh ON m.media_type = 'MOVIE'
+    LEFT JOIN LATERAL (
+        SELECT
+            COALESCE(MAX(sp.total), {_SERIES_TOTAL_FALLBACK}) AS total_count,
+            COALESCE(SUM(sp.watched), 0) AS watched_count,
+            COALESCE(SUM(sp.watching), 0) AS watching_count,
+            COALESCE(SUM(sp.dropped), 0) AS dropped_count
+        FROM series_progress sp
+        WHERE sp.series_id = m.id
+            AND (viewer.user_id IS NULL OR sp.user_id = viewer.user_id)
+    ) ep_stats ON m.media_type = 'SERIES'
+    LEFT JOIN LATERAL (
+        SELECT json_agg(
+            json_build_object(
+                'id', sea.id,
+                'number', sea.number,
+                'poster_url', sea.poster_url,
+                'vote_average', sea.vote_average,
+                'release_date', {_utc_json("sea.release_date")},
+                'total_episodes', eps.total_episodes,
+                'watched_episodes', eps.watched_episodes,
+                'episodes', COALESCE(eps.items, CAST('[]' AS JSON))
+            )
+            ORDER BY sea.number
+        ) AS items
+        FROM seasons sea
+        CROSS JOIN LATERAL (
+            SELECT
+                COUNT(*) AS total_episodes,
+                COUNT(*) FILTER (WHERE ep.status = 'WATCHED') AS watched_episodes,
+                json_agg(
+                    json_build_object(
+                        'id', ep.id,
+                        'episode_number', ep.number,
+                        'title', ep.title,
+                        'air_date', {_utc_json("ep.air_date")},
+                        'thumbnail_url', ep.still_url,
+                        'watch_status', LOWER(ep.status),
+                        'is_manual', COALESCE(ep.is_manual, false),
+                        'watched_at', {_utc_json("ep.watched_at")}
+                    )
+                    ORDER BY ep.number
+                ) AS items
+            FROM (
+                SELECT
+                    e.id,
+                    e.number,
+                    e.title,
+                    e.air_date,
+                    e.still_url,
+                    MAX(wh.watched_at) AS watched_at,
+                    CASE
+                        WHEN bool_or(wh.status = 'WATCHED') THEN 'WATCHED'
+                        WHEN bool_or(wh.status = 'WATCHING') THEN 'WATCHING'
+                        WHEN bool_or(wh.status = 'DROPPED') THEN 'DROPPED'
+                        WHEN bool_or(wh.status = 'PLANNED') THEN 'PLANNED'
+                        ELSE NULL
+                    END AS status,
+                    bool_or(wh.is_manual) AS is_manual
+                FROM episodes e
+                LEFT JOIN watch_history wh
+                    ON wh.episode_id = e.id
+                    AND (viewer.user_id IS NULL OR wh.user_id = viewer.user_id)
+                WHERE e.season_id = sea.id
+                GROUP BY e.id
+            ) ep
+        ) eps
+        WHERE sea.series_id = m.id
+    ) seasons ON m.media_type = 'SERIES'
+    WHERE m.id = :media_id
+"""
+
+
+async def get_media_detail_json(
+    session: AsyncSession,
+    media_id: int,
+    jellyfin_user_id: str | None = None,
+) -> bytes:
+    """
+    MediaDetailResponse of a movie or series as ready-to-send JSON bytes.
+
+    Postgres assembles the nested seasons → episodes document, so a long-running show
+    costs one round trip and no per-episode Python objects.
+    """
+    body = (
+        await session.execute(
+            text(_MEDIA_DETAIL_QUERY),
+            {"media_id": media_id, "jellyfin_user_id": jellyfin_user_id},
+        )
+    ).scalar_one_or_none()
+    if body is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return cast(str, body).encode()
@@ -1,6 +1,8 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
 
-from sqlalchemy import or_, select
+from sqlalchemy import insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -92,7 +94,7 @@ async def create_new_movie(
     genres: list[str] | None = None,
     rating_value: float | None = None,
     rating_votes: int | None = None,
-) -> None:
+) -> Movie:
     """Create a new movie with associated Media entry."""
     media_obj = Media(
         media_type=MediaType.MOVIE,
@@ -130,6 +132,7 @@ async def create_new_movie(
         id_info.append(f"status={status}")
 
     logger.info("Added new movie from %s: %s (%s)", source, title, ", ".join(id_info))
+    return movie_obj
 
 
 def update_existing_movie(
@@ -213,6 +216,8 @@ def update_existing_movie(
         was_updated = True
 
     if was_updated:
+        # The TMDB pass puts its values back over the ones written here
+        movie.tmdb_metadata_digest = None
         source_info = f" from {source}" if source else ""
         logger.info("Updated movie '%s' with new data %s", title, source_info)
 
@@ -235,3 +240,150 @@ def resolve_movie_from_indexes(
     if imdb_id and imdb_id in by_imdb_id:
         return by_imdb_id[imdb_id]
     return None
+
+
+@dataclass
+class MovieIndexes:
+    """Movies keyed by source and external ids, for resolving a batch without per-item queries."""
+
+    by_radarr_id: dict[int, Movie] = field(default_factory=dict)
+    by_jellyfin_id: dict[str, Movie] = field(default_factory=dict)
+    by_tmdb_id: dict[str, Movie] = field(default_factory=dict)
+    by_imdb_id: dict[str, Movie] = field(default_factory=dict)
+
+    def add(self, movie: Movie) -> None:
+        """Index a loaded, created or updated movie; the first movie seen for an id wins."""
+        if movie.radarr_id is not None:
+            self.by_radarr_id.setdefault(movie.radarr_id, movie)
+        if movie.jellyfin_id:
+            self.by_jellyfin_id.setdefault(movie.jellyfin_id, movie)
+        if movie.tmdb_id:
+            self.by_tmdb_id.setdefault(movie.tmdb_id, movie)
+        if movie.imdb_id:
+            self.by_imdb_id.setdefault(movie.imdb_id, movie)
+
+    def resolve(
+        self,
+        *,
+        radarr_id: int | None = None,
+        jellyfin_id: str | None = None,
+        tmdb_id: str | None = None,
+        imdb_id: str | None = None,
+    ) -> Movie | None:
+        """Look a movie up by its source id first, then by TMDB and IMDb ids."""
+        if radarr_id is not None and radarr_id in self.by_radarr_id:
+            return self.by_radarr_id[radarr_id]
+        return resolve_movie_from_indexes(
+            jellyfin_id=jellyfin_id,
+            tmdb_id=tmdb_id,
+            imdb_id=imdb_id,
+            by_jellyfin_id=self.by_jellyfin_id,
+            by_tmdb_id=self.by_tmdb_id,
+            by_imdb_id=self.by_imdb_id,
+        )
+
+
+async def load_movie_indexes(
+    session: AsyncSession,
+    *,
+    radarr_ids: Iterable[int] = (),
+    jellyfin_ids: Iterable[str] = (),
+    tmdb_ids: Iterable[str] = (),
+    imdb_ids: Iterable[str] = (),
+    into: MovieIndexes | None = None,
+) -> MovieIndexes:
+    """
+    Load every movie matching any of the given ids (with media) in one query.
+
+    With ``into`` the movies are added to existing indexes, so a large id set can be
+    loaded in several bounded queries.
+    """
+    conditions = []
+    if radarr_set := set(radarr_ids):
+        conditions.append(Movie.radarr_id.in_(radarr_set))
+    if jellyfin_set := set(jellyfin_ids):
+        conditions.append(Movie.jellyfin_id.in_(jellyfin_set))
+    if tmdb_set := set(tmdb_ids):
+        conditions.append(Movie.tmdb_id.in_(tmdb_set))
+    if imdb_set := set(imdb_ids):
+        conditions.append(Movie.imdb_id.in_(imdb_set))
+
+    indexes = into if into is not None else MovieIndexes()
+    if not conditions:
+        return indexes
+    result = await session.execute(
+        select(Movie).where(or_(*conditions)).options(selectinload(Movie.media))
+    )
+    for movie in result.scalars():
+        indexes.add(movie)
+    return indexes
+
+
+# Movie columns written by insert_new_movies, besides the id shared with Media
+_NEW_MOVIE_COLUMNS = (
+    "radarr_id",
+    "jellyfin_id",
+    "tmdb_id",
+    "imdb_id",
+    "status",
+    "poster_url",
+    "year",
+    "genres",
+    "rating_value",
+    "rating_votes",
+)
+
+
+def build_new_movie(
+    *,
+    title: str,
+    radarr_id: int | None,
+    jellyfin_id: str | None,
+    tmdb_id: str | None,
+    imdb_id: str | None,
+    release_date: datetime | None,
+    status: MovieStatus | None = None,
+) -> Movie:
+    """Transient Movie with its Media, not added to the session; see insert_new_movies."""
+    return Movie(
+        radarr_id=radarr_id,
+        jellyfin_id=jellyfin_id,
+        tmdb_id=tmdb_id,
+        imdb_id=imdb_id,
+        status=status,
+        media=Media(media_type=MediaType.MOVIE, title=title, release_date=release_date),
+    )
+
+
+async def insert_new_movies(
+    session: AsyncSession, movies: Sequence[Movie], source: str | None = None
+) -> None:
+    """
+    Write transient movies from build_new_movie with multi-row INSERTs.
+
+    Media rows go in first with ``RETURNING id`` (in parameter order), then the Movie
+    rows reuse those ids. The objects stay transient; only their ``id`` is filled in.
+    """
+    if not movies:
+        return
+    result = await session.execute(
+        insert(Media).returning(Media.id, sort_by_parameter_order=True),
+        [
+            {
+                "media_type": MediaType.MOVIE,
+                "title": movie.media.title,
+                "release_date": movie.media.release_date,
+            }
+            for movie in movies
+        ],
+    )
+    for movie, media_id in zip(movies, result.scalars(), strict=True):
+        movie.id = movie.media.id = media_id
+    await session.execute(
+        insert(Movie),
+        [
+            {"id": movie.id, **{column: getattr(movie, column) for column in _NEW_MOVIE_COLUMNS}}
+            for movie in movies
+        ],
+    )
+    logger.info("Added %d new movies from %s", len(movies), source)
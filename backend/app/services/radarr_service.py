@@ -1,13 +1,16 @@
+from typing import Any
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.client.radarr_client import fetch_radarr_movies
+from app.client.radarr_client import fetch_radarr_movie, iter_radarr_movies
 from app.config import logger
 from app.models.schedule import ServiceType
 from app.schemas.radarr import RadarrImportResponse
 from app.services.movie_utils import (
+    MovieIndexes,
     create_new_movie,
-    find_movie_by_external_ids,
     find_movie_by_radarr_id,
+    load_movie_indexes,
     map_radarr_status,
     update_existing_movie,
 )
@@ -15,6 +18,112 @@ from app.services.service_config_repository import get_decrypted_config
 from app.utils.datetime_utils import parse_iso_datetime
 from app.utils.poster_utils import extract_poster
 
+# Radarr movies resolved against the database per set-based lookup
+RESOLVE_BATCH_SIZE = 500
+
+
+def _radarr_ids(movie_data: dict[str, Any]) -> tuple[int | None, str | None, str | None]:
+    """radarr_id, tmdb_id and imdb_id of a Radarr movie payload."""
+    tmdb_id = str(movie_data.get("tmdbId")) if movie_data.get("tmdbId") else None
+    return movie_data.get("id"), tmdb_id, movie_data.get("imdbId") or None
+
+
+async def _load_radarr_indexes(
+    session: AsyncSession, movies_data: list[dict[str, Any]]
+) -> MovieIndexes:
+    ids = [_radarr_ids(movie_data) for movie_data in movies_data]
+    return await load_movie_indexes(
+        session,
+        radarr_ids=[radarr_id for radarr_id, _, _ in ids if radarr_id],
+        tmdb_ids=[tmdb_id for _, tmdb_id, _ in ids if tmdb_id],
+        imdb_ids=[imdb_id for _, _, imdb_id in ids if imdb_id],
+    )
+
+
+async def _upsert_radarr_movie(
+    session: AsyncSession, movie_data: dict[str, Any], indexes: MovieIndexes
+) -> str | None:
+    """
+    Create or update one movie from its Radarr payload.
+
+    The movie is resolved in ``indexes`` (by radarr_id, then tmdb/imdb ids), which
+    are kept current with the movies created or updated here.
+    Returns "imported" or "updated" when the movie was written, None otherwise.
+    """
+    radarr_id, tmdb_id, imdb_id = _radarr_ids(movie_data)
+    title = movie_data.get("title", "Unknown Title")
+    release_date = parse_iso_datetime(movie_data.get("inCinemas"), context=title)
+    status = map_radarr_status(movie_data.get("status"))
+    poster_url = extract_poster(movie_data.get("images", []))
+    year = movie_data.get("year")
+    genres = movie_data.get("genres")
+    rating_value = movie_data.get("ratings", {}).get("value")
+    rating_votes = movie_data.get("ratings", {}).get("votes")
+
+    existing_movie = indexes.resolve(radarr_id=radarr_id or None, tmdb_id=tmdb_id, imdb_id=imdb_id)
+
+    # Если нашли существующий фильм - обновляем
+    if existing_movie:
+        logger.debug("Found existing movie id=%s for %s", existing_movie.id, title)
+        if update_existing_movie(
+            movie=existing_movie,
+            radarr_id=radarr_id,
+            jellyfin_id=None,
+            tmdb_id=tmdb_id,
+            imdb_id=imdb_id,
+            release_date=release_date,
+            title=title,
+            status=status,
+            source="Radarr",
+            poster_url=poster_url,
+            year=year,
+            genres=genres,
+            rating_value=rating_value,
+            rating_votes=rating_votes,
+        ):
+            indexes.add(existing_movie)
+            return "updated"
+        return None
+
+    # Если не нашли - создаем новый (только если есть идентификаторы)
+    if not radarr_id and not tmdb_id and not imdb_id:
+        logger.warning("Skipping movie without any IDs: %s", title)
+        return None
+
+    movie = await create_new_movie(
+        session=session,
+        title=title,
+        radarr_id=radarr_id,
+        jellyfin_id=None,
+        tmdb_id=tmdb_id,
+        imdb_id=imdb_id,
+        release_date=release_date,
+        status=status,
+        source="Radarr",
+        poster_url=poster_url,
+        year=year,
+        genres=genres,
+        rating_value=rating_value,
+        rating_votes=rating_votes,
+    )
+    indexes.add(movie)
+    return "imported"
+
+
+async def _upsert_radarr_batch(
+    session: AsyncSession, movies_data: list[dict[str, Any]]
+) -> tuple[int, int]:
+    """Resolve a batch of Radarr movies in one lookup, then upsert them. Returns (new, updated)."""
+    indexes = await _load_radarr_indexes(session, movies_data)
+    imported = updated = 0
+    for movie_data in movies_data:
+        outcome = await _upsert_radarr_movie(session, movie_data, indexes)
+        if outcome == "imported":
+            imported += 1
+        elif outcome == "updated":
+            updated += 1
+    return imported, updated
+
 
 async def import_radarr_movies(session: AsyncSession) -> RadarrImportResponse:
     """Imports movies from Radarr into the database with logging and aware datetime."""
@@ -23,80 +132,21 @@ async def import_radarr_movies(session: AsyncSession) -> RadarrImportResponse:
         logger.info("Radarr is not configured, skipping import")
         return RadarrImportResponse(imported_count=0, updated_count=0)
     url, api_key = config
-    movies = await fetch_radarr_movies(url, api_key)
     imported = 0
     updated = 0
 
     try:
-        for movie_data in movies:
-            radarr_id = movie_data.get("id")
-            title = movie_data.get("title", "Unknown Title")
-            tmdb_id = str(movie_data.get("tmdbId")) if movie_data.get("tmdbId") else None
-            imdb_id = movie_data.get("imdbId")
-            release_date = parse_iso_datetime(movie_data.get("inCinemas"), context=title)
-            status = map_radarr_status(movie_data.get("status"))
-            poster_url = extract_poster(movie_data.get("images", []))
-            year = movie_data.get("year")
-            genres = movie_data.get("genres")
-            rating_value = movie_data.get("ratings", {}).get("value")
-            rating_votes = movie_data.get("ratings", {}).get("votes")
-
-            existing_movie = None
-
-            # 1. Сначала ищем по radarr_id (если он есть)
-            if radarr_id:
-                existing_movie = await find_movie_by_radarr_id(session, radarr_id)
-                if existing_movie:
-                    logger.debug("Found existing movie by radarr_id=%s: %s", radarr_id, title)
-
-            # 2. Если не нашли по radarr_id, ищем по внешним ID
-            if not existing_movie:
-                existing_movie = await find_movie_by_external_ids(session, tmdb_id, imdb_id)
-
-            # 3. Если нашли существующий фильм - обновляем
-            if existing_movie:
-                if update_existing_movie(
-                    movie=existing_movie,
-                    radarr_id=radarr_id,
-                    jellyfin_id=None,
-                    tmdb_id=tmdb_id,
-                    imdb_id=imdb_id,
-                    release_date=release_date,
-                    title=title,
-                    status=status,
-                    source="Radarr",
-                    poster_url=poster_url,
-                    year=year,
-                    genres=genres,
-                    rating_value=rating_value,
-                    rating_votes=rating_votes,
-                ):
-                    updated += 1
-                continue
-
-            # 4. Если не нашли - создаем новый (только если есть идентификаторы)
-            if not radarr_id and not tmdb_id and not imdb_id:
-                logger.warning("Skipping movie without any IDs: %s", title)
-                continue
-
-            await create_new_movie(
-                session=session,
-                title=title,
-                radarr_id=radarr_id,
-                jellyfin_id=None,
-                tmdb_id=tmdb_id,
-                imdb_id=imdb_id,
-                release_date=release_date,
-                status=status,
-                source="Radarr",
-                poster_url=poster_url,
-                year=year,
-                genres=genres,
-                rating_value=rating_value,
-                rating_votes=rating_votes,
-            )
-
-            imported += 1
+        # Movies are decoded from the response one at a time and resolved in batches,
+        # so neither the library nor the movies table is ever held in full
+        batch: list[dict[str, Any]] = []
+        async for movie_data in iter_radarr_movies(url, api_key):
+            batch.append(movie_data)
+            if len(batch) >= RESOLVE_BATCH_SIZE:
+                new, upd = await _upsert_radarr_batch(session, batch)
+                imported, updated, batch = imported + new, updated + upd, []
+        if batch:
+            new, upd = await _upsert_radarr_batch(session, batch)
+            imported, updated = imported + new, updated + upd
 
         await session.commit()
 
@@ -107,3 +157,45 @@ async def import_radarr_movies(session: AsyncSession) -> RadarrImportResponse:
 
     logger.info("Radarr import completed: %d imported, %d updated", imported, updated)
     return RadarrImportResponse(imported_count=imported, updated_count=updated)
+
+
+async def import_radarr_movie(session: AsyncSession, radarr_id: int) -> RadarrImportResponse:
+    """Import a single movie from Radarr (e.g. on a Connect webhook) instead of the library."""
+    config = await get_decrypted_config(session, ServiceType.RADARR)
+    if config is None:
+        logger.info("Radarr is not configured, skipping import of radarr_id=%s", radarr_id)
+        return RadarrImportResponse(imported_count=0, updated_count=0)
+    url, api_key = config
+
+    try:
+        movie_data = await fetch_radarr_movie(url, api_key, radarr_id)
+        if movie_data is None:
+            logger.info("Radarr movie radarr_id=%s no longer exists, skipping", radarr_id)
+            return RadarrImportResponse(imported_count=0, updated_count=0)
+        indexes = await _load_radarr_indexes(session, [movie_data])
+        outcome = await _upsert_radarr_movie(session, movie_data, indexes)
+        await session.commit()
+    except Exception as e:
+        logger.error("Radarr import of radarr_id=%s failed: %s", radarr_id, e)
+        await session.rollback()
+        raise
+
+    return RadarrImportResponse(
+        imported_count=int(outcome == "imported"), updated_count=int(outcome == "updated")
+    )
+
+
+async def detach_radarr_movie(session: AsyncSession, radarr_id: int) -> bool:
+    """
+    Unlink a movie deleted in Radarr.
+
+    The movie itself stays: it may still be in Jellyfin and carries watch history.
+    Returns True when a movie was linked to ``radarr_id``.
+    """
+    movie = await find_movie_by_radarr_id(session, radarr_id)
+    if movie is None:
+        return False
+    movie.radarr_id = None
+    await session.commit()
+    logger.info("Movie id=%s detached from deleted radarr_id=%s", movie.id, radarr_id)
+    return True
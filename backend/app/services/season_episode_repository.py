@@ -0,0 +1,200 @@
+"""Repository for set-based season and episode writes (bulk upserts for a batch of series)."""
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, cast
+
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    Table,
+    and_,
+    func,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql.dml import ReturningInsert
+
+from app.models.base import Base
+from app.models.media import Episode, Season
+
+# Rows per INSERT ... ON CONFLICT statement (kept well below the bind parameter limit)
+UPSERT_BATCH_SIZE = 1000
+
+# Conflict key of a season: one season per number in a series (uq_seasons_series_number)
+SEASON_KEY = ("series_id", "number")
+
+# A row is new when the INSERT did not hit a conflict (an updated row has a non-zero xmax)
+_INSERTED = literal_column("xmax = 0", Boolean).label("inserted")
+
+
+@dataclass
+class UpsertResult:
+    """Rows written by bulk_upsert: ids by conflict key and new/updated counts."""
+
+    ids: dict[tuple[Any, ...], int] = field(default_factory=dict)
+    inserted: int = 0
+    updated: int = 0
+
+
+def build_upsert_statement(
+    model: type[Base],
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    index_elements: Sequence[str],
+    overwrite: Sequence[str] = (),
+    overwrite_non_null: Sequence[str] = (),
+    fill: Sequence[str] = (),
+) -> ReturningInsert[Any]:
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE ... WHERE <something differs>.
+
+    ``overwrite`` columns take the incoming value, ``overwrite_non_null`` columns take it
+    unless it is NULL and ``fill`` columns take it only while the stored value is NULL.
+    A conflicting row is only rewritten (and returned) when one of these columns would change,
+    so unchanged rows cost neither a new tuple version nor a RETURNING row.
+    Returns (id, inserted, *index_elements) for every inserted or changed row.
+    """
+    table = cast(Table, model.__table__)
+    stmt = insert(table).values(list(rows))
+    excluded = stmt.excluded
+    set_: dict[str, ColumnElement[Any]] = {}
+    changed: list[ColumnElement[bool]] = []
+    for name in overwrite:
+        set_[name] = excluded[name]
+        changed.append(table.c[name].is_distinct_from(excluded[name]))
+    for name in overwrite_non_null:
+        set_[name] = func.coalesce(excluded[name], table.c[name])
+        changed.append(
+            and_(excluded[name].is_not(None), table.c[name].is_distinct_from(excluded[name]))
+        )
+    for name in fill:
+        set_[name] = func.coalesce(table.c[name], excluded[name])
+        changed.append(and_(table.c[name].is_(None), excluded[name].is_not(None)))
+
+    if set_:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements), set_=set_, where=or_(*changed)
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    return stmt.returning(table.c.id, _INSERTED, *(table.c[name] for name in index_elements))
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model: type[Base],
+    rows: Iterable[Mapping[str, Any]],
+    *,
+    index_elements: Sequence[str],
+    overwrite: Sequence[str] = (),
+    overwrite_non_null: Sequence[str] = (),
+    fill: Sequence[str] = (),
+) -> UpsertResult:
+    """
+    Upsert ``rows`` (all with the same keys) in statements of UPSERT_BATCH_SIZE rows.
+
+    Rows sharing a conflict key are collapsed to the last one, since a single statement
+    may not touch the same row twice. See build_upsert_statement for the column modes.
+    """
+    unique: dict[tuple[Any, ...], Mapping[str, Any]] = {}
+    for row in rows:
+        unique[tuple(row[name] for name in index_elements)] = row
+    deduped = list(unique.values())
+
+    result = UpsertResult()
+    for start in range(0, len(deduped), UPSERT_BATCH_SIZE):
+        stmt = build_upsert_statement(
+            model,
+            deduped[start : start + UPSERT_BATCH_SIZE],
+            index_elements=index_elements,
+            overwrite=overwrite,
+            overwrite_non_null=overwrite_non_null,
+            fill=fill,
+        )
+        for row_id, inserted, *key in await session.execute(stmt):
+            result.ids[tuple(key)] = row_id
+            if inserted:
+                result.inserted += 1
+            else:
+                result.updated += 1
+            # Rows were rewritten behind the ORM: drop the stale state of already loaded objects
+            loaded = session.identity_map.get(identity_key(model, row_id))
+            if loaded is not None:
+                session.expire(loaded)
+    return result
+
+
+async def load_season_ids(
+    session: AsyncSession, series_ids: Iterable[int]
+) -> dict[tuple[int, int], int]:
+    """Ids of the existing seasons of the given series, keyed by (series_id, number)."""
+    ids = list(set(series_ids))
+    if not ids:
+        return {}
+    result = await session.execute(
+        select(Season.series_id, Season.number, Season.id).where(Season.series_id.in_(ids))
+    )
+    return {(series_id, number): season_id for series_id, number, season_id in result}
+
+
+async def upsert_seasons(
+    session: AsyncSession, rows: Sequence[Mapping[str, Any]], *, fill: Sequence[str] = ()
+) -> UpsertResult:
+    """
+    Create the missing seasons of ``rows`` and fill their empty ``fill`` columns.
+
+    ``ids`` holds all seasons of the rows' series by (series_id, number), including
+    existing seasons the upsert left untouched; the counts are those of written rows.
+    """
+    if not rows:
+        return UpsertResult()
+    season_ids = await load_season_ids(session, (row["series_id"] for row in rows))
+    result = await bulk_upsert(session, Season, rows, index_elements=SEASON_KEY, fill=fill)
+    season_ids.update(result.ids)
+    result.ids = season_ids
+    return result
+
+
+async def load_episode_keys(
+    session: AsyncSession, season_ids: Iterable[int]
+) -> list[tuple[int, int, int, str | None]]:
+    """(id, season_id, number, jellyfin_id) of the existing episodes of the given seasons."""
+    ids = list(set(season_ids))
+    if not ids:
+        return []
+    result = await session.execute(
+        select(Episode.id, Episode.season_id, Episode.number, Episode.jellyfin_id).where(
+            Episode.season_id.in_(ids)
+        )
+    )
+    return [
+        (ep_id, season_id, number, jellyfin_id) for ep_id, season_id, number, jellyfin_id in result
+    ]
+
+
+async def load_episode_series_ids(
+    session: AsyncSession, column: InstrumentedAttribute[Any], keys: Iterable[Any]
+) -> set[int]:
+    """
+    Series the episodes with the given ``column`` values (e.g. sonarr_id) are stored under.
+
+    Read before an upsert that may move episodes to another season: the series they leave
+    need their series_progress totals refreshed too.
+    """
+    values = list(set(keys))
+    series_ids: set[int] = set()
+    for start in range(0, len(values), UPSERT_BATCH_SIZE):
+        result = await session.scalars(
+            select(Season.series_id)
+            .distinct()
+            .join(Episode, Episode.season_id == Season.id)
+            .where(column.in_(values[start : start + UPSERT_BATCH_SIZE]))
+        )
+        series_ids.update(result)
+    return series_ids
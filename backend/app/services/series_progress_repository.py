@@ -0,0 +1,124 @@
+"""
+Per-user episode counts of series (``series_progress``).
+
+The table is a read model over ``seasons``, ``episodes`` and ``watch_history``.
+Everything that writes episode watch history or adds episodes calls
+``refresh_series_progress`` with the series (and users) it touched; the affected
+rows are recomputed from the source tables with one INSERT ... SELECT ... ON CONFLICT.
+There is a row for every (user, series) pair, so a user's media list also gets the
+episode totals of series they have not started.
+"""
+
+from collections.abc import Collection
+from typing import Any, cast
+
+from sqlalchemy import ColumnElement, and_, delete, func, or_, select, true
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.media import Episode, Season, Series
+from app.models.user import SeriesProgress, User, WatchHistory, WatchStatus
+
+COUNT_COLUMNS = ("total", "watched", "watching", "dropped", "last_watched_at")
+
+
+def _count(status: WatchStatus) -> ColumnElement[int]:
+    return func.count().filter(WatchHistory.status == status)
+
+
+def build_refresh_statement(
+    series_ids: Collection[int] | None = None, user_ids: Collection[int] | None = None
+) -> Insert:
+    """INSERT ... SELECT recomputing the progress rows of the given series and users.
+
+    ``None`` means all of them; rows whose counts did not change are not rewritten.
+    """
+    totals_query = (
+        select(Season.series_id, func.count(Episode.id).label("total"))
+        .join(Episode, Episode.season_id == Season.id)
+        .group_by(Season.series_id)
+    )
+    watches_query = (
+        select(
+            WatchHistory.user_id,
+            Season.series_id,
+            _count(WatchStatus.WATCHED).label("watched"),
+            _count(WatchStatus.WATCHING).label("watching"),
+            _count(WatchStatus.DROPPED).label("dropped"),
+            func.max(WatchHistory.watched_at).label("last_watched_at"),
+        )
+        .join(Episode, Episode.id == WatchHistory.episode_id)
+        .join(Season, Season.id == Episode.season_id)
+        .group_by(WatchHistory.user_id, Season.series_id)
+    )
+    pairs_query = select(User.id.label("user_id"), Series.id.label("series_id")).join(
+        Series, true()
+    )
+    if series_ids is not None:
+        totals_query = totals_query.where(Season.series_id.in_(series_ids))
+        watches_query = watches_query.where(Season.series_id.in_(series_ids))
+        pairs_query = pairs_query.where(Series.id.in_(series_ids))
+    if user_ids is not None:
+        watches_query = watches_query.where(WatchHistory.user_id.in_(user_ids))
+        pairs_query = pairs_query.where(User.id.in_(user_ids))
+
+    totals = totals_query.subquery("totals")
+    watches = watches_query.subquery("watches")
+    pairs = pairs_query.subquery("pairs")
+    rows = (
+        select(
+            pairs.c.user_id,
+            pairs.c.series_id,
+            func.coalesce(totals.c.total, 0),
+            func.coalesce(watches.c.watched, 0),
+            func.coalesce(watches.c.watching, 0),
+            func.coalesce(watches.c.dropped, 0),
+            watches.c.last_watched_at,
+        )
+        .outerjoin(totals, totals.c.series_id == pairs.c.series_id)
+        .outerjoin(
+            watches,
+            and_(
+                watches.c.series_id == pairs.c.series_id,
+                watches.c.user_id == pairs.c.user_id,
+            ),
+        )
+    )
+
+    stmt = insert(SeriesProgress).from_select(["user_id", "series_id", *COUNT_COLUMNS], rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[SeriesProgress.user_id, SeriesProgress.series_id],
+        set_={name: stmt.excluded[name] for name in COUNT_COLUMNS},
+        where=or_(
+            *(
+                getattr(SeriesProgress, name).is_distinct_from(stmt.excluded[name])
+                for name in COUNT_COLUMNS
+            )
+        ),
+    )
+
+
+async def refresh_series_progress(
+    session: AsyncSession,
+    series_ids: Collection[int] | None = None,
+    user_ids: Collection[int] | None = None,
+) -> int:
+    """
+    Recompute progress of the given series for the given users (``None`` — all).
+
+    Pending ORM changes are autoflushed first, so callers may refresh right after
+    changing ``WatchHistory`` objects. Returns the number of rows written.
+    """
+    if (series_ids is not None and not series_ids) or (user_ids is not None and not user_ids):
+        return 0
+    result = cast(
+        CursorResult[Any], await session.execute(build_refresh_statement(series_ids, user_ids))
+    )
+    return result.rowcount
+
+
+async def rebuild_series_progress(session: AsyncSession) -> int:
+    """Regenerate the whole table from the source tables; returns the number of rows."""
+    await session.execute(delete(SeriesProgress))
+    return await refresh_series_progress(session)
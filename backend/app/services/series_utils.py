@@ -1,8 +1,10 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import datetime
 
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, selectinload
 
 from app.config import logger
 from app.models.media import Media, MediaType, Series, SeriesStatus
@@ -168,6 +170,16 @@ async def create_new_series(
     return series
 
 
+def forget_tmdb_metadata(series_list: Iterable[Series]) -> None:
+    """
+    Make the next TMDB pass apply its payload to these series again.
+
+    Called when an import wrote their seasons or episodes, which the TMDB pass also fills.
+    """
+    for series in series_list:
+        series.tmdb_metadata_digest = None
+
+
 def update_existing_series(
     series: Series,
     title: str | None,
@@ -270,6 +282,8 @@ def update_existing_series(
         was_updated = True
 
     if was_updated:
+        # The TMDB pass puts its values back over the ones written here
+        series.tmdb_metadata_digest = None
         source_info = f" from {source}" if source else ""
 
         updated_ids = []
@@ -299,3 +313,92 @@ def resolve_series_from_indexes(
     if imdb_id and imdb_id in by_imdb_id:
         return by_imdb_id[imdb_id]
     return None
+
+
+@dataclass
+class SeriesIndexes:
+    """Series keyed by source and external ids, for resolving a batch without per-item queries."""
+
+    by_sonarr_id: dict[int, Series] = field(default_factory=dict)
+    by_jellyfin_id: dict[str, Series] = field(default_factory=dict)
+    by_tvdb_id: dict[str, Series] = field(default_factory=dict)
+    by_imdb_id: dict[str, Series] = field(default_factory=dict)
+    by_tmdb_id: dict[str, Series] = field(default_factory=dict)
+
+    def add(self, series: Series) -> None:
+        """Index a loaded, created or updated series; the first series seen for an id wins."""
+        if series.sonarr_id is not None:
+            self.by_sonarr_id.setdefault(series.sonarr_id, series)
+        if series.jellyfin_id:
+            self.by_jellyfin_id.setdefault(series.jellyfin_id, series)
+        if series.tvdb_id:
+            self.by_tvdb_id.setdefault(series.tvdb_id, series)
+        if series.imdb_id:
+            self.by_imdb_id.setdefault(series.imdb_id, series)
+        if series.tmdb_id:
+            self.by_tmdb_id.setdefault(series.tmdb_id, series)
+
+    def resolve(
+        self,
+        *,
+        sonarr_id: int | None = None,
+        jellyfin_id: str | None = None,
+        tvdb_id: str | None = None,
+        imdb_id: str | None = None,
+        tmdb_id: str | None = None,
+    ) -> Series | None:
+        """Look a series up by its source id first, then by TVDB, IMDb and TMDB ids."""
+        if sonarr_id is not None and sonarr_id in self.by_sonarr_id:
+            return self.by_sonarr_id[sonarr_id]
+        series = resolve_series_from_indexes(
+            jellyfin_id=jellyfin_id,
+            tvdb_id=tvdb_id,
+            imdb_id=imdb_id,
+            by_jellyfin_id=self.by_jellyfin_id,
+            by_tvdb_id=self.by_tvdb_id,
+            by_imdb_id=self.by_imdb_id,
+        )
+        if series is None and tmdb_id:
+            series = self.by_tmdb_id.get(tmdb_id)
+        return series
+
+
+async def load_series_indexes(
+    session: AsyncSession,
+    *,
+    sonarr_ids: Iterable[int] = (),
+    jellyfin_ids: Iterable[str] = (),
+    tvdb_ids: Iterable[str] = (),
+    imdb_ids: Iterable[str] = (),
+    tmdb_ids: Iterable[str] = (),
+    into: SeriesIndexes | None = None,
+) -> SeriesIndexes:
+    """
+    Load every series matching any of the given ids in one query, with Media joined in.
+
+    With ``into`` the series are added to existing indexes.
+    """
+    conditions = []
+    if sonarr_set := set(sonarr_ids):
+        conditions.append(Series.sonarr_id.in_(sonarr_set))
+    if jellyfin_set := set(jellyfin_ids):
+        conditions.append(Series.jellyfin_id.in_(jellyfin_set))
+    if tvdb_set := set(tvdb_ids):
+        conditions.append(Series.tvdb_id.in_(tvdb_set))
+    if imdb_set := set(imdb_ids):
+        conditions.append(Series.imdb_id.in_(imdb_set))
+    if tmdb_set := set(tmdb_ids):
+        conditions.append(Series.tmdb_id.in_(tmdb_set))
+
+    indexes = into if into is not None else SeriesIndexes()
+    if not conditions:
+        return indexes
+    result = await session.execute(
+        select(Series)
+        .join(Series.media)
+        .options(contains_eager(Series.media))
+        .where(or_(*conditions))
+    )
+    for series in result.scalars():
+        indexes.add(series)
+    return indexes
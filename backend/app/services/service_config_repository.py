@@ -4,6 +4,7 @@ from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.schedule import ServiceConfig, ServiceType
+from app.services.sync_watermark_repository import reset_watermarks
 from app.utils.encryption import decrypt_api_key, encrypt_api_key
 
 
@@ -39,9 +40,15 @@ async def upsert_config(
     url: str,
     api_key: str,
 ) -> ServiceConfig:
-    """Create or update a service config. API key is encrypted before storing."""
+    """Create or update a service config. API key is encrypted before storing.
+
+    Pointing Jellyfin at another server drops the sync watermarks, so the next
+    imports read the new library in full.
+    """
     config = await get_config_by_service(session, service_type)
     encrypted = encrypt_api_key(api_key)
+    if service_type == ServiceType.JELLYFIN and (config is None or config.url != url.rstrip("/")):
+        await reset_watermarks(session)
 
     if config is None:
         config = ServiceConfig(
@@ -2,6 +2,7 @@
 
 import httpx
 
+from app.client.http_pool import build_probe_client
 from app.models.schedule import ServiceType
 
 
@@ -28,10 +29,11 @@ async def test_service_connection(
     service_name = service_type.value.capitalize()
 
     try:
-        async with httpx.AsyncClient() as client:
+        # Unsaved credentials: a throwaway client, the pooled one keeps serving jobs
+        async with build_probe_client(service_type.value) as client:
             response = await client.get(test_url, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            return True, f"{service_name} connection successful"
+        response.raise_for_status()
+        return True, f"{service_name} connection successful"
     except httpx.RequestError as e:
         return False, f"Cannot connect to {service_name}: {e}"
     except httpx.HTTPStatusError as e:
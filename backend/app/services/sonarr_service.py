@@ -1,19 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.client.sonarr_client import fetch_sonarr_episodes, fetch_sonarr_series
+from app.client.sonarr_client import (
+    fetch_sonarr_episodes,
+    fetch_sonarr_series_item,
+    iter_sonarr_series,
+)
 from app.config import logger
-from app.models.media import Episode, Season, Series
+from app.models.media import Episode, Series
 from app.models.schedule import ServiceType
 from app.schemas.sonarr import SonarrImportResponse
+from app.services.season_episode_repository import (
+    bulk_upsert,
+    load_episode_series_ids,
+    upsert_seasons,
+)
+from app.services.series_progress_repository import refresh_series_progress
 from app.services.series_utils import (
+    SeriesIndexes,
     create_new_series,
-    find_series_by_external_ids,
+    forget_tmdb_metadata,
+    load_series_indexes,
     map_sonarr_series_status,
     update_existing_series,
 )
@@ -21,6 +36,18 @@ from app.services.service_config_repository import get_decrypted_config
 from app.utils.datetime_utils import parse_iso_datetime
 from app.utils.poster_utils import extract_poster
 
+# Episode lists fetched concurrently ahead of the DB writer (kept below the Sonarr pool size)
+EPISODE_FETCH_CONCURRENCY = 8
+# How many series may be queued ahead of the DB writer, bounding prefetched episode lists in memory
+EPISODE_PREFETCH_DEPTH = 32
+# Series (with their episode lists) resolved against the DB per lookup query. No larger than
+# the prefetch depth: while a batch is written, the next one is downloading, and a larger
+# batch would leave the writer waiting on requests started only after its previous write
+RESOLVE_BATCH_SIZE = EPISODE_PREFETCH_DEPTH
+
+# A series from the stream and the task fetching its episodes (None when it has no Sonarr id)
+_PrefetchedSeries = tuple[dict[str, Any], "asyncio.Task[list[dict[str, Any]]] | None"]
+
 
 async def _find_series_by_sonarr_id(session: AsyncSession, sonarr_id: int) -> Series | None:
     """Find series by Sonarr ID."""
@@ -29,141 +56,292 @@ async def _find_series_by_sonarr_id(session: AsyncSession, sonarr_id: int) -> Se
     return result.scalar_one_or_none()
 
 
+def _sonarr_ids(raw: dict[str, Any]) -> tuple[int | None, str | None, str | None, str | None]:
+    """(sonarr_id, tvdb_id, imdb_id, tmdb_id) of a Sonarr series, external ids as strings."""
+    return (
+        raw.get("id"),
+        str(raw.get("tvdbId")) if raw.get("tvdbId") else None,
+        str(raw.get("imdbId")) if raw.get("imdbId") else None,
+        str(raw.get("tmdbId")) if raw.get("tmdbId") else None,
+    )
+
+
+async def _load_sonarr_indexes(
+    session: AsyncSession, series_raw: list[dict[str, Any]]
+) -> SeriesIndexes:
+    """Known series matching any id of the given Sonarr series, in one query."""
+    ids = [_sonarr_ids(raw) for raw in series_raw]
+    return await load_series_indexes(
+        session,
+        sonarr_ids=[sonarr_id for sonarr_id, _, _, _ in ids if sonarr_id],
+        tvdb_ids=[tvdb for _, tvdb, _, _ in ids if tvdb],
+        imdb_ids=[imdb for _, _, imdb, _ in ids if imdb],
+        tmdb_ids=[tmdb for _, _, _, tmdb in ids if tmdb],
+    )
+
+
+async def _iter_series_with_episodes(
+    url: str, api_key: str
+) -> AsyncGenerator[tuple[dict[str, Any], list[dict[str, Any]]], None]:
+    """
+    Yield (series, episodes) pairs in Sonarr order, prefetching episodes ahead of the consumer.
+
+    A producer task reads the series stream and starts the episode request for every series
+    (at most EPISODE_FETCH_CONCURRENCY in flight); the consumer writes a batch of series to
+    the DB while episodes for the next EPISODE_PREFETCH_DEPTH series are downloading.
+    """
+    queue: asyncio.Queue[_PrefetchedSeries | None] = asyncio.Queue(maxsize=EPISODE_PREFETCH_DEPTH)
+    semaphore = asyncio.Semaphore(EPISODE_FETCH_CONCURRENCY)
+    in_flight: set[asyncio.Task[list[dict[str, Any]]]] = set()
+
+    async def fetch(sonarr_id: int) -> list[dict[str, Any]]:
+        async with semaphore:
+            return await fetch_sonarr_episodes(url, api_key, sonarr_id)
+
+    async def produce() -> None:
+        try:
+            async for raw in iter_sonarr_series(url, api_key):
+                sonarr_id = raw.get("id")
+                task = None
+                if sonarr_id and raw.get("title"):
+                    task = asyncio.create_task(fetch(sonarr_id))
+                    in_flight.add(task)
+                await queue.put((raw, task))
+        except Exception:
+            # End of stream marker; the consumer re-raises the error by awaiting the producer
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (entry := await queue.get()) is not None:
+            raw, task = entry
+            episodes: list[dict[str, Any]] = []
+            if task is not None:
+                episodes = await task
+                in_flight.discard(task)
+            yield raw, episodes
+        await producer
+    finally:
+        producer.cancel()
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(producer, *in_flight, return_exceptions=True)
+
+
 async def _process_seasons_and_episodes(
     session: AsyncSession,
-    series: Series,
-    raw_series_data: dict[str, Any],
-    sonarr_id: int | None,
-    sonarr_url: str,
-    sonarr_api_key: str,
+    items: list[tuple[Series, dict[str, Any], list[dict[str, Any]]]],
 ) -> tuple[int, int]:
-    """Process seasons and episodes for a series."""
-    if not sonarr_id:
-        return 0, 0
-
-    # Extract season numbers from Sonarr data
-    sonarr_season_numbers = {
-        s["seasonNumber"]
-        for s in raw_series_data.get("seasons", [])
-        if isinstance(s.get("seasonNumber"), int)
-    }
-
-    # Load existing seasons
-    existing_seasons_result = await session.scalars(
-        select(Season).where(Season.series_id == series.id)
-    )
-    existing_seasons: dict[int, Season] = {
-        season_obj.number: season_obj for season_obj in existing_seasons_result
-    }
-
-    # Create missing seasons
-    for num in sonarr_season_numbers:
-        if num not in existing_seasons:
-            new_season = Season(series_id=series.id, number=num)
-            session.add(new_season)
-            await session.flush()
-            existing_seasons[num] = new_season
-
-    # Fetch episodes from Sonarr
-    episodes_raw = await fetch_sonarr_episodes(sonarr_url, sonarr_api_key, sonarr_id)
-
-    # Determine earliest air date per season
-    season_first_air: dict[int, str] = {}
-    for ep in episodes_raw:
-        sn = ep.get("seasonNumber")
-        air = ep.get("airDateUtc")
-        if (
-            isinstance(sn, int)
-            and air
-            and (sn not in season_first_air or air < season_first_air[sn])
-        ):
-            season_first_air[sn] = air
-
-    # Update season release dates if missing
-    for sn, first_air_str in season_first_air.items():
-        season = existing_seasons.get(sn)
-        if season and season.release_date is None:
-            dt = parse_iso_datetime(first_air_str, context=f"Season {sn}")
-            if dt:
-                season.release_date = dt
-
-    # Load existing episodes by sonarr_id (global search to handle episodes that moved seasons)
-    ep_sonarr_ids = [ep.get("id") for ep in episodes_raw if isinstance(ep.get("id"), int)]
-    existing_eps: dict[int, Episode] = {}
-    if ep_sonarr_ids:
-        existing_eps_result = await session.scalars(
-            select(Episode).where(Episode.sonarr_id.in_(ep_sonarr_ids))
-        )
-        existing_eps = {ep.sonarr_id: ep for ep in existing_eps_result if ep.sonarr_id is not None}
-
-    new_ep_cnt = upd_ep_cnt = 0
-    for ep_raw in episodes_raw:
-        ep_sonarr_id = ep_raw.get("id")
-        season_num = ep_raw.get("seasonNumber")
-        ep_num = ep_raw.get("episodeNumber")
-        ep_title = ep_raw.get("title")
-        overview = ep_raw.get("overview")
-        air_str = ep_raw.get("airDateUtc")
-
-        # Skip invalid episode data
-        if (
-            not isinstance(ep_sonarr_id, int)
-            or not isinstance(season_num, int)
-            or not isinstance(ep_num, int)
-            or not ep_title
-        ):
-            continue
-
-        season = existing_seasons.get(season_num)
-        if not season:
-            continue
-
-        air_date = parse_iso_datetime(air_str, context=f"Episode {ep_num}")
-
-        # Update or create episode
-        existing = existing_eps.get(ep_sonarr_id)
-        if existing:
-            updated = False
-            if existing.season_id != season.id:
-                existing.season_id = season.id
-                updated = True
-            if existing.number != ep_num:
-                existing.number = ep_num
-                updated = True
-            if existing.title != ep_title:
-                existing.title = ep_title
-                updated = True
-            if existing.overview != overview:
-                existing.overview = overview
-                updated = True
-            if existing.air_date != air_date:
-                existing.air_date = air_date
-                updated = True
-            if updated:
-                upd_ep_cnt += 1
-        else:
-            episode = Episode(
-                season_id=season.id,
-                sonarr_id=ep_sonarr_id,
-                number=ep_num,
-                title=ep_title,
-                air_date=air_date,
-                overview=overview,
+    """
+    Write seasons and episodes of a batch of series from their already fetched Sonarr episodes.
+
+    Seasons are upserted on (series_id, number) and episodes on sonarr_id, a few set-based
+    statements per batch (episodes may move between seasons).
+    """
+    season_rows: list[dict[str, Any]] = []
+    for series, raw_series_data, episodes_raw in items:
+        # Determine earliest air date per season
+        season_first_air: dict[int, str] = {}
+        for ep in episodes_raw:
+            sn = ep.get("seasonNumber")
+            air = ep.get("airDateUtc")
+            if (
+                isinstance(sn, int)
+                and air
+                and (sn not in season_first_air or air < season_first_air[sn])
+            ):
+                season_first_air[sn] = air
+
+        # Seasons listed by Sonarr; a missing release date is filled from the first episode
+        for num in {
+            s["seasonNumber"]
+            for s in raw_series_data.get("seasons", [])
+            if isinstance(s.get("seasonNumber"), int)
+        }:
+            first_air = season_first_air.get(num)
+            season_rows.append(
+                {
+                    "series_id": series.id,
+                    "number": num,
+                    "release_date": (
+                        parse_iso_datetime(first_air, context=f"Season {num}")
+                        if first_air
+                        else None
+                    ),
+                }
+            )
+
+    seasons = await upsert_seasons(session, season_rows, fill=("release_date",))
+    season_ids = seasons.ids
+
+    episode_rows: list[dict[str, Any]] = []
+    for series, _, episodes_raw in items:
+        for ep_raw in episodes_raw:
+            ep_sonarr_id = ep_raw.get("id")
+            season_num = ep_raw.get("seasonNumber")
+            ep_num = ep_raw.get("episodeNumber")
+            ep_title = ep_raw.get("title")
+
+            # Skip invalid episode data
+            if (
+                not isinstance(ep_sonarr_id, int)
+                or not isinstance(season_num, int)
+                or not isinstance(ep_num, int)
+                or not ep_title
+            ):
+                continue
+
+            season_id = season_ids.get((series.id, season_num))
+            if season_id is None:
+                continue
+
+            episode_rows.append(
+                {
+                    "season_id": season_id,
+                    "sonarr_id": ep_sonarr_id,
+                    "number": ep_num,
+                    "title": ep_title,
+                    "air_date": parse_iso_datetime(
+                        ep_raw.get("airDateUtc"), context=f"Episode {ep_num}"
+                    ),
+                    "overview": ep_raw.get("overview"),
+                }
             )
-            session.add(episode)
-            new_ep_cnt += 1
-            existing_eps[ep_sonarr_id] = episode
 
-    if new_ep_cnt or upd_ep_cnt:
-        await session.flush()
+    # Episodes are matched globally by sonarr_id to handle episodes that moved seasons;
+    # the series they move out of lose episodes, so their progress is refreshed too
+    previous_series_ids = await load_episode_series_ids(
+        session, Episode.sonarr_id, (row["sonarr_id"] for row in episode_rows)
+    )
+    result = await bulk_upsert(
+        session,
+        Episode,
+        episode_rows,
+        index_elements=("sonarr_id",),
+        overwrite=("season_id", "number", "title", "overview", "air_date"),
+    )
+    if seasons.inserted or seasons.updated or result.inserted or result.updated:
+        forget_tmdb_metadata(series for series, _, _ in items)
+    if result.inserted or result.updated:
+        # Episode totals of the batch changed
+        await refresh_series_progress(
+            session, {series.id for series, _, _ in items} | previous_series_ids
+        )
         logger.info(
-            "Series '%s': +%d episodes, ±%d updates",
-            series.media.title,
-            new_ep_cnt,
-            upd_ep_cnt,
+            "%d series: +%d episodes, ±%d updates", len(items), result.inserted, result.updated
         )
+    return result.inserted, result.updated
+
+
+async def _upsert_sonarr_series(
+    session: AsyncSession, raw: dict[str, Any], indexes: SeriesIndexes
+) -> tuple[Series | None, int, int]:
+    """
+    Create or update one series from its Sonarr payload.
+
+    ``indexes`` must hold the known series for this payload (see _load_sonarr_indexes);
+    the created or updated series is added to them.
+    Returns (series, new_series, updated_series), series is None when the payload is skipped.
+    """
+    # Extract core series data
+    sonarr_id, tvdb_id, imdb_id, tmdb_id = _sonarr_ids(raw)
+    title = raw.get("title")
+
+    # Skip series without title
+    if not title:
+        logger.warning("Skipping series (sonarr_id=%s) - missing title", sonarr_id)
+        return None, 0, 0
+
+    release_date = parse_iso_datetime(raw.get("firstAired"), context=title)
+    poster_url = extract_poster(raw.get("images", []))
+    logger.debug("Series '%s' (sonarr_id=%s): poster_url=%s", title, sonarr_id, poster_url)
+    year = raw.get("year")
+    genres = raw.get("genres")
+    rating_value = raw.get("ratings", {}).get("value")
+    rating_votes = raw.get("ratings", {}).get("votes")
+    status = map_sonarr_series_status(raw.get("status"))
+
+    # 1-2. Search by sonarr_id, then by external IDs
+    existing_series = indexes.resolve(
+        sonarr_id=sonarr_id, tvdb_id=tvdb_id, imdb_id=imdb_id, tmdb_id=tmdb_id
+    )
 
-    return new_ep_cnt, upd_ep_cnt
+    # 3. Update existing series
+    if existing_series:
+        updated_series = int(
+            update_existing_series(
+                series=existing_series,
+                title=title,
+                sonarr_id=sonarr_id,
+                tvdb_id=tvdb_id,
+                imdb_id=imdb_id,
+                release_date=release_date,
+                poster_url=poster_url,
+                year=year,
+                genres=genres,
+                rating_value=rating_value,
+                rating_votes=rating_votes,
+                status=status,
+                source="Sonarr",
+            )
+        )
+        indexes.add(existing_series)
+        return existing_series, 0, updated_series
+
+    # 4. Skip if no identifiers
+    if not (sonarr_id or tvdb_id or imdb_id):
+        logger.warning(
+            "Skipping series '%s' (sonarr_id=%s, tvdb_id=%s, imdb_id=%s) - no identifiers",
+            title,
+            sonarr_id,
+            tvdb_id,
+            imdb_id,
+        )
+        return None, 0, 0
+
+    # 5. Create new series
+    new_series = await create_new_series(
+        session=session,
+        title=title,
+        sonarr_id=sonarr_id,
+        jellyfin_id=None,
+        tvdb_id=tvdb_id,
+        tmdb_id=None,
+        imdb_id=imdb_id,
+        release_date=release_date,
+        poster_url=poster_url,
+        year=year,
+        genres=genres,
+        rating_value=rating_value,
+        rating_votes=rating_votes,
+        status=status,
+        source="Sonarr",
+    )
+    indexes.add(new_series)
+    return new_series, 1, 0
+
+
+async def _upsert_sonarr_batch(
+    session: AsyncSession, batch: list[tuple[dict[str, Any], list[dict[str, Any]]]]
+) -> tuple[int, int, int, int]:
+    """
+    Upsert a batch of (series, episodes): one lookup query for the series, then their seasons
+    and episodes together. Returns (new_series, updated_series, new_episodes, updated_episodes).
+    """
+    indexes = await _load_sonarr_indexes(session, [raw for raw, _ in batch])
+    new_series = updated_series = 0
+    items: list[tuple[Series, dict[str, Any], list[dict[str, Any]]]] = []
+    for raw, episodes_raw in batch:
+        series, created, updated = await _upsert_sonarr_series(session, raw, indexes)
+        new_series += created
+        updated_series += updated
+        if series is not None and raw.get("id"):
+            items.append((series, raw, episodes_raw))
+
+    new_eps, updated_eps = await _process_seasons_and_episodes(session, items)
+    return new_series, updated_series, new_eps, updated_eps
 
 
 async def import_sonarr_series(session: AsyncSession) -> SonarrImportResponse:
@@ -180,107 +358,36 @@ async def import_sonarr_series(session: AsyncSession) -> SonarrImportResponse:
     url, api_key = config
 
     logger.info("Starting Sonarr series import...")
-    sonarr_series = await fetch_sonarr_series(url, api_key)
 
     total_new_series = total_updated_series = 0
     total_new_episodes = total_updated_episodes = 0
 
     try:
-        for raw in sonarr_series:
-            # Extract core series data
-            sonarr_id = raw.get("id")
-            tmdb_id = str(raw.get("tmdbId")) if raw.get("tmdbId") else None
-            imdb_id = str(raw.get("imdbId")) if raw.get("imdbId") else None
-            tvdb_id = str(raw.get("tvdbId")) if raw.get("tvdbId") else None
-            title = raw.get("title")
-
-            # Skip series without title
-            if not title:
-                logger.warning("Skipping series (sonarr_id=%s) - missing title", sonarr_id)
-                continue
-
-            release_date = parse_iso_datetime(raw.get("firstAired"), context=title)
-            poster_url = extract_poster(raw.get("images", []))
-            logger.debug("Series '%s' (sonarr_id=%s): poster_url=%s", title, sonarr_id, poster_url)
-            year = raw.get("year")
-            genres = raw.get("genres")
-            rating_value = raw.get("ratings", {}).get("value")
-            rating_votes = raw.get("ratings", {}).get("votes")
-            status = map_sonarr_series_status(raw.get("status"))
-
-            existing_series = None
-
-            # 1. Search by sonarr_id
-            if sonarr_id:
-                existing_series = await _find_series_by_sonarr_id(session, sonarr_id)
-
-            # 2. Search by external IDs
-            if not existing_series:
-                existing_series = await find_series_by_external_ids(
-                    session, tmdb_id, imdb_id, tvdb_id
-                )
-
-            # 3. Update existing series
-            if existing_series:
-                if update_existing_series(
-                    series=existing_series,
-                    title=title,
-                    sonarr_id=sonarr_id,
-                    tvdb_id=tvdb_id,
-                    imdb_id=imdb_id,
-                    release_date=release_date,
-                    poster_url=poster_url,
-                    year=year,
-                    genres=genres,
-                    rating_value=rating_value,
-                    rating_votes=rating_votes,
-                    status=status,
-                    source="Sonarr",
-                ):
-                    total_updated_series += 1
-
-                new_eps, updated_eps = await _process_seasons_and_episodes(
-                    session, existing_series, raw, sonarr_id, url, api_key
+        # Series are decoded from the response one at a time and episodes for the upcoming
+        # series are fetched concurrently while the session writes the current batch;
+        # each batch of RESOLVE_BATCH_SIZE series is resolved with a single lookup query,
+        # and the next batch is prefetched in full by the time it is written
+        batch: list[tuple[dict[str, Any], list[dict[str, Any]]]] = []
+        async with aclosing(_iter_series_with_episodes(url, api_key)) as stream:
+            async for raw, episodes_raw in stream:
+                batch.append((raw, episodes_raw))
+                if len(batch) < RESOLVE_BATCH_SIZE:
+                    continue
+                new_series, updated_series, new_eps, updated_eps = await _upsert_sonarr_batch(
+                    session, batch
                 )
+                batch = []
+                total_new_series += new_series
+                total_updated_series += updated_series
                 total_new_episodes += new_eps
                 total_updated_episodes += updated_eps
-                continue
 
-            # 4. Skip if no identifiers
-            if not (sonarr_id or tvdb_id or imdb_id):
-                logger.warning(
-                    "Skipping series '%s' (sonarr_id=%s, tvdb_id=%s, imdb_id=%s) - no identifiers",
-                    title,
-                    sonarr_id,
-                    tvdb_id,
-                    imdb_id,
-                )
-                continue
-
-            # 5. Create new series
-            new_series = await create_new_series(
-                session=session,
-                title=title,
-                sonarr_id=sonarr_id,
-                jellyfin_id=None,
-                tvdb_id=tvdb_id,
-                tmdb_id=None,
-                imdb_id=imdb_id,
-                release_date=release_date,
-                poster_url=poster_url,
-                year=year,
-                genres=genres,
-                rating_value=rating_value,
-                rating_votes=rating_votes,
-                status=status,
-                source="Sonarr",
-            )
-            total_new_series += 1
-
-            # Process episodes for new series
-            new_eps, updated_eps = await _process_seasons_and_episodes(
-                session, new_series, raw, sonarr_id, url, api_key
+        if batch:
+            new_series, updated_series, new_eps, updated_eps = await _upsert_sonarr_batch(
+                session, batch
             )
+            total_new_series += new_series
+            total_updated_series += updated_series
             total_new_episodes += new_eps
             total_updated_episodes += updated_eps
 
@@ -304,3 +411,51 @@ async def import_sonarr_series(session: AsyncSession) -> SonarrImportResponse:
         logger.error("Sonarr import failed: %s", e)
         await session.rollback()
         raise
+
+
+async def import_sonarr_series_item(session: AsyncSession, sonarr_id: int) -> SonarrImportResponse:
+    """Import a single series with its episodes (e.g. on a Connect webhook)."""
+    empty = SonarrImportResponse(new_series=0, updated_series=0, new_episodes=0, updated_episodes=0)
+    config = await get_decrypted_config(session, ServiceType.SONARR)
+    if config is None:
+        logger.info("Sonarr is not configured, skipping import of sonarr_id=%s", sonarr_id)
+        return empty
+    url, api_key = config
+
+    try:
+        raw = await fetch_sonarr_series_item(url, api_key, sonarr_id)
+        if raw is None:
+            logger.info("Sonarr series sonarr_id=%s no longer exists, skipping", sonarr_id)
+            return empty
+        episodes_raw = await fetch_sonarr_episodes(url, api_key, sonarr_id)
+        new_series, updated_series, new_eps, updated_eps = await _upsert_sonarr_batch(
+            session, [(raw, episodes_raw)]
+        )
+        await session.commit()
+    except Exception as e:
+        logger.error("Sonarr import of sonarr_id=%s failed: %s", sonarr_id, e)
+        await session.rollback()
+        raise
+
+    return SonarrImportResponse(
+        new_series=new_series,
+        updated_series=updated_series,
+        new_episodes=new_eps,
+        updated_episodes=updated_eps,
+    )
+
+
+async def detach_sonarr_series(session: AsyncSession, sonarr_id: int) -> bool:
+    """
+    Unlink a series deleted in Sonarr.
+
+    The series and its episodes stay: they may still be in Jellyfin and carry watch history.
+    Returns True when a series was linked to ``sonarr_id``.
+    """
+    series = await _find_series_by_sonarr_id(session, sonarr_id)
+    if series is None:
+        return False
+    series.sonarr_id = None
+    await session.commit()
+    logger.info("Series id=%s detached from deleted sonarr_id=%s", series.id, sonarr_id)
+    return True
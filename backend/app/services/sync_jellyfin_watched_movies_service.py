@@ -1,20 +1,242 @@
-from sqlalchemy import select
+from collections.abc import AsyncIterator
+from typing import Any, cast
+
+from sqlalchemy import Integer, any_, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.client.jellyfin_client import fetch_jellyfin_movies_for_user_all
+from app.client.jellyfin_client import iter_jellyfin_movies_for_user
 from app.config import logger
 from app.models.media import Movie
-from app.models.schedule import ServiceType
+from app.models.schedule import ServiceType, SyncJobType
 from app.models.user import User, WatchHistory, WatchStatus
 from app.schemas.jellyfin import JellyfinWatchedMoviesResponse
 from app.services.movie_utils import resolve_movie_from_indexes
 from app.services.service_config_repository import get_decrypted_config
+from app.services.sync_watermark_repository import SyncWindow, begin_sync, complete_sync
 from app.utils.datetime import parse_datetime
 
 
+async def _sync_movies_page(
+    session: AsyncSession,
+    user: User,
+    movies_data: list[dict[str, Any]],
+    jellyfin_media_ids: set[int],
+    unresolved: set[str],
+) -> tuple[int, int]:
+    """
+    Resolve one page of Jellyfin movies and upsert the user's watch history for it.
+
+    Adds the ids of resolved movies to ``jellyfin_media_ids`` and the Jellyfin ids of
+    movies not found in the DB to ``unresolved``.
+    Returns (added, updated).
+    """
+    added = updated = 0
+
+    # 1. Save all jellyfin_id and external_id for package finding movies
+    jellyfin_ids = []
+    tmdb_ids = []
+    imdb_ids = []
+
+    for movie_data in movies_data:
+        jellyfin_id = str(movie_data.get("Id")) if movie_data.get("Id") else None
+        if jellyfin_id:
+            jellyfin_ids.append(jellyfin_id)
+
+        provider_ids = movie_data.get("ProviderIds", {}) or {}
+        tmdb_id = str(provider_ids.get("Tmdb")) if provider_ids.get("Tmdb") else None
+        if tmdb_id:
+            tmdb_ids.append(tmdb_id)
+
+        imdb_id = provider_ids.get("Imdb")
+        if imdb_id:
+            imdb_ids.append(imdb_id)
+
+    # 2. Package finding movies
+    movies_by_jellyfin_id: dict[str, Movie] = {}
+    movies_by_tmdb_id: dict[str, Movie] = {}
+    movies_by_imdb_id: dict[str, Movie] = {}
+
+    if jellyfin_ids:
+        movies_result = await session.execute(
+            select(Movie).where(Movie.jellyfin_id.in_(jellyfin_ids))
+        )
+        for db_movie in movies_result.scalars():
+            if db_movie.jellyfin_id:
+                movies_by_jellyfin_id[db_movie.jellyfin_id] = db_movie
+
+    if tmdb_ids:
+        movies_result = await session.execute(select(Movie).where(Movie.tmdb_id.in_(tmdb_ids)))
+        for db_movie in movies_result.scalars():
+            if db_movie.tmdb_id:
+                movies_by_tmdb_id[db_movie.tmdb_id] = db_movie
+
+    if imdb_ids:
+        movies_result = await session.execute(select(Movie).where(Movie.imdb_id.in_(imdb_ids)))
+        for db_movie in movies_result.scalars():
+            if db_movie.imdb_id:
+                movies_by_imdb_id[db_movie.imdb_id] = db_movie
+
+    # 3. Resolve page movies
+    resolved: list[tuple[dict[str, Any], Movie]] = []
+    for movie_data in movies_data:
+        jellyfin_id = str(movie_data.get("Id")) if movie_data.get("Id") else None
+        provider_ids = movie_data.get("ProviderIds", {}) or {}
+        tmdb_id = str(provider_ids.get("Tmdb")) if provider_ids.get("Tmdb") else None
+        imdb_id = provider_ids.get("Imdb") or None
+
+        movie = resolve_movie_from_indexes(
+            jellyfin_id=jellyfin_id,
+            tmdb_id=tmdb_id,
+            imdb_id=imdb_id,
+            by_jellyfin_id=movies_by_jellyfin_id,
+            by_tmdb_id=movies_by_tmdb_id,
+            by_imdb_id=movies_by_imdb_id,
+        )
+        if not movie:
+            logger.warning(
+                "Movie not found in DB: name=%s jellyfin_id=%s tmdb=%s imdb=%s",
+                movie_data.get("Name"),
+                jellyfin_id,
+                tmdb_id,
+                imdb_id,
+            )
+            if jellyfin_id:
+                unresolved.add(jellyfin_id)
+            continue
+
+        if jellyfin_id and movie.jellyfin_id != jellyfin_id:
+            logger.info(
+                "Healing Movie.jellyfin_id: id=%s old=%s new=%s",
+                movie.id,
+                movie.jellyfin_id,
+                jellyfin_id,
+            )
+            movie.jellyfin_id = jellyfin_id
+            movies_by_jellyfin_id[jellyfin_id] = movie
+
+        jellyfin_media_ids.add(movie.id)
+        resolved.append((movie_data, movie))
+
+    if not resolved:
+        return added, updated
+
+    # 4. Watch history rows for the resolved movies of this page (one request)
+    current_watches_result = await session.execute(
+        select(WatchHistory).where(
+            WatchHistory.user_id == user.id,
+            WatchHistory.episode_id.is_(None),
+            WatchHistory.media_id.in_({movie.id for _, movie in resolved}),
+        )
+    )
+    current_watches: dict[int, WatchHistory] = {
+        wh.media_id: wh for wh in current_watches_result.scalars()
+    }
+
+    # 5. Processed movies
+    for movie_data, movie in resolved:
+        # Data about watching
+        user_data = movie_data.get("UserData", {})
+        played = user_data.get("Played", False)
+        playback_ticks = user_data.get("PlaybackPositionTicks", 0) or 0
+        last_played_date_str = user_data.get("LastPlayedDate")
+
+        if played:
+            jellyfin_status = WatchStatus.WATCHED
+        elif playback_ticks > 0:
+            jellyfin_status = WatchStatus.WATCHING
+        else:
+            jellyfin_status = WatchStatus.PLANNED
+
+        existing_watch = current_watches.get(movie.id)
+
+        if existing_watch:
+            if existing_watch.is_manual:
+                continue  # не трогаем ручные записи
+            changed = False
+            if existing_watch.status != jellyfin_status:
+                existing_watch.status = jellyfin_status
+                changed = True
+            if existing_watch.playback_position_ticks != playback_ticks:
+                existing_watch.playback_position_ticks = playback_ticks
+                changed = True
+            if jellyfin_status == WatchStatus.WATCHED and last_played_date_str:
+                last_played_date = parse_datetime(last_played_date_str)
+                if last_played_date and existing_watch.watched_at != last_played_date:
+                    existing_watch.watched_at = last_played_date
+                    changed = True
+            if changed:
+                updated += 1
+                logger.debug("Updated: %s", movie.id)
+        else:
+            watched_at = parse_datetime(last_played_date_str) if last_played_date_str else None
+            watch_history = WatchHistory(
+                user_id=user.id,
+                media_id=movie.id,
+                episode_id=None,
+                status=jellyfin_status,
+                is_manual=False,
+                playback_position_ticks=playback_ticks,
+                watched_at=watched_at,
+            )
+            session.add(watch_history)
+            current_watches[movie.id] = watch_history
+            added += 1
+            logger.debug("Added: %s", movie.id)
+
+    return added, updated
+
+
+async def _iter_user_movies(
+    url: str, api_key: str, user_jellyfin_id: str, window: SyncWindow
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Pages of the user's movies for a sync window.
+
+    Incremental runs get the movies changed since the watermark, then the ones the last run
+    could not resolve: their user data does not change when they are imported later.
+    """
+    seen: set[str] = set()
+    async for page in iter_jellyfin_movies_for_user(
+        url, api_key, user_jellyfin_id, min_date_last_saved_for_user=window.since
+    ):
+        seen.update(str(item["Id"]) for item in page if item.get("Id"))
+        yield page
+
+    retry = [jellyfin_id for jellyfin_id in window.pending if jellyfin_id not in seen]
+    if retry:
+        async for page in iter_jellyfin_movies_for_user(url, api_key, user_jellyfin_id, ids=retry):
+            yield page
+
+
+async def _mark_dropped_movies(
+    session: AsyncSession, user_id: int, jellyfin_media_ids: set[int]
+) -> int:
+    """Mark unfinished, non-manual movie watches that are gone from Jellyfin as DROPPED."""
+    stmt = (
+        update(WatchHistory)
+        .where(
+            WatchHistory.user_id == user_id,
+            WatchHistory.episode_id.is_(None),
+            WatchHistory.status != WatchStatus.WATCHED,
+            WatchHistory.is_manual.is_(False),
+            # one array parameter instead of one bind per id
+            ~(WatchHistory.media_id == any_(literal(list(jellyfin_media_ids), ARRAY(Integer)))),
+        )
+        .values(status=WatchStatus.DROPPED)
+        .execution_options(synchronize_session="fetch")
+    )
+    result = cast(CursorResult[Any], await session.execute(stmt))
+    return result.rowcount
+
+
 async def sync_jellyfin_watched_movies(session: AsyncSession) -> JellyfinWatchedMoviesResponse:
     """
     Sync watched movies from Jellyfin for all users.
+
+    Movies are streamed from Jellyfin and written page by page, so memory is
+    bounded by the page size rather than the size of the user's library.
     """
     config = await get_decrypted_config(session, ServiceType.JELLYFIN)
     if config is None:
@@ -41,206 +263,56 @@ async def sync_jellyfin_watched_movies(session: AsyncSession) -> JellyfinWatched
     logger.info("Starting watched movies sync for %s users", total_users)
 
     for user in users:
-        user_added = user_updated = user_unwatched = 0
+        user_added = user_updated = user_unwatched = user_movies = 0
         if not user.jellyfin_user_id:
             continue
 
         logger.info("Processing movies for user %s", user.username)
         try:
-            # 2. Get all movies by user from Jellyfin (with pagination into func)
-            movies_data = await fetch_jellyfin_movies_for_user_all(
-                url, api_key, user.jellyfin_user_id
+            jellyfin_media_ids: set[int] = set()
+            unresolved: set[str] = set()
+            window = await begin_sync(
+                session, SyncJobType.JELLYFIN_MOVIE_WATCH_HISTORY, user.jellyfin_user_id
             )
 
-            if not movies_data:
-                logger.info("No movies found for user %s", user.username)
-                continue
-
-            # 3. Create data for fast finding
-
-            # 3a. Get all rows from watch_history by user (one request)
-            current_watches_result = await session.execute(
-                select(WatchHistory).where(
-                    WatchHistory.user_id == user.id, WatchHistory.episode_id.is_(None)
+            # 2. Stream movies by user from Jellyfin and resolve/write them page by page,
+            #    so memory is bounded by the page size rather than the library size.
+            #    Incremental runs only get movies whose user data changed since the watermark
+            #    and the ones still unresolved by the last run
+            async for movies_data in _iter_user_movies(url, api_key, user.jellyfin_user_id, window):
+                user_movies += len(movies_data)
+                total_movies_processed += len(movies_data)
+                added, updated = await _sync_movies_page(
+                    session, user, movies_data, jellyfin_media_ids, unresolved
                 )
+                user_added += added
+                user_updated += updated
+                watched_added += added
+                watched_updated += updated
+                await session.commit()
+
+            # 3. Dropped detection: фильмы, исчезнувшие из Jellyfin.
+            #    Needs the complete list, so it only runs on full reconciliation passes
+            if window.full and user_movies:
+                user_unwatched = await _mark_dropped_movies(session, user.id, jellyfin_media_ids)
+                unwatched_marked += user_unwatched
+            # Unresolved movies are asked for again next run, the watermark moves on regardless
+            await complete_sync(
+                session,
+                SyncJobType.JELLYFIN_MOVIE_WATCH_HISTORY,
+                window,
+                user.jellyfin_user_id,
+                pending=unresolved,
             )
-            current_watches: dict[int, WatchHistory] = {
-                wh.media_id: wh for wh in current_watches_result.scalars()
-            }
-
-            # 3b. Save all jellyfin_id and external_id for package fining movies
-            jellyfin_ids = []
-            tmdb_ids = []
-            imdb_ids = []
-
-            for movie_data in movies_data:
-                jellyfin_id = str(movie_data.get("Id")) if movie_data.get("Id") else None
-                if jellyfin_id:
-                    jellyfin_ids.append(jellyfin_id)
-
-                provider_ids = movie_data.get("ProviderIds", {})
-                tmdb_id = str(provider_ids.get("Tmdb")) if provider_ids.get("Tmdb") else None
-                if tmdb_id:
-                    tmdb_ids.append(tmdb_id)
-
-                imdb_id = provider_ids.get("Imdb")
-                if imdb_id:
-                    imdb_ids.append(imdb_id)
-
-            # 3c. Package finding movies
-            movies_by_jellyfin_id = {}
-            movies_by_tmdb_id = {}
-            movies_by_imdb_id = {}
-
-            if jellyfin_ids:
-                movies_result = await session.execute(
-                    select(Movie).where(Movie.jellyfin_id.in_(jellyfin_ids))
-                )
-                for db_movie in movies_result.scalars():
-                    if db_movie.jellyfin_id:
-                        movies_by_jellyfin_id[db_movie.jellyfin_id] = db_movie
-
-            if tmdb_ids:
-                movies_result = await session.execute(
-                    select(Movie).where(Movie.tmdb_id.in_(tmdb_ids))
-                )
-                for db_movie in movies_result.scalars():
-                    if db_movie.tmdb_id:
-                        movies_by_tmdb_id[db_movie.tmdb_id] = db_movie
-
-            if imdb_ids:
-                movies_result = await session.execute(
-                    select(Movie).where(Movie.imdb_id.in_(imdb_ids))
-                )
-                for db_movie in movies_result.scalars():
-                    if db_movie.imdb_id:
-                        movies_by_imdb_id[db_movie.imdb_id] = db_movie
-
-            # 4. Processed movies
-            for movie_data in movies_data:
-                total_movies_processed += 1
-
-                # Find movie into saved data
-                jellyfin_id = str(movie_data.get("Id")) if movie_data.get("Id") else None
-                provider_ids = movie_data.get("ProviderIds", {}) or {}
-                tmdb_id = str(provider_ids.get("Tmdb")) if provider_ids.get("Tmdb") else None
-                imdb_id = provider_ids.get("Imdb") or None
-
-                movie = resolve_movie_from_indexes(
-                    jellyfin_id=jellyfin_id,
-                    tmdb_id=tmdb_id,
-                    imdb_id=imdb_id,
-                    by_jellyfin_id=movies_by_jellyfin_id,
-                    by_tmdb_id=movies_by_tmdb_id,
-                    by_imdb_id=movies_by_imdb_id,
-                )
-                if not movie:
-                    logger.warning(
-                        "Movie not found in DB: name=%s jellyfin_id=%s tmdb=%s imdb=%s",
-                        movie_data.get("Name"),
-                        jellyfin_id,
-                        tmdb_id,
-                        imdb_id,
-                    )
-                    continue
-
-                if jellyfin_id and movie.jellyfin_id != jellyfin_id:
-                    logger.info(
-                        "Healing Movie.jellyfin_id: id=%s old=%s new=%s",
-                        movie.id,
-                        movie.jellyfin_id,
-                        jellyfin_id,
-                    )
-                    movie.jellyfin_id = jellyfin_id
-                    movies_by_jellyfin_id[jellyfin_id] = movie
-
-                # Data about watching
-                user_data = movie_data.get("UserData", {})
-                played = user_data.get("Played", False)
-                playback_ticks = user_data.get("PlaybackPositionTicks", 0) or 0
-                last_played_date_str = user_data.get("LastPlayedDate")
-
-                if played:
-                    jellyfin_status = WatchStatus.WATCHED
-                elif playback_ticks > 0:
-                    jellyfin_status = WatchStatus.WATCHING
-                else:
-                    jellyfin_status = WatchStatus.PLANNED
-
-                existing_watch = current_watches.get(movie.id)
-
-                if existing_watch:
-                    if existing_watch.is_manual:
-                        continue  # не трогаем ручные записи
-                    changed = False
-                    if existing_watch.status != jellyfin_status:
-                        existing_watch.status = jellyfin_status
-                        changed = True
-                    if existing_watch.playback_position_ticks != playback_ticks:
-                        existing_watch.playback_position_ticks = playback_ticks
-                        changed = True
-                    if jellyfin_status == WatchStatus.WATCHED and last_played_date_str:
-                        last_played_date = parse_datetime(last_played_date_str)
-                        if last_played_date and existing_watch.watched_at != last_played_date:
-                            existing_watch.watched_at = last_played_date
-                            changed = True
-                    if changed:
-                        watched_updated += 1
-                        user_updated += 1
-                        logger.debug("Updated: %s", movie.id)
-                else:
-                    watched_at = (
-                        parse_datetime(last_played_date_str) if last_played_date_str else None
-                    )
-                    watch_history = WatchHistory(
-                        user_id=user.id,
-                        media_id=movie.id,
-                        episode_id=None,
-                        status=jellyfin_status,
-                        is_manual=False,
-                        playback_position_ticks=playback_ticks,
-                        watched_at=watched_at,
-                    )
-                    session.add(watch_history)
-                    watched_added += 1
-                    user_added += 1
-                    logger.debug("Added: %s", movie.id)
-
-            # 4b. Dropped detection: фильмы, исчезнувшие из Jellyfin
-            jellyfin_media_ids: set[int] = set()
-            for movie_data in movies_data:
-                jf_id = str(movie_data.get("Id")) if movie_data.get("Id") else None
-                pids = movie_data.get("ProviderIds", {}) or {}
-                t_id = str(pids.get("Tmdb")) if pids.get("Tmdb") else None
-                i_id = pids.get("Imdb") or None
-                resolved = resolve_movie_from_indexes(
-                    jellyfin_id=jf_id,
-                    tmdb_id=t_id,
-                    imdb_id=i_id,
-                    by_jellyfin_id=movies_by_jellyfin_id,
-                    by_tmdb_id=movies_by_tmdb_id,
-                    by_imdb_id=movies_by_imdb_id,
-                )
-                if resolved:
-                    jellyfin_media_ids.add(resolved.id)
-
-            for media_id, wh in current_watches.items():
-                if (
-                    media_id not in jellyfin_media_ids
-                    and wh.status != WatchStatus.WATCHED
-                    and not wh.is_manual
-                ):
-                    wh.status = WatchStatus.DROPPED
-                    unwatched_marked += 1
-                    user_unwatched += 1
-                    logger.debug("Marked dropped: %s", media_id)
-
-            # 5. Save changes
             await session.commit()
+
+            if not user_movies:
+                logger.info("No movies found for user %s", user.username)
+                continue
             logger.info(
                 "User %s: movies=%d, added=%d, updated=%d, unwatched=%d",
                 user.username,
-                len(movies_data),
+                user_movies,
                 user_added,
                 user_updated,
                 user_unwatched,
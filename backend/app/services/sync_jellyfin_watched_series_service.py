@@ -1,28 +1,348 @@
+from collections.abc import AsyncIterator
 from typing import Any, cast
 
-from sqlalchemy import or_, select
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import Integer, any_, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.client.jellyfin_client import (
-    fetch_jellyfin_episodes_for_user_all,
     fetch_jellyfin_series_by_ids,
+    iter_jellyfin_episodes_for_user,
 )
 from app.config import logger
 from app.models.media import Episode, Season, Series
-from app.models.schedule import ServiceType
+from app.models.schedule import ServiceType, SyncJobType
 from app.models.user import User, WatchHistory, WatchStatus
 from app.schemas.jellyfin import JellyfinWatchedSeriesResponse
+from app.services.series_progress_repository import refresh_series_progress
 from app.services.series_utils import resolve_series_from_indexes
 from app.services.service_config_repository import get_decrypted_config
+from app.services.sync_watermark_repository import SyncWindow, begin_sync, complete_sync
 from app.utils.datetime import parse_datetime
 
 
+async def _resolve_page_series(
+    session: AsyncSession,
+    url: str,
+    api_key: str,
+    user_jellyfin_id: str,
+    series_jellyfin_ids: list[str],
+    series_by_jellyfin_series_id: dict[str, Series],
+    unmatched_series_ids: set[str],
+) -> None:
+    """
+    Resolve Jellyfin series ids not seen on earlier pages to Series rows.
+
+    Resolved series are cached in ``series_by_jellyfin_series_id``, misses in
+    ``unmatched_series_ids``, so each series is looked up once per user.
+    """
+    new_ids = [
+        jf_sid
+        for jf_sid in series_jellyfin_ids
+        if jf_sid not in series_by_jellyfin_series_id and jf_sid not in unmatched_series_ids
+    ]
+    if not new_ids:
+        return
+
+    # fetch provider IDs for those series from Jellyfin
+    series_items = await fetch_jellyfin_series_by_ids(url, api_key, user_jellyfin_id, new_ids)
+    series_provider_ids: dict[str, dict[str, str]] = {}
+    for item in series_items:
+        jf_id = item.get("Id")
+        if jf_id:
+            series_provider_ids[jf_id] = item.get("ProviderIds", {}) or {}
+
+    # load Series from DB in a single query
+    tvdb_ids = {v.get("Tvdb") for v in series_provider_ids.values() if v.get("Tvdb")}
+    imdb_ids = {v.get("Imdb") for v in series_provider_ids.values() if v.get("Imdb")}
+
+    series_result = await session.execute(
+        select(Series).where(
+            or_(
+                Series.jellyfin_id.in_(set(new_ids)),
+                Series.tvdb_id.in_(tvdb_ids),
+                Series.imdb_id.in_(imdb_ids),
+            )
+        )
+    )
+    db_series_list = series_result.scalars().all()
+
+    by_jf_id: dict[str, Series] = {s.jellyfin_id: s for s in db_series_list if s.jellyfin_id}
+    by_tvdb_id: dict[str, Series] = {s.tvdb_id: s for s in db_series_list if s.tvdb_id}
+    by_imdb_id: dict[str, Series] = {s.imdb_id: s for s in db_series_list if s.imdb_id}
+
+    # resolve each jellyfin_series_id to a Series object with heal
+    for jf_sid in new_ids:
+        pids = series_provider_ids.get(jf_sid, {})
+        tvdb = pids.get("Tvdb")
+        imdb = pids.get("Imdb")
+
+        series = resolve_series_from_indexes(
+            jellyfin_id=jf_sid,
+            tvdb_id=tvdb,
+            imdb_id=imdb,
+            by_jellyfin_id=by_jf_id,
+            by_tvdb_id=by_tvdb_id,
+            by_imdb_id=by_imdb_id,
+        )
+        if not series:
+            logger.warning(
+                "Series not found: jellyfin_series_id=%s tvdb=%s imdb=%s",
+                jf_sid,
+                tvdb,
+                imdb,
+            )
+            unmatched_series_ids.add(jf_sid)
+            continue
+
+        # heal Series.jellyfin_id
+        if series.jellyfin_id != jf_sid:
+            logger.info(
+                "Healing Series.jellyfin_id: id=%s old=%s new=%s",
+                series.id,
+                series.jellyfin_id,
+                jf_sid,
+            )
+            series.jellyfin_id = jf_sid
+            by_jf_id[jf_sid] = series
+
+        series_by_jellyfin_series_id[jf_sid] = series
+
+
+async def _sync_episodes_page(
+    session: AsyncSession,
+    user: User,
+    episodes_data: list[dict[str, Any]],
+    series_by_jellyfin_series_id: dict[str, Series],
+    unmatched_series_ids: set[str],
+    resolved_episode_ids: set[int],
+    unresolved: set[str],
+) -> tuple[int, int, int]:
+    """
+    Upsert the user's watch history for one page of Jellyfin episodes.
+
+    Adds the ids of resolved episodes to ``resolved_episode_ids`` and the Jellyfin ids of
+    episodes not found in the DB (or whose series is not) to ``unresolved``.
+    Returns (processed, added, updated).
+    """
+    processed = added = updated = 0
+
+    # load seasons and episodes for the series of this page
+    page_series_ids = {
+        series_by_jellyfin_series_id[ep["SeriesId"]].id
+        for ep in episodes_data
+        if ep.get("SeriesId") in series_by_jellyfin_series_id
+    }
+
+    seasons_result = await session.execute(
+        select(Season).where(Season.series_id.in_(page_series_ids))
+    )
+    seasons = seasons_result.scalars().all()
+
+    episodes_result = await session.execute(
+        select(Episode)
+        .options(selectinload(Episode.season))
+        .where(Episode.season_id.in_([s.id for s in seasons]))
+    )
+    db_episodes = episodes_result.scalars().all()
+    # index: (series_id, season_number, episode_number) -> Episode
+    episodes_by_triple: dict[tuple[int, int, int], Episode] = {}
+    for ep in db_episodes:
+        season_obj = ep.season
+        if season_obj:
+            key = (season_obj.series_id, season_obj.number, ep.number)
+            episodes_by_triple[key] = ep
+
+    # match page episodes to DB episodes
+    matched: list[tuple[dict[str, Any], Series, Episode]] = []
+    for ep_data in episodes_data:
+        jf_ep_id = ep_data.get("Id")
+        jf_series_id = ep_data.get("SeriesId")
+        season_num = ep_data.get("ParentIndexNumber")
+        ep_num = ep_data.get("IndexNumber")
+
+        if not jf_series_id or not isinstance(season_num, int) or not isinstance(ep_num, int):
+            logger.warning("Skip episode (incomplete payload): jellyfin_ep_id=%s", jf_ep_id)
+            continue
+
+        series = series_by_jellyfin_series_id.get(jf_series_id)
+        if not series:
+            # log each missing series once — don't flood warnings
+            if jf_series_id not in unmatched_series_ids:
+                logger.warning("Series not found for episode: jellyfin_series_id=%s", jf_series_id)
+                unmatched_series_ids.add(jf_series_id)
+            if jf_ep_id:
+                unresolved.add(jf_ep_id)
+            continue
+
+        episode = episodes_by_triple.get((series.id, season_num, ep_num))
+        if not episode:
+            logger.warning(
+                "Episode not found in DB: series_id=%d S%02dE%02d jellyfin_ep_id=%s",
+                series.id,
+                season_num,
+                ep_num,
+                jf_ep_id,
+            )
+            if jf_ep_id:
+                unresolved.add(jf_ep_id)
+            continue
+
+        # heal Episode.jellyfin_id
+        if jf_ep_id and episode.jellyfin_id != jf_ep_id:
+            logger.info(
+                "Healing Episode.jellyfin_id: id=%s old=%s new=%s",
+                episode.id,
+                episode.jellyfin_id,
+                jf_ep_id,
+            )
+            episode.jellyfin_id = jf_ep_id
+
+        # heal Season.jellyfin_id
+        jf_season_id = ep_data.get("SeasonId")
+        if jf_season_id and episode.season and episode.season.jellyfin_id != jf_season_id:
+            logger.info(
+                "Healing Season.jellyfin_id: id=%s old=%s new=%s",
+                episode.season.id,
+                episode.season.jellyfin_id,
+                jf_season_id,
+            )
+            episode.season.jellyfin_id = jf_season_id
+
+        resolved_episode_ids.add(episode.id)
+        matched.append((ep_data, series, episode))
+
+    if not matched:
+        return processed, added, updated
+
+    # load watch history for the matched episodes of this page
+    watch_history_result = await session.execute(
+        select(WatchHistory).where(
+            WatchHistory.user_id == user.id,
+            WatchHistory.episode_id.in_({episode.id for _, _, episode in matched}),
+        )
+    )
+    watch_by_episode_id: dict[int, WatchHistory] = {
+        wh.episode_id: wh for wh in watch_history_result.scalars() if wh.episode_id is not None
+    }
+    to_insert = []
+
+    for ep_data, series, episode in matched:
+        user_data = ep_data.get("UserData") or {}
+        played = bool(user_data.get("Played"))
+        playback_ticks = user_data.get("PlaybackPositionTicks", 0) or 0
+        last_played_date_str = user_data.get("LastPlayedDate")
+
+        if played:
+            jellyfin_status = WatchStatus.WATCHED
+        elif playback_ticks > 0:
+            jellyfin_status = WatchStatus.WATCHING
+        else:
+            jellyfin_status = WatchStatus.PLANNED
+
+        existing = watch_by_episode_id.get(episode.id)
+        if existing:
+            if existing.is_manual:
+                processed += 1
+                continue
+            changed = False
+            if existing.status != jellyfin_status:
+                existing.status = jellyfin_status
+                changed = True
+            if jellyfin_status == WatchStatus.WATCHED and last_played_date_str:
+                last_played_date = parse_datetime(last_played_date_str)
+                if last_played_date and existing.watched_at != last_played_date:
+                    existing.watched_at = last_played_date
+                    changed = True
+            if changed:
+                updated += 1
+        elif jellyfin_status in (WatchStatus.WATCHED, WatchStatus.WATCHING):
+            watched_at = parse_datetime(last_played_date_str) if last_played_date_str else None
+            to_insert.append(
+                {
+                    "user_id": user.id,
+                    "media_id": series.id,
+                    "episode_id": episode.id,
+                    "status": jellyfin_status,
+                    "is_manual": False,
+                    "playback_position_ticks": playback_ticks,
+                    "watched_at": watched_at,
+                }
+            )
+            added += 1
+
+        processed += 1
+
+    # bulk insert
+    if to_insert:
+        stmt = (
+            insert(WatchHistory)
+            .values(to_insert)
+            .on_conflict_do_nothing(index_elements=["user_id", "media_id", "episode_id"])
+        )
+        result = cast(CursorResult[Any], await session.execute(stmt))
+        added -= len(to_insert) - result.rowcount
+
+    await refresh_series_progress(session, {series.id for _, series, _ in matched}, [user.id])
+    return processed, added, updated
+
+
+async def _mark_dropped_episodes(
+    session: AsyncSession, user_id: int, resolved_episode_ids: set[int]
+) -> int:
+    """Mark PLANNED/WATCHING non-manual episode watches gone from Jellyfin as DROPPED."""
+    stmt = (
+        update(WatchHistory)
+        .where(
+            WatchHistory.user_id == user_id,
+            WatchHistory.episode_id.isnot(None),
+            WatchHistory.status.in_((WatchStatus.PLANNED, WatchStatus.WATCHING)),
+            WatchHistory.is_manual.is_(False),
+            # one array parameter instead of one bind per id
+            ~(WatchHistory.episode_id == any_(literal(list(resolved_episode_ids), ARRAY(Integer)))),
+        )
+        .values(status=WatchStatus.DROPPED)
+        .returning(WatchHistory.media_id)
+        .execution_options(synchronize_session="fetch")
+    )
+    # one series id per dropped episode
+    dropped = list((await session.execute(stmt)).scalars().all())
+    await refresh_series_progress(session, set(dropped), [user_id])
+    return len(dropped)
+
+
+async def _iter_user_episodes(
+    url: str, api_key: str, user_jellyfin_id: str, window: SyncWindow
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Pages of the user's episodes for a sync window.
+
+    Incremental runs get the episodes changed since the watermark, then the ones the last run
+    could not resolve: their user data does not change when they are imported later.
+    """
+    seen: set[str] = set()
+    async for page in iter_jellyfin_episodes_for_user(
+        url, api_key, user_jellyfin_id, min_date_last_saved_for_user=window.since
+    ):
+        seen.update(str(item["Id"]) for item in page if item.get("Id"))
+        yield page
+
+    retry = [jellyfin_id for jellyfin_id in window.pending if jellyfin_id not in seen]
+    if retry:
+        async for page in iter_jellyfin_episodes_for_user(
+            url, api_key, user_jellyfin_id, ids=retry
+        ):
+            yield page
+
+
 async def sync_jellyfin_watched_series(session: AsyncSession) -> JellyfinWatchedSeriesResponse:
     """
     Sync watched episodes from Jellyfin for all users.
+
+    Episodes are streamed from Jellyfin and written page by page, so memory is
+    bounded by the page size rather than the size of the user's library.
     """
     config = await get_decrypted_config(session, ServiceType.JELLYFIN)
     if config is None:
@@ -42,7 +362,7 @@ async def sync_jellyfin_watched_series(session: AsyncSession) -> JellyfinWatched
 
     logger.info("Starting watched episodes sync for %s users", total_users)
     for user in users:
-        user_added = user_updated = user_unwatched = 0
+        user_added = user_updated = user_unwatched = user_episodes = 0
 
         if not user.jellyfin_user_id:
             continue
@@ -50,266 +370,73 @@ async def sync_jellyfin_watched_series(session: AsyncSession) -> JellyfinWatched
         logger.info("Processing episodes for user %s", user.username)
 
         try:
-            # Step 1: get flat list of episodes from Jellyfin
-            episodes_data = await fetch_jellyfin_episodes_for_user_all(
-                url, api_key, user.jellyfin_user_id
-            )
-
-            if not episodes_data:
-                logger.info("No episodes found for user %s", user.username)
-                continue
-
-            # Step 2: collect unique jellyfin series IDs from episodes
-            series_jellyfin_ids = list(
-                {ep["SeriesId"] for ep in episodes_data if ep.get("SeriesId")}
-            )
-
-            # Step 3: fetch provider IDs for those series from Jellyfin
-            series_items = await fetch_jellyfin_series_by_ids(
-                url, api_key, user.jellyfin_user_id, series_jellyfin_ids
-            )
-            series_provider_ids: dict[str, dict[str, str]] = {}
-            for item in series_items:
-                jf_id = item.get("Id")
-                if jf_id:
-                    series_provider_ids[jf_id] = item.get("ProviderIds", {}) or {}
-
-            # Step 4: load Series from DB in a single query
-            tvdb_ids = {v.get("Tvdb") for v in series_provider_ids.values() if v.get("Tvdb")}
-            imdb_ids = {v.get("Imdb") for v in series_provider_ids.values() if v.get("Imdb")}
-            jf_ids_set = set(series_jellyfin_ids)
-
-            series_result = await session.execute(
-                select(Series).where(
-                    or_(
-                        Series.jellyfin_id.in_(jf_ids_set),
-                        Series.tvdb_id.in_(tvdb_ids),
-                        Series.imdb_id.in_(imdb_ids),
-                    )
-                )
-            )
-            db_series_list = series_result.scalars().all()
-
-            by_jf_id: dict[str, Series] = {
-                s.jellyfin_id: s for s in db_series_list if s.jellyfin_id
-            }
-            by_tvdb_id: dict[str, Series] = {s.tvdb_id: s for s in db_series_list if s.tvdb_id}
-            by_imdb_id: dict[str, Series] = {s.imdb_id: s for s in db_series_list if s.imdb_id}
-
-            # Step 5: resolve each jellyfin_series_id to a Series object with heal
             series_by_jellyfin_series_id: dict[str, Series] = {}
             unmatched_series_ids: set[str] = set()
-
-            for jf_sid in series_jellyfin_ids:
-                pids = series_provider_ids.get(jf_sid, {})
-                tvdb = pids.get("Tvdb")
-                imdb = pids.get("Imdb")
-
-                series = resolve_series_from_indexes(
-                    jellyfin_id=jf_sid,
-                    tvdb_id=tvdb,
-                    imdb_id=imdb,
-                    by_jellyfin_id=by_jf_id,
-                    by_tvdb_id=by_tvdb_id,
-                    by_imdb_id=by_imdb_id,
-                )
-                if not series:
-                    if jf_sid not in unmatched_series_ids:
-                        logger.warning(
-                            "Series not found: jellyfin_series_id=%s tvdb=%s imdb=%s",
-                            jf_sid,
-                            tvdb,
-                            imdb,
-                        )
-                        unmatched_series_ids.add(jf_sid)
-                    continue
-
-                # heal Series.jellyfin_id
-                if series.jellyfin_id != jf_sid:
-                    logger.info(
-                        "Healing Series.jellyfin_id: id=%s old=%s new=%s",
-                        series.id,
-                        series.jellyfin_id,
-                        jf_sid,
-                    )
-                    series.jellyfin_id = jf_sid
-                    by_jf_id[jf_sid] = series
-
-                series_by_jellyfin_series_id[jf_sid] = series
-
-            # Step 6: load seasons and episodes for resolved series
-            resolved_series = list(series_by_jellyfin_series_id.values())
-            resolved_series_ids = [s.id for s in resolved_series]
-
-            seasons_result = await session.execute(
-                select(Season).where(Season.series_id.in_(resolved_series_ids))
+            resolved_episode_ids: set[int] = set()
+            unresolved: set[str] = set()
+            window = await begin_sync(
+                session, SyncJobType.JELLYFIN_SERIES_WATCH_HISTORY, user.jellyfin_user_id
             )
-            seasons = seasons_result.scalars().all()
 
-            episodes_result = await session.execute(
-                select(Episode)
-                .options(selectinload(Episode.season))
-                .where(Episode.season_id.in_([s.id for s in seasons]))
-            )
-            db_episodes = episodes_result.scalars().all()
-            # index: (series_id, season_number, episode_number) -> Episode
-            episodes_by_triple: dict[tuple[int, int, int], Episode] = {}
-            for ep in db_episodes:
-                season_obj = ep.season
-                if season_obj:
-                    key = (season_obj.series_id, season_obj.number, ep.number)
-                    episodes_by_triple[key] = ep
-
-            # Step 7: load watch history for user
-            watch_history_result = await session.execute(
-                select(WatchHistory).where(
-                    WatchHistory.user_id == user.id,
-                    WatchHistory.episode_id.isnot(None),
+            # Step 1: stream episodes from Jellyfin page by page; incremental runs only get
+            # episodes whose user data changed since the watermark and the ones still
+            # unresolved by the last run
+            async for episodes_data in _iter_user_episodes(
+                url, api_key, user.jellyfin_user_id, window
+            ):
+                user_episodes += len(episodes_data)
+
+                # Step 2: resolve series of this page not seen on earlier pages
+                series_jellyfin_ids = list(
+                    dict.fromkeys(ep["SeriesId"] for ep in episodes_data if ep.get("SeriesId"))
+                )
+                await _resolve_page_series(
+                    session,
+                    url,
+                    api_key,
+                    user.jellyfin_user_id,
+                    series_jellyfin_ids,
+                    series_by_jellyfin_series_id,
+                    unmatched_series_ids,
                 )
-            )
-            watch_by_episode_id: dict[int, WatchHistory] = {
-                wh.episode_id: wh
-                for wh in watch_history_result.scalars()
-                if wh.episode_id is not None
-            }
-            to_insert = []
-            resolved_episode_ids: set[int] = set()
 
-            # Step 8: main loop over episodes
-            for ep_data in episodes_data:
-                jf_ep_id = ep_data.get("Id")
-                jf_series_id = ep_data.get("SeriesId")
-                season_num = ep_data.get("ParentIndexNumber")
-                ep_num = ep_data.get("IndexNumber")
-
-                if (
-                    not jf_series_id
-                    or not isinstance(season_num, int)
-                    or not isinstance(ep_num, int)
-                ):
-                    logger.warning("Skip episode (incomplete payload): jellyfin_ep_id=%s", jf_ep_id)
-                    continue
-
-                if jf_series_id in unmatched_series_ids:
-                    continue  # series not found — don't flood warnings
-
-                series = series_by_jellyfin_series_id.get(jf_series_id)
-                if not series:
-                    if jf_series_id not in unmatched_series_ids:
-                        logger.warning(
-                            "Series not found for episode: jellyfin_series_id=%s", jf_series_id
-                        )
-                        unmatched_series_ids.add(jf_series_id)
-                    continue
-
-                episode = episodes_by_triple.get((series.id, season_num, ep_num))
-                if not episode:
-                    logger.warning(
-                        "Episode not found in DB: series_id=%d S%02dE%02d jellyfin_ep_id=%s",
-                        series.id,
-                        season_num,
-                        ep_num,
-                        jf_ep_id,
-                    )
-                    continue
-
-                # heal Episode.jellyfin_id
-                if jf_ep_id and episode.jellyfin_id != jf_ep_id:
-                    logger.info(
-                        "Healing Episode.jellyfin_id: id=%s old=%s new=%s",
-                        episode.id,
-                        episode.jellyfin_id,
-                        jf_ep_id,
-                    )
-                    episode.jellyfin_id = jf_ep_id
-
-                # heal Season.jellyfin_id
-                jf_season_id = ep_data.get("SeasonId")
-                if jf_season_id and episode.season and episode.season.jellyfin_id != jf_season_id:
-                    logger.info(
-                        "Healing Season.jellyfin_id: id=%s old=%s new=%s",
-                        episode.season.id,
-                        episode.season.jellyfin_id,
-                        jf_season_id,
-                    )
-                    episode.season.jellyfin_id = jf_season_id
-
-                resolved_episode_ids.add(episode.id)
-
-                user_data = ep_data.get("UserData") or {}
-                played = bool(user_data.get("Played"))
-                playback_ticks = user_data.get("PlaybackPositionTicks", 0) or 0
-                last_played_date_str = user_data.get("LastPlayedDate")
-
-                if played:
-                    jellyfin_status = WatchStatus.WATCHED
-                elif playback_ticks > 0:
-                    jellyfin_status = WatchStatus.WATCHING
-                else:
-                    jellyfin_status = WatchStatus.PLANNED
-
-                existing = watch_by_episode_id.get(episode.id)
-                if existing:
-                    if existing.is_manual:
-                        total_episodes_processed += 1
-                        continue
-                    changed = False
-                    if existing.status != jellyfin_status:
-                        existing.status = jellyfin_status
-                        changed = True
-                    if jellyfin_status == WatchStatus.WATCHED and last_played_date_str:
-                        last_played_date = parse_datetime(last_played_date_str)
-                        if last_played_date and existing.watched_at != last_played_date:
-                            existing.watched_at = last_played_date
-                            changed = True
-                    if changed:
-                        user_updated += 1
-                        watched_updated += 1
-                elif jellyfin_status in (WatchStatus.WATCHED, WatchStatus.WATCHING):
-                    watched_at = (
-                        parse_datetime(last_played_date_str) if last_played_date_str else None
-                    )
-                    to_insert.append(
-                        {
-                            "user_id": user.id,
-                            "media_id": series.id,
-                            "episode_id": episode.id,
-                            "status": jellyfin_status,
-                            "is_manual": False,
-                            "playback_position_ticks": playback_ticks,
-                            "watched_at": watched_at,
-                        }
-                    )
-                    user_added += 1
-                    watched_added += 1
-
-                total_episodes_processed += 1
-
-            # Step 9: dropped-detection via resolved_episode_ids (O(n))
-            for ep_id, wh in watch_by_episode_id.items():
-                if (
-                    ep_id not in resolved_episode_ids
-                    and wh.status in (WatchStatus.PLANNED, WatchStatus.WATCHING)
-                    and not wh.is_manual
-                ):
-                    wh.status = WatchStatus.DROPPED
-                    unwatched_marked += 1
-                    user_unwatched += 1
-                    logger.debug("Marked dropped episode_id=%s", ep_id)
-
-            # Step 10: bulk insert and commit
-            if to_insert:
-                stmt = (
-                    insert(WatchHistory)
-                    .values(to_insert)
-                    .on_conflict_do_nothing(index_elements=["user_id", "media_id", "episode_id"])
+                # Step 3: upsert watch history for the page and commit
+                processed, added, updated = await _sync_episodes_page(
+                    session,
+                    user,
+                    episodes_data,
+                    series_by_jellyfin_series_id,
+                    unmatched_series_ids,
+                    resolved_episode_ids,
+                    unresolved,
+                )
+                total_episodes_processed += processed
+                user_added += added
+                watched_added += added
+                user_updated += updated
+                watched_updated += updated
+                await session.commit()
+
+            # Step 4: dropped-detection via resolved_episode_ids, in one UPDATE.
+            # Needs the complete list, so it only runs on full reconciliation passes
+            if window.full and user_episodes:
+                user_unwatched = await _mark_dropped_episodes(
+                    session, user.id, resolved_episode_ids
                 )
-                result = cast(CursorResult[Any], await session.execute(stmt))
-                skipped = len(to_insert) - result.rowcount
-                if skipped:
-                    user_added -= skipped
-                    watched_added -= skipped
+                unwatched_marked += user_unwatched
+            # Unresolved episodes are asked for again next run, the watermark moves on regardless
+            await complete_sync(
+                session,
+                SyncJobType.JELLYFIN_SERIES_WATCH_HISTORY,
+                window,
+                user.jellyfin_user_id,
+                pending=unresolved,
+            )
             await session.commit()
+
+            if not user_episodes:
+                logger.info("No episodes found for user %s", user.username)
+                continue
             logger.info(
                 "User %s: added=%d updated=%d unwatched=%d",
                 user.username,
@@ -0,0 +1,95 @@
+"""Repository for sync watermarks (incremental Jellyfin imports)."""
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schedule import SyncJobType, SyncWatermark
+
+# How often an incremental job falls back to a full pass, which also catches deletions
+FULL_SYNC_INTERVAL = timedelta(days=int(os.getenv("SYNC_FULL_RECONCILE_DAYS", "7")))
+# Items saved while the previous run was in flight (or under clock skew) are asked for again
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class SyncWindow:
+    """
+    What a run should fetch: everything (``since`` is None) or changes since ``since``.
+
+    ``pending`` holds the item ids an earlier run could not resolve; an incremental run asks
+    for them again, as their user data may not change after they are imported.
+    """
+
+    started_at: datetime
+    since: datetime | None = None
+    pending: tuple[str, ...] = ()
+
+    @property
+    def full(self) -> bool:
+        return self.since is None
+
+
+async def begin_sync(session: AsyncSession, job_type: SyncJobType, scope: str = "") -> SyncWindow:
+    """Decide between an incremental and a full run from the stored watermark."""
+    started_at = datetime.now(UTC)
+    entry = await session.scalar(
+        select(SyncWatermark).where(
+            SyncWatermark.job_type == job_type, SyncWatermark.scope == scope
+        )
+    )
+    if (
+        entry is None
+        or entry.last_full_sync_at is None
+        or started_at - entry.last_full_sync_at >= FULL_SYNC_INTERVAL
+    ):
+        return SyncWindow(started_at=started_at)
+    return SyncWindow(
+        started_at=started_at,
+        since=entry.watermark - WATERMARK_OVERLAP,
+        pending=tuple(entry.pending_ids or ()),
+    )
+
+
+async def complete_sync(
+    session: AsyncSession,
+    job_type: SyncJobType,
+    window: SyncWindow,
+    scope: str = "",
+    pending: Iterable[str] = (),
+) -> None:
+    """
+    Advance the watermark to the start of a successful run (caller commits).
+
+    ``pending`` replaces the stored ids of items this run could not resolve.
+    """
+    values = {
+        "job_type": job_type,
+        "scope": scope,
+        "watermark": window.started_at,
+        "last_full_sync_at": window.started_at if window.full else None,
+        "pending_ids": sorted(set(pending)),
+    }
+    stmt = insert(SyncWatermark).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sync_watermark_job_scope",
+        set_={
+            "watermark": stmt.excluded.watermark,
+            "last_full_sync_at": func.coalesce(
+                stmt.excluded.last_full_sync_at, SyncWatermark.last_full_sync_at
+            ),
+            "pending_ids": stmt.excluded.pending_ids,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def reset_watermarks(session: AsyncSession) -> None:
+    """Forget all watermarks, so the next run of every job is a full one."""
+    await session.execute(delete(SyncWatermark))
@@ -4,41 +4,67 @@ from datetime import UTC, datetime
 
 import httpx
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
-from app.client.tmdb_bridge_client import TmdbBridgeClientError, fetch_tmdb_movie
+from app.client.bridge_scheduler import BridgeScheduler
+from app.client.http_pool import TMDB_BRIDGE_POOL, http_clients
+from app.client.tmdb_bridge_client import (
+    BridgeResponse,
+    TmdbBridgeClientError,
+    fetch_tmdb_movie,
+    tmdb_movie_url,
+)
 from app.config import logger
+from app.database import AsyncSessionLocal
+from app.models.http_cache import HttpResponseCache
 from app.models.media import Movie
 from app.schemas.tmdb_bridge import TmdbBridgeMovieResponse, TmdbMetadataUpdateResponse
+from app.services.http_cache_repository import (
+    cached_validators,
+    is_unchanged,
+    load_cache_entries,
+    needs_save,
+    save_cache_entries,
+)
 from app.services.movie_utils import map_tmdb_status
 from app.services.update_tmdb_series_metadata_service import update_series_tmdb_metadata
 
-CONCURRENCY_LIMIT = 10
-
 
 @dataclass
 class _Counters:
     processed: int = field(default=0)
     updated: int = field(default=0)
     skipped: int = field(default=0)
+    unchanged: int = field(default=0)
     failed: int = field(default=0)
 
 
-async def update_movies_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpdateResponse:
+async def update_movies_tmdb_metadata(
+    session: AsyncSession, scheduler: BridgeScheduler | None = None
+) -> TmdbMetadataUpdateResponse:
     query = select(Movie).where(Movie.tmdb_id.is_not(None)).options(selectinload(Movie.media))
     movies = list((await session.execute(query)).scalars().all())
 
-    semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+    scheduler = scheduler or BridgeScheduler()
     counters = _Counters()
-
-    async with httpx.AsyncClient() as http_client:
-        await asyncio.gather(
-            *[_process_one_movie(movie, semaphore, counters, http_client) for movie in movies],
-            return_exceptions=True,
-        )
+    cache = await load_cache_entries(
+        session, [tmdb_movie_url(movie.tmdb_id) for movie in movies if movie.tmdb_id]
+    )
+    # Applied (or revalidated) responses; their cache entries are upserted before commit
+    to_cache: list[BridgeResponse] = []
+
+    http_client = await http_clients.get(TMDB_BRIDGE_POOL)
+    await asyncio.gather(
+        *[
+            _process_one_movie(movie, scheduler, counters, http_client, cache, to_cache)
+            for movie in movies
+        ],
+        return_exceptions=True,
+    )
 
     try:
+        await save_cache_entries(session, to_cache)
         await session.commit()
     except Exception as e:
         logger.error("TMDB metadata update commit failed: %s", e)
@@ -46,15 +72,17 @@ async def update_movies_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpda
         raise
 
     logger.info(
-        "TMDB metadata update done: processed=%d, updated=%d, skipped=%d, failed=%d",
+        "TMDB metadata update done: processed=%d, updated=%d, unchanged=%d, skipped=%d, failed=%d",
         counters.processed,
         counters.updated,
+        counters.unchanged,
         counters.skipped,
         counters.failed,
     )
     return TmdbMetadataUpdateResponse(
         processed_count=counters.processed,
         updated_count=counters.updated,
+        unchanged_count=counters.unchanged,
         skipped_count=counters.skipped,
         failed_count=counters.failed,
     )
@@ -62,39 +90,53 @@ async def update_movies_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpda
 
 async def _process_one_movie(
     movie: Movie,
-    semaphore: asyncio.Semaphore,
+    scheduler: BridgeScheduler,
     counters: _Counters,
     client: httpx.AsyncClient,
+    cache: dict[str, HttpResponseCache],
+    to_cache: list[BridgeResponse],
 ) -> None:
-    async with semaphore:
-        tmdb_id = movie.tmdb_id
-        assert tmdb_id is not None  # guaranteed by WHERE tmdb_id IS NOT NULL
-        counters.processed += 1
-
-        try:
-            raw = await fetch_tmdb_movie(tmdb_id, client=client)
-        except TmdbBridgeClientError as e:
-            logger.warning("Skip tmdb_id=%s due to Bridge error: %s", tmdb_id, e.message)
-            counters.failed += 1
-            return
-
-        if raw is None:
-            counters.skipped += 1
-            return
-
-        try:
-            payload = TmdbBridgeMovieResponse.model_validate(raw)
-        except Exception as e:
-            logger.warning("Bridge payload validation failed for tmdb_id=%s: %s", tmdb_id, e)
-            counters.failed += 1
-            return
-
-        try:
-            if _apply_tmdb_update(movie, payload):
-                counters.updated += 1
-        except Exception as e:
-            logger.error("Unexpected error applying TMDB update for tmdb_id=%s: %s", tmdb_id, e)
-            counters.failed += 1
+    tmdb_id = movie.tmdb_id
+    assert tmdb_id is not None  # guaranteed by WHERE tmdb_id IS NOT NULL
+    counters.processed += 1
+    cached = cache.get(tmdb_movie_url(tmdb_id))
+    validators = cached_validators(cached, movie.tmdb_metadata_digest)
+
+    try:
+        response = await scheduler.run(
+            lambda: fetch_tmdb_movie(tmdb_id, client=client, validators=validators)
+        )
+    except TmdbBridgeClientError as e:
+        logger.warning("Skip tmdb_id=%s due to Bridge error: %s", tmdb_id, e.message)
+        counters.failed += 1
+        return
+
+    if response is None:
+        counters.skipped += 1
+        return
+
+    # Same payload as the one applied to this row last time — nothing to write
+    if is_unchanged(response, movie.tmdb_metadata_digest):
+        counters.unchanged += 1
+        if needs_save(response, cached):
+            to_cache.append(response)
+        return
+
+    try:
+        payload = TmdbBridgeMovieResponse.model_validate(response.data)
+    except Exception as e:
+        logger.warning("Bridge payload validation failed for tmdb_id=%s: %s", tmdb_id, e)
+        counters.failed += 1
+        return
+
+    try:
+        if _apply_tmdb_update(movie, payload):
+            counters.updated += 1
+        movie.tmdb_metadata_digest = response.digest
+        to_cache.append(response)
+    except Exception as e:
+        logger.error("Unexpected error applying TMDB update for tmdb_id=%s: %s", tmdb_id, e)
+        counters.failed += 1
 
 
 def _apply_tmdb_update(movie: Movie, payload: TmdbBridgeMovieResponse) -> bool:
@@ -152,12 +194,48 @@ def _apply_tmdb_update(movie: Movie, payload: TmdbBridgeMovieResponse) -> bool:
     return changed
 
 
-async def update_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpdateResponse:
-    movies_result = await update_movies_tmdb_metadata(session)
-    series_result = await update_series_tmdb_metadata(session)
+async def update_tmdb_metadata(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> TmdbMetadataUpdateResponse:
+    """
+    Run the movie and series phases concurrently through one shared Bridge scheduler.
+
+    Each phase works in its own session: an AsyncSession must not be used by two tasks at once.
+    """
+    scheduler = BridgeScheduler()
+
+    async def run_movies() -> TmdbMetadataUpdateResponse:
+        async with session_factory() as session:
+            return await update_movies_tmdb_metadata(session, scheduler)
+
+    async def run_series() -> TmdbMetadataUpdateResponse:
+        async with session_factory() as session:
+            return await update_series_tmdb_metadata(session, scheduler)
+
+    tasks = [asyncio.create_task(run_movies()), asyncio.create_task(run_series())]
+    try:
+        movies_result, series_result = await asyncio.gather(*tasks)
+    except BaseException:
+        # One phase failed: do not leave the other one running detached
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    stats = scheduler.stats()
+    logger.info(
+        "TMDB Bridge scheduler: completed=%d, rate_limited=%d, retried=%d, "
+        "window=%d, throughput=%.2f req/s",
+        stats.completed,
+        stats.rate_limited,
+        stats.retried,
+        stats.window,
+        stats.throughput,
+    )
     return TmdbMetadataUpdateResponse(
         processed_count=movies_result.processed_count + series_result.processed_count,
         updated_count=movies_result.updated_count + series_result.updated_count,
+        unchanged_count=movies_result.unchanged_count + series_result.unchanged_count,
         skipped_count=movies_result.skipped_count + series_result.skipped_count,
         failed_count=movies_result.failed_count + series_result.failed_count,
     )
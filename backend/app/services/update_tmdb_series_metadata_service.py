@@ -1,16 +1,24 @@
 import asyncio
 from dataclasses import dataclass, field
 from datetime import UTC, date, datetime
+from typing import Any
 
 import httpx
 from pydantic import ValidationError
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.client.tmdb_bridge_client import TmdbBridgeClientError, fetch_tmdb_series
+from app.client.bridge_scheduler import BridgeScheduler
+from app.client.http_pool import TMDB_BRIDGE_POOL, http_clients
+from app.client.tmdb_bridge_client import (
+    BridgeResponse,
+    TmdbBridgeClientError,
+    fetch_tmdb_series,
+    tmdb_series_url,
+)
 from app.config import logger
+from app.models.http_cache import HttpResponseCache
 from app.models.media import Episode, Season, Series
 from app.schemas.tmdb_bridge import (
     TmdbBridgeEpisodeResponse,
@@ -18,20 +26,30 @@ from app.schemas.tmdb_bridge import (
     TmdbBridgeSeriesResponse,
     TmdbMetadataUpdateResponse,
 )
+from app.services.http_cache_repository import (
+    cached_validators,
+    is_unchanged,
+    load_cache_entries,
+    needs_save,
+    save_cache_entries,
+)
+from app.services.season_episode_repository import SEASON_KEY, UPSERT_BATCH_SIZE, bulk_upsert
+from app.services.series_progress_repository import refresh_series_progress
 from app.services.series_utils import map_tmdb_series_status
 
-CONCURRENCY_LIMIT = 10
-
 
 @dataclass
 class _Counters:
     processed: int = field(default=0)
     updated: int = field(default=0)
     skipped: int = field(default=0)
+    unchanged: int = field(default=0)
     failed: int = field(default=0)
 
 
-async def update_series_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpdateResponse:
+async def update_series_tmdb_metadata(
+    session: AsyncSession, scheduler: BridgeScheduler | None = None
+) -> TmdbMetadataUpdateResponse:
     """Fetch TMDB metadata for all series with tmdb_id, update Series/Season/Episode."""
     query = (
         select(Series)
@@ -43,17 +61,27 @@ async def update_series_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpda
     )
     series_list = list((await session.execute(query)).scalars().all())
 
-    semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+    scheduler = scheduler or BridgeScheduler()
     counters = _Counters()
+    cache = await load_cache_entries(
+        session, [tmdb_series_url(s.tmdb_id) for s in series_list if s.tmdb_id]
+    )
+    # Applied (or revalidated) responses; their cache entries are upserted before commit
+    to_cache: list[BridgeResponse] = []
 
     # Phase 1: fetch from TMDB concurrently
-    async with httpx.AsyncClient() as http_client:
-        fetch_results = await asyncio.gather(
-            *[_fetch_one_series(s, semaphore, counters, http_client) for s in series_list],
-            return_exceptions=True,
-        )
+    http_client = await http_clients.get(TMDB_BRIDGE_POOL)
+    fetch_results = await asyncio.gather(
+        *[
+            _fetch_one_series(s, scheduler, counters, http_client, cache, to_cache)
+            for s in series_list
+        ],
+        return_exceptions=True,
+    )
 
     # Phase 2: apply DB writes sequentially (session is not concurrency-safe)
+    applied: list[tuple[Series, TmdbBridgeSeriesResponse]] = []
+    fields_changed: set[int] = set()
     for result in fetch_results:
         if isinstance(result, BaseException):
             logger.error("Unexpected error processing series: %s", result)
@@ -61,16 +89,25 @@ async def update_series_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpda
             continue
         if result is None:
             continue
-        series, payload = result
+        series, payload, response = result
         try:
-            changed = await _apply_tmdb_series_update(series, payload, session)
-            if changed:
-                counters.updated += 1
+            if _apply_series_fields(series, payload):
+                fields_changed.add(series.id)
+            series.tmdb_metadata_fetched_at = datetime.now(UTC)
+            series.tmdb_metadata_digest = response.digest
+            applied.append((series, payload))
+            to_cache.append(response)
         except Exception as e:
             logger.error("Unexpected error processing series: %s", e)
             counters.failed += 1
 
     try:
+        # Seasons and episodes of all applied series are written together
+        writes = await _write_seasons_and_episodes(session, applied)
+        counters.updated += len(fields_changed | writes.changed_series_ids)
+        # New seasons and episodes change the totals of the series_progress read model
+        await refresh_series_progress(session, writes.grown_series_ids)
+        await save_cache_entries(session, to_cache)
         await session.commit()
     except Exception as e:
         logger.error("TMDB series metadata commit failed: %s", e)
@@ -78,15 +115,18 @@ async def update_series_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpda
         raise
 
     logger.info(
-        "TMDB series metadata update done: processed=%d, updated=%d, skipped=%d, failed=%d",
+        "TMDB series metadata update done: "
+        "processed=%d, updated=%d, unchanged=%d, skipped=%d, failed=%d",
         counters.processed,
         counters.updated,
+        counters.unchanged,
         counters.skipped,
         counters.failed,
     )
     return TmdbMetadataUpdateResponse(
         processed_count=counters.processed,
         updated_count=counters.updated,
+        unchanged_count=counters.unchanged,
         skipped_count=counters.skipped,
         failed_count=counters.failed,
     )
@@ -94,47 +134,50 @@ async def update_series_tmdb_metadata(session: AsyncSession) -> TmdbMetadataUpda
 
 async def _fetch_one_series(
     series: Series,
-    semaphore: asyncio.Semaphore,
+    scheduler: BridgeScheduler,
     counters: _Counters,
     client: httpx.AsyncClient,
-) -> tuple[Series, TmdbBridgeSeriesResponse] | None:
-    """Fetch + validate TMDB data for one series. Returns (series, payload) or None."""
-    async with semaphore:
-        tmdb_id = series.tmdb_id
-        assert tmdb_id is not None  # guaranteed by WHERE tmdb_id IS NOT NULL
-        counters.processed += 1
+    cache: dict[str, HttpResponseCache],
+    to_cache: list[BridgeResponse],
+) -> tuple[Series, TmdbBridgeSeriesResponse, BridgeResponse] | None:
+    """Fetch + validate TMDB data for one series.
+
+    Returns (series, payload, response), or None when there is nothing to apply.
+    """
+    tmdb_id = series.tmdb_id
+    assert tmdb_id is not None  # guaranteed by WHERE tmdb_id IS NOT NULL
+    counters.processed += 1
+    cached = cache.get(tmdb_series_url(tmdb_id))
+    validators = cached_validators(cached, series.tmdb_metadata_digest)
 
-        try:
-            raw = await fetch_tmdb_series(tmdb_id, client=client)
-        except TmdbBridgeClientError as e:
-            logger.error("Skip tmdb_id=%s due to Bridge error: %s", tmdb_id, e.message)
-            counters.failed += 1
-            return None
-
-        if raw is None:
-            counters.skipped += 1
-            return None
+    try:
+        response = await scheduler.run(
+            lambda: fetch_tmdb_series(tmdb_id, client=client, validators=validators)
+        )
+    except TmdbBridgeClientError as e:
+        logger.error("Skip tmdb_id=%s due to Bridge error: %s", tmdb_id, e.message)
+        counters.failed += 1
+        return None
 
-        try:
-            payload = TmdbBridgeSeriesResponse.model_validate(raw)
-        except ValidationError as e:
-            logger.error("Bridge payload validation failed for series tmdb_id=%s: %s", tmdb_id, e)
-            counters.failed += 1
-            return None
+    if response is None:
+        counters.skipped += 1
+        return None
 
-        return series, payload
+    # Same payload as the one applied to this series last time — skip the apply phase entirely
+    if is_unchanged(response, series.tmdb_metadata_digest):
+        counters.unchanged += 1
+        if needs_save(response, cached):
+            to_cache.append(response)
+        return None
 
+    try:
+        payload = TmdbBridgeSeriesResponse.model_validate(response.data)
+    except ValidationError as e:
+        logger.error("Bridge payload validation failed for series tmdb_id=%s: %s", tmdb_id, e)
+        counters.failed += 1
+        return None
 
-async def _apply_tmdb_series_update(
-    series: Series,
-    payload: TmdbBridgeSeriesResponse,
-    session: AsyncSession,
-) -> bool:
-    """Apply field-level updates to series, then process seasons + episodes."""
-    changed = _apply_series_fields(series, payload)
-    changed |= await _process_seasons(series, payload.seasons, session)
-    series.tmdb_metadata_fetched_at = datetime.now(UTC)
-    return changed
+    return series, payload, response
 
 
 def _apply_series_fields(series: Series, payload: TmdbBridgeSeriesResponse) -> bool:
@@ -213,48 +256,148 @@ def _apply_series_fields(series: Series, payload: TmdbBridgeSeriesResponse) -> b
     return changed
 
 
-async def _process_seasons(
-    series: Series,
-    payload_seasons: list[TmdbBridgeSeasonResponse],
-    session: AsyncSession,
-) -> bool:
-    """Match by series_id + season_number, create new if missing."""
-    existing_by_num = {s.number: s for s in series.seasons}
-    changed = False
-
-    for season_payload in payload_seasons:
-        season = existing_by_num.get(season_payload.season_number)
-        if season is None:
-            season = Season(
-                series_id=series.id,
-                number=season_payload.season_number,
+@dataclass
+class _SeasonEpisodeWrites:
+    """Series whose seasons or episodes were written, and those that got new ones."""
+
+    changed_series_ids: set[int] = field(default_factory=set)
+    grown_series_ids: set[int] = field(default_factory=set)
+
+
+async def _write_seasons_and_episodes(
+    session: AsyncSession, applied: list[tuple[Series, TmdbBridgeSeriesResponse]]
+) -> _SeasonEpisodeWrites:
+    """
+    Create or update the seasons and episodes of the applied series in a few statements.
+
+    Seasons are matched by series_id + season_number and written with one bulk upsert;
+    new episodes are matched by season_id + episode_number and inserted with one
+    multi-row INSERT. Episodes have no unique (season_id, number) key to upsert on, so
+    existing (already loaded) episodes are updated field by field and flushed in batches
+    at commit.
+    """
+    writes = _SeasonEpisodeWrites()
+    # Read before the season upsert: it expires the seasons it rewrites, episodes included
+    existing_episodes = {
+        (season.id, ep.number): ep
+        for series, _ in applied
+        for season in series.seasons
+        for ep in season.episodes
+    }
+    season_ids = {
+        (series.id, season.number): season.id for series, _ in applied for season in series.seasons
+    }
+
+    season_rows = [
+        _season_row(series.id, season_payload)
+        for series, payload in applied
+        for season_payload in payload.seasons
+    ]
+    await _drop_taken_season_tmdb_ids(session, season_rows)
+    if season_rows:
+        result = await bulk_upsert(
+            session,
+            Season,
+            season_rows,
+            index_elements=SEASON_KEY,
+            fill=("tmdb_id", "overview", "poster_url"),
+            overwrite_non_null=("release_date", "vote_average"),
+        )
+        for series_id, number in result.ids:
+            writes.changed_series_ids.add(series_id)
+            if (series_id, number) not in season_ids:
+                writes.grown_series_ids.add(series_id)
+        season_ids.update(result.ids)
+
+    new_episode_rows: list[dict[str, Any]] = []
+    new_episode_keys: set[tuple[int, int]] = set()
+    for series, payload in applied:
+        for season_payload in payload.seasons:
+            season_id = season_ids.get((series.id, season_payload.season_number))
+            if season_id is None:
+                continue
+            for ep_payload in season_payload.episodes:
+                key = (season_id, ep_payload.episode_number)
+                ep = existing_episodes.get(key)
+                if ep is None:
+                    if key in new_episode_keys:
+                        continue
+                    new_episode_keys.add(key)
+                    new_episode_rows.append(_new_episode_row(season_id, ep_payload))
+                    writes.changed_series_ids.add(series.id)
+                    writes.grown_series_ids.add(series.id)
+                elif _apply_episode_fields(ep, ep_payload):
+                    writes.changed_series_ids.add(series.id)
+
+    claimed = {ep.tmdb_id for ep in existing_episodes.values() if ep.tmdb_id is not None}
+    await _drop_taken_episode_tmdb_ids(session, new_episode_rows, claimed)
+    for start in range(0, len(new_episode_rows), UPSERT_BATCH_SIZE):
+        await session.execute(insert(Episode), new_episode_rows[start : start + UPSERT_BATCH_SIZE])
+    return writes
+
+
+def _season_row(series_id: int, payload: TmdbBridgeSeasonResponse) -> dict[str, Any]:
+    """overview/poster_url/tmdb_id — fill-if-empty; release_date/vote_average — overwrite."""
+    return {
+        "series_id": series_id,
+        "number": payload.season_number,
+        "tmdb_id": payload.tmdb_id,
+        "overview": payload.overview or None,
+        "poster_url": payload.poster_url or None,
+        "release_date": _to_datetime(payload.air_date),
+        "vote_average": payload.vote_average,
+    }
+
+
+async def _drop_taken_season_tmdb_ids(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """Clear tmdb_ids owned by another season; one of them would abort the whole upsert."""
+    ids = {row["tmdb_id"] for row in rows if row["tmdb_id"] is not None}
+    if not ids:
+        return
+    owners = {
+        tmdb_id: (series_id, number)
+        for tmdb_id, series_id, number in await session.execute(
+            select(Season.tmdb_id, Season.series_id, Season.number).where(Season.tmdb_id.in_(ids))
+        )
+    }
+    for row in rows:
+        tmdb_id = row["tmdb_id"]
+        if tmdb_id is None:
+            continue
+        key = (row["series_id"], row["number"])
+        if owners.setdefault(tmdb_id, key) != key:
+            logger.warning(
+                "Duplicate season tmdb_id=%d for season %d of series %d, skipping",
+                tmdb_id,
+                row["number"],
+                row["series_id"],
             )
-            season.episodes = []
-            session.add(season)
-            await session.flush()
-            existing_by_num[season_payload.season_number] = season
-            changed = True
-
-        # tmdb_id: fill-if-empty with savepoint to catch unique constraint violation
-        if season_payload.tmdb_id is not None and season.tmdb_id is None:
-            try:
-                sp = await session.begin_nested()
-                season.tmdb_id = season_payload.tmdb_id
-                await session.flush()
-                await sp.commit()
-                changed = True
-            except IntegrityError:
-                await sp.rollback()
-                logger.warning(
-                    "Duplicate season tmdb_id=%d for season %s, skipping",
-                    season_payload.tmdb_id,
-                    season.id,
-                )
-
-        changed |= _apply_season_fields(season, season_payload)
-        changed |= _process_episodes(season, season_payload.episodes)
-
-    return changed
+            row["tmdb_id"] = None
+
+
+async def _drop_taken_episode_tmdb_ids(
+    session: AsyncSession, rows: list[dict[str, Any]], claimed: set[int]
+) -> None:
+    """Clear tmdb_ids of new episodes that another episode already has."""
+    ids = {row["tmdb_id"] for row in rows if row["tmdb_id"] is not None}
+    if not ids:
+        return
+    taken: set[int | None] = set(claimed)
+    taken.update(
+        (await session.execute(select(Episode.tmdb_id).where(Episode.tmdb_id.in_(ids))))
+        .scalars()
+        .all()
+    )
+    for row in rows:
+        if row["tmdb_id"] is None:
+            continue
+        if row["tmdb_id"] in taken:
+            logger.warning(
+                "Duplicate episode tmdb_id=%d, storing episode without it", row["tmdb_id"]
+            )
+            row["tmdb_id"] = None
+        else:
+            taken.add(row["tmdb_id"])
 
 
 def _apply_season_fields(season: Season, payload: TmdbBridgeSeasonResponse) -> bool:
@@ -285,36 +428,18 @@ def _apply_season_fields(season: Season, payload: TmdbBridgeSeasonResponse) -> b
     return changed
 
 
-def _process_episodes(
-    season: Season,
-    payload_episodes: list[TmdbBridgeEpisodeResponse],
-) -> bool:
-    """Match by season_id + episode_number, create new if missing."""
-    existing_by_num = {ep.number: ep for ep in season.episodes}
-    changed = False
-
-    for ep_payload in payload_episodes:
-        ep = existing_by_num.get(ep_payload.episode_number)
-        if ep is None:
-            ep = Episode(
-                season_id=season.id,
-                number=ep_payload.episode_number,
-                title=ep_payload.name or f"Episode {ep_payload.episode_number}",
-                tmdb_id=ep_payload.tmdb_episode_id,
-                episode_type=ep_payload.episode_type,
-                still_url=ep_payload.still_url,
-                overview=ep_payload.overview,
-                air_date=_to_datetime(ep_payload.air_date),
-                vote_average=(
-                    ep_payload.vote_average if (ep_payload.vote_average or 0) > 0 else None
-                ),
-            )
-            season.episodes.append(ep)
-            changed = True
-        else:
-            changed |= _apply_episode_fields(ep, ep_payload)
-
-    return changed
+def _new_episode_row(season_id: int, payload: TmdbBridgeEpisodeResponse) -> dict[str, Any]:
+    return {
+        "season_id": season_id,
+        "number": payload.episode_number,
+        "title": payload.name or f"Episode {payload.episode_number}",
+        "tmdb_id": payload.tmdb_episode_id,
+        "episode_type": payload.episode_type,
+        "still_url": payload.still_url,
+        "overview": payload.overview,
+        "air_date": _to_datetime(payload.air_date),
+        "vote_average": payload.vote_average if (payload.vote_average or 0) > 0 else None,
+    }
 
 
 def _apply_episode_fields(ep: Episode, payload: TmdbBridgeEpisodeResponse) -> bool:
@@ -8,6 +8,7 @@ from app.models.media import Episode, Media, MediaType, Season
 from app.models.user import User, WatchHistory, WatchStatus
 from app.schemas.error_codes import WatchErrorCode
 from app.schemas.watch_history import BulkWatchStatusResponse, ManualWatchStatus
+from app.services.series_progress_repository import refresh_series_progress
 
 
 async def _get_user_by_jellyfin_id(session: AsyncSession, jellyfin_user_id: str) -> User:
@@ -178,6 +179,7 @@ async def set_episode_watch_status(
     media_id: int = series_id
 
     wh, _ = await _upsert_watch_history(session, user.id, media_id, episode_id, status)
+    await refresh_series_progress(session, [series_id], [user.id])
     return wh
 
 
@@ -227,6 +229,7 @@ async def set_season_watch_status(
 
     media_id: int = season.series_id
     inserted, updated = await _bulk_upsert(session, user.id, media_id, episode_ids, status)
+    await refresh_series_progress(session, [media_id], [user.id])
 
     return BulkWatchStatusResponse(
         affected=inserted + updated,
@@ -290,6 +293,7 @@ async def set_series_watch_status(
     episode_ids = list(ep_ids_result.scalars().all())
 
     inserted, updated = await _bulk_upsert(session, user.id, series_media_id, episode_ids, status)
+    await refresh_series_progress(session, [series_media_id], [user.id])
 
     return BulkWatchStatusResponse(
         affected=inserted + updated,
@@ -1,4 +1,5 @@
 import hashlib
+import hmac
 import os
 import secrets
 import string
@@ -49,3 +50,21 @@ def generate_recovery_code() -> str:
     alphabet = string.ascii_uppercase + string.digits
     segments = ["".join(secrets.choice(alphabet) for _ in range(5)) for _ in range(4)]
     return "-".join(segments)
+
+
+def sign_webhook_payload(body: bytes, secret: str) -> str:
+    """HMAC-SHA256 signature of a webhook body as sent in X-Webhook-Signature."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_webhook_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    if not signature:
+        return False
+    expected = sign_webhook_payload(body, secret)
+    if not signature.startswith("sha256="):
+        signature = f"sha256={signature}"
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters (TypeError)
+    return hmac.compare_digest(
+        expected.encode(), signature.lower().encode("utf-8", "surrogateescape")
+    )
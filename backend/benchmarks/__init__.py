@@ -0,0 +1 @@
+"""Scale benchmarks for the sync jobs (not part of the application image's runtime)."""
@@ -0,0 +1,93 @@
+"""Sync job benchmarks.
+
+    python -m benchmarks run --drop-database --sizes 1000,10000 --output report.json
+    python -m benchmarks compare report.json baseline.json --threshold 0.1
+
+``run`` wipes the database named by the ``POSTGRES_*`` variables. With
+``--baseline`` it compares right away; any regression makes the exit code 1.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.models.schedule import SyncJobType
+from benchmarks.report import BenchmarkReport, compare_reports
+from benchmarks.sync_jobs import DEFAULT_SIZES, PHASES, BenchmarkConfig, run_benchmarks
+
+
+def _int_list(value: str) -> tuple[int, ...]:
+    return tuple(int(v) for v in value.split(",") if v)
+
+
+def _job_list(value: str) -> tuple[SyncJobType, ...]:
+    return tuple(SyncJobType(v) for v in value.split(",") if v)
+
+
+def _print_comparison(current: BenchmarkReport, baseline: Path, threshold: float) -> int:
+    regressions = compare_reports(current, BenchmarkReport.load(baseline), threshold)
+    if not regressions:
+        print(f"No regressions above {threshold:.0%} against {baseline}")
+        return 0
+    print(f"{len(regressions)} regression(s) above {threshold:.0%} against {baseline}:")
+    for change in regressions:
+        print(f"  {change}")
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="benchmark the sync jobs")
+    run.add_argument("--drop-database", action="store_true", help="confirm the DB may be wiped")
+    run.add_argument("--sizes", type=_int_list, default=DEFAULT_SIZES)
+    run.add_argument("--jobs", type=_job_list, default=tuple(SyncJobType))
+    run.add_argument("--cold-only", action="store_true")
+    run.add_argument("--users", type=int, default=3)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--port", type=int, default=9100, help="port of the fake upstreams")
+    run.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    run.add_argument("--output", type=Path, default=Path("benchmark-report.json"))
+    run.add_argument("--baseline", type=Path)
+    run.add_argument("--threshold", type=float, default=0.1)
+    run.add_argument(
+        "upstream_args", nargs="*", help="extra fake upstream options after --, e.g. --latency=0.01"
+    )
+
+    compare = sub.add_parser("compare", help="compare a report with a baseline")
+    compare.add_argument("report", type=Path)
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return _print_comparison(BenchmarkReport.load(args.report), args.baseline, args.threshold)
+
+    if not args.drop_database:
+        parser.error("run wipes the POSTGRES_* database; pass --drop-database to confirm")
+    config = BenchmarkConfig(
+        sizes=args.sizes,
+        jobs=args.jobs,
+        phases=PHASES[:1] if args.cold_only else PHASES,
+        users=args.users,
+        seed=args.seed,
+        port=args.port,
+        trace_memory=not args.no_memory,
+        upstream_args=args.upstream_args,
+    )
+    report = asyncio.run(run_benchmarks(config))
+    report.save(args.output)
+    print(f"Report written to {args.output}")
+    if args.baseline is not None:
+        return _print_comparison(report, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Local stand-ins for Jellyfin, Sonarr, Radarr and the TMDB Bridge."""
+
+from benchmarks.fake_upstreams.app import FakeUpstreamSettings, create_fake_upstreams_app
+from benchmarks.fake_upstreams.library import SyntheticLibrary
+
+__all__ = ["FakeUpstreamSettings", "SyntheticLibrary", "create_fake_upstreams_app"]
@@ -0,0 +1,43 @@
+"""Run the fake upstreams: ``python -m benchmarks.fake_upstreams --items 10000``."""
+
+import argparse
+
+import uvicorn
+
+from benchmarks.fake_upstreams import (
+    FakeUpstreamSettings,
+    SyntheticLibrary,
+    create_fake_upstreams_app,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000, help="movies (and ~episodes) count")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--page-cap", type=int, default=None, help="max Jellyfin page size")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    library = SyntheticLibrary.of_size(args.items, seed=args.seed, users=args.users)
+    settings = FakeUpstreamSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        page_cap=args.page_cap,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_fake_upstreams_app(library, settings), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
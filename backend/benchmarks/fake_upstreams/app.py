@@ -0,0 +1,334 @@
+"""ASGI app that stands in for Jellyfin, Sonarr, Radarr and the TMDB Bridge.
+
+All four services are served by one app under path prefixes, so a single process
+covers a whole benchmark run::
+
+    Jellyfin  ServiceConfig.url = http://localhost:9000/jellyfin
+    Radarr    ServiceConfig.url = http://localhost:9000/radarr
+    Sonarr    ServiceConfig.url = http://localhost:9000/sonarr
+    Bridge    BRIDGE_BASE_URL   = http://localhost:9000/bridge
+
+API keys are accepted but not checked. Only the endpoints and fields the project's
+clients use are implemented; payloads come from :class:`SyntheticLibrary`.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fake_upstreams.library import EpisodeRef, SyntheticLibrary
+
+# Items per streamed body chunk: one chunk per item makes ASGI overhead dominate
+_STREAM_CHUNK_ITEMS = 500
+
+
+@dataclass(frozen=True)
+class FakeUpstreamSettings:
+    """Behaviour knobs of the fake servers.
+
+    ``latency`` (+ up to ``jitter``) seconds are added to every response.
+    ``page_cap`` truncates Jellyfin pages regardless of the requested Limit, like
+    servers with a hard maximum. ``rate_limit_rate`` of requests get 429 with
+    ``Retry-After: retry_after`` and ``error_rate`` of requests get 503.
+    Fault injection draws from a generator seeded with ``seed``.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    page_cap: int | None = None
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+def _parse_since(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {value}") from e
+
+
+def _types(value: str | None) -> set[str]:
+    return {t.strip() for t in value.split(",") if t.strip()} if value else set()
+
+
+def _stream_json_list(items: Iterator[dict[str, Any]]) -> StreamingResponse:
+    """Large plain-list responses (Radarr/Sonarr) are streamed item by item."""
+
+    def body() -> Iterator[bytes]:
+        yield b"["
+        chunk: list[str] = []
+        separator = ""
+        for item in items:
+            chunk.append(json.dumps(item))
+            if len(chunk) == _STREAM_CHUNK_ITEMS:
+                yield (separator + ",".join(chunk)).encode()
+                chunk, separator = [], ","
+        if chunk:
+            yield (separator + ",".join(chunk)).encode()
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+class _JellyfinCatalog:
+    """Index lists behind /Items queries, cached per (type, MinDateLastSaved)."""
+
+    def __init__(self, library: SyntheticLibrary):
+        self.library = library
+        self._filtered: dict[tuple[str, datetime], list[int]] = {}
+
+    def _count(self, item_type: str) -> int:
+        lib = self.library
+        return {"Movie": lib.movies, "Series": lib.series, "Episode": lib.episode_count}[item_type]
+
+    def _item(self, item_type: str, position: int) -> dict[str, Any]:
+        lib = self.library
+        if item_type == "Movie":
+            return lib.jellyfin_movie(position)
+        if item_type == "Series":
+            return lib.jellyfin_series(position)
+        return lib.jellyfin_episode(lib.episode_at(position))
+
+    def _saved_at(self, item_type: str, position: int) -> datetime:
+        lib = self.library
+        if item_type == "Movie":
+            return lib.movie_saved_at(position)
+        if item_type == "Series":
+            return lib.series_saved_at(position)
+        return lib.episode_saved_at(lib.episode_at(position))
+
+    def positions(self, item_types: set[str], since: datetime | None) -> list[tuple[str, int]]:
+        result: list[tuple[str, int]] = []
+        for item_type in ("Movie", "Series", "Episode"):
+            if item_type not in item_types:
+                continue
+            if since is None:
+                result.extend((item_type, p) for p in range(self._count(item_type)))
+                continue
+            key = (item_type, since)
+            if key not in self._filtered:
+                self._filtered[key] = [
+                    p
+                    for p in range(self._count(item_type))
+                    if self._saved_at(item_type, p) >= since
+                ]
+            result.extend((item_type, p) for p in self._filtered[key])
+        return result
+
+    def item(self, ref: tuple[str, int]) -> dict[str, Any]:
+        return self._item(*ref)
+
+
+def _jellyfin_router(library: SyntheticLibrary, settings: FakeUpstreamSettings) -> APIRouter:
+    router = APIRouter(prefix="/jellyfin")
+    catalog = _JellyfinCatalog(library)
+
+    def page(
+        refs: list[Any], render: Callable[[Any], dict[str, Any]], start: int, limit: int | None
+    ) -> dict[str, Any]:
+        size = len(refs) if limit is None else limit
+        if settings.page_cap is not None:
+            size = min(size, settings.page_cap)
+        return {
+            "Items": [render(ref) for ref in refs[start : start + size]],
+            "TotalRecordCount": len(refs),
+            "StartIndex": start,
+        }
+
+    @router.get("/Users")
+    async def users() -> list[dict[str, Any]]:
+        return [library.jellyfin_user(u) for u in range(library.users)]
+
+    # The clients request both /Items and /Items/?api_key=…
+    @router.get("/Items")
+    @router.get("/Items/")
+    async def items(
+        include_types: str | None = Query(None, alias="IncludeItemTypes"),
+        start: int = Query(0, alias="StartIndex", ge=0),
+        limit: int | None = Query(None, alias="Limit", ge=0),
+        min_saved: str | None = Query(None, alias="MinDateLastSaved"),
+    ) -> dict[str, Any]:
+        types = _types(include_types) or {"Movie", "Series", "Episode"}
+        refs = catalog.positions(types, _parse_since(min_saved))
+        return page(refs, catalog.item, start, limit)
+
+    @router.get("/Shows/{series_id}/Seasons")
+    async def seasons(
+        series_id: str,
+        start: int = Query(0, alias="StartIndex", ge=0),
+        limit: int | None = Query(None, alias="Limit", ge=0),
+    ) -> dict[str, Any]:
+        resolved = library.resolve(series_id)
+        if resolved is None or resolved[0] != "Series":
+            raise HTTPException(status_code=404, detail="Series not found")
+        numbers = list(range(1, library.seasons_per_series + 1))
+        return page(numbers, lambda s: library.jellyfin_season(resolved[1], s), start, limit)
+
+    @router.get("/Shows/{series_id}/Episodes")
+    async def episodes(
+        series_id: str,
+        start: int = Query(0, alias="StartIndex", ge=0),
+        limit: int | None = Query(None, alias="Limit", ge=0),
+    ) -> dict[str, Any]:
+        resolved = library.resolve(series_id)
+        if resolved is None or resolved[0] != "Series":
+            raise HTTPException(status_code=404, detail="Series not found")
+        return page(library.episodes_of(resolved[1]), library.jellyfin_episode, start, limit)
+
+    @router.get("/Users/{user_id}/Items")
+    async def user_items(
+        user_id: str,
+        include_types: str | None = Query(None, alias="IncludeItemTypes"),
+        ids: str | None = Query(None, alias="Ids"),
+        start: int = Query(0, alias="StartIndex", ge=0),
+        limit: int | None = Query(None, alias="Limit", ge=0),
+        min_saved: str | None = Query(None, alias="MinDateLastSavedForUser"),
+    ) -> dict[str, Any]:
+        resolved_user = library.resolve(user_id)
+        if resolved_user is None or resolved_user[0] != "User":
+            raise HTTPException(status_code=404, detail="User not found")
+        user = resolved_user[1]
+        types = _types(include_types) or {"Movie", "Series", "Episode"}
+
+        if ids:
+            refs: list[tuple[str, int]] = []
+            for item_id in ids.split(","):
+                resolved = library.resolve(item_id)
+                if resolved is None or resolved[0] not in types:
+                    continue
+                kind, ref = resolved
+                position = (
+                    library.sonarr_episode_id(ref) - 1 if isinstance(ref, EpisodeRef) else ref
+                )
+                refs.append((kind, position))
+        else:
+            refs = catalog.positions(types, None)
+
+        def with_user_data(ref: tuple[str, int]) -> tuple[dict[str, Any], datetime | None]:
+            item = catalog.item(ref)
+            user_data, played_at = library.user_data(user, item["Id"])
+            item["UserData"] = user_data
+            return item, played_at if "LastPlayedDate" in user_data else None
+
+        since = _parse_since(min_saved)
+        if since is not None:
+            # Only items whose user data was saved after the watermark are listed
+            refs = [
+                ref
+                for ref in refs
+                if (played_at := with_user_data(ref)[1]) is not None and played_at >= since
+            ]
+        return page(refs, lambda ref: with_user_data(ref)[0], start, limit)
+
+    return router
+
+
+def _arr_routers(library: SyntheticLibrary) -> list[APIRouter]:
+    radarr = APIRouter(prefix="/radarr/api/v3")
+    sonarr = APIRouter(prefix="/sonarr/api/v3")
+
+    @radarr.get("/movie")
+    async def radarr_movies() -> StreamingResponse:
+        return _stream_json_list(library.radarr_movie(i) for i in range(library.movies))
+
+    @radarr.get("/movie/{movie_id}")
+    async def radarr_movie(movie_id: int) -> dict[str, Any]:
+        if not 1 <= movie_id <= library.movies:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        return library.radarr_movie(movie_id - 1)
+
+    @sonarr.get("/series")
+    async def sonarr_series_list() -> StreamingResponse:
+        return _stream_json_list(library.sonarr_series(i) for i in range(library.series))
+
+    @sonarr.get("/series/{series_id}")
+    async def sonarr_series(series_id: int) -> dict[str, Any]:
+        if not 1 <= series_id <= library.series:
+            raise HTTPException(status_code=404, detail="Series not found")
+        return library.sonarr_series(series_id - 1)
+
+    @sonarr.get("/episode")
+    async def sonarr_episodes(series_id: int = Query(alias="seriesId")) -> list[dict[str, Any]]:
+        if not 1 <= series_id <= library.series:
+            return []
+        return [library.sonarr_episode(ref) for ref in library.episodes_of(series_id - 1)]
+
+    return [radarr, sonarr]
+
+
+def _bridge_router(library: SyntheticLibrary) -> APIRouter:
+    router = APIRouter(prefix="/bridge/tmdb")
+
+    def conditional(request: Request, data: dict[str, Any]) -> Response:
+        body = json.dumps(data, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    @router.get("/movie/{tmdb_id}")
+    async def movie(tmdb_id: int, request: Request) -> Response:
+        index = tmdb_id - library.movie_tmdb_id(0)
+        if not 0 <= index < library.movies:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        return conditional(request, library.bridge_movie(index))
+
+    @router.get("/tv/{tmdb_id}")
+    async def tv(tmdb_id: int, request: Request) -> Response:
+        index = tmdb_id - library.series_tmdb_id(0)
+        if not 0 <= index < library.series:
+            raise HTTPException(status_code=404, detail="Series not found")
+        return conditional(request, library.bridge_series(index))
+
+    return router
+
+
+def create_fake_upstreams_app(
+    library: SyntheticLibrary | None = None, settings: FakeUpstreamSettings | None = None
+) -> FastAPI:
+    """Build the fake upstream app for ``library`` with the given fault ``settings``."""
+    library = library or SyntheticLibrary()
+    settings = settings or FakeUpstreamSettings()
+    faults = random.Random(settings.seed)
+
+    app = FastAPI(title="Fake media upstreams", openapi_url=None)
+    app.state.library = library
+    app.state.settings = settings
+    app.state.requests = 0
+
+    @app.middleware("http")
+    async def inject_faults(
+        request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        app.state.requests += 1
+        delay = settings.latency + faults.uniform(0, settings.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = faults.random()
+        if roll < settings.rate_limit_rate:
+            return JSONResponse(
+                {"detail": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": f"{settings.retry_after:g}"},
+            )
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            return JSONResponse({"detail": "Service Unavailable"}, status_code=503)
+        return await call_next(request)
+
+    app.include_router(_jellyfin_router(library, settings))
+    for router in _arr_routers(library):
+        app.include_router(router)
+    app.include_router(_bridge_router(library))
+    return app
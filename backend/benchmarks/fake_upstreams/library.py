@@ -0,0 +1,383 @@
+"""Deterministic synthetic media library shared by the fake upstream servers.
+
+Nothing is stored: every movie, series, season, episode and per-user play state is
+derived from ``(seed, kind, index)`` on demand, so a 100k-item library costs no
+memory and the same seed always produces byte-identical payloads. Jellyfin ids
+encode the item kind and index, which lets the servers resolve ``/Shows/{id}``
+or ``Ids=`` lookups without a reverse index.
+
+The four upstreams describe the same titles: Radarr movie ``i`` and Jellyfin movie
+``i`` share TMDB/IMDb ids, as do Sonarr and Jellyfin series, so imports from
+different services meet in identity resolution exactly as on a real install.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+GENRES = ("Drama", "Comedy", "Thriller", "Sci-Fi", "Animation", "Documentary", "Crime")
+MOVIE_STATUSES = ("released", "released", "released", "inCinemas", "announced")
+SERIES_STATUSES = ("continuing", "ended", "ended", "upcoming")
+
+# Kind tags encoded into the first byte of Jellyfin ids
+_MOVIE, _SERIES, _SEASON, _EPISODE, _USER = 1, 2, 3, 4, 5
+_MAX_SEASONS = 100
+_MAX_EPISODES = 1000
+
+TICKS_PER_SECOND = 10_000_000
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
+
+
+@dataclass(frozen=True)
+class EpisodeRef:
+    series: int
+    season: int
+    number: int
+
+
+@dataclass(frozen=True)
+class SyntheticLibrary:
+    """Synthetic catalogue of ``movies`` films and ``series`` shows.
+
+    Every series has ``seasons_per_series`` seasons of ``episodes_per_season``
+    episodes; ``users`` Jellyfin users have watched roughly ``watched_ratio`` of it.
+    Items were last saved within ``history_days`` before ``epoch``.
+    """
+
+    movies: int = 1000
+    series: int = 30
+    seasons_per_series: int = 3
+    episodes_per_season: int = 10
+    users: int = 3
+    watched_ratio: float = 0.4
+    seed: int = 0
+    epoch: datetime = datetime(2026, 1, 1, tzinfo=UTC)
+    history_days: int = 365
+
+    @classmethod
+    def of_size(cls, items: int, *, seed: int = 0, users: int = 3) -> "SyntheticLibrary":
+        """Library of ``items`` movies plus about as many episodes."""
+        return cls(movies=items, series=max(1, items // 30), users=users, seed=seed)
+
+    @property
+    def episode_count(self) -> int:
+        return self.series * self.seasons_per_series * self.episodes_per_season
+
+    # --- ids ---
+
+    def _jellyfin_id(self, kind: int, index: int) -> str:
+        return f"{kind:02x}{self.seed:06x}{index:024x}"
+
+    def _parse_jellyfin_id(self, item_id: str) -> tuple[int, int] | None:
+        item_id = item_id.replace("-", "").lower()
+        if len(item_id) != 32:
+            return None
+        try:
+            kind, seed, index = int(item_id[:2], 16), int(item_id[2:8], 16), int(item_id[8:], 16)
+        except ValueError:
+            return None
+        return (kind, index) if seed == self.seed else None
+
+    def movie_id(self, i: int) -> str:
+        return self._jellyfin_id(_MOVIE, i)
+
+    def series_id(self, i: int) -> str:
+        return self._jellyfin_id(_SERIES, i)
+
+    def season_id(self, series: int, season: int) -> str:
+        return self._jellyfin_id(_SEASON, series * _MAX_SEASONS + season)
+
+    def episode_id(self, ref: EpisodeRef) -> str:
+        index = (ref.series * _MAX_SEASONS + ref.season) * _MAX_EPISODES + ref.number
+        return self._jellyfin_id(_EPISODE, index)
+
+    def user_id(self, u: int) -> str:
+        return self._jellyfin_id(_USER, u)
+
+    def resolve(self, item_id: str) -> tuple[str, Any] | None:
+        """Map a Jellyfin id back to ``("Movie", i)``, ``("Series", i)``, ``("Episode", ref)``…"""
+        parsed = self._parse_jellyfin_id(item_id)
+        if parsed is None:
+            return None
+        kind, index = parsed
+        if kind == _MOVIE and index < self.movies:
+            return "Movie", index
+        if kind == _SERIES and index < self.series:
+            return "Series", index
+        if kind == _SEASON:
+            series, season = divmod(index, _MAX_SEASONS)
+            if series < self.series and 1 <= season <= self.seasons_per_series:
+                return "Season", (series, season)
+        if kind == _EPISODE:
+            rest, number = divmod(index, _MAX_EPISODES)
+            series, season = divmod(rest, _MAX_SEASONS)
+            ref = EpisodeRef(series, season, number)
+            if self.has_episode(ref):
+                return "Episode", ref
+        if kind == _USER and index < self.users:
+            return "User", index
+        return None
+
+    def has_episode(self, ref: EpisodeRef) -> bool:
+        return (
+            0 <= ref.series < self.series
+            and 1 <= ref.season <= self.seasons_per_series
+            and 1 <= ref.number <= self.episodes_per_season
+        )
+
+    def episodes_of(self, series: int) -> list[EpisodeRef]:
+        return [
+            EpisodeRef(series, season, number)
+            for season in range(1, self.seasons_per_series + 1)
+            for number in range(1, self.episodes_per_season + 1)
+        ]
+
+    def episode_at(self, position: int) -> EpisodeRef:
+        """Episode ``position`` of the library ordered by series, season and number."""
+        per_series = self.seasons_per_series * self.episodes_per_season
+        series, rest = divmod(position, per_series)
+        season, number = divmod(rest, self.episodes_per_season)
+        return EpisodeRef(series, season + 1, number + 1)
+
+    def sonarr_episode_id(self, ref: EpisodeRef) -> int:
+        per_series = self.seasons_per_series * self.episodes_per_season
+        return ref.series * per_series + (ref.season - 1) * self.episodes_per_season + ref.number
+
+    # --- deterministic attributes ---
+
+    def _rng(self, *key: object) -> random.Random:
+        return random.Random(":".join(map(str, (self.seed, *key))))
+
+    def _last_saved(self, *key: object) -> datetime:
+        offset = self._rng("saved", *key).randrange(self.history_days * 24 * 3600)
+        return self.epoch - timedelta(seconds=offset)
+
+    def movie_tmdb_id(self, i: int) -> int:
+        return 100_000 + i
+
+    def series_tmdb_id(self, i: int) -> int:
+        return 500_000 + i
+
+    def _release(self, rng: random.Random) -> date:
+        return date(1970, 1, 1) + timedelta(days=rng.randrange(56 * 365))
+
+    def movie_saved_at(self, i: int) -> datetime:
+        return self._last_saved("movie", i)
+
+    def series_saved_at(self, i: int) -> datetime:
+        return self._last_saved("series", i)
+
+    def episode_saved_at(self, ref: EpisodeRef) -> datetime:
+        return self._last_saved("episode", ref.series, ref.season, ref.number)
+
+    # --- Jellyfin payloads ---
+
+    def jellyfin_movie(self, i: int) -> dict[str, Any]:
+        rng = self._rng("movie", i)
+        released = self._release(rng)
+        return {
+            "Id": self.movie_id(i),
+            "Name": f"Synthetic Movie {i}",
+            "Type": "Movie",
+            "ProductionYear": released.year,
+            "PremiereDate": f"{released.isoformat()}T00:00:00.0000000Z",
+            "ProviderIds": {"Tmdb": str(self.movie_tmdb_id(i)), "Imdb": f"tt{1_000_000 + i}"},
+            "DateLastSaved": _iso(self.movie_saved_at(i)),
+        }
+
+    def jellyfin_series(self, i: int) -> dict[str, Any]:
+        rng = self._rng("series", i)
+        premiered = self._release(rng)
+        return {
+            "Id": self.series_id(i),
+            "Name": f"Synthetic Series {i}",
+            "Type": "Series",
+            "ProductionYear": premiered.year,
+            "PremiereDate": f"{premiered.isoformat()}T00:00:00.0000000Z",
+            "Status": "Continuing" if rng.random() < 0.3 else "Ended",
+            "ProviderIds": {
+                "Tmdb": str(self.series_tmdb_id(i)),
+                "Imdb": f"tt{5_000_000 + i}",
+                "Tvdb": str(300_000 + i),
+            },
+            "DateLastSaved": _iso(self.series_saved_at(i)),
+        }
+
+    def jellyfin_season(self, series: int, season: int) -> dict[str, Any]:
+        return {
+            "Id": self.season_id(series, season),
+            "Name": f"Season {season}",
+            "Type": "Season",
+            "IndexNumber": season,
+            "SeriesId": self.series_id(series),
+        }
+
+    def _air_date(self, ref: EpisodeRef) -> date:
+        rng = self._rng("series", ref.series)
+        premiered = self._release(rng)
+        return premiered + timedelta(days=365 * (ref.season - 1) + 7 * (ref.number - 1))
+
+    def jellyfin_episode(self, ref: EpisodeRef) -> dict[str, Any]:
+        return {
+            "Id": self.episode_id(ref),
+            "Name": f"Episode {ref.season}x{ref.number:02d}",
+            "Type": "Episode",
+            "SeriesId": self.series_id(ref.series),
+            "SeasonId": self.season_id(ref.series, ref.season),
+            "ParentIndexNumber": ref.season,
+            "IndexNumber": ref.number,
+            "PremiereDate": f"{self._air_date(ref).isoformat()}T00:00:00.0000000Z",
+            "ProviderIds": {},
+            "DateLastSaved": _iso(self.episode_saved_at(ref)),
+        }
+
+    def jellyfin_user(self, u: int) -> dict[str, Any]:
+        return {"Id": self.user_id(u), "Name": f"user{u}", "HasPassword": True}
+
+    def user_data(self, user: int, item_id: str) -> tuple[dict[str, Any], datetime]:
+        """UserData block of one item for one user and its DateLastSavedForUser."""
+        rng = self._rng("userdata", user, item_id)
+        roll = rng.random()
+        played_at = self.epoch - timedelta(seconds=rng.randrange(self.history_days * 24 * 3600))
+        data: dict[str, Any] = {"Played": False, "PlaybackPositionTicks": 0, "Key": item_id}
+        if roll < self.watched_ratio:
+            data.update(Played=True, LastPlayedDate=_iso(played_at))
+        elif roll < self.watched_ratio + 0.1:
+            ticks = rng.randrange(60, 3600) * TICKS_PER_SECOND
+            data.update(PlaybackPositionTicks=ticks, LastPlayedDate=_iso(played_at))
+        return data, played_at
+
+    # --- Radarr / Sonarr payloads ---
+
+    @staticmethod
+    def _images(kind: str, i: int) -> list[dict[str, Any]]:
+        return [
+            {"coverType": "poster", "remoteUrl": f"https://image.example/{kind}/{i}/poster.jpg"}
+        ]
+
+    def radarr_movie(self, i: int) -> dict[str, Any]:
+        rng = self._rng("movie", i)
+        released = self._release(rng)
+        return {
+            "id": i + 1,
+            "title": f"Synthetic Movie {i}",
+            "tmdbId": self.movie_tmdb_id(i),
+            "imdbId": f"tt{1_000_000 + i}",
+            "inCinemas": f"{released.isoformat()}T00:00:00Z",
+            "year": released.year,
+            "status": rng.choice(MOVIE_STATUSES),
+            "images": self._images("movie", i),
+            "genres": rng.sample(GENRES, 2),
+            "ratings": {"value": round(rng.uniform(3, 9), 1), "votes": rng.randrange(10, 50_000)},
+            "hasFile": True,
+        }
+
+    def sonarr_series(self, i: int) -> dict[str, Any]:
+        rng = self._rng("series", i)
+        premiered = self._release(rng)
+        return {
+            "id": i + 1,
+            "title": f"Synthetic Series {i}",
+            "tmdbId": self.series_tmdb_id(i),
+            "imdbId": f"tt{5_000_000 + i}",
+            "tvdbId": 300_000 + i,
+            "firstAired": f"{premiered.isoformat()}T00:00:00Z",
+            "year": premiered.year,
+            "status": rng.choice(SERIES_STATUSES),
+            "images": self._images("series", i),
+            "genres": rng.sample(GENRES, 2),
+            "ratings": {"value": round(rng.uniform(3, 9), 1), "votes": rng.randrange(10, 50_000)},
+            "seasons": [
+                {"seasonNumber": season, "monitored": True}
+                for season in range(1, self.seasons_per_series + 1)
+            ],
+        }
+
+    def sonarr_episode(self, ref: EpisodeRef) -> dict[str, Any]:
+        return {
+            "id": self.sonarr_episode_id(ref),
+            "seriesId": ref.series + 1,
+            "seasonNumber": ref.season,
+            "episodeNumber": ref.number,
+            "title": f"Episode {ref.season}x{ref.number:02d}",
+            "overview": f"Synthetic episode {ref.number} of season {ref.season}.",
+            "airDateUtc": f"{self._air_date(ref).isoformat()}T20:00:00Z",
+            "hasFile": True,
+        }
+
+    # --- TMDB Bridge payloads ---
+
+    def bridge_movie(self, i: int) -> dict[str, Any]:
+        rng = self._rng("movie", i)
+        released = self._release(rng)
+        return {
+            "tmdb_id": self.movie_tmdb_id(i),
+            "title": f"Synthetic Movie {i}",
+            "original_title": f"Synthetic Movie {i}",
+            "overview": f"Overview of synthetic movie {i}.",
+            "poster_path": f"/movie{i}.jpg",
+            "backdrop_path": f"/movie{i}-backdrop.jpg",
+            "status": "Released",
+            "release_date": released.isoformat(),
+            "vote_average": round(rng.uniform(3, 9), 1),
+            "vote_count": rng.randrange(10, 50_000),
+            "genres": [{"id": GENRES.index(g), "name": g} for g in rng.sample(GENRES, 2)],
+            "fetched_at": _iso(self.epoch),
+            "poster_url": f"https://image.example/movie/{i}/poster.jpg",
+        }
+
+    def bridge_series(self, i: int) -> dict[str, Any]:
+        rng = self._rng("series", i)
+        premiered = self._release(rng)
+        seasons: list[dict[str, Any]] = []
+        for season in range(1, self.seasons_per_series + 1):
+            episodes = [
+                {
+                    "tmdb_episode_id": 9_000_000 + self.sonarr_episode_id(ref),
+                    "episode_number": ref.number,
+                    "season_number": season,
+                    "name": f"Episode {season}x{ref.number:02d}",
+                    "overview": f"Synthetic episode {ref.number} of season {season}.",
+                    "still_url": None,
+                    "air_date": self._air_date(ref).isoformat(),
+                    "episode_type": "standard",
+                    "vote_average": 7.5,
+                }
+                for ref in (
+                    EpisodeRef(i, season, n) for n in range(1, self.episodes_per_season + 1)
+                )
+            ]
+            seasons.append(
+                {
+                    "tmdb_id": 8_000_000 + i * _MAX_SEASONS + season,
+                    "season_number": season,
+                    "overview": None,
+                    "poster_path": None,
+                    "air_date": episodes[0]["air_date"],
+                    "vote_average": None,
+                    "poster_url": None,
+                    "episodes": episodes,
+                }
+            )
+        return {
+            "tmdb_id": self.series_tmdb_id(i),
+            "name": f"Synthetic Series {i}",
+            "original_name": f"Synthetic Series {i}",
+            "overview": f"Overview of synthetic series {i}.",
+            "poster_path": f"/series{i}.jpg",
+            "backdrop_path": None,
+            "status": "Ended",
+            "first_air_date": premiered.isoformat(),
+            "last_air_date": seasons[-1]["episodes"][-1]["air_date"],
+            "number_of_seasons": self.seasons_per_series,
+            "number_of_episodes": self.seasons_per_series * self.episodes_per_season,
+            "vote_average": round(rng.uniform(3, 9), 1),
+            "genres": [{"id": GENRES.index(g), "name": g} for g in rng.sample(GENRES, 2)],
+            "seasons": seasons,
+            "fetched_at": _iso(self.epoch),
+            "poster_url": f"https://image.example/series/{i}/poster.jpg",
+        }
@@ -0,0 +1,106 @@
+"""JSON benchmark reports and comparison against a stored baseline."""
+
+import json
+import platform
+import subprocess
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.metrics import JobMeasurement
+
+REPORT_VERSION = 1
+
+# Metrics compared with the baseline; relative growth above the threshold is a regression
+COMPARED_METRICS = ("wall_seconds", "statements", "rows_written", "peak_memory_bytes")
+# Timings below this many seconds are noise and never flagged
+MIN_COMPARED_SECONDS = 0.05
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+@dataclass
+class BenchmarkReport:
+    results: list[JobMeasurement] = field(default_factory=list)
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def new(cls, **meta: Any) -> "BenchmarkReport":
+        return cls(
+            meta={
+                "version": REPORT_VERSION,
+                "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                **meta,
+            }
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"meta": self.meta, "results": [asdict(r) for r in self.results]}
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    @classmethod
+    def load(cls, path: Path) -> "BenchmarkReport":
+        data = json.loads(path.read_text())
+        return cls(
+            results=[JobMeasurement(**r) for r in data.get("results", [])],
+            meta=data.get("meta", {}),
+        )
+
+
+@dataclass(frozen=True)
+class MetricChange:
+    job: str
+    items: int
+    phase: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.job} [{self.items} {self.phase}] {self.metric}: "
+            f"{self.baseline:g} -> {self.current:g} ({self.ratio - 1:+.0%})"
+        )
+
+
+def compare_reports(
+    current: BenchmarkReport, baseline: BenchmarkReport, threshold: float = 0.1
+) -> list[MetricChange]:
+    """Metrics of ``current`` that grew by more than ``threshold`` over ``baseline``.
+
+    Runs are matched by (job, items, phase); runs missing from either side are
+    skipped. A run that failed now but passed in the baseline is always reported.
+    """
+    baseline_by_key = {r.key: r for r in baseline.results}
+    regressions: list[MetricChange] = []
+    for run in current.results:
+        base = baseline_by_key.get(run.key)
+        if base is None:
+            continue
+        if run.error and not base.error:
+            regressions.append(MetricChange(*run.key, "error", 0, 1))
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = getattr(base, metric), getattr(run, metric)
+            if metric == "wall_seconds" and new < MIN_COMPARED_SECONDS:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append(MetricChange(*run.key, metric, old, new))
+    return regressions
@@ -0,0 +1,162 @@
+"""Run every JOB_REGISTRY job against the fake upstreams and a real Postgres.
+
+For each library size the database is wiped and migrated to head, the fake
+upstreams are started in a subprocess and the service configs are seeded to
+point at them. Every job then runs twice: ``cold`` against the empty database
+and ``warm`` as a re-sync where nothing upstream changed.
+
+The jobs use the application's own engine (``POSTGRES_*`` variables), so point
+those at a throwaway database.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from cryptography.fernet import Fernet
+from sqlalchemy import text
+
+from app.client import tmdb_bridge_client
+from app.client.http_pool import http_clients
+from app.config import logger
+from app.database import AsyncSessionLocal, async_engine
+from app.models.schedule import ServiceType, SyncJobType, SyncSchedule
+from app.services.schedule_constants import DEFAULT_PRESETS, DEFAULT_SCHEDULES, JOB_REGISTRY
+from app.services.service_config_repository import upsert_config
+from benchmarks.metrics import measure
+from benchmarks.report import BenchmarkReport
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+PHASES = ("cold", "warm")
+SEED_API_KEY = "benchmark-api-key"
+
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    sizes: tuple[int, ...] = DEFAULT_SIZES
+    jobs: tuple[SyncJobType, ...] = tuple(JOB_REGISTRY)
+    phases: tuple[str, ...] = PHASES
+    users: int = 3
+    seed: int = 0
+    port: int = 9100
+    trace_memory: bool = True
+    upstream_args: list[str] = field(default_factory=list)
+
+
+async def reset_database() -> None:
+    """Drop everything in the public schema and migrate it to head."""
+    async with async_engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    alembic_cfg = AlembicConfig()
+    alembic_cfg.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+
+
+async def seed_database(upstream_url: str) -> None:
+    """Service configs pointing at the fake upstreams plus the default schedules."""
+    os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+    async with AsyncSessionLocal() as session:
+        for service in ServiceType:
+            await upsert_config(session, service, f"{upstream_url}/{service.value}", SEED_API_KEY)
+        session.add_all(
+            SyncSchedule(
+                job_type=job_type,
+                preset=DEFAULT_PRESETS[job_type],
+                cron_expression=DEFAULT_SCHEDULES[job_type],
+            )
+            for job_type in SyncJobType
+        )
+        await session.commit()
+
+
+async def _wait_until_ready(process: asyncio.subprocess.Process, url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(300):
+            if process.returncode is not None:
+                raise RuntimeError(f"Fake upstreams exited with code {process.returncode}")
+            try:
+                await client.get(f"{url}/jellyfin/Users", timeout=1.0)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("Fake upstreams did not start within 30 seconds")
+
+
+@asynccontextmanager
+async def fake_upstreams(items: int, config: BenchmarkConfig) -> AsyncIterator[str]:
+    """Serve a synthetic library of ``items`` in a subprocess; yields its base URL."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "benchmarks.fake_upstreams",
+        f"--items={items}",
+        f"--users={config.users}",
+        f"--seed={config.seed}",
+        f"--port={config.port}",
+        *config.upstream_args,
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{config.port}"
+    try:
+        await _wait_until_ready(process, url)
+        yield url
+    finally:
+        if process.returncode is None:
+            process.terminate()
+        await process.wait()
+
+
+async def run_benchmarks(config: BenchmarkConfig) -> BenchmarkReport:
+    """Cold and warm runs of the selected jobs at every library size."""
+    report = BenchmarkReport.new(
+        sizes=list(config.sizes),
+        jobs=[job.value for job in config.jobs],
+        users=config.users,
+        seed=config.seed,
+        upstream_args=config.upstream_args,
+        trace_memory=config.trace_memory,
+    )
+    for items in config.sizes:
+        logger.info("Benchmark: preparing database for %d items", items)
+        await reset_database()
+        async with fake_upstreams(items, config) as upstream_url:
+            tmdb_bridge_client.BRIDGE_BASE_URL = f"{upstream_url}/bridge"
+            await seed_database(upstream_url)
+            for phase in config.phases:
+                for job_type in config.jobs:
+                    job_func, _ = JOB_REGISTRY[job_type]
+                    async with measure(
+                        async_engine.sync_engine,
+                        job_type.value,
+                        items,
+                        phase,
+                        trace_memory=config.trace_memory,
+                    ) as result:
+                        await job_func()
+                    report.results.append(result)
+                    logger.info(
+                        "Benchmark: %s [%d %s] %.2fs, %d statements, %d rows%s",
+                        job_type.value,
+                        items,
+                        phase,
+                        result.wall_seconds,
+                        result.statements,
+                        result.rows_written,
+                        f", failed: {result.error}" if result.error else "",
+                    )
+            # The next size restarts the upstreams: drop keep-alive connections to this one
+            await http_clients.aclose()
+    await async_engine.dispose()
+    return report
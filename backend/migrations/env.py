@@ -7,9 +7,10 @@ from sqlalchemy import engine_from_config, pool
 
 from app.models.auth import AppUser, RefreshToken  # noqa: F401
 from app.models.base import Base
+from app.models.http_cache import HttpResponseCache  # noqa: F401
 from app.models.media import Episode, Media, Movie, Season, Series  # noqa: F401
-from app.models.schedule import ServiceConfig, SyncSchedule  # noqa: F401
-from app.models.user import User, WatchHistory  # noqa: F401
+from app.models.schedule import ServiceConfig, SyncSchedule, SyncWatermark  # noqa: F401
+from app.models.user import SeriesProgress, User, WatchHistory  # noqa: F401
 
 try:
     from typing import Union
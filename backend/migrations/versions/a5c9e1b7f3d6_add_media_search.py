@@ -0,0 +1,87 @@
+"""add media search
+
+Revision ID: a5c9e1b7f3d6
+Revises: f4b8d0a6e3c5
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a5c9e1b7f3d6"
+down_revision: Union[str, Sequence[str], None] = "f4b8d0a6e3c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Weights: A — title, B — original title, C — overview
+SEARCH_VECTORS = {
+    "media": "setweight(to_tsvector('simple', title), 'A')",
+    "movies": (
+        "setweight(to_tsvector('simple', COALESCE(original_title, '')), 'B') || "
+        "setweight(to_tsvector('simple', COALESCE(overview, '')), 'C')"
+    ),
+    "series": (
+        "setweight(to_tsvector('simple', COALESCE(original_name, '')), 'B') || "
+        "setweight(to_tsvector('simple', COALESCE(overview, '')), 'C')"
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, expression in SEARCH_VECTORS.items():
+        op.add_column(
+            table,
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(expression, persisted=True),
+                nullable=False,
+            ),
+        )
+    with op.get_context().autocommit_block():
+        for table in SEARCH_VECTORS:
+            op.create_index(
+                f"ix_{table}_search_vector",
+                table,
+                ["search_vector"],
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            "ix_media_title_trgm",
+            "media",
+            ["title"],
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_media_title_trgm",
+            table_name="media",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        for table in SEARCH_VECTORS:
+            op.drop_index(
+                f"ix_{table}_search_vector",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    for table in SEARCH_VECTORS:
+        op.drop_column(table, "search_vector")
@@ -0,0 +1,49 @@
+"""add sync watermarks
+
+Revision ID: b8d4f0e2a3c5
+Revises: a7c3e9d1f2b4
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4f0e2a3c5"
+down_revision: Union[str, Sequence[str], None] = "a7c3e9d1f2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "job_type",
+            postgresql.ENUM(name="syncjobtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("scope", sa.String(length=64), nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_full_sync_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_type", "scope", name="uq_sync_watermark_job_scope"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("sync_watermarks")
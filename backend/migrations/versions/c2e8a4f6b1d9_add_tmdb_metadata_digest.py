@@ -0,0 +1,32 @@
+"""add tmdb metadata digest
+
+Revision ID: c2e8a4f6b1d9
+Revises: a5c9e1b7f3d6
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2e8a4f6b1d9"
+down_revision: Union[str, Sequence[str], None] = "a5c9e1b7f3d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows start without a digest, so the next TMDB pass applies them once more
+    for table in ("movies", "series"):
+        op.add_column(table, sa.Column("tmdb_metadata_digest", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("series", "movies"):
+        op.drop_column(table, "tmdb_metadata_digest")
@@ -0,0 +1,54 @@
+"""add unique season number per series
+
+Revision ID: c9e5a1f3b7d2
+Revises: b8d4f0e2a3c5
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9e5a1f3b7d2"
+down_revision: Union[str, Sequence[str], None] = "b8d4f0e2a3c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicate seasons of a series are merged into the oldest one before the constraint
+    op.execute(
+        """
+        UPDATE episodes e
+        SET season_id = d.keep_id
+        FROM (
+            SELECT id,
+                   MIN(id) OVER (PARTITION BY series_id, number) AS keep_id
+            FROM seasons
+        ) d
+        WHERE e.season_id = d.id AND d.id <> d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM seasons
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id,
+                       MIN(id) OVER (PARTITION BY series_id, number) AS keep_id
+                FROM seasons
+            ) d
+            WHERE d.id <> d.keep_id
+        )
+        """
+    )
+    op.create_unique_constraint("uq_seasons_series_number", "seasons", ["series_id", "number"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_seasons_series_number", "seasons", type_="unique")
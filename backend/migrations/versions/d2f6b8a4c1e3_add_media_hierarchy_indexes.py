@@ -0,0 +1,57 @@
+"""add media hierarchy indexes
+
+Revision ID: d2f6b8a4c1e3
+Revises: c9e5a1f3b7d2
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2f6b8a4c1e3"
+down_revision: Union[str, Sequence[str], None] = "c9e5a1f3b7d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY can't run inside the migration transaction.
+    # seasons (series_id, number) is already covered by uq_seasons_series_number;
+    # episode numbers are not unique within a season (renumbering, specials)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_media_media_type",
+            "media",
+            ["media_type"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_episodes_season_id_number",
+            "episodes",
+            ["season_id", "number"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_episodes_season_id_number",
+            table_name="episodes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_media_media_type",
+            table_name="media",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
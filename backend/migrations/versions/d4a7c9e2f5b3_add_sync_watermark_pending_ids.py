@@ -0,0 +1,32 @@
+"""add sync watermark pending ids
+
+Revision ID: d4a7c9e2f5b3
+Revises: c2e8a4f6b1d9
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a7c9e2f5b3"
+down_revision: Union[str, Sequence[str], None] = "c2e8a4f6b1d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "sync_watermarks",
+        sa.Column("pending_ids", sa.JSON(), nullable=False, server_default=sa.text("'[]'")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("sync_watermarks", "pending_ids")
@@ -0,0 +1,77 @@
+"""add series progress
+
+Revision ID: e3a7c9b5d2f4
+Revises: d2f6b8a4c1e3
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a7c9b5d2f4"
+down_revision: Union[str, Sequence[str], None] = "d2f6b8a4c1e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "series_progress",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("series_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("watched", sa.Integer(), nullable=False),
+        sa.Column("watching", sa.Integer(), nullable=False),
+        sa.Column("dropped", sa.Integer(), nullable=False),
+        sa.Column("last_watched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["series_id"], ["series.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "series_id"),
+    )
+    op.create_index(
+        op.f("ix_series_progress_series_id"), "series_progress", ["series_id"], unique=False
+    )
+    # Backfill, same as `python -m app.cli rebuild-series-progress`
+    op.execute(
+        """
+        INSERT INTO series_progress
+            (user_id, series_id, total, watched, watching, dropped, last_watched_at)
+        SELECT u.id, s.id,
+               COALESCE(totals.total, 0),
+               COALESCE(watches.watched, 0),
+               COALESCE(watches.watching, 0),
+               COALESCE(watches.dropped, 0),
+               watches.last_watched_at
+        FROM users u
+        CROSS JOIN series s
+        LEFT JOIN (
+            SELECT sea.series_id, COUNT(e.id) AS total
+            FROM seasons sea
+            JOIN episodes e ON e.season_id = sea.id
+            GROUP BY sea.series_id
+        ) totals ON totals.series_id = s.id
+        LEFT JOIN (
+            SELECT wh.user_id, sea.series_id,
+                   COUNT(*) FILTER (WHERE wh.status = 'WATCHED') AS watched,
+                   COUNT(*) FILTER (WHERE wh.status = 'WATCHING') AS watching,
+                   COUNT(*) FILTER (WHERE wh.status = 'DROPPED') AS dropped,
+                   MAX(wh.watched_at) AS last_watched_at
+            FROM watch_history wh
+            JOIN episodes e ON e.id = wh.episode_id
+            JOIN seasons sea ON sea.id = e.season_id
+            GROUP BY wh.user_id, sea.series_id
+        ) watches ON watches.series_id = s.id AND watches.user_id = u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_series_progress_series_id"), table_name="series_progress")
+    op.drop_table("series_progress")
@@ -0,0 +1,55 @@
+"""add media list sort indexes
+
+Revision ID: f4b8d0a6e3c5
+Revises: e3a7c9b5d2f4
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4b8d0a6e3c5"
+down_revision: Union[str, Sequence[str], None] = "e3a7c9b5d2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination of /api/v1/media walks these in (key, id) order
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_media_title_id",
+            "media",
+            ["title", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_media_created_at_id",
+            "media",
+            ["created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_media_created_at_id",
+            table_name="media",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_media_title_id",
+            table_name="media",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -6,7 +6,7 @@ HTTP calls to the bridge with pytest-httpx.
 
 import pytest
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
 from app.models.media import Episode, MediaType, Movie, Season, Series, SeriesStatus
@@ -18,6 +18,11 @@ from tests.factories import MediaFactory, MovieFactory, SeriesFactory, SyncSched
 BRIDGE_BASE = "https://bridge.mediatrackr.org"
 
 
+def _session_factory(session: AsyncSession) -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий на том же тестовом движке: оркестратор открывает сессию на каждую фазу."""
+    return async_sessionmaker(session.bind, expire_on_commit=False)
+
+
 # ---------------------------------------------------------------------------
 # Payloads
 # ---------------------------------------------------------------------------
@@ -304,6 +309,7 @@ async def test_idempotency_second_call_returns_zero_updated(
 
     assert second_result.updated_count == 0
     assert second_result.processed_count == 1
+    assert second_result.unchanged_count == 1
 
     # No duplicate seasons or episodes
     seasons = list(
@@ -321,6 +327,35 @@ async def test_idempotency_second_call_returns_zero_updated(
     assert len(episodes) == 1
 
 
+async def test_second_run_sends_etag_and_short_circuits_on_304(
+    session_no_expire: AsyncSession,
+    httpx_mock,
+) -> None:
+    """The cached ETag is sent back on the next run; 304 skips the apply step."""
+    series = await _create_series(session_no_expire, tmdb_id="9998")
+    await session_no_expire.commit()
+
+    httpx_mock.add_response(
+        url=f"{BRIDGE_BASE}/tmdb/tv/{series.tmdb_id}",
+        json=_series_payload(tmdb_id=9998, seasons=[]),
+        headers={"ETag": '"v1"'},
+        status_code=200,
+    )
+    first_result = await update_series_tmdb_metadata(session_no_expire)
+    assert first_result.updated_count == 1
+
+    httpx_mock.add_response(
+        url=f"{BRIDGE_BASE}/tmdb/tv/{series.tmdb_id}",
+        match_headers={"If-None-Match": '"v1"'},
+        status_code=304,
+    )
+    second_result = await update_series_tmdb_metadata(session_no_expire)
+
+    assert second_result.unchanged_count == 1
+    assert second_result.updated_count == 0
+    assert second_result.failed_count == 0
+
+
 # ===========================================================================
 # Test 3: orchestrator update_tmdb_metadata processes both movies and series
 # ===========================================================================
@@ -349,7 +384,7 @@ async def test_orchestrator_processes_both_movie_and_series(
         status_code=200,
     )
 
-    result = await update_tmdb_metadata(session_no_expire)
+    result = await update_tmdb_metadata(_session_factory(session_no_expire))
 
     # Both movie and series were processed
     assert result.processed_count == 2
@@ -377,7 +412,7 @@ async def test_orchestrator_counts_are_sum_of_both_jobs(
         status_code=200,
     )
 
-    result = await update_tmdb_metadata(session_no_expire)
+    result = await update_tmdb_metadata(_session_factory(session_no_expire))
 
     # 1 movie + 1 series
     assert result.processed_count == 2
@@ -415,7 +450,7 @@ async def test_orchestrator_skips_series_without_tmdb_id(
         status_code=200,
     )
 
-    result = await update_tmdb_metadata(session_no_expire)
+    result = await update_tmdb_metadata(_session_factory(session_no_expire))
 
     # Only the movie was processed; series with no tmdb_id was skipped entirely
     assert result.processed_count == 1
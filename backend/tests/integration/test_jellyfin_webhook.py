@@ -0,0 +1,124 @@
+"""Integration tests for the Jellyfin webhook: signed event → coalescing queue → WatchHistory."""
+
+import uuid
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import WatchHistory, WatchStatus
+from app.services.jellyfin_webhook_service import WatchEventQueue
+from tests.factories import WatchHistoryFactory
+from tests.integration.conftest import (
+    create_episode,
+    create_movie,
+    create_season,
+    create_series,
+    create_user,
+)
+from tests.utils.fake_jellyfin_webhook import FakeJellyfinWebhookSender
+
+SECRET = "integration-webhook-secret"
+
+
+@pytest.fixture
+async def queue(
+    session_for_test: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[WatchEventQueue, None]:
+    """Очередь без фонового сброса: тест применяет события явно через flush()."""
+
+    @asynccontextmanager
+    async def factory() -> AsyncGenerator[AsyncSession, None]:
+        yield session_for_test
+
+    queue = WatchEventQueue(factory, flush_delay=3600)  # type: ignore[arg-type]
+    monkeypatch.setattr("app.api.webhooks.watch_event_queue", queue)
+    yield queue
+    await queue.aclose()
+
+
+@pytest.fixture
+async def sender(client_with_db, monkeypatch: pytest.MonkeyPatch) -> FakeJellyfinWebhookSender:
+    monkeypatch.setenv("JELLYFIN_WEBHOOK_SECRET", SECRET)
+    return FakeJellyfinWebhookSender(client_with_db, SECRET)
+
+
+async def test_playback_stop_marks_movie_watched(session_for_test, queue, sender) -> None:
+    user = await create_user(session_for_test, username="alice", jellyfin_user_id=uuid.uuid4().hex)
+    movie = await create_movie(session_for_test, jellyfin_id=uuid.uuid4().hex)
+    jf_user_id, jf_movie_id, movie_id = user.jellyfin_user_id, movie.jellyfin_id, movie.id
+    await session_for_test.commit()
+
+    response = await sender.playback_stop(
+        user_id=jf_user_id, item_id=jf_movie_id, PlaybackPositionTicks=100
+    )
+    assert response.status_code == 202
+    await sender.playback_stop(user_id=jf_user_id, item_id=jf_movie_id, PlayedToCompletion=True)
+
+    assert await queue.flush() == 1
+    rows = (await session_for_test.execute(select(WatchHistory))).scalars().all()
+    assert len(rows) == 1
+    assert rows[0].media_id == movie_id
+    assert rows[0].episode_id is None
+    assert rows[0].status == WatchStatus.WATCHED
+    assert rows[0].watched_at is not None
+
+
+async def test_episode_progress_upserts_existing_row(session_for_test, queue, sender) -> None:
+    user = await create_user(session_for_test, username="bob", jellyfin_user_id=uuid.uuid4().hex)
+    series = await create_series(session_for_test)
+    season = await create_season(session_for_test, series_id=series.id, number=1)
+    episode = await create_episode(
+        session_for_test, season_id=season.id, number=1, jellyfin_id=uuid.uuid4().hex
+    )
+    session_for_test.add(
+        WatchHistoryFactory.build(
+            user_id=user.id,
+            media_id=series.id,
+            episode_id=episode.id,
+            status=WatchStatus.PLANNED,
+        )
+    )
+    jf_user_id, jf_episode_id = user.jellyfin_user_id, episode.jellyfin_id
+    await session_for_test.commit()
+
+    await sender.playback_stop(
+        user_id=jf_user_id,
+        item_id=jf_episode_id,
+        item_type="Episode",
+        PlaybackPositionTicks=6_000_000_000,
+    )
+    applied = await queue.flush()
+
+    assert applied == 1
+    session_for_test.expire_all()
+    rows = (await session_for_test.execute(select(WatchHistory))).scalars().all()
+    assert len(rows) == 1
+    assert rows[0].status == WatchStatus.WATCHING
+    assert rows[0].playback_position_ticks == 6_000_000_000
+
+
+async def test_manual_status_not_overwritten(session_for_test, queue, sender) -> None:
+    user = await create_user(session_for_test, username="carol", jellyfin_user_id=uuid.uuid4().hex)
+    movie = await create_movie(session_for_test, jellyfin_id=uuid.uuid4().hex)
+    session_for_test.add(
+        WatchHistoryFactory.build(
+            user_id=user.id,
+            media_id=movie.id,
+            episode_id=None,
+            status=WatchStatus.DROPPED,
+            is_manual=True,
+        )
+    )
+    jf_user_id, jf_movie_id = user.jellyfin_user_id, movie.jellyfin_id
+    await session_for_test.commit()
+
+    await sender.user_data_saved(user_id=jf_user_id, item_id=jf_movie_id, Played=True)
+    await queue.flush()
+
+    session_for_test.expire_all()
+    wh = (await session_for_test.execute(select(WatchHistory))).scalar_one()
+    assert wh.status == WatchStatus.DROPPED
+    assert wh.is_manual is True
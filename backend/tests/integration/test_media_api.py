@@ -1,7 +1,13 @@
+import json
 from datetime import UTC, datetime
 
+import pytest
+
 from app.models.media import MediaType, MovieStatus, SeriesStatus
 from app.models.user import WatchStatus
+from app.schemas.media import EpisodeDetail, MediaDetailResponse, SeasonDetail
+from app.services.media_service import _to_percent
+from app.services.series_progress_repository import refresh_series_progress
 from tests.factories import (
     EpisodeFactory,
     MediaFactory,
@@ -52,6 +58,26 @@ async def test_get_media_returns_series(client_with_db, session_for_test):
     assert item["media_type"] == "series"
 
 
+async def test_get_media_series_totals_without_users(client_with_db, session_for_test):
+    """With no users there are no series_progress rows; totals come from the episodes."""
+    series = await create_series(session_for_test, title="Nobody Watches")
+    season = await create_season(session_for_test, series_id=series.id)
+    await create_episode(session_for_test, season_id=season.id, number=1, title="Ep 1")
+    await create_episode(session_for_test, season_id=season.id, number=2, title="Ep 2")
+    await refresh_series_progress(session_for_test, [series.id])
+
+    resp = await client_with_db.get("/api/v1/media")
+    assert resp.status_code == 200
+    item = resp.json()["items"][0]
+    assert item["total_episodes"] == 2
+    assert item["watched_episodes"] == 0
+    assert item["watch_status"] == "planned"
+
+    resp = await client_with_db.get(f"/api/v1/media/{series.id}")
+    assert resp.status_code == 200
+    assert resp.json()["watch_status"] == "planned"
+
+
 async def test_get_media_filter_by_type_movie(client_with_db, session_for_test):
     await create_movie(session_for_test, title="Only Movie")
     await create_series(session_for_test, title="Some Series")
@@ -143,6 +169,8 @@ async def test_get_media_series_all_episodes_watched(client_with_db, session_for
     )
     session_for_test.add(wh2)
     await session_for_test.flush()
+    # Watch history is seeded directly, bypassing the services that refresh progress
+    await refresh_series_progress(session_for_test, [series.id])
 
     resp = await client_with_db.get("/api/v1/media")
     assert resp.status_code == 200
@@ -153,6 +181,46 @@ async def test_get_media_series_all_episodes_watched(client_with_db, session_for
     assert item["watch_status"] == "watched"
 
 
+async def test_get_media_pages_walk_the_whole_list(client_with_db, session_for_test):
+    for title in ("Delta", "Alpha", "Echo", "Charlie", "Bravo"):
+        await create_movie(session_for_test, title=title)
+    await session_for_test.commit()
+
+    titles, cursor, totals = [], None, []
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = await client_with_db.get("/api/v1/media", params=params)
+        assert resp.status_code == 200
+        data = resp.json()
+        titles += [item["title"] for item in data["items"]]
+        totals.append(data["total"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]
+    assert totals == [5, 5, 5]
+
+
+async def test_get_media_page_sorted_by_recently_added(client_with_db, session_for_test):
+    for title in ("First", "Second", "Third"):
+        await create_movie(session_for_test, title=title)
+    await session_for_test.commit()
+
+    resp = await client_with_db.get(
+        "/api/v1/media", params={"limit": 2, "sort": "added", "include_total": "false"}
+    )
+    data = resp.json()
+    assert data["total"] is None
+    assert data["next_cursor"] is not None
+    assert len(data["items"]) == 2
+
+    resp = await client_with_db.get(
+        "/api/v1/media", params={"sort": "title", "cursor": data["next_cursor"]}
+    )
+    assert resp.status_code == 400
+
+
 async def test_get_media_detail_movie_basic(client_with_db, session_for_test):
     movie = await create_movie(session_for_test, title="Basic Movie")
 
@@ -218,6 +286,7 @@ async def test_get_media_detail_series_watch_status(client_with_db, session_for_
     )
     session_for_test.add(wh2)
     await session_for_test.flush()
+    await refresh_series_progress(session_for_test, [series.id])
 
     resp = await client_with_db.get(f"/api/v1/media/{series.id}")
     assert resp.status_code == 200
@@ -250,6 +319,78 @@ async def test_get_media_detail_rating_percent_computed(client_with_db, session_
     assert resp.json()["tmdb_rating_percent"] == 75
 
 
+@pytest.mark.parametrize("rating_value", [7.25, 7.75])
+async def test_get_media_detail_formats_like_pydantic(
+    client_with_db, session_for_test, rating_value
+):
+    """Half-way ratings and whole-second timestamps render as MediaDetailResponse did."""
+    user = UserFactory.build()
+    session_for_test.add(user)
+    await session_for_test.flush()
+    media = MediaFactory(media_type=MediaType.MOVIE, title="Half Way")
+    session_for_test.add(media)
+    await session_for_test.flush()
+    movie = MovieFactory.build(id=media.id, rating_value=rating_value, media=media)
+    session_for_test.add(movie)
+    watched_at = datetime(2024, 3, 15, 20, 30, tzinfo=UTC)
+    session_for_test.add(
+        WatchHistoryFactory.build(
+            user_id=user.id,
+            media_id=media.id,
+            episode_id=None,
+            status=WatchStatus.WATCHED,
+            watched_at=watched_at,
+        )
+    )
+    await session_for_test.flush()
+
+    resp = await client_with_db.get(f"/api/v1/media/{media.id}")
+
+    assert resp.status_code == 200
+    expected = json.loads(
+        MediaDetailResponse(
+            id=media.id,
+            media_type="movie",
+            title="Half Way",
+            tmdb_rating_percent=_to_percent(rating_value),
+            watched_at=watched_at,
+        ).model_dump_json()
+    )
+    data = resp.json()
+    assert data["tmdb_rating_percent"] == expected["tmdb_rating_percent"]
+    assert data["watched_at"] == expected["watched_at"] == "2024-03-15T20:30:00Z"
+
+
+async def test_get_media_detail_keeps_fractional_seconds_like_pydantic(
+    client_with_db, session_for_test
+):
+    series = await create_series(session_for_test, title="Precise")
+    release_date = datetime(2024, 3, 15, tzinfo=UTC)
+    season = await create_season(
+        session_for_test, series_id=series.id, number=1, release_date=release_date
+    )
+    episode = await create_episode(session_for_test, season_id=season.id, number=1)
+    episode.air_date = datetime(2024, 3, 15, 1, 2, 3, 120000, tzinfo=UTC)
+    await session_for_test.flush()
+
+    resp = await client_with_db.get(f"/api/v1/media/{series.id}")
+
+    assert resp.status_code == 200
+    expected = json.loads(
+        SeasonDetail(
+            id=season.id,
+            number=1,
+            release_date=release_date,
+            episodes=[
+                EpisodeDetail(id=episode.id, episode_number=1, title="x", air_date=episode.air_date)
+            ],
+        ).model_dump_json()
+    )
+    data = resp.json()["seasons"][0]
+    assert data["release_date"] == expected["release_date"]
+    assert data["episodes"][0]["air_date"] == expected["episodes"][0]["air_date"]
+
+
 async def test_get_media_detail_status_lowercase(client_with_db, session_for_test):
     media = MediaFactory(media_type=MediaType.MOVIE, title="Released Movie")
     session_for_test.add(media)
@@ -548,3 +689,38 @@ async def test_get_media_detail_movie_has_no_seasons(client_with_db, session_for
     resp = await client_with_db.get(f"/api/v1/media/{movie.id}")
     assert resp.status_code == 200
     assert resp.json()["seasons"] == []
+
+
+async def test_get_media_detail_json_matches_schema(client_with_db, session_for_test):
+    series = await create_series(session_for_test, title="Daily Show")
+    season = await create_season(session_for_test, series_id=series.id, number=1)
+    await create_season(session_for_test, series_id=series.id, number=2)
+    for n in (3, 1, 2):
+        await create_episode(session_for_test, season_id=season.id, number=n, title=f"E{n}")
+    await refresh_series_progress(session_for_test, [series.id])
+    await session_for_test.commit()
+
+    resp = await client_with_db.get(f"/api/v1/media/{series.id}")
+
+    assert resp.status_code == 200
+    detail = MediaDetailResponse.model_validate_json(resp.content)
+    assert detail.media_type == "series"
+    assert [s.number for s in detail.seasons] == [1, 2]
+    assert [e.episode_number for e in detail.seasons[0].episodes] == [1, 2, 3]
+    assert (detail.seasons[0].total_episodes, detail.seasons[0].watched_episodes) == (3, 0)
+    assert detail.seasons[1].episodes == []
+    assert detail.watch_status == "planned"
+
+
+async def test_get_media_detail_movie_without_genres_returns_empty_list(
+    client_with_db, session_for_test
+):
+    movie = await create_movie(session_for_test, title="No Genres")
+    movie.genres = None
+    await session_for_test.commit()
+
+    resp = await client_with_db.get(f"/api/v1/media/{movie.id}")
+
+    detail = MediaDetailResponse.model_validate_json(resp.content)
+    assert detail.genres == []
+    assert detail.seasons == []
@@ -0,0 +1,142 @@
+"""The media list and the series progress refresh use indexes, not sequential scans."""
+
+from typing import Any
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import ClauseElement
+
+from app.models.media import Episode, Season
+from app.services.media_service import _media_list_query
+from app.services.series_progress_repository import build_refresh_statement
+
+SERIES_COUNT = 1_000
+SEASONS_PER_SERIES = 10
+EPISODES_PER_SEASON = 10  # 100k episodes
+MOVIE_COUNT = 1_000
+USER_COUNT = 3  # each user watched every episode and movie: 303k watch_history rows
+EPISODES_PER_SERIES = SEASONS_PER_SERIES * EPISODES_PER_SEASON
+
+# Tables whose lookups must go through an index; users, movies and series are small or
+# joined by primary key, where a hash join may legitimately win
+INDEXED_TABLES = ("media", "seasons", "episodes", "watch_history", "series_progress")
+
+
+@pytest.fixture
+async def media_library(session_for_test):
+    """
+    1k series × 10 seasons × 10 episodes and 1k movies, all watched by 3 users, with their
+    series_progress rows and fresh planner statistics.
+    """
+    seasons = SERIES_COUNT * SEASONS_PER_SERIES
+    episodes = seasons * EPISODES_PER_SEASON
+    first_movie = SERIES_COUNT + 1
+    last_movie = SERIES_COUNT + MOVIE_COUNT
+    for statement in (
+        f"""
+        INSERT INTO media (id, media_type, title)
+        SELECT i, 'SERIES', 'Series ' || i FROM generate_series(1, {SERIES_COUNT}) AS i
+        """,
+        f"""
+        INSERT INTO media (id, media_type, title)
+        SELECT i, 'MOVIE', 'Movie ' || i FROM generate_series({first_movie}, {last_movie}) AS i
+        """,
+        f"INSERT INTO series (id) SELECT i FROM generate_series(1, {SERIES_COUNT}) AS i",
+        f"INSERT INTO movies (id) SELECT i FROM generate_series({first_movie}, {last_movie}) AS i",
+        f"""
+        INSERT INTO seasons (id, series_id, number)
+        SELECT i, (i - 1) / {SEASONS_PER_SERIES} + 1, (i - 1) % {SEASONS_PER_SERIES} + 1
+        FROM generate_series(1, {seasons}) AS i
+        """,
+        f"""
+        INSERT INTO episodes (id, season_id, number, title)
+        SELECT i, (i - 1) / {EPISODES_PER_SEASON} + 1, (i - 1) % {EPISODES_PER_SEASON} + 1,
+               'Episode ' || i
+        FROM generate_series(1, {episodes}) AS i
+        """,
+        f"""
+        INSERT INTO users (id, username)
+        SELECT u, 'user' || u FROM generate_series(1, {USER_COUNT}) AS u
+        """,
+        f"""
+        INSERT INTO watch_history (user_id, media_id, episode_id, status, is_manual)
+        SELECT u, (e - 1) / {EPISODES_PER_SERIES} + 1, e, 'WATCHED', false
+        FROM generate_series(1, {USER_COUNT}) AS u, generate_series(1, {episodes}) AS e
+        """,
+        f"""
+        INSERT INTO watch_history (user_id, media_id, status, is_manual)
+        SELECT u, m, 'WATCHED', false
+        FROM generate_series(1, {USER_COUNT}) AS u, generate_series({first_movie}, {last_movie}) AS m
+        """,
+        f"""
+        INSERT INTO series_progress (user_id, series_id, total, watched, watching, dropped)
+        SELECT u, s, {EPISODES_PER_SERIES}, {EPISODES_PER_SERIES}, 0, 0
+        FROM generate_series(1, {USER_COUNT}) AS u, generate_series(1, {SERIES_COUNT}) AS s
+        """,
+    ):
+        await session_for_test.execute(text(statement))
+    await session_for_test.commit()
+    for table in (
+        "media",
+        "series",
+        "movies",
+        "seasons",
+        "episodes",
+        "users",
+        "watch_history",
+        "series_progress",
+    ):
+        await session_for_test.execute(text(f"ANALYZE {table}"))
+    return session_for_test
+
+
+def _list_page(sort: str, cursor: tuple[Any, int] | None = None, **filters: Any) -> ClauseElement:
+    """A page of media_service's list query, as get_media_page binds it."""
+    params: dict[str, Any] = {
+        "user_id": None,
+        "type": None,
+        "status": None,
+        "genre": None,
+        "year": None,
+        "limit": 50,
+        **filters,
+    }
+    if cursor is not None:
+        params["cursor_key"], params["cursor_id"] = cursor
+    return _media_list_query(sort, after=cursor is not None, limit=True).bindparams(**params)
+
+
+HOT_QUERIES: dict[str, ClauseElement] = {
+    "list by title": _list_page("title"),
+    "list by title, next page": _list_page("title", ("Series 500", 500)),
+    "list of one user's movies": _list_page("title", user_id=1, type="MOVIE"),
+    "list of one user's watched series": _list_page(
+        "title", user_id=2, type="SERIES", status="watched"
+    ),
+    "list by date added, next page": _list_page("added", ("2026-01-01T00:00:00+00:00", 1500)),
+    # Sonarr / Jellyfin imports refresh the series they wrote episodes of, for all users
+    "progress refresh of a series": build_refresh_statement({50, 500}),
+    # the watched sync refreshes the series a user watched episodes of
+    "progress refresh of a user's series": build_refresh_statement({50, 500}, {1}),
+    # sync_jellyfin_watched_series: seasons of a page of series, then their episodes
+    "seasons of series": select(Season).where(Season.series_id.in_([10, 20, 30])),
+    "episodes of seasons": select(Episode).where(Episode.season_id.in_([101, 102, 103])),
+}
+
+
+async def _plan(session, query: ClauseElement) -> str:
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    # Sent as is: the literals (e.g. timestamps) must not be parsed as bind parameters.
+    # EXPLAIN without ANALYZE: the refresh INSERT is planned, not run
+    connection = await session.connection()
+    rows = await connection.exec_driver_sql(f"EXPLAIN {sql}")
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+async def test_hot_queries_avoid_sequential_scans(media_library, name: str) -> None:
+    plan = await _plan(media_library, HOT_QUERIES[name])
+
+    for table in INDEXED_TABLES:
+        assert f"Seq Scan on {table}" not in plan, plan
@@ -0,0 +1,125 @@
+"""GET /api/v1/media/search: ranked full-text and typo-tolerant title search."""
+
+import pytest
+from sqlalchemy import text
+
+from app.services.media_service import _media_search_query
+from tests.integration.conftest import create_movie, create_series
+
+LIBRARY_SIZE = 50_000
+
+
+async def _search(client, q: str, **params) -> dict:
+    resp = await client.get("/api/v1/media/search", params={"q": q, **params})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+async def _seed(session) -> None:
+    await create_series(session, title="Breaking Bad")
+    await create_movie(session, title="El Camino: A Breaking Bad Movie")
+    heat = await create_movie(session, title="Heat")
+    heat.original_title = "Heat"
+    heat.overview = "A group of professional bank robbers feels the heat from police."
+    amelie = await create_movie(session, title="Amelie")
+    amelie.original_title = "Le Fabuleux Destin d'Amélie Poulain"
+    await create_movie(session, title="The Godfather")
+    await session.commit()
+
+
+async def test_search_ranks_title_matches_first(client_with_db, session_for_test) -> None:
+    await _seed(session_for_test)
+
+    data = await _search(client_with_db, "breaking bad")
+
+    assert [item["title"] for item in data["items"]] == [
+        "Breaking Bad",
+        "El Camino: A Breaking Bad Movie",
+    ]
+    assert data["total"] == 2
+
+
+async def test_search_matches_prefixes_original_title_and_overview(
+    client_with_db, session_for_test
+) -> None:
+    await _seed(session_for_test)
+
+    assert [i["title"] for i in (await _search(client_with_db, "godf"))["items"]] == [
+        "The Godfather"
+    ]
+    assert [i["title"] for i in (await _search(client_with_db, "fabuleux"))["items"]] == ["Amelie"]
+    assert [i["title"] for i in (await _search(client_with_db, "robbers"))["items"]] == ["Heat"]
+
+
+async def test_search_tolerates_typos(client_with_db, session_for_test) -> None:
+    await _seed(session_for_test)
+
+    data = await _search(client_with_db, "Breakng Bad")
+
+    assert data["items"][0]["title"] == "Breaking Bad"
+
+
+async def test_search_filters_and_paginates(client_with_db, session_for_test) -> None:
+    await _seed(session_for_test)
+
+    first = await _search(client_with_db, "breaking", limit=1)
+    second = await _search(client_with_db, "breaking", limit=1, cursor=first["next_cursor"])
+    movies = await _search(client_with_db, "breaking", type="movie")
+
+    assert [first["items"][0]["title"], second["items"][0]["title"]] == [
+        "Breaking Bad",
+        "El Camino: A Breaking Bad Movie",
+    ]
+    assert second["next_cursor"] is None
+    assert [item["title"] for item in movies["items"]] == ["El Camino: A Breaking Bad Movie"]
+
+
+@pytest.fixture
+async def large_library(session_for_test):
+    """50k movies with titles and overviews, with fresh planner statistics."""
+    for statement in (
+        f"""
+        INSERT INTO media (id, media_type, title)
+        SELECT i, 'MOVIE', 'Movie ' || md5(i::text) FROM generate_series(1, {LIBRARY_SIZE}) AS i
+        """,
+        f"""
+        INSERT INTO movies (id, overview)
+        SELECT i, 'Overview ' || md5((i * 7)::text) FROM generate_series(1, {LIBRARY_SIZE}) AS i
+        """,
+        "UPDATE media SET title = 'Breaking Bad' WHERE id = 4242",
+    ):
+        await session_for_test.execute(text(statement))
+    await session_for_test.commit()
+    for table in ("media", "movies", "series"):
+        await session_for_test.execute(text(f"ANALYZE {table}"))
+    return session_for_test
+
+
+async def test_search_hits_come_from_gin_indexes(large_library) -> None:
+    query = _media_search_query()
+    params = {
+        "q": "breaking bad",
+        "tsquery": "breaking:* & bad:*",
+        "user_id": None,
+        "type": None,
+        "status": None,
+        "genre": None,
+        "year": None,
+        "limit": 51,
+    }
+
+    plan = "\n".join(
+        row[0] for row in await large_library.execute(text(f"EXPLAIN {query.text}"), params)
+    )
+    rows = (await large_library.execute(query, params)).mappings().all()
+
+    for index in (
+        "ix_media_search_vector",
+        "ix_movies_search_vector",
+        "ix_series_search_vector",
+        "ix_media_title_trgm",
+    ):
+        assert index in plan, plan
+    assert "Seq Scan on media" not in plan, plan
+    assert "Seq Scan on movies" not in plan, plan
+    assert rows[0]["title"] == "Breaking Bad"
@@ -13,6 +13,15 @@ from tests.factories import (
 )
 
 
+def _single_page(items):  # type: ignore[no-untyped-def]
+    """Stand-in for a Jellyfin page iterator that yields all items as one page."""
+
+    async def _iter(url, api_key):  # type: ignore[no-untyped-def]
+        yield items
+
+    return _iter
+
+
 @pytest.fixture(autouse=True)
 def mock_jellyfin_config(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(
@@ -42,16 +51,16 @@ async def test_import_jellyfin_series_creates_new_series_with_episodes(
     ]
 
     jellyfin_episodes: list[dict] = [  # type: ignore[list-item]
-        JellyfinEpisodeDictFactory(SeasonId=jellyfin_series[0].get("Id")),
-        JellyfinEpisodeDictFactory(SeasonId=jellyfin_series[0].get("Id")),
+        JellyfinEpisodeDictFactory(SeriesId="jf-series-1", SeasonId=jellyfin_series[0].get("Id")),
+        JellyfinEpisodeDictFactory(SeriesId="jf-series-1", SeasonId=jellyfin_series[0].get("Id")),
     ]
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
-        AsyncMock(return_value=jellyfin_series),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        _single_page(jellyfin_series),
     )
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        AsyncMock(return_value=jellyfin_episodes),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_library_episodes",
+        _single_page(jellyfin_episodes),
     )
 
     resp = await client_with_db.post("/api/v1/jellyfin/import/series")
@@ -113,12 +122,12 @@ async def test_import_jellyfin_series_updates_existing_by_tmdb(
         )
     ]
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
-        AsyncMock(return_value=jellyfin_series),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        _single_page(jellyfin_series),
     )
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        AsyncMock(return_value=[]),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_library_episodes",
+        _single_page([]),
     )
 
     resp = await client_with_db.post("/api/v1/jellyfin/import/series")
@@ -163,17 +172,22 @@ async def test_import_jellyfin_series_updates_existing_episode(
 
     episodes: list[dict] = [  # type: ignore[list-item]
         JellyfinEpisodeDictFactory(
-            Id="ep-1", SeasonId="season-1", ParentIndexNumber=1, IndexNumber=1, Name="New title"
+            SeriesId="jf-series-1",
+            Id="ep-1",
+            SeasonId="season-1",
+            ParentIndexNumber=1,
+            IndexNumber=1,
+            Name="New title",
         )
     ]
 
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
-        AsyncMock(return_value=[{"Id": "jf-series-1", "Name": "Series"}]),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        _single_page([{"Id": "jf-series-1", "Name": "Series"}]),
     )
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        AsyncMock(return_value=episodes),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_library_episodes",
+        _single_page(episodes),
     )
 
     resp = await client_with_db.post("/api/v1/jellyfin/import/series")
@@ -205,6 +219,7 @@ async def test_import_jellyfin_no_duplicate_season_when_created_by_sonarr(
     jf_season_jellyfin_id = "jf-season-1"
     episodes = [
         JellyfinEpisodeDictFactory(
+            SeriesId="jf-series-1",
             Id="ep-1",
             SeasonId=jf_season_jellyfin_id,
             ParentIndexNumber=1,
@@ -214,14 +229,12 @@ async def test_import_jellyfin_no_duplicate_season_when_created_by_sonarr(
     ]
 
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
-        AsyncMock(
-            return_value=[{"Id": "jf-series-1", "Name": "Series", "ProviderIds": {"Tmdb": "100"}}]
-        ),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        _single_page([{"Id": "jf-series-1", "Name": "Series", "ProviderIds": {"Tmdb": "100"}}]),
     )
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        AsyncMock(return_value=episodes),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_library_episodes",
+        _single_page(episodes),
     )
 
     resp = await client_with_db.post("/api/v1/jellyfin/import/series")
@@ -260,6 +273,7 @@ async def test_import_jellyfin_no_duplicate_episode_when_created_by_sonarr(
     ep_jellyfin_id = "jf-ep-1"
     episodes = [
         JellyfinEpisodeDictFactory(
+            SeriesId="jf-series-1",
             Id=ep_jellyfin_id,
             SeasonId="jf-season-1",
             ParentIndexNumber=1,
@@ -269,14 +283,12 @@ async def test_import_jellyfin_no_duplicate_episode_when_created_by_sonarr(
     ]
 
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
-        AsyncMock(
-            return_value=[{"Id": "jf-series-1", "Name": "Series", "ProviderIds": {"Tmdb": "200"}}]
-        ),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        _single_page([{"Id": "jf-series-1", "Name": "Series", "ProviderIds": {"Tmdb": "200"}}]),
     )
     monkeypatch.setattr(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        AsyncMock(return_value=episodes),
+        "app.services.import_jellyfin_series_service.iter_jellyfin_library_episodes",
+        _single_page(episodes),
     )
 
     resp = await client_with_db.post("/api/v1/jellyfin/import/series")
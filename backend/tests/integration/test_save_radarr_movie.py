@@ -5,6 +5,7 @@ from sqlalchemy import select
 
 from app.models.media import Media, MediaType, Movie, MovieStatus
 from tests.factories import RadarrMovieDictFactory
+from tests.utils.async_iter import AsyncIterMock
 from tests.utils.db_asserts import assert_model_matches
 
 
@@ -19,14 +20,14 @@ def mock_radarr_config(monkeypatch: pytest.MonkeyPatch) -> None:
 async def test_import_radarr_movies_new_movie(client_with_db, session_for_test, monkeypatch):
     client = client_with_db
 
-    # Mock the fetch_radarr_movies function
+    # Mock the iter_radarr_movies function
     mock_movies: list[dict] = [  # type: ignore[list-item]
         RadarrMovieDictFactory(
             id=123, title="Test Movie", inCinemas="2023-01-01T00:00:00Z", year=2010
         )
     ]
-    mock_fetch = AsyncMock(return_value=mock_movies)
-    monkeypatch.setattr("app.services.radarr_service.fetch_radarr_movies", mock_fetch)
+    mock_fetch = AsyncIterMock(return_value=mock_movies)
+    monkeypatch.setattr("app.services.radarr_service.iter_radarr_movies", mock_fetch)
 
     # Call the API endpoint
     response = await client.post("/api/v1/radarr/import")
@@ -70,12 +71,12 @@ async def test_import_radarr_movies_existing_movie(client_with_db, session_for_t
     session_for_test.add(existing_movie)
     await session_for_test.commit()  # Commit this setup data (will be rolled back after test)
 
-    # Mock the fetch_radarr_movies to return the existing movie
+    # Mock the iter_radarr_movies to return the existing movie
     mock_movies: list[dict] = [  # type: ignore[list-item]
         RadarrMovieDictFactory(id=456, title="Existing Movie", inCinemas=None, no_external_ids=True)
     ]
-    mock_fetch = AsyncMock(return_value=mock_movies)
-    monkeypatch.setattr("app.services.radarr_service.fetch_radarr_movies", mock_fetch)
+    mock_fetch = AsyncIterMock(return_value=mock_movies)
+    monkeypatch.setattr("app.services.radarr_service.iter_radarr_movies", mock_fetch)
 
     # Call the API endpoint
     response = await client_with_db.post("/api/v1/radarr/import")
@@ -98,7 +99,7 @@ async def test_import_radarr_movies_known_status_saved(
         RadarrMovieDictFactory(id=789, status="released")
     ]
     monkeypatch.setattr(
-        "app.services.radarr_service.fetch_radarr_movies", AsyncMock(return_value=mock_movies)
+        "app.services.radarr_service.iter_radarr_movies", AsyncIterMock(return_value=mock_movies)
     )
 
     response = await client_with_db.post("/api/v1/radarr/import")
@@ -116,7 +117,7 @@ async def test_import_radarr_movies_unknown_status_saves_movie_without_status(
         RadarrMovieDictFactory(id=790, status="unknownFutureStatus")
     ]
     monkeypatch.setattr(
-        "app.services.radarr_service.fetch_radarr_movies", AsyncMock(return_value=mock_movies)
+        "app.services.radarr_service.iter_radarr_movies", AsyncIterMock(return_value=mock_movies)
     )
 
     response = await client_with_db.post("/api/v1/radarr/import")
@@ -143,7 +144,7 @@ async def test_import_radarr_movies_updates_status_of_existing_movie(
         RadarrMovieDictFactory(id=791, status="released")
     ]
     monkeypatch.setattr(
-        "app.services.radarr_service.fetch_radarr_movies", AsyncMock(return_value=mock_movies)
+        "app.services.radarr_service.iter_radarr_movies", AsyncIterMock(return_value=mock_movies)
     )
 
     response = await client_with_db.post("/api/v1/radarr/import")
@@ -155,12 +156,12 @@ async def test_import_radarr_movies_updates_status_of_existing_movie(
 
 
 async def test_import_radarr_movies_invalid_data(client_with_db, session_for_test, monkeypatch):
-    # Mock the fetch_radarr_movies to return invalid movie (no id)
+    # Mock the iter_radarr_movies to return invalid movie (no id)
     mock_movies: list[dict] = [  # type: ignore[list-item]
         RadarrMovieDictFactory(title="Invalid Movie", missing_id=True, no_external_ids=True)
     ]
-    mock_fetch = AsyncMock(return_value=mock_movies)
-    monkeypatch.setattr("app.services.radarr_service.fetch_radarr_movies", mock_fetch)
+    mock_fetch = AsyncIterMock(return_value=mock_movies)
+    monkeypatch.setattr("app.services.radarr_service.iter_radarr_movies", mock_fetch)
 
     # Call the API endpoint
     response = await client_with_db.post("/api/v1/radarr/import")
@@ -6,6 +6,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models.media import Episode, Media, MediaType, Season, Series, SeriesStatus
 from tests.factories import SeriesDictFactory, SonarrEpisodeDictFactory
+from tests.utils.async_iter import AsyncIterMock
 
 
 @pytest.fixture(autouse=True)
@@ -56,7 +57,7 @@ async def test_import_sonarr_series_creates_new_series_with_episodes(
         ),
     ]
     monkeypatch.setattr(
-        "app.services.sonarr_service.fetch_sonarr_series", AsyncMock(return_value=sonarr_series)
+        "app.services.sonarr_service.iter_sonarr_series", AsyncIterMock(return_value=sonarr_series)
     )
     monkeypatch.setattr(
         "app.services.sonarr_service.fetch_sonarr_episodes",
@@ -111,8 +112,8 @@ async def test_import_sonarr_series_updates_existing_series_by_sonarr_id(
     ]
 
     monkeypatch.setattr(
-        "app.services.sonarr_service.fetch_sonarr_series",
-        AsyncMock(return_value=sonarr_series),
+        "app.services.sonarr_service.iter_sonarr_series",
+        AsyncIterMock(return_value=sonarr_series),
     )
     monkeypatch.setattr(
         "app.services.sonarr_service.fetch_sonarr_episodes",
@@ -148,8 +149,8 @@ async def test_import_sonarr_series_updates_by_external_ids(
     ]
 
     monkeypatch.setattr(
-        "app.services.sonarr_service.fetch_sonarr_series",
-        AsyncMock(return_value=sonarr_series),
+        "app.services.sonarr_service.iter_sonarr_series",
+        AsyncIterMock(return_value=sonarr_series),
     )
     monkeypatch.setattr(
         "app.services.sonarr_service.fetch_sonarr_episodes",
@@ -197,8 +198,8 @@ async def test_import_sonarr_series_updates_existing_episode(
         SeriesDictFactory(id=1, title="Series", seasons=[{"seasonNumber": 1}]),
     ]
     monkeypatch.setattr(
-        "app.services.sonarr_service.fetch_sonarr_series",
-        AsyncMock(return_value=resp_series),
+        "app.services.sonarr_service.iter_sonarr_series",
+        AsyncIterMock(return_value=resp_series),
     )
 
     resp_episodes: list[dict] = [  # type: ignore[list-item]
@@ -247,8 +248,8 @@ async def test_import_sonarr_episode_moved_to_different_season(
         SeriesDictFactory(id=1, title="Series", seasons=[{"seasonNumber": 1}, {"seasonNumber": 2}]),
     ]
     monkeypatch.setattr(
-        "app.services.sonarr_service.fetch_sonarr_series",
-        AsyncMock(return_value=resp_series),
+        "app.services.sonarr_service.iter_sonarr_series",
+        AsyncIterMock(return_value=resp_series),
     )
     # Sonarr теперь говорит что эпизод в сезоне 2
     resp_episodes: list[dict] = [  # type: ignore[list-item]
@@ -0,0 +1,109 @@
+"""series_progress is kept up to date by the watch-history writers and read by /api/v1/media."""
+
+import uuid
+
+from sqlalchemy import select
+
+from app.models.user import SeriesProgress
+from app.services.series_progress_repository import (
+    rebuild_series_progress,
+    refresh_series_progress,
+)
+from tests.integration.conftest import (
+    create_episode,
+    create_season,
+    create_series,
+    create_user,
+)
+
+
+async def _progress(session) -> dict[tuple[int, int], tuple[int, int, int, int]]:
+    rows = (await session.execute(select(SeriesProgress))).scalars().all()
+    for row in rows:
+        await session.refresh(row)
+    return {
+        (row.user_id, row.series_id): (row.total, row.watched, row.watching, row.dropped)
+        for row in rows
+    }
+
+
+async def _seed(session):
+    alice = await create_user(session, username="alice", jellyfin_user_id=str(uuid.uuid4()))
+    bob = await create_user(session, username="bob", jellyfin_user_id=str(uuid.uuid4()))
+    series = await create_series(session, title="Breaking Bad")
+    season = await create_season(session, series_id=series.id, number=1)
+    episodes = [
+        await create_episode(session, season_id=season.id, number=n, title=f"S01E0{n}")
+        for n in (1, 2, 3)
+    ]
+    await refresh_series_progress(session, [series.id])
+    await session.commit()
+    return alice, bob, series, season, episodes
+
+
+async def test_every_user_gets_series_totals(session_for_test) -> None:
+    alice, bob, series, _, _ = await _seed(session_for_test)
+
+    assert await _progress(session_for_test) == {
+        (alice.id, series.id): (3, 0, 0, 0),
+        (bob.id, series.id): (3, 0, 0, 0),
+    }
+
+
+async def test_manual_season_status_updates_progress(client_with_db, session_for_test) -> None:
+    alice, bob, series, season, _ = await _seed(session_for_test)
+
+    response = await client_with_db.put(
+        f"/api/v1/watch/seasons/{season.id}",
+        json={"jellyfin_user_id": alice.jellyfin_user_id, "status": "watched"},
+    )
+    assert response.status_code == 200
+
+    assert await _progress(session_for_test) == {
+        (alice.id, series.id): (3, 3, 0, 0),
+        (bob.id, series.id): (3, 0, 0, 0),
+    }
+
+    resp = await client_with_db.get(
+        "/api/v1/media", params={"jellyfin_user_id": alice.jellyfin_user_id}
+    )
+    (item,) = resp.json()["items"]
+    assert (item["total_episodes"], item["watched_episodes"]) == (3, 3)
+    assert item["watch_status"] == "watched"
+
+    resp = await client_with_db.get(
+        f"/api/v1/media/{series.id}", params={"jellyfin_user_id": bob.jellyfin_user_id}
+    )
+    assert resp.json()["watch_status"] == "planned"
+
+
+async def test_manual_episode_status_updates_progress(client_with_db, session_for_test) -> None:
+    alice, _, series, _, episodes = await _seed(session_for_test)
+
+    response = await client_with_db.put(
+        f"/api/v1/watch/episodes/{episodes[0].id}",
+        json={"jellyfin_user_id": alice.jellyfin_user_id, "status": "dropped"},
+    )
+    assert response.status_code == 200
+
+    progress = await _progress(session_for_test)
+    assert progress[(alice.id, series.id)] == (3, 0, 0, 1)
+
+
+async def test_rebuild_matches_incremental_updates(client_with_db, session_for_test) -> None:
+    alice, _, series, season, _ = await _seed(session_for_test)
+    await client_with_db.put(
+        f"/api/v1/watch/seasons/{season.id}",
+        json={"jellyfin_user_id": alice.jellyfin_user_id, "status": "watching"},
+    )
+    # An episode added behind the writers' back is picked up by the rebuild
+    await create_episode(session_for_test, season_id=season.id, number=4, title="S01E04")
+    incremental = await _progress(session_for_test)
+
+    rows = await rebuild_series_progress(session_for_test)
+    await session_for_test.commit()
+
+    assert rows == 2
+    rebuilt = await _progress(session_for_test)
+    assert rebuilt[(alice.id, series.id)] == (4, 0, 3, 0)
+    assert incremental[(alice.id, series.id)] == (3, 0, 3, 0)
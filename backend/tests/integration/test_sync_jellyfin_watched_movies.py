@@ -37,10 +37,10 @@ async def test_sync_adds_watched_movie(session_no_expire, monkeypatch):
     ]
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return mock_movies
+        yield mock_movies
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -98,10 +98,10 @@ async def test_sync_with_mixed_watched_status(session_no_expire, monkeypatch):
     ]
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return mock_movies
+        yield mock_movies
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -144,10 +144,10 @@ async def test_sync_updates_existing_watched_movie(session_no_expire, monkeypatc
     ]
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return mock_movies
+        yield mock_movies
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -183,10 +183,10 @@ async def test_sync_marks_movie_unwatched(session_no_expire, monkeypatch):
     ]
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return mock_movies
+        yield mock_movies
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -215,7 +215,7 @@ async def test_sync_multiple_users(session_no_expire, monkeypatch):
         call_count += 1
 
         if jellyfin_user_id == "jf_5":
-            return [
+            yield [
                 JellyfinMovieDictFactory(
                     Id="50",
                     Name="Movie 1",
@@ -224,7 +224,7 @@ async def test_sync_multiple_users(session_no_expire, monkeypatch):
                 )
             ]
         else:
-            return [
+            yield [
                 JellyfinMovieDictFactory(
                     Id="60",
                     Name="Movie 2",
@@ -234,7 +234,7 @@ async def test_sync_multiple_users(session_no_expire, monkeypatch):
             ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -259,7 +259,7 @@ async def test_find_movie_by_different_ids(session_no_expire, monkeypatch):
     )
 
     async def mock_fetch_jellyfin(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinMovieDictFactory(
                 Id="jellyfin_70",
                 Name="Movie by Jellyfin ID",
@@ -269,7 +269,7 @@ async def test_find_movie_by_different_ids(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch_jellyfin,
     )
 
@@ -282,7 +282,7 @@ async def test_find_movie_by_different_ids(session_no_expire, monkeypatch):
     await session_no_expire.commit()
 
     async def mock_fetch_tmdb(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinMovieDictFactory(
                 Id="unknown_jellyfin",
                 Name="Movie by TMDB ID",
@@ -292,7 +292,7 @@ async def test_find_movie_by_different_ids(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch_tmdb,
     )
 
@@ -317,7 +317,7 @@ async def test_error_handling(session_no_expire, monkeypatch):
         call_count += 1
 
         if jellyfin_user_id == "jf_8":
-            return [
+            yield [
                 JellyfinMovieDictFactory(
                     Id="80",
                     Name="Good Movie",
@@ -329,7 +329,7 @@ async def test_error_handling(session_no_expire, monkeypatch):
             raise Exception("Jellyfin API error")
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -359,7 +359,7 @@ async def test_sync_heals_stale_jellyfin_id_via_tmdb(session_no_expire, monkeypa
     await session_no_expire.commit()
 
     async def mock_fetch(url, api_key, jellyfin_user_id):
-        return [
+        yield [
             JellyfinMovieDictFactory(
                 Id="new-jellyfin-id",
                 Name="Healed Movie",
@@ -369,7 +369,7 @@ async def test_sync_heals_stale_jellyfin_id_via_tmdb(session_no_expire, monkeypa
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -393,10 +393,10 @@ async def test_no_movies_found(session_no_expire, monkeypatch):
     _ = await create_user(session_no_expire, username="empty", jellyfin_user_id="jf_10")
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return []
+        yield []
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
@@ -59,7 +59,7 @@ async def test_sync_adds_watched_episode(session_no_expire, monkeypatch):
     )
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="episode_1",
                 Name="Test Episode",
@@ -73,7 +73,7 @@ async def test_sync_adds_watched_episode(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -137,7 +137,7 @@ async def test_sync_updates_existing_watched_episode(session_no_expire, monkeypa
     await session_no_expire.commit()
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="episode_2",
                 Name="Episode to Update",
@@ -154,7 +154,7 @@ async def test_sync_updates_existing_watched_episode(session_no_expire, monkeypa
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -210,7 +210,7 @@ async def test_sync_marks_episode_unwatched(session_no_expire, monkeypatch):
     await session_no_expire.commit()
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="episode_3",
                 Name="Episode to Unwatch",
@@ -224,7 +224,7 @@ async def test_sync_marks_episode_unwatched(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -276,7 +276,7 @@ async def test_sync_multiple_episodes_for_user(session_no_expire, monkeypatch):
     await session_no_expire.commit()
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="episode_4",
                 Name="Episode 1",
@@ -310,7 +310,7 @@ async def test_sync_multiple_episodes_for_user(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -369,7 +369,7 @@ async def test_sync_multiple_users(session_no_expire, monkeypatch):
         nonlocal call_count
         call_count += 1
 
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="episode_7",
                 Name="Shared Episode",
@@ -383,7 +383,7 @@ async def test_sync_multiple_users(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -437,7 +437,7 @@ async def test_skip_episode_not_found_in_database(session_no_expire, monkeypatch
     await session_no_expire.commit()
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="episode_8",
                 Name="Missing Episode",
@@ -461,7 +461,7 @@ async def test_skip_episode_not_found_in_database(session_no_expire, monkeypatch
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -516,7 +516,7 @@ async def test_error_handling_during_sync(session_no_expire, monkeypatch):
         call_count += 1
 
         if jellyfin_user_id == "jf_9":
-            return [
+            yield [
                 JellyfinSeriesDictFactory(
                     Id="episode_9",
                     Name="Test Episode",
@@ -532,7 +532,7 @@ async def test_error_handling_during_sync(session_no_expire, monkeypatch):
             raise Exception("Jellyfin API error")
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -583,7 +583,7 @@ async def test_bulk_insert_of_watched_episodes(session_no_expire, monkeypatch):
     await session_no_expire.commit()
 
     async def mock_fetch(url: str, api_key: str, jellyfin_user_id: str):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id=f"episode_{j + 10}",
                 Name=f"Episode {j + 1}",
@@ -598,7 +598,7 @@ async def test_bulk_insert_of_watched_episodes(session_no_expire, monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch,
     )
 
@@ -648,7 +648,7 @@ async def test_sync_heals_stale_series_jellyfin_id_via_tvdb(session_no_expire, m
     await session_no_expire.commit()
 
     async def mock_fetch_episodes(url, api_key, jellyfin_user_id):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="new-ep-id",
                 SeriesId="new-series",
@@ -663,7 +663,7 @@ async def test_sync_heals_stale_series_jellyfin_id_via_tvdb(session_no_expire, m
         return [{"Id": "new-series", "ProviderIds": {"Tvdb": "tvdb-999"}}]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch_episodes,
     )
     monkeypatch.setattr(
@@ -707,7 +707,7 @@ async def test_sync_heals_stale_episode_jellyfin_id_via_season_ep(session_no_exp
     await session_no_expire.commit()
 
     async def mock_fetch_episodes(url, api_key, jellyfin_user_id):
-        return [
+        yield [
             JellyfinSeriesDictFactory(
                 Id="new-ep-2",
                 SeriesId="jf-series-stable",
@@ -722,7 +722,7 @@ async def test_sync_heals_stale_episode_jellyfin_id_via_season_ep(session_no_exp
         return [{"Id": "jf-series-stable", "ProviderIds": {}}]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
+        "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         mock_fetch_episodes,
     )
     monkeypatch.setattr(
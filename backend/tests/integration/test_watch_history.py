@@ -149,7 +149,7 @@ async def test_is_manual_protects_from_sync(session_for_test, monkeypatch) -> No
 
     # Sync reports both movies as UNWATCHED (Played=False) → jellyfin_status=PLANNED
     async def mock_fetch(url, api_key, jellyfin_user_id):
-        return [
+        yield [
             JellyfinMovieDictFactory(
                 Id="jf-movie-A",
                 Name="Movie A",
@@ -165,7 +165,7 @@ async def test_is_manual_protects_from_sync(session_for_test, monkeypatch) -> No
         ]
 
     monkeypatch.setattr(
-        "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
+        "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         mock_fetch,
     )
 
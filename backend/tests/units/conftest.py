@@ -1,5 +1,6 @@
 import os
 from collections.abc import AsyncGenerator, Callable, Coroutine, Generator
+from dataclasses import replace
 from datetime import UTC, datetime
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
@@ -8,11 +9,14 @@ import pytest
 from httpx import AsyncClient
 from pytest_factoryboy import register
 
-from app.dependencies.auth import get_current_user
+from app.client.http_pool import POOL_SETTINGS, http_clients
+from app.dependencies.auth import forget_active_users, get_current_user, get_current_user_id
 from app.main import app
 from app.models.auth import AppUser
 from app.models.media import Movie, Series
 from app.models.user import User, WatchHistory, WatchStatus
+from app.services.media_response_cache import media_response_cache
+from app.services.sync_watermark_repository import SyncWindow
 from tests.factories import (
     AppUserFactory,
     EpisodeFactory,
@@ -26,6 +30,7 @@ from tests.factories import (
     UserFactory,
     WatchHistoryFactory,
 )
+from tests.utils.async_iter import AsyncIterMock
 
 # Устанавливаем тестовое окружение
 os.environ.update(
@@ -78,9 +83,97 @@ def override_auth_dependency(mock_current_user: AppUser) -> Generator[None, None
     async def override() -> AppUser:
         return mock_current_user
 
+    async def override_id() -> int:
+        return mock_current_user.id
+
     app.dependency_overrides[get_current_user] = override
+    app.dependency_overrides[get_current_user_id] = override_id
     yield
     app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_current_user_id, None)
+    forget_active_users()
+
+
+@pytest.fixture(autouse=True)
+async def reset_http_clients() -> AsyncGenerator[None, None]:
+    """Пул HTTP-клиентов глобальный — сбрасываем его, чтобы моки не протекали между тестами."""
+    yield
+    await http_clients.aclose()
+
+
+@pytest.fixture(autouse=True)
+def reset_media_response_cache() -> Generator[None, None, None]:
+    """Кеш ответов /api/v1/media глобальный — очищаем его после каждого теста."""
+    yield
+    media_response_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def fast_http_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Повторы HTTP-запросов без реальных пауз между попытками."""
+    for service, settings in POOL_SETTINGS.items():
+        if settings.retry is not None:
+            monkeypatch.setitem(
+                POOL_SETTINGS,
+                service,
+                replace(settings, retry=replace(settings.retry, backoff_base=0.0)),
+            )
+
+
+_WATERMARK_USERS = (
+    "app.services.import_jellyfin_movies_service",
+    "app.services.import_jellyfin_series_service",
+    "app.services.sync_jellyfin_watched_movies_service",
+    "app.services.sync_jellyfin_watched_series_service",
+)
+
+
+@pytest.fixture(autouse=True)
+def full_sync_window() -> Generator[AsyncMock, None, None]:
+    """
+    Водяные знаки синхронизации: по умолчанию каждый прогон полный и ничего не пишет в сессию.
+    Тесты инкрементального режима переопределяют begin_sync у себя.
+    """
+    begin = AsyncMock(side_effect=lambda *args, **kwargs: SyncWindow(started_at=datetime.now(UTC)))
+    patchers = [
+        patch(f"{module}.{name}", new=mock)
+        for module in _WATERMARK_USERS
+        for name, mock in (("begin_sync", begin), ("complete_sync", AsyncMock()))
+    ]
+    for patcher in patchers:
+        patcher.start()
+    yield begin
+    for patcher in patchers:
+        patcher.stop()
+
+
+_SERIES_PROGRESS_WRITERS = (
+    "app.services.import_jellyfin_series_service",
+    "app.services.jellyfin_users_service",
+    "app.services.jellyfin_webhook_service",
+    "app.services.sonarr_service",
+    "app.services.sync_jellyfin_watched_series_service",
+    "app.services.update_tmdb_series_metadata_service",
+    "app.services.watch_history_service",
+)
+
+
+@pytest.fixture(autouse=True)
+def series_progress_refresh() -> Generator[AsyncMock, None, None]:
+    """
+    Пересчёт series_progress — отдельный INSERT ... SELECT, в юнит-тестах не выполняется.
+    Тесты могут проверить, для каких сериалов и пользователей он вызван.
+    """
+    refresh = AsyncMock(return_value=0)
+    patchers = [
+        patch(f"{module}.refresh_series_progress", new=refresh)
+        for module in _SERIES_PROGRESS_WRITERS
+    ]
+    for patcher in patchers:
+        patcher.start()
+    yield refresh
+    for patcher in patchers:
+        patcher.stop()
 
 
 # --- Моки базы данных и зависимостей ---
@@ -474,21 +567,21 @@ def setup_mock_session_exists_check(
     return _setup
 
 
-# --- Хелперы для мокирования fetch_radarr_movies и fetch_sonarr_series ---
+# --- Хелперы для мокирования iter_radarr_movies и iter_sonarr_series ---
 @pytest.fixture
-def mock_fetch_radarr_movies() -> Generator[AsyncMock, None, None]:
-    """Фикстура для мока функции fetch_radarr_movies"""
+def mock_fetch_radarr_movies() -> Generator[AsyncIterMock, None, None]:
+    """Фикстура для мока потока iter_radarr_movies"""
     with patch(
-        "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
+        "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
     ) as mock_fetch:
         yield mock_fetch
 
 
 @pytest.fixture
-def mock_fetch_sonarr_series() -> Generator[AsyncMock, None, None]:
-    """Фикстура для мока функции fetch_sonarr_series"""
+def mock_fetch_sonarr_series() -> Generator[AsyncIterMock, None, None]:
+    """Фикстура для мока потока iter_sonarr_series"""
     with patch(
-        "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+        "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
     ) as mock_fetch:
         yield mock_fetch
 
@@ -0,0 +1,116 @@
+"""Unit tests for app.services.http_cache_repository (no real DB)."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.client.tmdb_bridge_client import BridgeResponse, BridgeValidators
+from app.models.http_cache import HttpResponseCache
+from app.services import http_cache_repository as repo
+
+_URL = "https://bridge.test/tmdb/movie/1"
+
+
+def _entry(**kwargs) -> HttpResponseCache:  # type: ignore[no-untyped-def]
+    defaults: dict = {"url": _URL, "etag": '"v1"', "last_modified": None, "body_digest": "d1"}
+    defaults.update(kwargs)
+    return HttpResponseCache(**defaults)
+
+
+def _response(data=None, digest=None, **validators) -> BridgeResponse:  # type: ignore[no-untyped-def]
+    return BridgeResponse(
+        url=_URL, data=data, validators=BridgeValidators(**validators), digest=digest
+    )
+
+
+# ---------------------------------------------------------------------------
+# cached_validators / is_unchanged / needs_save
+# ---------------------------------------------------------------------------
+
+
+def test_cached_validators_none_without_entry_or_validators() -> None:
+    assert repo.cached_validators(None, "d1") is None
+    assert repo.cached_validators(_entry(etag=None, last_modified=None), "d1") is None
+
+
+def test_cached_validators_from_entry() -> None:
+    entry = _entry(etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+    assert repo.cached_validators(entry, "d1") == BridgeValidators(
+        etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT"
+    )
+
+
+def test_cached_validators_none_when_row_has_another_body() -> None:
+    # The row was changed by an import (digest cleared) or got another body since
+    assert repo.cached_validators(_entry(), None) is None
+    assert repo.cached_validators(_entry(), "d0") is None
+
+
+def test_is_unchanged() -> None:
+    assert repo.is_unchanged(_response(data=None), "d1") is True
+    assert repo.is_unchanged(_response(data={"a": 1}, digest="d1"), "d1") is True
+    assert repo.is_unchanged(_response(data={"a": 1}, digest="d2"), "d1") is False
+    assert repo.is_unchanged(_response(data={"a": 1}, digest="d1"), None) is False
+
+
+def test_needs_save() -> None:
+    same = _response(data={"a": 1}, digest="d1", etag='"v1"')
+    new_etag = _response(data={"a": 1}, digest="d1", etag='"v2"')
+
+    assert repo.needs_save(same, None) is True
+    assert repo.needs_save(same, _entry()) is False
+    assert repo.needs_save(new_etag, _entry()) is True
+    assert repo.needs_save(_response(data=None), _entry()) is False
+
+
+# ---------------------------------------------------------------------------
+# load_cache_entries / save_cache_entries
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_load_cache_entries_keyed_by_url() -> None:
+    entry = _entry()
+    session = AsyncMock()
+    session.scalars = AsyncMock(return_value=[entry])
+
+    result = await repo.load_cache_entries(session, [_URL])
+
+    assert result == {_URL: entry}
+    session.scalars.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_load_cache_entries_empty_urls_skips_query() -> None:
+    session = AsyncMock()
+
+    assert await repo.load_cache_entries(session, []) == {}
+    session.scalars.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_save_cache_entries_single_upsert() -> None:
+    session = AsyncMock()
+    responses = [
+        _response(data={"a": 1}, digest="d1", etag='"v1"'),
+        _response(data={"a": 2}, digest="d2", etag='"v2"'),  # same URL — last one wins
+    ]
+
+    await repo.save_cache_entries(session, responses)
+
+    session.execute.assert_awaited_once()
+    stmt = session.execute.call_args.args[0]
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (url) DO UPDATE" in str(compiled)
+    assert compiled.params["body_digest_m0"] == "d2"
+
+
+@pytest.mark.asyncio
+async def test_save_cache_entries_nothing_to_save() -> None:
+    session = AsyncMock()
+
+    await repo.save_cache_entries(session, [_response(data=None)])
+
+    session.execute.assert_not_called()
@@ -0,0 +1,149 @@
+"""Unit tests for app.services.media_response_cache (no real DB)."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.auth import AppUser
+from app.models.media import Media
+from app.models.user import SeriesProgress, WatchHistory
+from app.services import media_response_cache as cache_module
+from app.services.media_response_cache import MediaResponseCache, _etag_matches, cached_response
+
+KEY = ("/api/v1/media", (("jellyfin_user_id", "u1"),))
+
+
+def test_put_returns_strong_etag_of_body() -> None:
+    cache = MediaResponseCache()
+
+    entry = cache.put(KEY, b'{"items": []}', cache.version)
+
+    assert entry.etag.startswith('"') and entry.etag.endswith('"')
+    assert cache.put(KEY, b'{"items": []}', cache.version).etag == entry.etag
+    assert cache.put(KEY, b'{"items": [1]}', cache.version).etag != entry.etag
+    assert cache.get(KEY) is not None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = MediaResponseCache(max_entries=2)
+    keys = [("/api/v1/media", (("page", str(n)),)) for n in range(3)]
+    cache.put(keys[0], b"0", 0)
+    cache.put(keys[1], b"1", 0)
+    cache.get(keys[0])
+
+    cache.put(keys[2], b"2", 0)
+
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+
+
+def test_invalidate_drops_entries_and_bumps_version() -> None:
+    cache = MediaResponseCache()
+    cache.put(KEY, b"{}", 0)
+
+    cache.invalidate()
+
+    assert cache.version == 1
+    assert cache.get(KEY) is None
+
+
+def test_body_built_before_invalidation_is_not_stored() -> None:
+    """Ответ, собранный до коммита синхронизации, не должен попасть в кеш."""
+    cache = MediaResponseCache()
+    version = cache.version
+    cache.invalidate()
+
+    entry = cache.put(KEY, b"{}", version)
+
+    assert entry.body == b"{}"
+    assert cache.get(KEY) is None
+
+
+def test_etag_matching() -> None:
+    assert _etag_matches('"abc"', '"abc"')
+    assert _etag_matches('"x", W/"abc"', '"abc"')
+    assert _etag_matches("*", '"abc"')
+    assert not _etag_matches('"x"', '"abc"')
+    assert not _etag_matches(None, '"abc"')
+
+
+def _session() -> Mock:
+    return Mock(spec=Session, info={}, new=[], dirty=[], deleted=[])
+
+
+def _commit(session: Mock) -> None:
+    cache_module._invalidate_on_commit(session)
+    cache_module._forget_rolled_back_changes(session, SimpleNamespace(parent=None))
+
+
+def test_commit_after_flushing_media_objects_invalidates() -> None:
+    session = _session()
+    session.dirty = [WatchHistory(user_id=1)]
+    version = cache_module.media_response_cache.version
+
+    cache_module._mark_flushed_changes(session, Mock())
+    _commit(session)
+
+    assert cache_module.media_response_cache.version == version + 1
+    assert session.info == {}
+
+
+def test_commit_after_bulk_statement_invalidates() -> None:
+    version = cache_module.media_response_cache.version
+    for stmt in (insert(SeriesProgress), update(Media), delete(WatchHistory)):
+        session = _session()
+        cache_module._mark_bulk_changes(
+            Mock(
+                session=session,
+                statement=stmt,
+                is_insert=stmt.is_insert,
+                is_update=stmt.is_update,
+                is_delete=stmt.is_delete,
+            )
+        )
+        _commit(session)
+
+    assert cache_module.media_response_cache.version == version + 3
+
+
+def test_writes_to_other_tables_keep_cache() -> None:
+    session = _session()
+    session.new = [AppUser(username="admin")]
+    cache_module._mark_flushed_changes(session, Mock())
+    cache_module._mark_bulk_changes(
+        Mock(session=session, statement=update(AppUser), is_insert=False, is_update=True)
+    )
+    version = cache_module.media_response_cache.version
+
+    _commit(session)
+
+    assert cache_module.media_response_cache.version == version
+
+
+def test_rollback_forgets_changes_but_savepoint_rollback_does_not() -> None:
+    session = _session()
+    session.new = [Media(title="x")]
+    cache_module._mark_flushed_changes(session, Mock())
+
+    cache_module._forget_rolled_back_changes(session, SimpleNamespace(parent=Mock()))
+    assert session.info
+
+    cache_module._forget_rolled_back_changes(session, SimpleNamespace(parent=None))
+    assert session.info == {}
+
+
+async def test_cached_response_stores_ready_json_bytes_as_is() -> None:
+    cache = MediaResponseCache()
+    request = Mock(url=Mock(path="/api/v1/media/1"), query_params=Mock(), headers={})
+    request.query_params.multi_items.return_value = []
+
+    async def build() -> bytes:
+        return b'{"id":1}'
+
+    response = await cached_response(request, build, cache)
+
+    assert response.body == b'{"id":1}'
+    assert cache.get(("/api/v1/media/1", ())) is not None
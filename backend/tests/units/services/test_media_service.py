@@ -1,13 +1,22 @@
 """Unit tests for app.services.media_service (no real DB)."""
 
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, Mock
 
+import pytest
+from fastapi import HTTPException
+
 from app.schemas.media import MediaListResponse
 from app.services.media_service import (
+    MediaSort,
     _pick_movie_status,
+    _prefix_tsquery,
     _to_percent,
     compute_series_status,
+    get_media_detail_json,
     get_media_list,
+    get_media_page,
+    search_media,
 )
 
 
@@ -96,6 +105,12 @@ class TestMovieWithoutWatchHistory:
         result = await get_media_list(session)
         assert result.items[0].watch_status is None
 
+    async def test_series_total_falls_back_to_episode_count_without_progress_rows(self) -> None:
+        session = _make_session([])
+        await get_media_list(session)
+        sql = str(session.execute.await_args.args[0])
+        assert "COALESCE(MAX(sp.total), (\n    SELECT COUNT(*)\n    FROM episodes e" in sql
+
     async def test_movie_without_watch_history_total_is_one(self) -> None:
         row = _movie_row()
         session = _make_session([row])
@@ -181,29 +196,16 @@ class TestFilterByType:
 
 
 class TestFilterByStatus:
-    async def test_filter_status_watched_returns_only_watched(self) -> None:
-        watched_row = _movie_row(media_id=1, title="Watched Movie", movie_status="watched")
-        planned_row = _movie_row(media_id=2, title="Planned Movie", movie_status="planned")
-        session = _make_session([watched_row, planned_row])
-        result = await get_media_list(session, status="watched")
-        assert result.total == 1
-        assert result.items[0].watch_status == "watched"
+    """Статус вычисляется и фильтруется в SQL, БД возвращает только подходящие строки."""
 
-    async def test_filter_status_watched_excludes_other_statuses(self) -> None:
-        planned_row = _movie_row(media_id=1, title="Planned", movie_status="planned")
-        no_status_row = _movie_row(media_id=2, title="No Status", movie_status=None)
-        session = _make_session([planned_row, no_status_row])
+    async def test_filter_status_is_bound_to_query(self) -> None:
+        session = _make_session([_movie_row(movie_status="watched")])
         result = await get_media_list(session, status="watched")
-        assert result.total == 0
-        assert result.items == []
 
-    async def test_filter_status_planned_returns_matching(self) -> None:
-        planned_row = _movie_row(media_id=1, title="Planned", movie_status="planned")
-        watched_row = _movie_row(media_id=2, title="Watched", movie_status="watched")
-        session = _make_session([planned_row, watched_row])
-        result = await get_media_list(session, status="planned")
+        query, params = session.execute.await_args.args
+        assert "st.watch_status = CAST(:status AS VARCHAR)" in str(query)
+        assert params["status"] == "watched"
         assert result.total == 1
-        assert result.items[0].title == "Planned"
 
     async def test_filter_status_none_returns_all(self) -> None:
         watched_row = _movie_row(media_id=1, title="Watched", movie_status="watched")
@@ -211,6 +213,40 @@ class TestFilterByStatus:
         session = _make_session([watched_row, planned_row])
         result = await get_media_list(session, status=None)
         assert result.total == 2
+        assert session.execute.await_args.args[1]["status"] is None
+
+
+class TestFilterByGenreAndYear:
+    async def test_genre_and_year_are_bound_to_query(self) -> None:
+        session = _make_session([])
+        await get_media_list(session, genre="Drama", year=2022)
+
+        query, params = session.execute.await_args.args
+        assert "@> jsonb_build_array(CAST(:genre AS VARCHAR))" in str(query)
+        assert "COALESCE(mov.year, s.year) = CAST(:year AS INTEGER)" in str(query)
+        assert (params["genre"], params["year"]) == ("Drama", 2022)
+
+
+class TestSort:
+    async def test_default_sort_is_title(self) -> None:
+        session = _make_session([])
+        await get_media_list(session)
+        assert "ORDER BY m.title ASC, m.id ASC" in str(session.execute.await_args.args[0])
+
+    @pytest.mark.parametrize(
+        ("sort", "order_by"),
+        [
+            ("year", "ORDER BY COALESCE(mov.year, s.year, 0) DESC, m.id DESC"),
+            ("rating", "ORDER BY COALESCE(mov.rating_value, s.rating_value, -1) DESC"),
+            ("added", "ORDER BY m.created_at DESC, m.id DESC"),
+            ("watched", "ORDER BY COALESCE(movie_wh.watched_at, ep_stats.last_watched_at"),
+        ],
+    )
+    async def test_sort_options(self, sort: MediaSort, order_by: str) -> None:
+        session = _make_session([])
+        await get_media_list(session, sort=sort)
+        assert order_by in str(session.execute.await_args.args[0])
+        assert "LIMIT :limit" not in str(session.execute.await_args.args[0])
 
 
 class TestToPercent:
@@ -321,3 +357,185 @@ class TestMovieIsManual:
         session = _make_session([row])
         result = await get_media_list(session)
         assert result.items[0].is_manual is False
+
+
+def _page_session(rows: list[dict], total: int | None = None) -> AsyncMock:
+    """execute(): 1-й — строки страницы, 2-й — COUNT(*)."""
+    session = _make_session(rows)
+    page_result = session.execute.return_value
+    count_result = Mock()
+    count_result.scalar_one.return_value = total
+    session.execute = AsyncMock(side_effect=[page_result, count_result])
+    return session
+
+
+class TestGetMediaPage:
+    async def test_last_page_has_no_cursor(self) -> None:
+        rows = [{**_movie_row(media_id=1, title="A"), "sort_key": "A"}]
+        session = _page_session(rows, total=1)
+
+        page = await get_media_page(session, limit=2)
+
+        assert [item.id for item in page.items] == [1]
+        assert page.total == 1
+        assert page.next_cursor is None
+        query, params = session.execute.await_args_list[0].args
+        assert "LIMIT :limit" in str(query)
+        assert params["limit"] == 3  # one extra row tells whether there is a next page
+
+    async def test_next_cursor_resumes_after_last_item(self) -> None:
+        rows = [
+            {**_movie_row(media_id=i, title=title), "sort_key": title}
+            for i, title in ((1, "A"), (2, "B"), (3, "C"))
+        ]
+        session = _page_session(rows, total=3)
+
+        page = await get_media_page(session, limit=2)
+
+        assert [item.id for item in page.items] == [1, 2]
+        assert page.next_cursor is not None
+
+        session = _page_session([], total=3)
+        await get_media_page(session, limit=2, cursor=page.next_cursor)
+
+        query, params = session.execute.await_args_list[0].args
+        assert "AND (m.title, m.id) > (CAST(:cursor_key AS VARCHAR)" in str(query)
+        assert (params["cursor_key"], params["cursor_id"]) == ("B", 2)
+
+    async def test_descending_sort_cursor_round_trips_datetimes(self) -> None:
+        added = datetime(2024, 5, 1, 12, 30, tzinfo=UTC)
+        rows = [{**_movie_row(media_id=i), "sort_key": added} for i in (7, 6)]
+        page = await get_media_page(_page_session(rows), sort="added", limit=1)
+
+        session = _page_session([])
+        await get_media_page(session, sort="added", limit=1, cursor=page.next_cursor)
+
+        query, params = session.execute.await_args_list[0].args
+        assert "AND (m.created_at, m.id) < (CAST(:cursor_key AS TIMESTAMPTZ)" in str(query)
+        assert (params["cursor_key"], params["cursor_id"]) == (added, 7)
+
+    async def test_total_can_be_skipped(self) -> None:
+        session = _page_session([])
+
+        page = await get_media_page(session, include_total=False)
+
+        assert page.total is None
+        session.execute.assert_awaited_once()
+
+    async def test_count_uses_the_same_filters(self) -> None:
+        session = _page_session([], total=0)
+
+        await get_media_page(session, status="watching", genre="Drama")
+
+        count_query, count_params = session.execute.await_args_list[1].args
+        assert str(count_query).strip().startswith("SELECT COUNT(*)")
+        assert "LIMIT :limit" not in str(count_query)
+        assert (count_params["status"], count_params["genre"]) == ("watching", "Drama")
+
+    @pytest.mark.parametrize("cursor", ["garbage!", "WyJ0aXRsZSJd"])
+    async def test_invalid_cursor_is_rejected(self, cursor: str) -> None:
+        with pytest.raises(HTTPException) as exc:
+            await get_media_page(_page_session([]), cursor=cursor)
+        assert exc.value.status_code == 400
+
+    async def test_cursor_of_another_sort_is_rejected(self) -> None:
+        rows = [{**_movie_row(media_id=i, title="A"), "sort_key": "A"} for i in (1, 2)]
+        page = await get_media_page(_page_session(rows), limit=1)
+
+        with pytest.raises(HTTPException):
+            await get_media_page(_page_session([]), sort="year", cursor=page.next_cursor)
+
+
+class TestSearchMedia:
+    @pytest.mark.parametrize(
+        ("q", "expected"),
+        [
+            ("Breaking", "breaking:*"),
+            ("  breaking  BA! ", "breaking:* & ba:*"),
+            ("Во все тяжкие", "во:* & все:* & тяжкие:*"),
+            ("it's_2", "it:* & s:* & 2:*"),
+        ],
+    )
+    def test_every_word_is_a_prefix_match(self, q: str, expected: str) -> None:
+        assert _prefix_tsquery(q) == expected
+
+    async def test_query_unions_index_lookups_and_ranks(self) -> None:
+        rows = [{**_movie_row(media_id=3, title="Breaking Bad"), "sort_key": 0.9}]
+        session = _page_session(rows, total=1)
+
+        page = await search_media(session, "breaking ba", media_type="movie", limit=5)
+
+        assert [item.title for item in page.items] == ["Breaking Bad"]
+        assert page.total == 1
+        query, params = session.execute.await_args_list[0].args
+        sql = str(query)
+        for table in ("media", "movies", "series"):
+            assert f"FROM {table} WHERE search_vector @@ to_tsquery('simple', :tsquery)" in sql
+        assert "CAST(:q AS TEXT) <% title" in sql
+        assert "ORDER BY ranked.rank DESC, m.id DESC" in sql
+        assert (params["q"], params["tsquery"]) == ("breaking ba", "breaking:* & ba:*")
+        assert (params["type"], params["limit"]) == ("MOVIE", 6)
+        count_query, _ = session.execute.await_args_list[1].args
+        assert "SELECT COUNT(*)" in str(count_query)
+
+    async def test_relevance_cursor_resumes_after_last_item(self) -> None:
+        rows = [{**_movie_row(media_id=i), "sort_key": 0.5} for i in (9, 4)]
+        page = await search_media(_page_session(rows), "heat", limit=1)
+
+        session = _page_session([])
+        await search_media(session, "heat", limit=1, cursor=page.next_cursor)
+
+        query, params = session.execute.await_args_list[0].args
+        assert "AND (ranked.rank, m.id) < (CAST(:cursor_key AS DOUBLE PRECISION)" in str(query)
+        assert (params["cursor_key"], params["cursor_id"]) == (0.5, 9)
+
+    async def test_cursor_of_media_list_is_rejected(self) -> None:
+        rows = [{**_movie_row(media_id=i, title="A"), "sort_key": "A"} for i in (1, 2)]
+        page = await get_media_page(_page_session(rows), limit=1)
+
+        with pytest.raises(HTTPException) as exc:
+            await search_media(_page_session([]), "a", cursor=page.next_cursor)
+        assert exc.value.status_code == 400
+
+    async def test_text_without_words_runs_no_query(self) -> None:
+        session = _page_session([])
+
+        page = await search_media(session, "?!", include_total=True)
+
+        assert page.items == []
+        assert page.total == 0
+        session.execute.assert_not_called()
+
+
+class TestGetMediaDetailJson:
+    async def test_returns_document_built_by_postgres(self) -> None:
+        session = AsyncMock()
+        session.execute.return_value = Mock(
+            scalar_one_or_none=Mock(return_value='{"id": 5, "seasons": []}')
+        )
+
+        body = await get_media_detail_json(session, 5, jellyfin_user_id="jf-1")
+
+        assert body == b'{"id": 5, "seasons": []}'
+        session.execute.assert_awaited_once()  # user lookup, seasons and episodes included
+        query, params = session.execute.await_args.args
+        sql = str(query)
+        assert "json_agg(" in sql
+        assert "ORDER BY sea.number" in sql
+        assert "ORDER BY ep.number" in sql
+        assert "COALESCE(MAX(sp.total), (" in sql  # totals without series_progress rows
+        # Formatting matches the MediaDetailResponse serialization it replaced
+        assert "THEN 2 * ROUND(COALESCE(mov.rating_value, s.rating_value) * 10 / 2)" in sql
+        assert (
+            "WHEN date_trunc('second', ep.air_date AT TIME ZONE 'UTC') = ep.air_date AT TIME ZONE"
+            in sql
+        )
+        assert params == {"media_id": 5, "jellyfin_user_id": "jf-1"}
+
+    async def test_unknown_media_is_404(self) -> None:
+        session = AsyncMock()
+        session.execute.return_value = Mock(scalar_one_or_none=Mock(return_value=None))
+
+        with pytest.raises(HTTPException) as exc:
+            await get_media_detail_json(session, 404)
+        assert exc.value.status_code == 404
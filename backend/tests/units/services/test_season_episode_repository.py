@@ -0,0 +1,210 @@
+"""Unit tests for app.services.season_episode_repository (no real DB)."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.util import identity_key
+
+from app.models.media import Episode, Season
+from app.services import season_episode_repository as repo
+
+
+@pytest.fixture
+def mock_session(mock_session: AsyncMock) -> AsyncMock:
+    mock_session.identity_map = {}
+    mock_session.expire = Mock()
+    return mock_session
+
+
+def _sql(stmt) -> str:  # type: ignore[no-untyped-def]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _episode_row(sonarr_id: int, title: str = "Pilot") -> dict:
+    return {"season_id": 1, "sonarr_id": sonarr_id, "number": 1, "title": title}
+
+
+# ---------------------------------------------------------------------------
+# build_upsert_statement
+# ---------------------------------------------------------------------------
+
+
+def test_upsert_statement_updates_only_changed_rows() -> None:
+    stmt = repo.build_upsert_statement(
+        Episode,
+        [{**_episode_row(1), "air_date": None, "overview": None}],
+        index_elements=("sonarr_id",),
+        overwrite=("title",),
+        overwrite_non_null=("air_date",),
+        fill=("overview",),
+    )
+    sql = _sql(stmt)
+
+    assert "ON CONFLICT (sonarr_id) DO UPDATE SET" in sql
+    assert "title = excluded.title" in sql
+    assert "air_date = coalesce(excluded.air_date, episodes.air_date)" in sql
+    assert "overview = coalesce(episodes.overview, excluded.overview)" in sql
+    # Unchanged rows are not rewritten
+    assert "WHERE episodes.title IS DISTINCT FROM excluded.title" in sql
+    assert "excluded.air_date IS NOT NULL AND episodes.air_date IS DISTINCT FROM" in sql
+    assert "episodes.overview IS NULL AND excluded.overview IS NOT NULL" in sql
+    assert "RETURNING episodes.id, xmax = 0 AS inserted, episodes.sonarr_id" in sql
+
+
+def test_upsert_statement_without_update_columns_does_nothing_on_conflict() -> None:
+    sql = _sql(
+        repo.build_upsert_statement(
+            Season, [{"series_id": 1, "number": 1}], index_elements=repo.SEASON_KEY
+        )
+    )
+
+    assert "ON CONFLICT (series_id, number) DO NOTHING" in sql
+
+
+# ---------------------------------------------------------------------------
+# bulk_upsert
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_counts_inserted_and_updated(mock_session: AsyncMock) -> None:
+    # Unchanged rows are filtered by the WHERE clause and not returned at all
+    mock_session.execute.return_value = [(10, True, 1), (11, False, 2)]
+
+    result = await repo.bulk_upsert(
+        mock_session,
+        Episode,
+        [_episode_row(1), _episode_row(2), _episode_row(3)],
+        index_elements=("sonarr_id",),
+        overwrite=("title",),
+    )
+
+    assert result == repo.UpsertResult(ids={(1,): 10, (2,): 11}, inserted=1, updated=1)
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_expires_loaded_objects(mock_session: AsyncMock) -> None:
+    """Объекты, уже загруженные в сессию, перечитываются после upsert."""
+    loaded = Episode(id=10, season_id=1, sonarr_id=1, number=1, title="Old")
+    mock_session.identity_map = {identity_key(Episode, 10): loaded}
+    mock_session.execute.return_value = [(10, False, 1), (11, True, 2)]
+
+    await repo.bulk_upsert(
+        mock_session,
+        Episode,
+        [_episode_row(1, "New"), _episode_row(2)],
+        index_elements=("sonarr_id",),
+        overwrite=("title",),
+    )
+
+    mock_session.expire.assert_called_once_with(loaded)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_collapses_duplicate_keys(mock_session: AsyncMock) -> None:
+    """Одна строка на ключ конфликта: ON CONFLICT не может обновить строку дважды."""
+    mock_session.execute.return_value = []
+
+    await repo.bulk_upsert(
+        mock_session,
+        Episode,
+        [_episode_row(1, "Old"), _episode_row(1, "New")],
+        index_elements=("sonarr_id",),
+        overwrite=("title",),
+    )
+
+    stmt = mock_session.execute.await_args.args[0]
+    assert stmt.compile().params["title_m0"] == "New"
+    assert "title_m1" not in stmt.compile().params
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_splits_into_batches(
+    mock_session: AsyncMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(repo, "UPSERT_BATCH_SIZE", 2)
+    mock_session.execute.return_value = []
+
+    await repo.bulk_upsert(
+        mock_session,
+        Episode,
+        [_episode_row(i) for i in range(5)],
+        index_elements=("sonarr_id",),
+    )
+
+    assert mock_session.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_without_rows_runs_no_statement(mock_session: AsyncMock) -> None:
+    result = await repo.bulk_upsert(mock_session, Episode, [], index_elements=("sonarr_id",))
+
+    assert result == repo.UpsertResult()
+    mock_session.execute.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# upsert_seasons
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_upsert_seasons_returns_existing_and_new_ids(mock_session: AsyncMock) -> None:
+    """Существующие сезоны, которые upsert не тронул, тоже попадают в результат."""
+    mock_session.execute.side_effect = [
+        [(7, 1, 100)],  # load_season_ids: season 1 exists
+        [(101, True, 7, 2)],  # upsert: season 2 inserted, season 1 unchanged
+    ]
+    release = datetime(2020, 1, 1, tzinfo=UTC)
+
+    seasons = await repo.upsert_seasons(
+        mock_session,
+        [
+            {"series_id": 7, "number": 1, "release_date": release},
+            {"series_id": 7, "number": 2, "release_date": None},
+        ],
+        fill=("release_date",),
+    )
+
+    assert seasons.ids == {(7, 1): 100, (7, 2): 101}
+    assert (seasons.inserted, seasons.updated) == (1, 0)
+    sql = _sql(mock_session.execute.await_args_list[1].args[0])
+    assert "ON CONFLICT (series_id, number) DO UPDATE SET" in sql
+    assert "release_date = coalesce(seasons.release_date, excluded.release_date)" in sql
+
+
+@pytest.mark.asyncio
+async def test_upsert_seasons_without_rows(mock_session: AsyncMock) -> None:
+    assert await repo.upsert_seasons(mock_session, []) == repo.UpsertResult()
+    mock_session.execute.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# load_episode_series_ids
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_load_episode_series_ids_in_batches(
+    mock_session: AsyncMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(repo, "UPSERT_BATCH_SIZE", 2)
+    mock_session.scalars.side_effect = [[7], [7, 8]]
+
+    series_ids = await repo.load_episode_series_ids(mock_session, Episode.sonarr_id, [1, 2, 3])
+
+    assert series_ids == {7, 8}
+    assert mock_session.scalars.await_count == 2
+    sql = _sql(mock_session.scalars.await_args.args[0])
+    assert "SELECT DISTINCT seasons.series_id" in sql
+    assert "JOIN episodes ON episodes.season_id = seasons.id" in sql
+    assert "episodes.sonarr_id IN" in sql
+
+
+@pytest.mark.asyncio
+async def test_load_episode_series_ids_without_keys(mock_session: AsyncMock) -> None:
+    assert await repo.load_episode_series_ids(mock_session, Episode.jellyfin_id, []) == set()
+    mock_session.scalars.assert_not_called()
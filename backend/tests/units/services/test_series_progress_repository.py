@@ -0,0 +1,68 @@
+"""Unit tests for app.services.series_progress_repository (no real DB)."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import series_progress_repository as repo
+
+
+def _sql(stmt) -> str:  # type: ignore[no-untyped-def]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_refresh_statement_recomputes_every_user_series_pair() -> None:
+    sql = _sql(repo.build_refresh_statement())
+
+    assert sql.startswith(
+        "INSERT INTO series_progress "
+        "(user_id, series_id, total, watched, watching, dropped, last_watched_at) SELECT"
+    )
+    assert "FROM users JOIN series ON true" in sql
+    assert "count(*) FILTER (WHERE watch_history.status = " in sql
+    assert "ON CONFLICT (user_id, series_id) DO UPDATE SET total = excluded.total" in sql
+    # Unchanged rows are not rewritten
+    assert "WHERE series_progress.total IS DISTINCT FROM excluded.total OR" in sql
+    assert " IN (" not in sql
+
+
+def test_refresh_statement_limits_series_and_users() -> None:
+    stmt = repo.build_refresh_statement([7], [3])
+    sql = _sql(stmt)
+
+    assert "WHERE series.id IN (__[POSTCOMPILE_id_1]) AND users.id IN (__[POSTCOMPILE_id_2])" in sql
+    assert "WHERE seasons.series_id IN (__[POSTCOMPILE_series_id_1]) GROUP BY" in sql
+    assert "watch_history.user_id IN (__[POSTCOMPILE_user_id_1])" in sql
+    params = stmt.compile().params
+    assert params["id_1"] == [7]
+    assert params["id_2"] == [3]
+
+
+@pytest.mark.asyncio
+async def test_refresh_returns_rows_written(mock_session: AsyncMock) -> None:
+    mock_session.execute.return_value = Mock(rowcount=4)
+
+    assert await repo.refresh_series_progress(mock_session, {1, 2}, [5]) == 4
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("series_ids", "user_ids"), [(set(), None), ({1}, []), ([], [])])
+async def test_refresh_with_nothing_to_refresh_runs_no_statement(
+    mock_session: AsyncMock, series_ids: set[int], user_ids: list[int] | None
+) -> None:
+    """Пустой список сериалов или пользователей — не «все», а «никто»."""
+    assert await repo.refresh_series_progress(mock_session, series_ids, user_ids) == 0
+    mock_session.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_clears_table_then_refreshes_everything(mock_session: AsyncMock) -> None:
+    mock_session.execute.side_effect = [Mock(), Mock(rowcount=12)]
+
+    assert await repo.rebuild_series_progress(mock_session) == 12
+
+    delete_stmt, refresh_stmt = (call.args[0] for call in mock_session.execute.await_args_list)
+    assert _sql(delete_stmt) == "DELETE FROM series_progress"
+    assert " IN (" not in _sql(refresh_stmt)
@@ -202,3 +202,39 @@ async def test_get_decrypted_config_passes_correct_encrypted_key_to_decrypt():
         await repo.get_decrypted_config(session, ServiceType.SONARR)
 
     mock_decrypt.assert_called_once_with("my-encrypted-blob")
+
+
+# ---------------------------------------------------------------------------
+# upsert_config — Jellyfin sync watermarks
+# ---------------------------------------------------------------------------
+
+
+async def test_upsert_jellyfin_config_with_new_url_resets_watermarks():
+    """Another Jellyfin server → watermarks are dropped so the next imports run in full."""
+    existing = _make_config(ServiceType.JELLYFIN, "http://old-jellyfin", "old_enc")
+    session = _make_session(scalar_one_or_none=existing)
+
+    with (
+        patch("app.services.service_config_repository.encrypt_api_key", return_value="enc"),
+        patch(
+            "app.services.service_config_repository.reset_watermarks", new_callable=AsyncMock
+        ) as mock_reset,
+    ):
+        await repo.upsert_config(session, ServiceType.JELLYFIN, "http://new-jellyfin/", "key")
+
+    mock_reset.assert_awaited_once_with(session)
+
+
+async def test_upsert_jellyfin_config_same_url_keeps_watermarks():
+    existing = _make_config(ServiceType.JELLYFIN, "http://jellyfin", "old_enc")
+    session = _make_session(scalar_one_or_none=existing)
+
+    with (
+        patch("app.services.service_config_repository.encrypt_api_key", return_value="enc"),
+        patch(
+            "app.services.service_config_repository.reset_watermarks", new_callable=AsyncMock
+        ) as mock_reset,
+    ):
+        await repo.upsert_config(session, ServiceType.JELLYFIN, "http://jellyfin/", "rotated")
+
+    mock_reset.assert_not_awaited()
@@ -0,0 +1,139 @@
+"""Unit tests for app.services.sync_watermark_repository (no real DB)."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.schedule import SyncJobType, SyncWatermark
+from app.services import sync_watermark_repository as repo
+
+_JOB = SyncJobType.JELLYFIN_MOVIE_WATCH_HISTORY
+
+
+def _session(entry: SyncWatermark | None) -> AsyncMock:
+    session = AsyncMock()
+    session.scalar = AsyncMock(return_value=entry)
+    return session
+
+
+def _entry(
+    watermark_age: timedelta, full_age: timedelta | None, pending_ids: list[str] | None = None
+) -> SyncWatermark:
+    now = datetime.now(UTC)
+    return SyncWatermark(
+        job_type=_JOB,
+        scope="jf-user",
+        watermark=now - watermark_age,
+        last_full_sync_at=now - full_age if full_age is not None else None,
+        pending_ids=pending_ids if pending_ids is not None else [],
+    )
+
+
+# ---------------------------------------------------------------------------
+# begin_sync
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_first_run_is_full() -> None:
+    window = await repo.begin_sync(_session(None), _JOB, "jf-user")
+
+    assert window.full
+    assert window.since is None
+
+
+@pytest.mark.asyncio
+async def test_incremental_since_watermark_minus_overlap() -> None:
+    entry = _entry(timedelta(hours=1), full_age=timedelta(days=1))
+
+    window = await repo.begin_sync(_session(entry), _JOB, "jf-user")
+
+    assert not window.full
+    assert window.since == entry.watermark - repo.WATERMARK_OVERLAP
+    assert window.pending == ()
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_asks_again_for_pending_ids() -> None:
+    entry = _entry(timedelta(hours=1), full_age=timedelta(days=1), pending_ids=["jf-1", "jf-2"])
+
+    window = await repo.begin_sync(_session(entry), _JOB, "jf-user")
+
+    assert window.pending == ("jf-1", "jf-2")
+
+
+@pytest.mark.asyncio
+async def test_full_reconciliation_when_last_full_run_is_old() -> None:
+    entry = _entry(
+        timedelta(hours=1),
+        full_age=repo.FULL_SYNC_INTERVAL + timedelta(minutes=1),
+        pending_ids=["jf-1"],
+    )
+
+    window = await repo.begin_sync(_session(entry), _JOB, "jf-user")
+
+    assert window.full
+    # a full run lists every item anyway
+    assert window.pending == ()
+
+
+# ---------------------------------------------------------------------------
+# complete_sync / reset_watermarks
+# ---------------------------------------------------------------------------
+
+
+def _compiled(session: AsyncMock) -> str:
+    stmt = session.execute.await_args.args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_complete_full_sync_records_full_run_time() -> None:
+    session = AsyncMock()
+    window = repo.SyncWindow(started_at=datetime(2026, 1, 2, tzinfo=UTC))
+
+    await repo.complete_sync(session, _JOB, window, "jf-user")
+
+    stmt = session.execute.await_args.args[0]
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    assert params["watermark"] == window.started_at
+    assert params["last_full_sync_at"] == window.started_at
+    assert params["pending_ids"] == []
+    assert "ON CONFLICT ON CONSTRAINT uq_sync_watermark_job_scope DO UPDATE" in _compiled(session)
+
+
+@pytest.mark.asyncio
+async def test_complete_incremental_sync_keeps_last_full_run_time() -> None:
+    session = AsyncMock()
+    window = repo.SyncWindow(
+        started_at=datetime(2026, 1, 2, tzinfo=UTC), since=datetime(2026, 1, 1, tzinfo=UTC)
+    )
+
+    await repo.complete_sync(session, _JOB, window, "jf-user")
+
+    stmt = session.execute.await_args.args[0]
+    assert stmt.compile(dialect=postgresql.dialect()).params["last_full_sync_at"] is None
+    assert "coalesce(excluded.last_full_sync_at" in _compiled(session)
+
+
+@pytest.mark.asyncio
+async def test_complete_sync_replaces_pending_ids() -> None:
+    session = AsyncMock()
+    window = repo.SyncWindow(started_at=datetime(2026, 1, 2, tzinfo=UTC))
+
+    await repo.complete_sync(session, _JOB, window, "jf-user", pending=["jf-2", "jf-1", "jf-2"])
+
+    stmt = session.execute.await_args.args[0]
+    assert stmt.compile(dialect=postgresql.dialect()).params["pending_ids"] == ["jf-1", "jf-2"]
+    assert "pending_ids = excluded.pending_ids" in _compiled(session)
+
+
+@pytest.mark.asyncio
+async def test_reset_watermarks_deletes_all() -> None:
+    session = AsyncMock()
+
+    await repo.reset_watermarks(session)
+
+    assert _compiled(session).startswith("DELETE FROM sync_watermarks")
@@ -1,17 +1,29 @@
 """Unit tests for update_tmdb_metadata_service."""
 
+import asyncio
 from datetime import UTC, date, datetime
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
-from app.client.tmdb_bridge_client import TmdbBridgeClientError
+from app.client.tmdb_bridge_client import (
+    BridgeResponse,
+    BridgeValidators,
+    TmdbBridgeClientError,
+    tmdb_movie_url,
+)
+from app.models.http_cache import HttpResponseCache
 from app.models.media import MovieStatus
 from app.schemas.error_codes import TmdbBridgeErrorCode
-from app.schemas.tmdb_bridge import TmdbBridgeMovieResponse, TmdbGenre
+from app.schemas.tmdb_bridge import (
+    TmdbBridgeMovieResponse,
+    TmdbGenre,
+    TmdbMetadataUpdateResponse,
+)
 from app.services.update_tmdb_metadata_service import (
     _apply_tmdb_update,
     update_movies_tmdb_metadata,
+    update_tmdb_metadata,
 )
 from tests.factories import MediaFactory, MovieFactory
 
@@ -199,6 +211,10 @@ _VALID_RAW = {
 }
 
 
+def _bridge_response(data, tmdb_id="123", **kwargs) -> BridgeResponse:  # type: ignore[no-untyped-def]
+    return BridgeResponse(url=tmdb_movie_url(tmdb_id), data=data, **kwargs)
+
+
 @pytest.mark.asyncio
 async def test_happy_path_two_movies() -> None:
     movie1 = _make_movie(tmdb_id="123")
@@ -209,7 +225,7 @@ async def test_happy_path_two_movies() -> None:
     with patch(
         "app.services.update_tmdb_metadata_service.fetch_tmdb_movie",
         new_callable=AsyncMock,
-        return_value=_VALID_RAW,
+        return_value=_bridge_response(_VALID_RAW),
     ):
         result = await update_movies_tmdb_metadata(session)
 
@@ -269,3 +285,239 @@ async def test_no_movies_with_tmdb_id() -> None:
     assert result.processed_count == 0
     mock_fetch.assert_not_called()
     session.commit.assert_called_once()
+
+
+# --- conditional requests / response cache ---
+
+
+@pytest.mark.asyncio
+async def test_not_modified_skips_apply_and_sends_validators() -> None:
+    movie = _make_movie(tmdb_id="123", tmdb_metadata_digest="abc")
+    movie.media.title = "Kept"
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([movie]))
+    entry = HttpResponseCache(
+        url=tmdb_movie_url("123"), etag='"v1"', last_modified=None, body_digest="abc"
+    )
+
+    with (
+        patch(
+            "app.services.update_tmdb_metadata_service.load_cache_entries",
+            new_callable=AsyncMock,
+            return_value={entry.url: entry},
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ) as mock_save,
+        patch(
+            "app.services.update_tmdb_metadata_service.fetch_tmdb_movie",
+            new_callable=AsyncMock,
+            return_value=_bridge_response(None, validators=BridgeValidators(etag='"v1"')),
+        ) as mock_fetch,
+    ):
+        result = await update_movies_tmdb_metadata(session)
+
+    assert result.unchanged_count == 1
+    assert result.updated_count == 0
+    assert movie.media.title == "Kept"
+    assert movie.tmdb_metadata_fetched_at is None
+    assert mock_fetch.call_args.kwargs["validators"] == BridgeValidators(etag='"v1"')
+    mock_save.assert_awaited_once_with(session, [])
+
+
+@pytest.mark.asyncio
+async def test_same_digest_skips_apply() -> None:
+    movie = _make_movie(tmdb_id="123", tmdb_metadata_digest="same")
+    movie.media.title = "Kept"
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([movie]))
+    entry = HttpResponseCache(
+        url=tmdb_movie_url("123"), etag=None, last_modified=None, body_digest="same"
+    )
+
+    with (
+        patch(
+            "app.services.update_tmdb_metadata_service.load_cache_entries",
+            new_callable=AsyncMock,
+            return_value={entry.url: entry},
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ) as mock_save,
+        patch(
+            "app.services.update_tmdb_metadata_service.fetch_tmdb_movie",
+            new_callable=AsyncMock,
+            return_value=_bridge_response(_VALID_RAW, digest="same"),
+        ) as mock_fetch,
+    ):
+        result = await update_movies_tmdb_metadata(session)
+
+    assert result.unchanged_count == 1
+    assert movie.media.title == "Kept"
+    # nothing to revalidate with — a plain request is sent
+    assert mock_fetch.call_args.kwargs["validators"] is None
+    mock_save.assert_awaited_once_with(session, [])
+
+
+@pytest.mark.asyncio
+async def test_row_changed_by_import_is_reapplied_without_validators() -> None:
+    """Radarr cleared the row digest: the cached body is applied again, not revalidated."""
+    movie = _make_movie(tmdb_id="123", tmdb_metadata_digest=None)
+    movie.media.title = "Radarr Title"
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([movie]))
+    entry = HttpResponseCache(
+        url=tmdb_movie_url("123"), etag='"v1"', last_modified=None, body_digest="same"
+    )
+    response = _bridge_response(_VALID_RAW, validators=BridgeValidators(etag='"v1"'), digest="same")
+
+    with (
+        patch(
+            "app.services.update_tmdb_metadata_service.load_cache_entries",
+            new_callable=AsyncMock,
+            return_value={entry.url: entry},
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.fetch_tmdb_movie",
+            new_callable=AsyncMock,
+            return_value=response,
+        ) as mock_fetch,
+    ):
+        result = await update_movies_tmdb_metadata(session)
+
+    assert result.updated_count == 1
+    assert result.unchanged_count == 0
+    assert movie.media.title == "Updated"
+    assert movie.tmdb_metadata_digest == "same"
+    assert mock_fetch.call_args.kwargs["validators"] is None
+
+
+@pytest.mark.asyncio
+async def test_changed_body_is_applied_and_cached() -> None:
+    movie = _make_movie(tmdb_id="123")
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([movie]))
+    entry = HttpResponseCache(
+        url=tmdb_movie_url("123"), etag='"v1"', last_modified=None, body_digest="old"
+    )
+    response = _bridge_response(_VALID_RAW, validators=BridgeValidators(etag='"v2"'), digest="new")
+
+    with (
+        patch(
+            "app.services.update_tmdb_metadata_service.load_cache_entries",
+            new_callable=AsyncMock,
+            return_value={entry.url: entry},
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ) as mock_save,
+        patch(
+            "app.services.update_tmdb_metadata_service.fetch_tmdb_movie",
+            new_callable=AsyncMock,
+            return_value=response,
+        ),
+    ):
+        result = await update_movies_tmdb_metadata(session)
+
+    assert result.updated_count == 1
+    assert result.unchanged_count == 0
+    assert movie.media.title == "Updated"
+    assert movie.tmdb_metadata_digest == "new"
+    mock_save.assert_awaited_once_with(session, [response])
+
+
+# --- orchestrator ---
+
+
+def _session_factory() -> tuple[MagicMock, list[AsyncMock]]:
+    sessions: list[AsyncMock] = []
+
+    def open_session() -> AsyncMock:
+        session = AsyncMock()
+        session.__aenter__.return_value = session
+        sessions.append(session)
+        return session
+
+    return MagicMock(side_effect=open_session), sessions
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_phases_concurrently_with_shared_scheduler() -> None:
+    """Фазы фильмов и сериалов идут параллельно, в разных сессиях, с общим планировщиком."""
+    factory, sessions = _session_factory()
+    both_started = asyncio.Barrier(2)
+    seen: dict[str, tuple] = {}
+
+    def fake_phase(name: str):  # type: ignore[no-untyped-def]
+        async def run(session, scheduler) -> TmdbMetadataUpdateResponse:  # type: ignore[no-untyped-def]
+            seen[name] = (session, scheduler)
+            # Would time out if the phases were run one after the other
+            await asyncio.wait_for(both_started.wait(), 1)
+            return TmdbMetadataUpdateResponse(
+                processed_count=2,
+                updated_count=1,
+                unchanged_count=1,
+                skipped_count=0,
+                failed_count=0,
+            )
+
+        return run
+
+    with (
+        patch(
+            "app.services.update_tmdb_metadata_service.update_movies_tmdb_metadata",
+            side_effect=fake_phase("movies"),
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.update_series_tmdb_metadata",
+            side_effect=fake_phase("series"),
+        ),
+    ):
+        result = await update_tmdb_metadata(factory)
+
+    assert result.processed_count == 4
+    assert result.updated_count == 2
+    assert result.unchanged_count == 2
+    assert len(sessions) == 2
+    assert seen["movies"][0] is not seen["series"][0]
+    assert seen["movies"][1] is seen["series"][1]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_cancels_other_phase_on_failure() -> None:
+    factory, _ = _session_factory()
+    series_cancelled = asyncio.Event()
+
+    async def failing_movies(session, scheduler) -> TmdbMetadataUpdateResponse:  # type: ignore[no-untyped-def]
+        await asyncio.sleep(0)
+        raise RuntimeError("commit failed")
+
+    async def slow_series(session, scheduler) -> TmdbMetadataUpdateResponse:  # type: ignore[no-untyped-def]
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            series_cancelled.set()
+            raise
+        raise AssertionError("unreachable")
+
+    with (
+        patch(
+            "app.services.update_tmdb_metadata_service.update_movies_tmdb_metadata",
+            side_effect=failing_movies,
+        ),
+        patch(
+            "app.services.update_tmdb_metadata_service.update_series_tmdb_metadata",
+            side_effect=slow_series,
+        ),
+        pytest.raises(RuntimeError, match="commit failed"),
+    ):
+        await update_tmdb_metadata(factory)
+
+    assert series_cancelled.is_set()
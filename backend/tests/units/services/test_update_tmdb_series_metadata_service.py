@@ -1,11 +1,12 @@
 """Unit tests for update_tmdb_series_metadata_service."""
 
 from datetime import UTC, date, datetime
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
-from app.client.tmdb_bridge_client import TmdbBridgeClientError
+from app.client.tmdb_bridge_client import BridgeResponse, TmdbBridgeClientError, tmdb_series_url
+from app.models.http_cache import HttpResponseCache
 from app.models.media import Season, SeriesStatus
 from app.schemas.error_codes import TmdbBridgeErrorCode
 from app.schemas.tmdb_bridge import (
@@ -14,12 +15,12 @@ from app.schemas.tmdb_bridge import (
     TmdbBridgeSeriesResponse,
     TmdbGenre,
 )
+from app.services.season_episode_repository import UpsertResult
 from app.services.update_tmdb_series_metadata_service import (
     _apply_episode_fields,
     _apply_season_fields,
-    _apply_tmdb_series_update,
-    _process_episodes,
-    _process_seasons,
+    _new_episode_row,
+    _write_seasons_and_episodes,
     update_series_tmdb_metadata,
 )
 from app.services.update_tmdb_series_metadata_service import (
@@ -27,6 +28,8 @@ from app.services.update_tmdb_series_metadata_service import (
 )
 from tests.factories import EpisodeFactory, MediaFactory, SeasonFactory, SeriesFactory
 
+_SERVICE = "app.services.update_tmdb_series_metadata_service"
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -430,7 +433,7 @@ class TestApplySeriesFieldsReturnValue:
 
 
 class TestApplySeasonFieldsFillIfEmpty:
-    # tmdb_id is handled in _process_seasons (with savepoint), not here
+    # tmdb_id is written by the season upsert of _write_seasons_and_episodes, not here
 
     def test_overview_filled_when_empty(self) -> None:
         season = SeasonFactory.build(tmdb_id=1, overview=None)
@@ -701,375 +704,246 @@ class TestApplyEpisodeFieldsOverwrite:
 
 
 # ===========================================================================
-# _process_episodes
+# _new_episode_row
 # ===========================================================================
 
 
-class TestProcessEpisodes:
-    def test_new_episode_created_when_absent(self) -> None:
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=5)
-
-        changed = _process_episodes(season, [payload])
-
-        assert changed is True
-        assert len(season.episodes) == 1
-        assert season.episodes[0].number == 5
-
-    def test_new_episode_title_from_name(self) -> None:
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=1, name="Great Pilot")
+class TestNewEpisodeRow:
+    def test_row_of_new_episode(self) -> None:
+        payload = _make_episode_payload(episode_number=5, tmdb_episode_id=55)
 
-        _process_episodes(season, [payload])
+        row = _new_episode_row(10, payload)
 
-        assert season.episodes[0].title == "Great Pilot"
+        assert row["season_id"] == 10
+        assert row["number"] == 5
+        assert row["tmdb_id"] == 55
+        assert row["title"] == "Pilot"
 
-    def test_new_episode_fallback_title_when_name_none(self) -> None:
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=7, name=None)
+    def test_fallback_title_when_name_none(self) -> None:
+        row = _new_episode_row(10, _make_episode_payload(episode_number=7, name=None))
 
-        _process_episodes(season, [payload])
+        assert row["title"] == "Episode 7"
 
-        assert season.episodes[0].title == "Episode 7"
-
-    def test_new_episode_fallback_title_when_name_empty(self) -> None:
+    def test_fallback_title_when_name_empty(self) -> None:
         """Empty string is falsy — should use fallback title."""
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=3, name="")
-
-        _process_episodes(season, [payload])
+        row = _new_episode_row(10, _make_episode_payload(episode_number=3, name=""))
 
-        assert season.episodes[0].title == "Episode 3"
+        assert row["title"] == "Episode 3"
 
-    def test_new_episode_vote_average_zero_stored_as_none(self) -> None:
+    def test_vote_average_zero_stored_as_none(self) -> None:
         """vote_average=0.0 on new episode → None (not recorded)."""
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=1, vote_average=0.0)
-
-        _process_episodes(season, [payload])
-
-        assert season.episodes[0].vote_average is None
-
-    def test_new_episode_vote_average_positive_stored(self) -> None:
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=1, vote_average=8.1)
-
-        _process_episodes(season, [payload])
-
-        assert season.episodes[0].vote_average == 8.1
-
-    def test_existing_episode_matched_by_number(self) -> None:
-        ep = EpisodeFactory.build(number=2, title="Old Title", tmdb_id=None)
-        season = _make_season_with_episodes(id=10)
-        season.episodes = [ep]
-        payload = _make_episode_payload(episode_number=2, name="Old Title", tmdb_episode_id=77)
-
-        _process_episodes(season, [payload])
-
-        assert len(season.episodes) == 1
-        assert season.episodes[0].tmdb_id == 77
+        row = _new_episode_row(10, _make_episode_payload(vote_average=0.0))
 
-    def test_episode_in_db_without_payload_not_deleted(self) -> None:
-        ep_old = EpisodeFactory.build(number=1, title="Old Ep")
-        season = _make_season_with_episodes(id=10)
-        season.episodes = [ep_old]
-        payload = _make_episode_payload(episode_number=2)
+        assert row["vote_average"] is None
 
-        _process_episodes(season, [payload])
-
-        assert any(e.number == 1 for e in season.episodes)
-
-    def test_returns_false_when_no_changes_to_existing_episode(self) -> None:
-        ep = EpisodeFactory.build(
-            number=1,
-            tmdb_id=10,
-            title="Title",
-            overview="Ov",
-            episode_type="standard",
-            still_url="http://s.jpg",
-            air_date=datetime(2021, 3, 7, tzinfo=UTC),
-            vote_average=8.0,
-        )
-        season = _make_season_with_episodes(id=10)
-        season.episodes = [ep]
-
-        payload = _make_episode_payload(
-            episode_number=1,
-            tmdb_episode_id=10,
-            name=None,
-            overview=None,
-            still_url=None,
-            air_date=None,
-            episode_type=None,
-            vote_average=None,
-        )
-
-        changed = _process_episodes(season, [payload])
-
-        assert changed is False
+    def test_vote_average_positive_stored(self) -> None:
+        row = _new_episode_row(10, _make_episode_payload(vote_average=8.1))
 
-    def test_new_episode_air_date_converted(self) -> None:
-        season = _make_season_with_episodes(id=10)
-        payload = _make_episode_payload(episode_number=1, air_date=date(2022, 8, 15))
+        assert row["vote_average"] == 8.1
 
-        _process_episodes(season, [payload])
+    def test_air_date_converted(self) -> None:
+        row = _new_episode_row(10, _make_episode_payload(air_date=date(2022, 8, 15)))
 
-        assert season.episodes[0].air_date == datetime(2022, 8, 15, tzinfo=UTC)
+        assert row["air_date"] == datetime(2022, 8, 15, tzinfo=UTC)
 
 
 # ===========================================================================
-# _process_seasons
+# _write_seasons_and_episodes
 # ===========================================================================
 
 
-class TestProcessSeasons:
-    @pytest.mark.asyncio
-    async def test_new_season_created_when_absent(self) -> None:
-        series = _make_series()
-        series.id = 5
-        series.seasons = []
-        session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
+def _taken_ids_result(rows: list) -> Mock:
+    """Result of a tmdb_id ownership lookup: iterable rows and scalars().all()."""
+    result = MagicMock()
+    result.__iter__.return_value = iter(rows)
+    result.scalars.return_value.all.return_value = [row[0] for row in rows]
+    return result
 
-        payload = _make_series_payload(
-            seasons=[_make_season_payload(season_number=1, tmdb_id=None, episodes=[])]
-        )
 
-        changed = await _process_seasons(series, payload.seasons, session)
+def _upsert_result(*keys: tuple[int, int], first_id: int = 500) -> UpsertResult:
+    return UpsertResult(ids={key: first_id + i for i, key in enumerate(keys)})
 
-        assert changed is True
-        session.add.assert_called_once()
-        session.flush.assert_called_once()
 
+class TestWriteSeasonsAndEpisodes:
     @pytest.mark.asyncio
-    async def test_new_season_has_correct_series_id_and_number(self) -> None:
-        series = _make_series()
-        series.id = 42
-        series.seasons = []
-        session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
-
-        season_payload = _make_season_payload(season_number=3, episodes=[])
-        await _process_seasons(series, [season_payload], session)
-
-        created_season: Season = session.add.call_args[0][0]
-        assert created_season.series_id == 42
-        assert created_season.number == 3
-
-    @pytest.mark.asyncio
-    async def test_existing_season_matched_by_number(self) -> None:
-        existing_season = SeasonFactory.build(
-            number=2, tmdb_id=None, overview=None, poster_url=None
+    async def test_seasons_of_all_series_are_one_upsert(self) -> None:
+        """Все сезоны пачки сериалов — один bulk upsert, без flush и savepoint на сезон."""
+        series1, series2 = _make_series(id=1), _make_series(id=2)
+        payload1 = _make_series_payload(
+            seasons=[_make_season_payload(season_number=1, tmdb_id=None)]
         )
-        existing_season.episodes = []
-        series = _make_series()
-        series.seasons = [existing_season]
-        session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
-
-        season_payload = _make_season_payload(season_number=2, tmdb_id=777, episodes=[])
-        await _process_seasons(series, [season_payload], session)
-
-        session.add.assert_not_called()
-        assert existing_season.tmdb_id == 777
-
-    @pytest.mark.asyncio
-    async def test_season_in_db_without_payload_not_deleted(self) -> None:
-        extra_season = SeasonFactory.build(number=99)
-        extra_season.episodes = []
-        series = _make_series()
-        series.seasons = [extra_season]
-        session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
-
-        # payload has season_number=1 only — season 99 should survive
-        await _process_seasons(
-            series, [_make_season_payload(season_number=1, episodes=[])], session
+        payload2 = _make_series_payload(
+            seasons=[
+                _make_season_payload(season_number=1, tmdb_id=None),
+                _make_season_payload(season_number=2, tmdb_id=None, vote_average=None),
+            ]
         )
+        session = AsyncMock()
 
-        assert any(s.number == 99 for s in series.seasons)
+        with patch(
+            f"{_SERVICE}.bulk_upsert",
+            new_callable=AsyncMock,
+            return_value=_upsert_result((1, 1), (2, 1), (2, 2)),
+        ) as mock_upsert:
+            writes = await _write_seasons_and_episodes(
+                session, [(series1, payload1), (series2, payload2)]
+            )
+
+        mock_upsert.assert_awaited_once()
+        _, model, rows = mock_upsert.await_args.args
+        kwargs = mock_upsert.await_args.kwargs
+        assert model is Season
+        assert [(r["series_id"], r["number"]) for r in rows] == [(1, 1), (2, 1), (2, 2)]
+        assert kwargs["index_elements"] == ("series_id", "number")
+        assert kwargs["fill"] == ("tmdb_id", "overview", "poster_url")
+        assert kwargs["overwrite_non_null"] == ("release_date", "vote_average")
+        assert rows[0]["release_date"] == datetime(2020, 1, 1, tzinfo=UTC)
+        assert writes.changed_series_ids == writes.grown_series_ids == {1, 2}
+        session.begin_nested.assert_not_called()
+        session.flush.assert_not_called()
+        session.execute.assert_not_called()  # no tmdb_ids to check, no episodes to insert
 
     @pytest.mark.asyncio
-    async def test_multiple_new_seasons_all_flushed(self) -> None:
-        series = _make_series()
-        series.id = 1
-        series.seasons = []
+    async def test_existing_seasons_are_not_counted_as_new(self) -> None:
+        season = SeasonFactory.build(id=7, number=2, episodes=[])
+        series = _make_series(id=3)
+        series.seasons = [season]
+        payload = _make_series_payload(seasons=[_make_season_payload(season_number=2)])
         session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
-
-        payloads = [
-            _make_season_payload(season_number=1, tmdb_id=None, episodes=[]),
-            _make_season_payload(season_number=2, tmdb_id=None, episodes=[]),
-        ]
-        await _process_seasons(series, payloads, session)
+        session.execute = AsyncMock(return_value=_taken_ids_result([]))
 
-        assert session.add.call_count == 2
-        assert session.flush.call_count == 2
-
-
-# ===========================================================================
-# _apply_tmdb_series_update
-# ===========================================================================
+        with patch(
+            f"{_SERVICE}.bulk_upsert",
+            new_callable=AsyncMock,
+            return_value=_upsert_result((3, 2), first_id=7),
+        ):
+            writes = await _write_seasons_and_episodes(session, [(series, payload)])
 
+        assert writes.changed_series_ids == {3}
+        assert writes.grown_series_ids == set()
 
-class TestApplyTmdbSeriesUpdate:
     @pytest.mark.asyncio
-    async def test_tmdb_metadata_fetched_at_always_set(self) -> None:
-        series = _make_series(
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=None,
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            rating_value=None,
-            tmdb_metadata_fetched_at=None,
-        )
-        series.media.title = "Same"
-        series.seasons = []
-        session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
-
+    async def test_unchanged_seasons_mark_nothing(self) -> None:
+        season = SeasonFactory.build(id=7, number=1, episodes=[])
+        series = _make_series(id=3)
+        series.seasons = [season]
         payload = _make_series_payload(
-            name="Same",
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=[],
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            vote_average=None,
-            seasons=[],
+            seasons=[_make_season_payload(season_number=1, tmdb_id=None)]
         )
 
-        await _apply_tmdb_series_update(series, payload, session)
+        with patch(f"{_SERVICE}.bulk_upsert", new_callable=AsyncMock, return_value=UpsertResult()):
+            writes = await _write_seasons_and_episodes(AsyncMock(), [(series, payload)])
 
-        assert series.tmdb_metadata_fetched_at is not None
-        assert series.tmdb_metadata_fetched_at.tzinfo is not None
+        assert writes.changed_series_ids == set()
 
     @pytest.mark.asyncio
-    async def test_returns_true_when_fields_changed(self) -> None:
-        series = _make_series(
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=None,
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            rating_value=None,
+    async def test_season_tmdb_id_of_another_season_is_dropped(self) -> None:
+        """Дубликат tmdb_id не должен ронять весь upsert — он просто не записывается."""
+        series = _make_series(id=1)
+        payload = _make_series_payload(
+            seasons=[
+                _make_season_payload(season_number=1, tmdb_id=111),
+                _make_season_payload(season_number=2, tmdb_id=222),
+                _make_season_payload(season_number=3, tmdb_id=222),
+            ]
         )
-        series.media.title = "Old"
-        series.seasons = []
         session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
+        # tmdb_id=111 belongs to season 4 of series 9
+        session.execute = AsyncMock(return_value=_taken_ids_result([(111, 9, 4)]))
 
-        payload = _make_series_payload(name="New", seasons=[])
+        with patch(
+            f"{_SERVICE}.bulk_upsert", new_callable=AsyncMock, return_value=UpsertResult()
+        ) as mock_upsert:
+            await _write_seasons_and_episodes(session, [(series, payload)])
 
-        result = await _apply_tmdb_series_update(series, payload, session)
-
-        assert result is True
+        rows = mock_upsert.await_args.args[2]
+        assert [r["tmdb_id"] for r in rows] == [None, 222, None]
 
     @pytest.mark.asyncio
-    async def test_returns_false_when_nothing_changed_no_new_seasons(self) -> None:
-        series = _make_series(
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=None,
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            rating_value=None,
+    async def test_new_episodes_are_one_insert(self) -> None:
+        existing = EpisodeFactory.build(number=1, tmdb_id=10, title="Old", overview=None)
+        season = SeasonFactory.build(id=7, number=1)
+        season.episodes = [existing]
+        series = _make_series(id=3)
+        series.seasons = [season]
+        payload = _make_series_payload(
+            seasons=[
+                _make_season_payload(
+                    season_number=1,
+                    tmdb_id=None,
+                    episodes=[
+                        _make_episode_payload(episode_number=1, tmdb_episode_id=10),
+                        _make_episode_payload(episode_number=2, tmdb_episode_id=20),
+                        _make_episode_payload(episode_number=3, tmdb_episode_id=10),
+                        _make_episode_payload(episode_number=3, tmdb_episode_id=30),
+                    ],
+                ),
+                _make_season_payload(
+                    season_number=2,
+                    tmdb_id=None,
+                    episodes=[_make_episode_payload(episode_number=1, tmdb_episode_id=40)],
+                ),
+            ]
         )
-        series.media.title = "Same"
-        series.seasons = []
         session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
+        session.execute = AsyncMock(return_value=_taken_ids_result([(40,)]))
 
+        with patch(
+            f"{_SERVICE}.bulk_upsert",
+            new_callable=AsyncMock,
+            return_value=_upsert_result((3, 2), first_id=8),
+        ):
+            writes = await _write_seasons_and_episodes(session, [(series, payload)])
+
+        _, insert_call = session.execute.await_args_list
+        stmt, rows = insert_call.args
+        assert stmt.is_insert
+        assert [(r["season_id"], r["number"], r["tmdb_id"]) for r in rows] == [
+            (7, 2, 20),
+            (7, 3, None),  # tmdb_id=10 belongs to the existing episode 1
+            (8, 1, None),  # tmdb_id=40 is taken in the database
+        ]
+        assert existing.overview == "Episode overview"  # updated in place
+        assert writes.grown_series_ids == {3}
+
+    @pytest.mark.asyncio
+    async def test_existing_episode_matched_by_number_is_updated_in_place(self) -> None:
+        ep = EpisodeFactory.build(number=2, title="Old Title", tmdb_id=None)
+        season = SeasonFactory.build(id=7, number=1)
+        season.episodes = [ep]
+        series = _make_series(id=3)
+        series.seasons = [season]
         payload = _make_series_payload(
-            name="Same",
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=[],
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            vote_average=None,
-            seasons=[],
+            seasons=[
+                _make_season_payload(
+                    season_number=1,
+                    episodes=[_make_episode_payload(episode_number=2, tmdb_episode_id=77)],
+                )
+            ]
         )
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=_taken_ids_result([]))
 
-        result = await _apply_tmdb_series_update(series, payload, session)
+        with patch(f"{_SERVICE}.bulk_upsert", new_callable=AsyncMock, return_value=UpsertResult()):
+            writes = await _write_seasons_and_episodes(session, [(series, payload)])
 
-        assert result is False
+        assert ep.tmdb_id == 77
+        assert ep.title == "Old Title"
+        assert writes.changed_series_ids == {3}
+        assert writes.grown_series_ids == set()
+        # Only the season tmdb_id lookup; nothing to insert
+        session.execute.assert_awaited_once()
 
     @pytest.mark.asyncio
-    async def test_new_season_in_payload_marks_changed(self) -> None:
-        series = _make_series(
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=None,
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            rating_value=None,
-        )
-        series.media.title = "Same"
-        series.seasons = []
-        series.id = 1
+    async def test_nothing_to_write_runs_no_statement(self) -> None:
         session = AsyncMock()
-        session.add = Mock()
-        session.flush = AsyncMock()
 
-        payload = _make_series_payload(
-            name="Same",
-            original_name=None,
-            overview=None,
-            backdrop_path=None,
-            poster_url=None,
-            genres=[],
-            status=None,
-            first_air_date=None,
-            last_air_date=None,
-            number_of_seasons=None,
-            number_of_episodes=None,
-            vote_average=None,
-            seasons=[_make_season_payload(season_number=1, episodes=[])],
+        writes = await _write_seasons_and_episodes(
+            session, [(_make_series(id=1), _make_series_payload(seasons=[]))]
         )
 
-        result = await _apply_tmdb_series_update(series, payload, session)
-
-        assert result is True
+        assert writes.changed_series_ids == set()
+        session.execute.assert_not_called()
 
 
 # ===========================================================================
@@ -1095,6 +969,10 @@ _VALID_SERIES_RAW = {
 }
 
 
+def _bridge_response(data, tmdb_id="12345", **kwargs) -> BridgeResponse:  # type: ignore[no-untyped-def]
+    return BridgeResponse(url=tmdb_series_url(tmdb_id), data=data, **kwargs)
+
+
 @pytest.mark.asyncio
 async def test_update_series_happy_path_two_series() -> None:
     series1 = _make_series(tmdb_id="12345", original_name=None, overview=None)
@@ -1110,7 +988,7 @@ async def test_update_series_happy_path_two_series() -> None:
     with patch(
         "app.services.update_tmdb_series_metadata_service.fetch_tmdb_series",
         new_callable=AsyncMock,
-        return_value=_VALID_SERIES_RAW,
+        return_value=_bridge_response(_VALID_SERIES_RAW),
     ):
         result = await update_series_tmdb_metadata(session)
 
@@ -1169,7 +1047,7 @@ async def test_update_series_failed_on_invalid_payload() -> None:
     with patch(
         "app.services.update_tmdb_series_metadata_service.fetch_tmdb_series",
         new_callable=AsyncMock,
-        return_value={"bad_field": "no tmdb_id here"},
+        return_value=_bridge_response({"bad_field": "no tmdb_id here"}),
     ):
         result = await update_series_tmdb_metadata(session)
 
@@ -1206,10 +1084,174 @@ async def test_update_series_commit_failure_raises() -> None:
         patch(
             "app.services.update_tmdb_series_metadata_service.fetch_tmdb_series",
             new_callable=AsyncMock,
-            return_value=_VALID_SERIES_RAW,
+            return_value=_bridge_response(_VALID_SERIES_RAW),
         ),
         pytest.raises(RuntimeError, match="DB gone"),
     ):
         await update_series_tmdb_metadata(session)
 
     session.rollback.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_series_unchanged_digest_skips_apply_phase() -> None:
+    series = _make_series(tmdb_id="12345", tmdb_metadata_digest="same")
+    series.seasons = []
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([series]))
+    entry = HttpResponseCache(
+        url=tmdb_series_url("12345"), etag=None, last_modified=None, body_digest="same"
+    )
+
+    with (
+        patch(
+            "app.services.update_tmdb_series_metadata_service.load_cache_entries",
+            new_callable=AsyncMock,
+            return_value={entry.url: entry},
+        ),
+        patch(
+            "app.services.update_tmdb_series_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ) as mock_save,
+        patch(
+            "app.services.update_tmdb_series_metadata_service.fetch_tmdb_series",
+            new_callable=AsyncMock,
+            return_value=_bridge_response(_VALID_SERIES_RAW, digest="same"),
+        ),
+        patch(
+            "app.services.update_tmdb_series_metadata_service._apply_series_fields"
+        ) as mock_apply,
+    ):
+        result = await update_series_tmdb_metadata(session)
+
+    assert result.unchanged_count == 1
+    assert result.updated_count == 0
+    mock_apply.assert_not_called()
+    mock_save.assert_awaited_once_with(session, [])
+
+
+@pytest.mark.asyncio
+async def test_update_series_changed_by_import_is_reapplied() -> None:
+    """Сериал, изменённый Sonarr (digest сброшен), получает тот же ответ Bridge заново."""
+    series = _make_series(tmdb_id="12345", tmdb_metadata_digest=None)
+    series.seasons = []
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([series]))
+    entry = HttpResponseCache(
+        url=tmdb_series_url("12345"), etag='"v1"', last_modified=None, body_digest="same"
+    )
+
+    with (
+        patch(
+            "app.services.update_tmdb_series_metadata_service.load_cache_entries",
+            new_callable=AsyncMock,
+            return_value={entry.url: entry},
+        ),
+        patch(
+            "app.services.update_tmdb_series_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "app.services.update_tmdb_series_metadata_service.fetch_tmdb_series",
+            new_callable=AsyncMock,
+            return_value=_bridge_response(_VALID_SERIES_RAW, digest="same"),
+        ) as mock_fetch,
+        patch(
+            "app.services.update_tmdb_series_metadata_service._apply_series_fields",
+            return_value=True,
+        ) as mock_apply,
+    ):
+        result = await update_series_tmdb_metadata(session)
+
+    assert result.unchanged_count == 0
+    mock_apply.assert_called_once()
+    assert series.tmdb_metadata_digest == "same"
+    assert mock_fetch.call_args.kwargs["validators"] is None
+
+
+@pytest.mark.asyncio
+async def test_update_series_applied_response_is_cached() -> None:
+    series = _make_series(tmdb_id="12345", original_name=None, overview=None)
+    series.seasons = []
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([series]))
+    session.add = Mock()
+    session.flush = AsyncMock()
+    response = _bridge_response(_VALID_SERIES_RAW, digest="new")
+
+    with (
+        patch(
+            "app.services.update_tmdb_series_metadata_service.save_cache_entries",
+            new_callable=AsyncMock,
+        ) as mock_save,
+        patch(
+            "app.services.update_tmdb_series_metadata_service.fetch_tmdb_series",
+            new_callable=AsyncMock,
+            return_value=response,
+        ),
+    ):
+        result = await update_series_tmdb_metadata(session)
+
+    assert result.updated_count == 1
+    assert series.tmdb_metadata_digest == "new"
+    mock_save.assert_awaited_once_with(session, [response])
+
+
+@pytest.mark.asyncio
+async def test_update_series_sets_fetched_at_and_counts_season_only_changes() -> None:
+    """Сериал без изменённых полей, но с новым сезоном, считается обновлённым."""
+    series = _make_series(tmdb_id="12345", id=1, tmdb_metadata_fetched_at=None)
+    series.seasons = []
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([series]))
+    raw = {**_VALID_SERIES_RAW, "seasons": [{"tmdb_id": None, "season_number": 1}]}
+
+    with (
+        patch(f"{_SERVICE}._apply_series_fields", return_value=False),
+        patch(
+            f"{_SERVICE}.bulk_upsert",
+            new_callable=AsyncMock,
+            return_value=_upsert_result((1, 1)),
+        ),
+        patch(
+            f"{_SERVICE}.fetch_tmdb_series",
+            new_callable=AsyncMock,
+            return_value=_bridge_response(raw),
+        ),
+    ):
+        result = await update_series_tmdb_metadata(session)
+
+    assert result.updated_count == 1
+    assert series.tmdb_metadata_fetched_at is not None
+    assert series.tmdb_metadata_fetched_at.tzinfo is not None
+
+
+async def test_update_series_refreshes_progress_of_grown_series(
+    series_progress_refresh: AsyncMock,
+) -> None:
+    """Сериалы с новыми сезонами или эпизодами пересчитываются в series_progress до commit."""
+    series = _make_series(tmdb_id="12345", id=1, tmdb_metadata_fetched_at=None)
+    series.seasons = []
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=_mock_execute_result([series]))
+    raw = {**_VALID_SERIES_RAW, "seasons": [{"tmdb_id": None, "season_number": 1}]}
+    calls = MagicMock()
+    calls.attach_mock(series_progress_refresh, "refresh")
+    calls.attach_mock(session.commit, "commit")
+
+    with (
+        patch(
+            f"{_SERVICE}.bulk_upsert",
+            new_callable=AsyncMock,
+            return_value=_upsert_result((1, 1)),
+        ),
+        patch(
+            f"{_SERVICE}.fetch_tmdb_series",
+            new_callable=AsyncMock,
+            return_value=_bridge_response(raw),
+        ),
+    ):
+        await update_series_tmdb_metadata(session)
+
+    series_progress_refresh.assert_awaited_once_with(session, {1})
+    assert [c[0] for c in calls.mock_calls] == ["refresh", "commit"]
@@ -3,6 +3,8 @@ from unittest.mock import AsyncMock, MagicMock, Mock, patch
 import pytest
 
 from app.schemas.sonarr import SonarrImportResponse
+from tests.utils.async_iter import AsyncIterMock
+from tests.utils.season_episode_writer import FakeSeasonEpisodeWriter
 
 
 @pytest.mark.asyncio
@@ -17,7 +19,7 @@ async def test_import_sonarr_success(
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -31,6 +33,7 @@ async def test_import_sonarr_success(
         patch(
             "app.services.series_utils.create_new_series", new_callable=AsyncMock
         ) as mock_create_series,
+        FakeSeasonEpisodeWriter().patched("app.services.sonarr_service"),
     ):
         modified_series = []
         for series in sonarr_series_basic:
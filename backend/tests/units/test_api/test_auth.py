@@ -1,10 +1,16 @@
-from unittest.mock import AsyncMock, patch
+from collections.abc import Generator
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi import HTTPException
 from httpx import AsyncClient
 
+from app.dependencies import auth
+from app.dependencies.auth import get_current_user_id
+from app.main import app
 from app.schemas.error_codes import AuthErrorCode
+from app.utils.security import create_access_token, get_jwt_secret
 from tests.factories import AppUserFactory
 
 
@@ -253,3 +259,99 @@ async def test_change_password_wrong_current(async_client: AsyncClient) -> None:
             json={"current_password": "wrongpass", "new_password": "newpass123"},
         )
     assert response.status_code == 400
+
+
+# === Проверка пользователя на media-роутах ===
+
+
+@pytest.fixture
+def user_token(
+    async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> Generator[dict[str, str], None, None]:
+    """Cookie с токеном пользователя 1; get_current_user_id работает по-настоящему."""
+    monkeypatch.setenv("JWT_SECRET", "test-jwt-secret-long-enough-for-hs256")
+    app.dependency_overrides.pop(get_current_user_id, None)
+    yield {"access_token": create_access_token(1, get_jwt_secret())}
+
+
+@pytest.mark.asyncio
+async def test_media_304_does_not_load_known_active_user(
+    async_client: AsyncClient, mock_session: AsyncMock, user_token: dict[str, str]
+) -> None:
+    """Активный пользователь загружается один раз, 304 дальше отдаётся без запросов к БД."""
+    mock_session.get = AsyncMock(return_value=AppUserFactory.build(id=1, is_active=True))
+    with patch("app.api.media.get_media_detail_json", new_callable=AsyncMock) as detail_fn:
+        detail_fn.return_value = b'{"id": 7}'
+        first = await async_client.get("/api/v1/media/7", cookies=user_token)
+        not_modified = await async_client.get(
+            "/api/v1/media/7",
+            cookies=user_token,
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+    assert first.status_code == 200
+    assert not_modified.status_code == 304
+    mock_session.get.assert_awaited_once()
+    mock_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_media_inactive_user_is_checked_every_time(
+    async_client: AsyncClient, mock_session: AsyncMock, user_token: dict[str, str]
+) -> None:
+    mock_session.get = AsyncMock(return_value=AppUserFactory.build(id=1, is_active=False))
+
+    for _ in range(2):
+        response = await async_client.get("/api/v1/media/7", cookies=user_token)
+        assert response.status_code == 401
+        assert response.json()["detail"]["code"] == AuthErrorCode.USER_INACTIVE
+
+    assert mock_session.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_media_without_token_is_rejected(
+    async_client: AsyncClient, mock_session: AsyncMock, user_token: dict[str, str]
+) -> None:
+    mock_session.get = AsyncMock()
+
+    response = await async_client.get("/api/v1/media/7")
+
+    assert response.status_code == 401
+    assert response.json()["detail"]["code"] == AuthErrorCode.TOKEN_INVALID
+    mock_session.get.assert_not_awaited()
+
+
+def test_commit_of_app_user_change_forgets_active_users() -> None:
+    """Деактивация пользователя действует с его следующего запроса."""
+    session = Mock(info={})
+    auth._active_user_ids.add(1)
+    flush_session = Mock(info=session.info, new=[], dirty=[AppUserFactory.build(id=1)], deleted=[])
+
+    auth._mark_flushed_app_users(flush_session, Mock())
+    auth._forget_active_users_on_commit(session)
+
+    assert auth._active_user_ids == set()
+    assert session.info == {}
+
+
+def test_rolled_back_app_user_change_keeps_active_users() -> None:
+    session = Mock(info={})
+    auth._active_user_ids.add(1)
+    flush_session = Mock(info=session.info, new=[AppUserFactory.build(id=2)], dirty=[], deleted=[])
+
+    auth._mark_flushed_app_users(flush_session, Mock())
+    auth._forget_rolled_back_app_users(session, SimpleNamespace(parent=None))
+    auth._forget_active_users_on_commit(session)
+
+    assert auth._active_user_ids == {1}
+
+
+def test_commit_without_app_user_change_keeps_active_users() -> None:
+    session = Mock(info={})
+    auth._active_user_ids.add(1)
+
+    auth._mark_flushed_app_users(Mock(info=session.info, new=[], dirty=[], deleted=[]), Mock())
+    auth._forget_active_users_on_commit(session)
+
+    assert auth._active_user_ids == {1}
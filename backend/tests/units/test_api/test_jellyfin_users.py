@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
@@ -31,16 +31,18 @@ async def test_import_jellyfin_users_success(
             {"Id": "1", "Name": "Alice Updated"},
         ]
 
-        mock_db_result.scalars.return_value.first.side_effect = [None, None, Mock(username="Alice")]
-
-        mock_session.execute = AsyncMock(return_value=mock_db_result)
+        # Known user "1" as "Alice"; the repeated Id keeps its last name, "Bob" is new
+        mock_db_result.tuples.return_value.all.return_value = [("1", "Alice")]
+        mock_session.execute = AsyncMock(
+            side_effect=[mock_db_result, [("1", False, 1), ("2", True, 2)]]
+        )
 
         response = await async_client.post("/api/v1/jellyfin/import/users")
 
         assert response.status_code == 200
 
         exp_res = JellyfinUsersResponse(
-            status="success", imported_count=2, updated_count=1
+            status="success", imported_count=1, updated_count=1
         ).model_dump(mode="json", exclude_none=True)
 
         assert response.json() == exp_res
@@ -93,8 +95,8 @@ async def test_import_jellyfin_users_db_error(
     ):
         mock_fetch.return_value = [{"Id": "1", "Name": "Alice"}]
 
-        mock_db_result.scalars.return_value.first.return_value = None
-        mock_session.execute = AsyncMock(return_value=mock_db_result)
+        mock_db_result.tuples.return_value.all.return_value = []
+        mock_session.execute = AsyncMock(side_effect=[mock_db_result, [("1", True, 1)]])
 
         mock_session.commit.side_effect = SQLAlchemyError("DB error")
 
@@ -0,0 +1,141 @@
+"""Unit tests for GET /api/v1/media endpoint."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.schemas.media import MediaListResponse, MediaPageResponse
+from app.services.media_response_cache import media_response_cache
+
+
+@pytest.mark.asyncio
+async def test_list_media_without_limit_returns_whole_list(async_client: AsyncClient) -> None:
+    """Без limit и cursor — прежний ответ со всем списком."""
+    with (
+        patch("app.api.media.get_media_list", new_callable=AsyncMock) as list_fn,
+        patch("app.api.media.get_media_page", new_callable=AsyncMock) as page_fn,
+    ):
+        list_fn.return_value = MediaListResponse(items=[], total=0)
+        response = await async_client.get("/api/v1/media", params={"sort": "year"})
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "total": 0}
+    assert list_fn.await_args.kwargs["sort"] == "year"
+    page_fn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_list_media_with_limit_returns_page(async_client: AsyncClient) -> None:
+    with patch("app.api.media.get_media_page", new_callable=AsyncMock) as page_fn:
+        page_fn.return_value = MediaPageResponse(items=[], total=None, next_cursor="abc")
+        response = await async_client.get(
+            "/api/v1/media",
+            params={"limit": 10, "genre": "Drama", "include_total": "false"},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "total": None, "next_cursor": "abc"}
+    kwargs = page_fn.await_args.kwargs
+    assert (kwargs["limit"], kwargs["genre"], kwargs["include_total"]) == (10, "Drama", False)
+
+
+@pytest.mark.asyncio
+async def test_list_media_cursor_without_limit_uses_default_page_size(
+    async_client: AsyncClient,
+) -> None:
+    with patch("app.api.media.get_media_page", new_callable=AsyncMock) as page_fn:
+        page_fn.return_value = MediaPageResponse(items=[])
+        response = await async_client.get("/api/v1/media", params={"cursor": "abc"})
+
+    assert response.status_code == 200
+    assert page_fn.await_args.kwargs["limit"] == 50
+    assert page_fn.await_args.kwargs["cursor"] == "abc"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"sort": "popularity"}, {"limit": 0}, {"limit": 501}])
+async def test_list_media_rejects_invalid_params(
+    async_client: AsyncClient, params: dict[str, object]
+) -> None:
+    response = await async_client.get("/api/v1/media", params=params)
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_media_detail_is_served_from_cache_with_etag(async_client: AsyncClient) -> None:
+    """Повторный запрос и If-None-Match не доходят до сервиса."""
+    with patch("app.api.media.get_media_detail_json", new_callable=AsyncMock) as detail_fn:
+        detail_fn.return_value = b'{"id": 7, "media_type": "movie", "title": "Heat"}'
+        first = await async_client.get("/api/v1/media/7")
+        second = await async_client.get("/api/v1/media/7")
+        not_modified = await async_client.get(
+            "/api/v1/media/7", headers={"If-None-Match": first.headers["etag"]}
+        )
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == b'{"id": 7, "media_type": "movie", "title": "Heat"}'
+    assert first.headers["content-type"] == "application/json"
+    assert second.content == first.content
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == first.headers["etag"]
+    detail_fn.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_media_list_cache_is_keyed_by_params_and_invalidated(
+    async_client: AsyncClient,
+) -> None:
+    with patch("app.api.media.get_media_list", new_callable=AsyncMock) as list_fn:
+        list_fn.return_value = MediaListResponse(items=[], total=0)
+        await async_client.get("/api/v1/media", params={"jellyfin_user_id": "u1"})
+        await async_client.get("/api/v1/media", params={"jellyfin_user_id": "u2"})
+        await async_client.get("/api/v1/media", params={"jellyfin_user_id": "u1"})
+        assert list_fn.await_count == 2
+
+        media_response_cache.invalidate()
+        response = await async_client.get(
+            "/api/v1/media", params={"jellyfin_user_id": "u1"}, headers={"If-None-Match": '"x"'}
+        )
+
+    assert response.status_code == 200
+    assert list_fn.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_media_detail_errors_are_not_cached(async_client: AsyncClient) -> None:
+    with patch("app.api.media.get_media_detail_json", new_callable=AsyncMock) as detail_fn:
+        detail_fn.side_effect = HTTPException(status_code=404, detail="Media not found")
+        first = await async_client.get("/api/v1/media/404")
+        second = await async_client.get("/api/v1/media/404")
+
+    assert first.status_code == second.status_code == 404
+    assert detail_fn.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_search_media_passes_query_and_filters(async_client: AsyncClient) -> None:
+    """/media/search не перехватывается маршрутом /media/{media_id}."""
+    with patch("app.api.media.search_media", new_callable=AsyncMock) as search_fn:
+        search_fn.return_value = MediaPageResponse(items=[], total=0)
+        response = await async_client.get(
+            "/api/v1/media/search", params={"q": "breaking", "type": "series", "limit": 5}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "total": 0, "next_cursor": None}
+    kwargs = search_fn.await_args.kwargs
+    assert (kwargs["q"], kwargs["media_type"], kwargs["limit"]) == ("breaking", "series", 5)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"q": ""}, {"q": "x" * 201}])
+async def test_search_media_requires_query_text(
+    async_client: AsyncClient, params: dict[str, str]
+) -> None:
+    response = await async_client.get("/api/v1/media/search", params=params)
+
+    assert response.status_code == 422
@@ -2,9 +2,12 @@
 
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
+from app.client.http_pool import http_clients
 from app.models.schedule import ServiceConfig, ServiceType
+from app.services import service_test
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -164,6 +167,35 @@ async def test_put_service_new_both_fields_returns_200(async_client, mock_sessio
     assert data["service_type"] == "radarr"
 
 
+@pytest.mark.asyncio
+async def test_put_service_keeps_pooled_client_of_running_jobs(async_client, mock_session):
+    """Saving settings does not close the client a running import holds."""
+    client = await http_clients.get(ServiceType.RADARR.value, "http://radarr:7878", "old-key")
+    new_cfg = _make_config(ServiceType.RADARR, "http://radarr:7878", "enc")
+
+    with (
+        patch(
+            "app.api.settings.config_repo.get_config_by_service",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+        patch(
+            "app.api.settings.config_repo.upsert_config",
+            new_callable=AsyncMock,
+            return_value=new_cfg,
+        ),
+        patch("app.api.settings.decrypt_api_key", return_value="abcdef1234"),
+    ):
+        mock_session.commit = AsyncMock()
+        response = await async_client.put(
+            "/api/v1/settings/services/radarr",
+            json={"url": "http://radarr:7878", "api_key": "new-key"},
+        )
+
+    assert response.status_code == 200
+    assert not client.is_closed
+
+
 @pytest.mark.asyncio
 async def test_put_service_partial_update_url_only(async_client, mock_session):
     """Partial update with only url — api_key is preserved from existing config."""
@@ -402,3 +434,29 @@ async def test_test_service_passes_correct_args_to_connection_test(async_client)
         )
 
     mock_test.assert_awaited_once_with(ServiceType.JELLYFIN, "http://myjellyfin.local", "token-xyz")
+
+
+@pytest.mark.asyncio
+async def test_service_connection_uses_throwaway_client(monkeypatch: pytest.MonkeyPatch):
+    """Testing unsaved credentials neither replaces nor reuses the pooled service client."""
+    pooled = await http_clients.get(ServiceType.SONARR.value, "http://sonarr:8989", "saved")
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200)
+
+    monkeypatch.setattr(
+        service_test,
+        "build_probe_client",
+        lambda service: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    ok, _ = await service_test.test_service_connection(
+        ServiceType.SONARR, "http://typed:8989", "typed-key"
+    )
+
+    assert ok
+    assert [str(r.url) for r in seen] == ["http://typed:8989/api/v3/system/status"]
+    assert await http_clients.get(ServiceType.SONARR.value, "http://sonarr:8989", "saved") is pooled
+    assert not pooled.is_closed
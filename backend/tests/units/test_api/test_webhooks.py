@@ -0,0 +1,208 @@
+"""Unit tests for POST /api/v1/webhooks/{jellyfin,radarr,sonarr}."""
+
+from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.schedule import ServiceType
+from app.services.arr_webhook_service import ArrWebhookEvent
+from app.services.jellyfin_webhook_service import JellyfinWatchEvent
+from app.utils.security import sign_webhook_payload
+from tests.utils.fake_jellyfin_webhook import FakeJellyfinWebhookSender
+
+SECRET = "webhook-secret"
+USER_ID = "a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6"
+ITEM_ID = "0f1e2d3c4b5a69788796a5b4c3d2e1f0"
+
+
+@pytest.fixture
+def queue() -> MagicMock:
+    with patch("app.api.webhooks.watch_event_queue") as mock_queue:
+        yield mock_queue
+
+
+@pytest.fixture
+async def sender(
+    async_client, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[FakeJellyfinWebhookSender, None]:
+    monkeypatch.setenv("JELLYFIN_WEBHOOK_SECRET", SECRET)
+    yield FakeJellyfinWebhookSender(async_client, SECRET)
+
+
+@pytest.mark.asyncio
+async def test_playback_stop_is_queued(sender, queue) -> None:
+    response = await sender.playback_stop(
+        user_id=USER_ID, item_id=ITEM_ID, PlayedToCompletion=True, PlaybackPositionTicks=0
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": True}
+    event: JellyfinWatchEvent = queue.put.call_args.args[0]
+    assert event.jellyfin_user_id == USER_ID
+    assert event.item_id == ITEM_ID
+    assert event.played is True
+
+
+@pytest.mark.asyncio
+async def test_user_data_saved_is_queued(sender, queue) -> None:
+    response = await sender.user_data_saved(
+        user_id=USER_ID, item_id=ITEM_ID, item_type="Episode", Played=False
+    )
+
+    assert response.status_code == 202
+    event: JellyfinWatchEvent = queue.put.call_args.args[0]
+    assert event.item_type == "Episode"
+    assert event.played is False
+
+
+@pytest.mark.asyncio
+async def test_malformed_ticks_are_accepted(sender, queue) -> None:
+    """Нечисловой PlaybackPositionTicks не превращается в 500."""
+    response = await sender.user_data_saved(
+        user_id=USER_ID, item_id=ITEM_ID, Played=True, PlaybackPositionTicks="abc"
+    )
+
+    assert response.status_code == 202
+    event: JellyfinWatchEvent = queue.put.call_args.args[0]
+    assert event.playback_position_ticks == 0
+
+
+@pytest.mark.asyncio
+async def test_irrelevant_notification_not_queued(sender, queue) -> None:
+    """ItemAdded и прочие уведомления подтверждаются, но не ставятся в очередь."""
+    response = await sender.send(sender.payload("ItemAdded", user_id=USER_ID, item_id=ITEM_ID))
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": False}
+    queue.put.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalid_signature_rejected(sender, queue) -> None:
+    payload = sender.payload("PlaybackStop", user_id=USER_ID, item_id=ITEM_ID)
+
+    response = await sender.send(payload, signature="sha256=" + "0" * 64)
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid webhook credentials"
+    queue.put.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_non_ascii_signature_rejected(sender, queue) -> None:
+    """Подпись с не-ASCII символами — 401, а не 500 из hmac.compare_digest."""
+    payload = sender.payload("PlaybackStop", user_id=USER_ID, item_id=ITEM_ID)
+
+    response = await sender.send(payload, signature=("sha256=" + "é" * 64).encode())
+
+    assert response.status_code == 401
+    queue.put.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_signature_with_other_secret_rejected(async_client, sender, queue) -> None:
+    other = FakeJellyfinWebhookSender(async_client, "not-the-secret")
+
+    response = await other.playback_stop(user_id=USER_ID, item_id=ITEM_ID, PlayedToCompletion=True)
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_malformed_body_rejected(sender, queue) -> None:
+    response = await sender.send(b"{not json")
+
+    assert response.status_code == 400
+    queue.put.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_secret_not_configured_returns_503(
+    async_client, queue, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("JELLYFIN_WEBHOOK_SECRET", raising=False)
+    sender = FakeJellyfinWebhookSender(async_client, SECRET)
+
+    response = await sender.playback_stop(user_id=USER_ID, item_id=ITEM_ID)
+
+    assert response.status_code == 503
+    queue.put.assert_not_called()
+
+
+# --- Radarr/Sonarr Connect ---
+
+
+@pytest.fixture
+def arr_handler() -> AsyncMock:
+    with patch("app.api.webhooks.handle_arr_event", new_callable=AsyncMock) as handler:
+        yield handler
+
+
+@pytest.mark.asyncio
+async def test_radarr_movie_added_with_basic_auth(
+    async_client, arr_handler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Radarr не умеет подписывать тело — секрет передаётся паролем Basic auth."""
+    monkeypatch.setenv("RADARR_WEBHOOK_SECRET", SECRET)
+
+    response = await async_client.post(
+        "/api/v1/webhooks/radarr",
+        json={"eventType": "MovieAdded", "movie": {"id": 42, "title": "Dune"}},
+        auth=("radarr", SECRET),
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": True}
+    arr_handler.assert_awaited_once_with(ArrWebhookEvent(ServiceType.RADARR, "MovieAdded", 42))
+
+
+@pytest.mark.asyncio
+async def test_sonarr_series_delete_with_signature(
+    async_client, arr_handler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("SONARR_WEBHOOK_SECRET", SECRET)
+    body = b'{"eventType": "SeriesDelete", "series": {"id": 9}}'
+
+    response = await async_client.post(
+        "/api/v1/webhooks/sonarr",
+        content=body,
+        headers={"X-Webhook-Signature": sign_webhook_payload(body, SECRET)},
+    )
+
+    assert response.status_code == 202
+    arr_handler.assert_awaited_once_with(
+        ArrWebhookEvent(ServiceType.SONARR, "SeriesDelete", 9, delete=True)
+    )
+
+
+@pytest.mark.asyncio
+async def test_arr_test_event_accepted_without_work(
+    async_client, arr_handler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("SONARR_WEBHOOK_SECRET", SECRET)
+
+    response = await async_client.post(
+        "/api/v1/webhooks/sonarr", json={"eventType": "Test"}, auth=("sonarr", SECRET)
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": False}
+    arr_handler.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("auth", [("radarr", "wrong"), None])
+async def test_radarr_wrong_credentials_rejected(
+    async_client, arr_handler, monkeypatch: pytest.MonkeyPatch, auth
+) -> None:
+    monkeypatch.setenv("RADARR_WEBHOOK_SECRET", SECRET)
+
+    response = await async_client.post(
+        "/api/v1/webhooks/radarr",
+        json={"eventType": "MovieAdded", "movie": {"id": 42}},
+        auth=auth,
+    )
+
+    assert response.status_code == 401
+    arr_handler.assert_not_called()
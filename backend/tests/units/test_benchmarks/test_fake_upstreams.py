@@ -0,0 +1,187 @@
+"""Unit tests for the fake Jellyfin/Sonarr/Radarr/Bridge upstreams used by the benchmarks."""
+
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.client.http_pool import TMDB_BRIDGE_POOL, http_clients
+from app.client.jellyfin_client import (
+    fetch_jellyfin_episodes,
+    fetch_jellyfin_movies,
+    fetch_jellyfin_series_by_ids,
+    iter_jellyfin_library_episodes,
+)
+from app.client.radarr_client import fetch_radarr_movie, fetch_radarr_movies
+from app.client.sonarr_client import fetch_sonarr_episodes, fetch_sonarr_series
+from app.client.tmdb_bridge_client import fetch_tmdb_movie, fetch_tmdb_series
+from app.schemas.tmdb_bridge import TmdbBridgeMovieResponse, TmdbBridgeSeriesResponse
+from benchmarks.fake_upstreams import (
+    FakeUpstreamSettings,
+    SyntheticLibrary,
+    create_fake_upstreams_app,
+)
+
+BASE = "http://fake"
+LIBRARY = SyntheticLibrary(movies=25, series=4, seasons_per_series=2, episodes_per_season=3)
+
+
+@pytest.fixture
+def serve(monkeypatch: pytest.MonkeyPatch) -> Callable[..., FastAPI]:
+    """Направляет пул HTTP-клиентов приложения в фейковый ASGI-сервер."""
+
+    def _serve(
+        library: SyntheticLibrary = LIBRARY, settings: FakeUpstreamSettings | None = None
+    ) -> FastAPI:
+        fake = create_fake_upstreams_app(library, settings)
+        monkeypatch.setattr(
+            "app.client.http_pool.httpx.AsyncHTTPTransport",
+            lambda **_: httpx.ASGITransport(app=fake),
+        )
+        monkeypatch.setattr("app.client.tmdb_bridge_client.BRIDGE_BASE_URL", f"{BASE}/bridge")
+        return fake
+
+    return _serve
+
+
+# --- library ---
+
+
+def test_library_is_deterministic() -> None:
+    again = SyntheticLibrary(movies=25, series=4, seasons_per_series=2, episodes_per_season=3)
+
+    assert again.radarr_movie(7) == LIBRARY.radarr_movie(7)
+    assert again.bridge_series(2) == LIBRARY.bridge_series(2)
+    assert SyntheticLibrary(seed=1).radarr_movie(7) != LIBRARY.radarr_movie(7)
+
+
+def test_library_services_share_external_ids() -> None:
+    """Один и тот же фильм в Radarr и Jellyfin — для проверки сопоставления по TMDB/IMDb."""
+    radarr, jellyfin = LIBRARY.radarr_movie(3), LIBRARY.jellyfin_movie(3)
+
+    assert str(radarr["tmdbId"]) == jellyfin["ProviderIds"]["Tmdb"]
+    assert radarr["imdbId"] == jellyfin["ProviderIds"]["Imdb"]
+
+
+def test_library_resolves_jellyfin_ids() -> None:
+    episode = LIBRARY.episode_at(4)
+
+    assert LIBRARY.resolve(LIBRARY.movie_id(3)) == ("Movie", 3)
+    assert LIBRARY.resolve(LIBRARY.episode_id(episode)) == ("Episode", episode)
+    assert LIBRARY.resolve(LIBRARY.movie_id(99)) is None
+    assert LIBRARY.resolve(SyntheticLibrary(seed=5).movie_id(3)) is None
+
+
+# --- project clients against the fakes ---
+
+
+@pytest.mark.asyncio
+async def test_jellyfin_movies_paginated_under_page_cap(serve) -> None:
+    serve(settings=FakeUpstreamSettings(page_cap=7))
+
+    movies = await fetch_jellyfin_movies(f"{BASE}/jellyfin", "key")
+
+    assert [m["Id"] for m in movies] == [LIBRARY.movie_id(i) for i in range(25)]
+
+
+@pytest.mark.asyncio
+async def test_jellyfin_changed_since_filters_items(serve) -> None:
+    serve()
+    since = datetime.now(UTC) - timedelta(days=36500)
+    later = LIBRARY.epoch - timedelta(days=LIBRARY.history_days // 2)
+
+    everything = [
+        e
+        async for page in iter_jellyfin_library_episodes(f"{BASE}/jellyfin", "k", since)
+        for e in page
+    ]
+    changed = await fetch_jellyfin_movies(f"{BASE}/jellyfin", "key", later)
+
+    assert len(everything) == LIBRARY.episode_count
+    assert 0 < len(changed) < LIBRARY.movies
+    assert all(m["DateLastSaved"] >= later.strftime("%Y-%m-%dT%H:%M:%S") for m in changed)
+
+
+@pytest.mark.asyncio
+async def test_jellyfin_show_episodes_and_series_by_ids(serve) -> None:
+    serve()
+
+    episodes = await fetch_jellyfin_episodes(f"{BASE}/jellyfin", "key", LIBRARY.series_id(1))
+    series = await fetch_jellyfin_series_by_ids(
+        f"{BASE}/jellyfin", "key", LIBRARY.user_id(0), [LIBRARY.series_id(2), "unknown"]
+    )
+
+    assert len(episodes) == 6
+    assert {e["SeriesId"] for e in episodes} == {LIBRARY.series_id(1)}
+    assert [s["Id"] for s in series] == [LIBRARY.series_id(2)]
+    assert "Played" in series[0]["UserData"]
+
+
+@pytest.mark.asyncio
+async def test_arr_clients(serve) -> None:
+    serve()
+
+    movies = await fetch_radarr_movies(f"{BASE}/radarr", "key")
+    missing = await fetch_radarr_movie(f"{BASE}/radarr", "key", 999)
+    series = await fetch_sonarr_series(f"{BASE}/sonarr", "key")
+    episodes = await fetch_sonarr_episodes(f"{BASE}/sonarr", "key", series[0]["id"])
+
+    assert len(movies) == 25
+    assert movies[0] == LIBRARY.radarr_movie(0)
+    assert missing is None
+    assert len(series) == 4
+    assert [(e["seasonNumber"], e["episodeNumber"]) for e in episodes][:4] == [
+        (1, 1),
+        (1, 2),
+        (1, 3),
+        (2, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bridge_payloads_validate_and_support_etag(serve) -> None:
+    serve()
+    client = await http_clients.get(TMDB_BRIDGE_POOL)
+
+    movie = await fetch_tmdb_movie(str(LIBRARY.movie_tmdb_id(2)), client=client)
+    series = await fetch_tmdb_series(str(LIBRARY.series_tmdb_id(1)), client=client)
+    assert movie is not None and movie.data is not None
+    assert series is not None and series.data is not None
+    TmdbBridgeMovieResponse.model_validate(movie.data)
+    parsed = TmdbBridgeSeriesResponse.model_validate(series.data)
+    assert len(parsed.seasons) == 2
+
+    again = await fetch_tmdb_movie(
+        str(LIBRARY.movie_tmdb_id(2)), client=client, validators=movie.validators
+    )
+    assert again is not None and again.not_modified
+
+
+# --- fault injection ---
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_injection_sets_retry_after() -> None:
+    fake = create_fake_upstreams_app(
+        LIBRARY, FakeUpstreamSettings(rate_limit_rate=1.0, retry_after=2)
+    )
+    async with httpx.AsyncClient(app=fake, base_url=BASE) as client:
+        response = await client.get("/radarr/api/v3/movie")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_error_rate_is_reproducible() -> None:
+    async def statuses() -> list[int]:
+        fake = create_fake_upstreams_app(LIBRARY, FakeUpstreamSettings(error_rate=0.5, seed=3))
+        async with httpx.AsyncClient(app=fake, base_url=BASE) as client:
+            return [(await client.get("/jellyfin/Users")).status_code for _ in range(20)]
+
+    first = await statuses()
+
+    assert set(first) == {200, 503}
+    assert await statuses() == first
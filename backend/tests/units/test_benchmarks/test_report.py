@@ -0,0 +1,69 @@
+"""Unit tests for benchmark measurements, reports and baseline comparison."""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+from benchmarks.metrics import JobMeasurement, SqlStatementCounter
+from benchmarks.report import BenchmarkReport, compare_reports
+
+
+def _run(**kwargs) -> JobMeasurement:
+    defaults = {
+        "job": "radarr_import",
+        "items": 1000,
+        "phase": "cold",
+        "wall_seconds": 2.0,
+        "statements": 100,
+        "rows_written": 2000,
+        "peak_memory_bytes": 10_000_000,
+    }
+    return JobMeasurement(**{**defaults, **kwargs})
+
+
+def test_counter_counts_statements_and_written_rows() -> None:
+    counter = SqlStatementCounter()
+
+    counter._after_execute(None, Mock(rowcount=-1), "SELECT 1", {}, None, False)
+    counter._after_execute(None, Mock(rowcount=5), "INSERT INTO media ...", {}, None, False)
+    counter._after_execute(None, Mock(rowcount=-1), " update movies ...", [{}, {}, {}], None, True)
+
+    assert counter.statements == 3
+    assert counter.rows_written == 8
+
+
+def test_report_round_trip(tmp_path: Path) -> None:
+    report = BenchmarkReport.new(sizes=[1000])
+    report.results.append(_run(error="RuntimeError: boom"))
+    path = tmp_path / "report.json"
+
+    report.save(path)
+    loaded = BenchmarkReport.load(path)
+
+    assert loaded.results == report.results
+    assert loaded.meta["sizes"] == [1000]
+
+
+def test_compare_flags_growth_above_threshold() -> None:
+    baseline = BenchmarkReport(results=[_run(), _run(phase="warm", statements=10)])
+    current = BenchmarkReport(results=[_run(wall_seconds=2.1), _run(phase="warm", statements=30)])
+
+    changes = compare_reports(current, baseline, threshold=0.1)
+
+    assert [(c.phase, c.metric) for c in changes] == [("warm", "statements")]
+    assert str(changes[0]) == "radarr_import [1000 warm] statements: 10 -> 30 (+200%)"
+
+
+def test_compare_reports_new_failures_and_ignores_tiny_timings() -> None:
+    """Новая ошибка — всегда регрессия; миллисекундные замеры — шум."""
+    baseline = BenchmarkReport(results=[_run(), _run(job="x", wall_seconds=0.001)])
+    current = BenchmarkReport(
+        results=[
+            _run(error="RuntimeError: boom"),
+            _run(job="x", wall_seconds=0.01),
+            _run(job="only-in-current"),
+        ]
+    )
+
+    changes = compare_reports(current, baseline)
+
+    assert [(c.job, c.metric) for c in changes] == [("radarr_import", "error")]
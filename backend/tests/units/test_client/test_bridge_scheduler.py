@@ -0,0 +1,191 @@
+"""Unit tests for BridgeScheduler (AIMD window, Retry-After pause, requeue on 429)."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.client.bridge_scheduler import BridgeScheduler
+from app.client.tmdb_bridge_client import TmdbBridgeClientError
+from app.schemas.error_codes import TmdbBridgeErrorCode
+
+
+def _rate_limited(retry_after: float | None = None) -> TmdbBridgeClientError:
+    return TmdbBridgeClientError(
+        code=TmdbBridgeErrorCode.RATE_LIMIT_ERROR,
+        message="Bridge HTTP 429",
+        retry_after=retry_after,
+    )
+
+
+class _Flaky:
+    """Запрос, который первые `failures` раз отвечает 429."""
+
+    def __init__(self, failures: int, retry_after: float | None = None):
+        self.failures = failures
+        self.retry_after = retry_after
+        self.calls: list[float] = []
+
+    async def __call__(self) -> str:
+        self.calls.append(time.monotonic())
+        if len(self.calls) <= self.failures:
+            raise _rate_limited(self.retry_after)
+        return "ok"
+
+
+@pytest.mark.asyncio
+async def test_success_grows_window_additively() -> None:
+    """Каждый успех добавляет 1/window: после полного окна успехов окно растёт на 1."""
+    scheduler = BridgeScheduler(initial_window=4, max_window=20)
+
+    async def ok() -> int:
+        return 1
+
+    for _ in range(4):
+        assert await scheduler.run(ok) == 1
+
+    assert scheduler.window == 4  # 4 + 1/4 + 1/4.25 + ... ~= 4.9
+    await scheduler.run(ok)
+    assert scheduler.window == 5
+    assert scheduler.stats().completed == 5
+
+
+@pytest.mark.asyncio
+async def test_window_capped_by_max() -> None:
+    scheduler = BridgeScheduler(initial_window=2, max_window=3)
+
+    async def ok() -> None:
+        return None
+
+    for _ in range(50):
+        await scheduler.run(ok)
+
+    assert scheduler.window == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_halves_window_and_requeues() -> None:
+    """429 → окно делится пополам, запрос повторяется и в итоге возвращает результат."""
+    scheduler = BridgeScheduler(initial_window=8, backoff_base=0.001)
+    request = _Flaky(failures=1)
+
+    assert await scheduler.run(request) == "ok"
+
+    stats = scheduler.stats()
+    assert len(request.calls) == 2
+    assert stats.rate_limited == 1
+    assert stats.retried == 1
+    assert stats.window == 4
+    assert stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rate_limits_decrease_window_once() -> None:
+    """Несколько 429 от запросов, отправленных до снижения, уменьшают окно только один раз."""
+    scheduler = BridgeScheduler(initial_window=8, backoff_base=0.001)
+    gate = asyncio.Event()
+    calls = 0
+
+    async def request() -> str:
+        nonlocal calls
+        calls += 1
+        if calls <= 4:
+            await gate.wait()
+            raise _rate_limited()
+        return "ok"
+
+    runs = [asyncio.create_task(scheduler.run(request)) for _ in range(4)]
+    await asyncio.sleep(0)
+    gate.set()
+    assert await asyncio.gather(*runs) == ["ok"] * 4
+
+    assert scheduler.stats().rate_limited == 4
+    assert scheduler.window == 4
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_all_requests() -> None:
+    """Retry-After приостанавливает все новые запросы, не только повторяемый."""
+    scheduler = BridgeScheduler(initial_window=4, backoff_base=0.001)
+    flaky = _Flaky(failures=1, retry_after=0.2)
+    started: list[float] = []
+
+    async def other() -> None:
+        started.append(time.monotonic())
+
+    first = asyncio.create_task(scheduler.run(flaky))
+    await asyncio.sleep(0.01)
+    rate_limited_at = flaky.calls[0]
+    await scheduler.run(other)
+    assert await first == "ok"
+
+    assert started[0] - rate_limited_at >= 0.19
+    assert flaky.calls[1] - rate_limited_at >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries() -> None:
+    scheduler = BridgeScheduler(max_retries=2, backoff_base=0.001)
+    request = _Flaky(failures=10)
+
+    with pytest.raises(TmdbBridgeClientError) as exc_info:
+        await scheduler.run(request)
+
+    assert exc_info.value.code == TmdbBridgeErrorCode.RATE_LIMIT_ERROR
+    assert len(request.calls) == 3
+    assert scheduler.stats().in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_other_errors_are_not_retried() -> None:
+    scheduler = BridgeScheduler(initial_window=4)
+    calls = 0
+
+    async def request() -> None:
+        nonlocal calls
+        calls += 1
+        raise TmdbBridgeClientError(code=TmdbBridgeErrorCode.TIMEOUT_ERROR, message="timeout")
+
+    with pytest.raises(TmdbBridgeClientError):
+        await scheduler.run(request)
+
+    assert calls == 1
+    assert scheduler.window == 4
+    assert scheduler.stats().in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_window() -> None:
+    scheduler = BridgeScheduler(initial_window=3, max_window=3)
+    active = peak = 0
+
+    async def request() -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+
+    await asyncio.gather(*(scheduler.run(request) for _ in range(20)))
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_throughput_counts_recent_completions() -> None:
+    now = [100.0]
+    scheduler = BridgeScheduler(clock=lambda: now[0])
+
+    async def ok() -> None:
+        return None
+
+    assert scheduler.throughput == 0.0
+    now[0] = 102.0
+    for _ in range(10):
+        await scheduler.run(ok)
+
+    assert scheduler.throughput == pytest.approx(5.0)
+
+    # Completions older than the throughput window are no longer counted
+    now[0] = 200.0
+    assert scheduler.throughput == 0.0
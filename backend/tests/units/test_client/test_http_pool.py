@@ -0,0 +1,256 @@
+"""Unit tests for app.client.http_pool."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from app.client import http_pool
+from app.client.http_pool import (
+    POOL_SETTINGS,
+    TMDB_BRIDGE_POOL,
+    HttpClientRegistry,
+    PoolSettings,
+    build_probe_client,
+)
+from app.client.resilience import ResilientTransport
+from app.models.schedule import ServiceType
+
+_URL = "http://localhost:8989"
+_KEY = "test_key"
+
+
+@pytest.mark.asyncio
+async def test_get_reuses_client_for_same_config() -> None:
+    """Same url + api_key → the same pooled client is returned."""
+    registry = HttpClientRegistry()
+
+    first = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+    second = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+
+    assert first is second
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_keeps_separate_clients_per_service() -> None:
+    """Each service gets its own pool."""
+    registry = HttpClientRegistry()
+
+    sonarr = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+    radarr = await registry.get(ServiceType.RADARR.value, _URL, _KEY)
+
+    assert sonarr is not radarr
+    await registry.aclose()
+
+
+class _Body(httpx.AsyncByteStream):
+    """A streamed body, closed by the client like a real network response."""
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b'{"ok": true}'
+
+
+class _SlowUpstream:
+    """MockTransport whose responses wait until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.started.set()
+        await self.release.wait()
+        return httpx.Response(200, stream=_Body())
+
+
+@pytest.fixture
+def upstream(monkeypatch: pytest.MonkeyPatch) -> _SlowUpstream:
+    fake = _SlowUpstream()
+    monkeypatch.setattr(
+        http_pool, "_build_transport", lambda service, settings: httpx.MockTransport(fake.handle)
+    )
+    return fake
+
+
+@pytest.mark.parametrize(
+    "url,api_key",
+    [
+        ("http://other-host:8989", _KEY),
+        (_URL, "rotated_key"),
+    ],
+)
+@pytest.mark.asyncio
+async def test_get_rebuilds_client_when_config_changes(url: str, api_key: str) -> None:
+    """Changed url or api_key → a new client; the idle old one is closed at once."""
+    registry = HttpClientRegistry()
+
+    old = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+    new = await registry.get(ServiceType.SONARR.value, url, api_key)
+
+    assert new is not old
+    assert old.is_closed
+    assert not new.is_closed
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_busy_client_open_until_its_request_is_done(
+    upstream: _SlowUpstream,
+) -> None:
+    """A job holding the old client finishes its request; then the old client is closed."""
+    registry = HttpClientRegistry()
+    old = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+    request = asyncio.create_task(old.get(f"{_URL}/api/v3/series"))
+    await upstream.started.wait()
+
+    new = await registry.get(ServiceType.SONARR.value, _URL, "rotated_key")
+
+    assert new is not old
+    assert not old.is_closed
+    upstream.release.set()
+    response = await request
+    assert response.json() == {"ok": True}
+    assert old.is_closed
+    assert registry._retired == []
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_keeps_client_open_until_closed(upstream: _SlowUpstream) -> None:
+    registry = HttpClientRegistry()
+    old = await registry.get(ServiceType.JELLYFIN.value, _URL, _KEY)
+    upstream.release.set()
+
+    async with old.stream("GET", f"{_URL}/Items") as response:
+        await registry.invalidate(ServiceType.JELLYFIN.value)
+        assert not old.is_closed
+        await response.aread()
+
+    assert old.is_closed
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rebuilds_create_one_client() -> None:
+    """Callers racing on a config change share one new client, none is leaked."""
+    registry = HttpClientRegistry()
+    old = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+
+    clients = await asyncio.gather(
+        *(registry.get(ServiceType.SONARR.value, _URL, "rotated_key") for _ in range(5))
+    )
+
+    assert all(client is clients[0] for client in clients)
+    assert old.is_closed
+    assert registry._retired == []
+    await registry.aclose()
+    assert clients[0].is_closed
+
+
+@pytest.mark.asyncio
+async def test_invalidate_closes_and_forgets_client() -> None:
+    registry = HttpClientRegistry()
+    old = await registry.get(ServiceType.JELLYFIN.value, _URL, _KEY)
+
+    await registry.invalidate(ServiceType.JELLYFIN.value)
+    new = await registry.get(ServiceType.JELLYFIN.value, _URL, _KEY)
+
+    assert old.is_closed
+    assert new is not old
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_retires_busy_client(upstream: _SlowUpstream) -> None:
+    """Saving or deleting settings does not break a running import."""
+    registry = HttpClientRegistry()
+    client = await registry.get(ServiceType.RADARR.value, _URL, _KEY)
+    request = asyncio.create_task(client.get(f"{_URL}/api/v3/movie"))
+    await upstream.started.wait()
+
+    await registry.invalidate(ServiceType.RADARR.value)
+
+    assert not client.is_closed
+    upstream.release.set()
+    assert (await request).status_code == 200
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_busy_retired_clients(upstream: _SlowUpstream) -> None:
+    registry = HttpClientRegistry()
+    client = await registry.get(ServiceType.RADARR.value, _URL, _KEY)
+    request = asyncio.create_task(client.get(f"{_URL}/api/v3/movie"))
+    await upstream.started.wait()
+    await registry.invalidate(ServiceType.RADARR.value)
+
+    await registry.aclose()
+
+    assert client.is_closed
+    upstream.release.set()
+    await request
+
+
+@pytest.mark.asyncio
+async def test_invalidate_unknown_service_is_noop() -> None:
+    registry = HttpClientRegistry()
+
+    await registry.invalidate(ServiceType.RADARR.value)
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_all_clients() -> None:
+    registry = HttpClientRegistry()
+    clients = [
+        await registry.get(ServiceType.SONARR.value, _URL, _KEY),
+        await registry.get(TMDB_BRIDGE_POOL),
+    ]
+
+    await registry.aclose()
+
+    assert all(c.is_closed for c in clients)
+
+
+@pytest.mark.asyncio
+async def test_client_uses_service_pool_settings() -> None:
+    """Timeouts come from the per-service PoolSettings."""
+    settings = {
+        ServiceType.RADARR.value: PoolSettings(
+            max_connections=2, max_keepalive_connections=1, keepalive_expiry=5.0, timeout=7.0
+        )
+    }
+    registry = HttpClientRegistry(settings)
+
+    client = await registry.get(ServiceType.RADARR.value, _URL, _KEY)
+
+    assert client.timeout == httpx.Timeout(7.0, connect=10.0)
+    await registry.aclose()
+
+
+def test_pool_settings_defined_for_every_service() -> None:
+    for service in ServiceType:
+        assert service.value in POOL_SETTINGS
+    assert TMDB_BRIDGE_POOL in POOL_SETTINGS
+
+
+@pytest.mark.asyncio
+async def test_service_clients_get_resilient_transport() -> None:
+    """*arr/Jellyfin clients retry and break circuits; the Bridge pool is left to its scheduler."""
+    registry = HttpClientRegistry()
+
+    sonarr = await registry.get(ServiceType.SONARR.value, _URL, _KEY)
+    bridge = await registry.get(TMDB_BRIDGE_POOL)
+
+    assert isinstance(sonarr._transport.transport, ResilientTransport)
+    assert sonarr._transport.transport.breaker is not None
+    assert not isinstance(bridge._transport.transport, ResilientTransport)
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_probe_client_has_pool_settings_but_no_retries() -> None:
+    """Connection tests of unsaved credentials fail after one attempt."""
+    async with build_probe_client(ServiceType.SONARR.value) as client:
+        assert client.timeout == POOL_SETTINGS[ServiceType.SONARR.value].timeouts()
+        assert isinstance(client._transport, httpx.AsyncHTTPTransport)
@@ -37,7 +37,7 @@ async def test_fetch_jellyfin_movies_pagination(mock_httpx_client: Mock) -> None
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.side_effect = [mock_response1, mock_response2]
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     result = await fetch_jellyfin_movies(url=_URL, api_key=_KEY)
 
@@ -61,7 +61,7 @@ async def test_fetch_jellyfin_movies_single_page(mock_httpx_client: Mock) -> Non
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.return_value = mock_response
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     result = await fetch_jellyfin_movies(url=_URL, api_key=_KEY)
 
@@ -79,7 +79,7 @@ async def test_fetch_jellyfin_movies_empty_library(mock_httpx_client: Mock) -> N
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.return_value = mock_response
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     result = await fetch_jellyfin_movies(url=_URL, api_key=_KEY)
 
@@ -117,7 +117,7 @@ async def test_fetch_jellyfin_movies_errors(
         )
         mock_client_instance.get.return_value = mock_response
 
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     with pytest.raises(JellyfinClientError) as exc_info:
         await fetch_jellyfin_movies(url=_URL, api_key=_KEY)
@@ -137,7 +137,7 @@ async def test_fetch_jellyfin_movies_sends_api_key_in_url(mock_httpx_client: Moc
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.return_value = mock_response
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     await fetch_jellyfin_movies(url="http://myjf.local", api_key="my-secret-token")
 
@@ -159,7 +159,7 @@ async def test_fetch_jellyfin_movies_includes_provider_ids_field(mock_httpx_clie
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.return_value = mock_response
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     await fetch_jellyfin_movies(url=_URL, api_key=_KEY)
 
@@ -3,7 +3,11 @@ from unittest.mock import AsyncMock, Mock
 import httpx
 import pytest
 
-from app.client.jellyfin_client import JellyfinClientError, fetch_jellyfin_movies_for_user_all
+from app.client.jellyfin_client import (
+    JellyfinClientError,
+    fetch_jellyfin_movies_for_user_all,
+    iter_jellyfin_movies_for_user,
+)
 from app.schemas.error_codes import JellyfinErrorCode
 
 TEST_URL = "http://jellyfin.test"
@@ -34,7 +38,7 @@ async def test_fetch_jellyfin_movies_by_user_pagination(mock_httpx_client):
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.side_effect = [mock_response1, mock_response2]
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     result = await fetch_jellyfin_movies_for_user_all(TEST_URL, TEST_API_KEY, "user1")
 
@@ -58,7 +62,7 @@ async def test_fetch_jellyfin_movies_by_user_single_page(mock_httpx_client):
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.return_value = mock_response
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     result = await fetch_jellyfin_movies_for_user_all(TEST_URL, TEST_API_KEY, "user1")
 
@@ -66,6 +70,43 @@ async def test_fetch_jellyfin_movies_by_user_single_page(mock_httpx_client):
     assert mock_client_instance.get.call_count == 1
 
 
+@pytest.mark.asyncio
+async def test_iter_jellyfin_movies_by_user_ids_in_chunks(mock_httpx_client):
+    """Фильмы по списку id запрашиваются пачками по 50, без фильтра по дате."""
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"Items": [], "TotalRecordCount": 0}
+
+    mock_client_instance = AsyncMock()
+    mock_client_instance.get.return_value = mock_response
+    mock_httpx_client.return_value = mock_client_instance
+
+    ids = [f"m{i}" for i in range(60)]
+    pages = [
+        page
+        async for page in iter_jellyfin_movies_for_user(TEST_URL, TEST_API_KEY, "user1", ids=ids)
+    ]
+
+    assert pages == []
+    params = [c.kwargs["params"] for c in mock_client_instance.get.call_args_list]
+    assert [p["Ids"].split(",") for p in params] == [ids[:50], ids[50:]]
+    assert all("MinDateLastSavedForUser" not in p for p in params)
+
+
+@pytest.mark.asyncio
+async def test_iter_jellyfin_movies_by_user_empty_ids_skips_request(mock_httpx_client):
+    mock_client_instance = AsyncMock()
+    mock_httpx_client.return_value = mock_client_instance
+
+    pages = [
+        page
+        async for page in iter_jellyfin_movies_for_user(TEST_URL, TEST_API_KEY, "user1", ids=[])
+    ]
+
+    assert pages == []
+    mock_client_instance.get.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "error_type,status_code,error_message,expected_code",
     [
@@ -97,7 +138,7 @@ async def test_fetch_jellyfin_movies_by_user_errors(
         )
         mock_client_instance.get.return_value = mock_response
 
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     with pytest.raises(JellyfinClientError) as exc_info:
         await fetch_jellyfin_movies_for_user_all(TEST_URL, TEST_API_KEY, "user1")
@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, Mock
 
 import httpx
@@ -6,6 +7,8 @@ import pytest
 from app.client.jellyfin_client import (
     JellyfinClientError,
     fetch_jellyfin_series,
+    iter_jellyfin_library_episodes,
+    iter_jellyfin_series,
 )
 from app.schemas.error_codes import JellyfinErrorCode
 
@@ -35,7 +38,7 @@ async def test_fetch_jellyfin_series_pagination(mock_httpx_client: Mock) -> None
 
     client_instance = AsyncMock()
     client_instance.get.side_effect = [resp1, resp2]
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     result = await fetch_jellyfin_series(TEST_URL, TEST_API_KEY)
 
@@ -59,7 +62,7 @@ async def test_fetch_jellyfin_series_single_page(mock_httpx_client: Mock) -> Non
 
     client_instance = AsyncMock()
     client_instance.get.return_value = resp
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     result = await fetch_jellyfin_series(TEST_URL, TEST_API_KEY)
 
@@ -81,7 +84,7 @@ async def test_fetch_jellyfin_series_empty_result(mock_httpx_client: Mock) -> No
 
     client_instance = AsyncMock()
     client_instance.get.return_value = resp
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     result = await fetch_jellyfin_series(TEST_URL, TEST_API_KEY)
 
@@ -122,7 +125,7 @@ async def test_fetch_jellyfin_series_errors(
         )
         client_instance.get.return_value = resp
 
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     with pytest.raises(JellyfinClientError) as exc:
         await fetch_jellyfin_series(TEST_URL, TEST_API_KEY)
@@ -130,3 +133,72 @@ async def test_fetch_jellyfin_series_errors(
     assert exc.value.code == expected_code
     if error_type == "http":
         assert error_message in exc.value.message
+
+
+@pytest.mark.asyncio
+async def test_iter_jellyfin_library_episodes_single_recursive_query(
+    mock_httpx_client: Mock,
+) -> None:
+    """Все эпизоды библиотеки одним рекурсивным запросом /Items с SeriesId."""
+    data = {
+        "Items": [
+            {"Id": "e1", "SeriesId": "s1", "ParentIndexNumber": 1, "IndexNumber": 1},
+            {"Id": "e2", "SeriesId": "s2", "ParentIndexNumber": 1, "IndexNumber": 1},
+        ],
+        "TotalRecordCount": 2,
+    }
+
+    resp = Mock()
+    resp.raise_for_status.return_value = None
+    resp.json.return_value = data
+
+    client_instance = AsyncMock()
+    client_instance.get.return_value = resp
+    mock_httpx_client.return_value = client_instance
+
+    pages = [page async for page in iter_jellyfin_library_episodes(TEST_URL, TEST_API_KEY)]
+
+    assert pages == [data["Items"]]
+    assert client_instance.get.call_count == 1
+    kwargs = client_instance.get.call_args.kwargs
+    assert kwargs["url"] == f"{TEST_URL}/Items"
+    params = kwargs["params"]
+    assert params["IncludeItemTypes"] == "Episode"
+    assert params["Recursive"] == "true"
+    assert "SeriesId" in params["Fields"]
+    assert "SeasonId" in params["Fields"]
+
+
+@pytest.mark.asyncio
+async def test_iter_jellyfin_library_episodes_error(mock_httpx_client: Mock) -> None:
+    """Сетевая ошибка оборачивается в JellyfinClientError."""
+    client_instance = AsyncMock()
+    client_instance.get.side_effect = httpx.RequestError("Timeout")
+    mock_httpx_client.return_value = client_instance
+
+    with pytest.raises(JellyfinClientError) as exc:
+        async for _ in iter_jellyfin_library_episodes(TEST_URL, TEST_API_KEY):
+            pass
+
+    assert exc.value.code == JellyfinErrorCode.NETWORK_ERROR
+
+
+@pytest.mark.asyncio
+async def test_iter_jellyfin_series_changed_since(mock_httpx_client: Mock) -> None:
+    """С датой водяного знака запрос идёт с MinDateLastSaved в UTC, без неё — без фильтра."""
+    resp = Mock()
+    resp.raise_for_status.return_value = None
+    resp.json.return_value = {"Items": [], "TotalRecordCount": 0}
+
+    client_instance = AsyncMock()
+    client_instance.get.return_value = resp
+    mock_httpx_client.return_value = client_instance
+
+    since = datetime(2026, 3, 1, 15, 30, tzinfo=timezone(timedelta(hours=3)))
+    [page async for page in iter_jellyfin_series(TEST_URL, TEST_API_KEY, since)]
+    assert client_instance.get.call_args.kwargs["params"]["MinDateLastSaved"] == (
+        "2026-03-01T12:30:00Z"
+    )
+
+    [page async for page in iter_jellyfin_series(TEST_URL, TEST_API_KEY)]
+    assert "MinDateLastSaved" not in client_instance.get.call_args.kwargs["params"]
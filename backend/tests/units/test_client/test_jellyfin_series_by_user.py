@@ -35,7 +35,7 @@ async def test_fetch_jellyfin_episodes_pagination(mock_httpx_client):
 
     client_instance = AsyncMock()
     client_instance.get.side_effect = [resp1, resp2]
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     result = await fetch_jellyfin_episodes_for_user_all(TEST_URL, TEST_API_KEY, "user123")
 
@@ -58,7 +58,7 @@ async def test_fetch_jellyfin_episodes_single_page(mock_httpx_client):
 
     client_instance = AsyncMock()
     client_instance.get.return_value = resp
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     result = await fetch_jellyfin_episodes_for_user_all(TEST_URL, TEST_API_KEY, "user123")
 
@@ -99,7 +99,7 @@ async def test_fetch_jellyfin_episodes_errors(
         )
         client_instance.get.return_value = resp
 
-    mock_httpx_client.return_value.__aenter__.return_value = client_instance
+    mock_httpx_client.return_value = client_instance
 
     with pytest.raises(JellyfinClientError) as exc:
         await fetch_jellyfin_episodes_for_user_all(TEST_URL, TEST_API_KEY, "user123")
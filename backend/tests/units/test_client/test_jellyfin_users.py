@@ -22,7 +22,7 @@ async def test_fetch_jellyfin_users_success(mock_httpx_client):
 
     mock_client_instance = AsyncMock()
     mock_client_instance.get.return_value = mock_response
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     result = await fetch_jellyfin_users(TEST_URL, TEST_API_KEY)
 
@@ -62,7 +62,7 @@ async def test_fetch_jellyfin_users_errors(
         )
         mock_client_instance.get.return_value = mock_response
 
-    mock_httpx_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_httpx_client.return_value = mock_client_instance
 
     with pytest.raises(JellyfinClientError) as exc_info:
         await fetch_jellyfin_users(TEST_URL, TEST_API_KEY)
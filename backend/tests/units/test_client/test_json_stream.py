@@ -0,0 +1,73 @@
+"""Unit tests for app.client.json_stream."""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from app.client.json_stream import iter_json_array
+
+
+async def _chunks(text: str, size: int) -> AsyncIterator[str]:
+    for start in range(0, len(text), size):
+        yield text[start : start + size]
+
+
+async def _decode(text: str, size: int, fields: frozenset[str] | None = None) -> list[Any]:
+    return [item async for item in iter_json_array(_chunks(text, size), fields)]
+
+
+_ITEMS = [
+    {"id": 1, "title": 'Dune, "Part" [One]', "ratings": {"value": 8.1}, "images": []},
+    {"id": 2, "title": "Ёлки", "ratings": {}, "genres": ["Comedy", "Drama"]},
+    {"id": 3, "title": None, "year": 2024},
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 10_000])
+@pytest.mark.asyncio
+async def test_iter_json_array_decodes_any_chunking(size: int) -> None:
+    """Elements are decoded correctly wherever the chunk boundaries fall."""
+    text = json.dumps(_ITEMS, indent=2, ensure_ascii=False)
+
+    assert await _decode(text, size) == _ITEMS
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_keeps_only_requested_fields() -> None:
+    result = await _decode(json.dumps(_ITEMS), 16, fields=frozenset({"id", "ratings"}))
+
+    assert result == [
+        {"id": 1, "ratings": {"value": 8.1}},
+        {"id": 2, "ratings": {}},
+        {"id": 3},
+    ]
+
+
+@pytest.mark.parametrize("text", ["[]", " [ ] ", "[\n]"])
+@pytest.mark.asyncio
+async def test_iter_json_array_empty(text: str) -> None:
+    assert await _decode(text, 1) == []
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_scalars_split_across_chunks() -> None:
+    """A number cut by a chunk boundary is not emitted until it is complete."""
+    assert await _decode("[12345, 678, true]", 2) == [12345, 678, True]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"id": 1}',  # not an array
+        '[{"id": 1}',  # truncated
+        '[{"id": 1} {"id": 2}]',  # missing separator
+        '[{"id": 1},]',  # trailing comma
+        "[1] 2",  # trailing data
+    ],
+)
+@pytest.mark.asyncio
+async def test_iter_json_array_rejects_malformed_body(text: str) -> None:
+    with pytest.raises(ValueError):
+        await _decode(text, 3)
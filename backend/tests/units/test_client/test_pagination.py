@@ -0,0 +1,163 @@
+"""Unit tests for app.client.pagination.fetch_paginated and iter_paginated."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.client.pagination import (
+    MAX_PAGE_SIZE,
+    MIN_PAGE_SIZE,
+    fetch_paginated,
+    iter_paginated,
+    tune_page_size,
+)
+
+_URL = "http://jf.local/Items"
+
+
+def _fake_server(total: int, page_cap: int | None = None, delay: float = 0.0) -> AsyncMock:
+    """Client whose get() serves Items[StartIndex:StartIndex+Limit] out of `total` items."""
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _get(**kwargs: Any) -> Mock:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+
+        start = kwargs["params"]["StartIndex"]
+        limit = kwargs["params"]["Limit"]
+        if page_cap is not None:
+            limit = min(limit, page_cap)
+        response = Mock()
+        response.content = b"x" * 100
+        response.json.return_value = {
+            "Items": [{"Id": f"i{n}"} for n in range(start, min(start + limit, total))],
+            "TotalRecordCount": total,
+        }
+        return response
+
+    client = AsyncMock()
+    client.get.side_effect = _get
+    client.max_in_flight = lambda: max_in_flight
+    return client
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_returns_items_in_order() -> None:
+    """Concurrently fetched windows are reassembled in server order."""
+    client = _fake_server(total=2500, delay=0.001)
+
+    items = await fetch_paginated(client=client, url=_URL, headers={}, params={}, limit=100)
+
+    assert [i["Id"] for i in items] == [f"i{n}" for n in range(2500)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_respects_max_concurrency() -> None:
+    client = _fake_server(total=5000, delay=0.005)
+
+    await fetch_paginated(
+        client=client, url=_URL, headers={}, params={}, limit=100, max_concurrency=2, max_limit=100
+    )
+
+    assert client.max_in_flight() <= 2
+    assert client.get.call_count == 50
+
+
+@pytest.mark.asyncio
+async def test_iter_paginated_yields_pages_in_order() -> None:
+    client = _fake_server(total=1000, delay=0.001)
+
+    pages = [
+        page
+        async for page in iter_paginated(
+            client=client, url=_URL, headers={}, params={}, limit=100, max_limit=100
+        )
+    ]
+
+    assert [len(page) for page in pages] == [100] * 10
+    assert [i["Id"] for page in pages for i in page] == [f"i{n}" for n in range(1000)]
+
+
+@pytest.mark.asyncio
+async def test_iter_paginated_prefetches_only_a_bounded_lookahead() -> None:
+    """Stopping early leaves at most max_concurrency windows requested ahead of the consumer."""
+    client = _fake_server(total=5000, delay=0.001)
+
+    iterator = iter_paginated(
+        client=client, url=_URL, headers={}, params={}, limit=100, max_concurrency=2, max_limit=100
+    )
+    async for _ in iterator:
+        break
+    await iterator.aclose()
+
+    # first page + 2 prefetched windows
+    assert client.get.call_count <= 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_fills_gaps_when_server_caps_page_size() -> None:
+    """Server returns fewer items than requested → the rest of the window is re-requested."""
+    client = _fake_server(total=1000, page_cap=100)
+
+    items = await fetch_paginated(client=client, url=_URL, headers={}, params={}, limit=100)
+
+    assert [i["Id"] for i in items] == [f"i{n}" for n in range(1000)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_first_page_below_cap_is_not_the_end() -> None:
+    """Короткая первая страница из-за лимита сервера — не признак конца выборки."""
+    client = _fake_server(total=250, page_cap=40)
+
+    items = await fetch_paginated(client=client, url=_URL, headers={}, params={}, limit=100)
+
+    assert [i["Id"] for i in items] == [f"i{n}" for n in range(250)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_single_page_makes_one_request() -> None:
+    client = _fake_server(total=30)
+
+    items = await fetch_paginated(client=client, url=_URL, headers={}, params={}, limit=100)
+
+    assert len(items) == 30
+    assert client.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_paginated_passes_base_params() -> None:
+    client = _fake_server(total=150)
+
+    await fetch_paginated(
+        client=client, url=_URL, headers={}, params={"IncludeItemTypes": "Movie"}, limit=100
+    )
+
+    for call in client.get.call_args_list:
+        assert call.kwargs["params"]["IncludeItemTypes"] == "Movie"
+
+
+@pytest.mark.parametrize(
+    "item_count,elapsed,payload_bytes,expected",
+    [
+        # fast and small → grow to the upper bound
+        (100, 0.01, 10_000, MAX_PAGE_SIZE),
+        # slow → shrink, but never below the lower bound
+        (100, 20.0, 10_000, MIN_PAGE_SIZE),
+        # 1s per 100 items → ~2s target means 200 items
+        (100, 1.0, None, 200),
+        # payload bound wins over latency: 2 MiB per 100 items → 200 items for 4 MiB
+        (100, 0.01, 2 * 1024 * 1024, 200),
+        # empty page → lower bound
+        (0, 0.1, None, MIN_PAGE_SIZE),
+    ],
+)
+def test_tune_page_size(
+    item_count: int, elapsed: float, payload_bytes: int | None, expected: int
+) -> None:
+    assert tune_page_size(item_count, elapsed, payload_bytes) == expected
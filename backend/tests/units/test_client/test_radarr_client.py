@@ -7,8 +7,14 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
 import pytest
+from pytest_httpx import HTTPXMock
 
-from app.client.radarr_client import RadarrClientError, fetch_radarr_movies
+from app.client.radarr_client import (
+    RadarrClientError,
+    fetch_radarr_movie,
+    fetch_radarr_movies,
+    iter_radarr_movies,
+)
 from app.schemas.error_codes import RadarrErrorCode
 
 _URL = "http://localhost:7878"
@@ -25,13 +31,13 @@ async def test_fetch_radarr_movies_success() -> None:
 
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value.get.return_value = mock_response
+        mock_client_instance.get.return_value = mock_response
         mock_client.return_value = mock_client_instance
 
         result = await fetch_radarr_movies(url=_URL, api_key=_KEY)
 
     assert result == mock_movies
-    mock_client_instance.__aenter__.return_value.get.assert_called_once()
+    mock_client_instance.get.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -39,9 +45,7 @@ async def test_fetch_radarr_movies_network_error() -> None:
     """Network-level error raises RadarrClientError with NETWORK_ERROR code."""
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value.get.side_effect = httpx.RequestError(
-            "Connection failed"
-        )
+        mock_client_instance.get.side_effect = httpx.RequestError("Connection failed")
         mock_client.return_value = mock_client_instance
 
         with pytest.raises(RadarrClientError) as exc_info:
@@ -56,9 +60,7 @@ async def test_fetch_radarr_movies_timeout() -> None:
     """Timeout error raises RadarrClientError with NETWORK_ERROR code."""
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value.get.side_effect = httpx.TimeoutException(
-            "Timed out"
-        )
+        mock_client_instance.get.side_effect = httpx.TimeoutException("Timed out")
         mock_client.return_value = mock_client_instance
 
         with pytest.raises(RadarrClientError) as exc_info:
@@ -102,7 +104,7 @@ async def test_fetch_radarr_movies_invalid_json() -> None:
 
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value.get.return_value = mock_response
+        mock_client_instance.get.return_value = mock_response
         mock_client.return_value = mock_client_instance
 
         with pytest.raises(RadarrClientError) as exc_info:
@@ -117,7 +119,6 @@ async def test_fetch_radarr_movies_unexpected_exception() -> None:
     """Unexpected exception wrapped in INTERNAL_ERROR."""
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value = mock_client_instance
         mock_client_instance.get.side_effect = RuntimeError("Unexpected failure in request")
         mock_client.return_value = mock_client_instance
 
@@ -137,7 +138,7 @@ async def test_fetch_radarr_movies_sends_api_key_header() -> None:
 
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_get = mock_client_instance.__aenter__.return_value.get
+        mock_get = mock_client_instance.get
         mock_get.return_value = mock_response
         mock_client.return_value = mock_client_instance
 
@@ -160,7 +161,7 @@ async def test_fetch_radarr_movies_uses_correct_url() -> None:
 
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_get = mock_client_instance.__aenter__.return_value.get
+        mock_get = mock_client_instance.get
         mock_get.return_value = mock_response
         mock_client.return_value = mock_client_instance
 
@@ -170,3 +171,76 @@ async def test_fetch_radarr_movies_uses_correct_url() -> None:
     # fetch_paginated_simple calls client.get(url=...) with keyword arg
     called_url = call_args.kwargs.get("url", "")
     assert called_url == f"http://myradarr:7878{RADARR_MOVIES}"
+
+
+@pytest.mark.asyncio
+async def test_iter_radarr_movies_streams_trimmed_items(httpx_mock: HTTPXMock) -> None:
+    """Items are streamed one by one with only the fields the import reads."""
+    httpx_mock.add_response(
+        url=f"{_URL}/api/v3/movie",
+        json=[
+            {
+                "id": 1,
+                "title": "Dune",
+                "tmdbId": 438631,
+                "movieFile": {"size": 1},
+                "overview": "Long text",
+            }
+        ],
+    )
+
+    result = [item async for item in iter_radarr_movies(url=_URL, api_key=_KEY)]
+
+    assert result == [{"id": 1, "title": "Dune", "tmdbId": 438631}]
+    assert httpx_mock.get_requests()[0].headers["X-Api-Key"] == _KEY
+
+
+@pytest.mark.asyncio
+async def test_iter_radarr_movies_http_error(httpx_mock: HTTPXMock) -> None:
+    """HTTP error while streaming raises RadarrClientError carrying the response body."""
+    httpx_mock.add_response(url=f"{_URL}/api/v3/movie", status_code=503, text="Service Unavailable")
+
+    with pytest.raises(RadarrClientError) as exc_info:
+        [item async for item in iter_radarr_movies(url=_URL, api_key=_KEY)]
+
+    assert exc_info.value.code == RadarrErrorCode.EXTERNAL_API_ERROR
+    assert "Service Unavailable" in exc_info.value.message
+
+
+@pytest.mark.asyncio
+async def test_iter_radarr_movies_malformed_body(httpx_mock: HTTPXMock) -> None:
+    """A truncated body raises RadarrClientError with INTERNAL_ERROR."""
+    httpx_mock.add_response(url=f"{_URL}/api/v3/movie", text='[{"id": 1}, {"id"')
+
+    with pytest.raises(RadarrClientError) as exc_info:
+        [item async for item in iter_radarr_movies(url=_URL, api_key=_KEY)]
+
+    assert exc_info.value.code == RadarrErrorCode.INTERNAL_ERROR
+
+
+@pytest.mark.asyncio
+async def test_fetch_radarr_movie_returns_single_movie(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(url=f"{_URL}/api/v3/movie/42", json={"id": 42, "title": "Dune"})
+
+    result = await fetch_radarr_movie(url=_URL, api_key=_KEY, movie_id=42)
+
+    assert result == {"id": 42, "title": "Dune"}
+    assert httpx_mock.get_requests()[0].headers["X-Api-Key"] == _KEY
+
+
+@pytest.mark.asyncio
+async def test_fetch_radarr_movie_not_found_returns_none(httpx_mock: HTTPXMock) -> None:
+    """Фильм удалён из Radarr — None вместо ошибки."""
+    httpx_mock.add_response(url=f"{_URL}/api/v3/movie/42", status_code=404)
+
+    assert await fetch_radarr_movie(url=_URL, api_key=_KEY, movie_id=42) is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_radarr_movie_http_error(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(url=f"{_URL}/api/v3/movie/42", status_code=401, text="Unauthorized")
+
+    with pytest.raises(RadarrClientError) as exc_info:
+        await fetch_radarr_movie(url=_URL, api_key=_KEY, movie_id=42)
+
+    assert exc_info.value.code == RadarrErrorCode.EXTERNAL_API_ERROR
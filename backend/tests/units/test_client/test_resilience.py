@@ -0,0 +1,279 @@
+"""Unit tests for app.client.resilience (retries, backoff, circuit breaker)."""
+
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from app.client.resilience import (
+    BreakerPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    ResilientTransport,
+    RetryPolicy,
+    retry_after_seconds,
+)
+
+_URL = "http://sonarr.local/api/v3/series"
+_NO_BACKOFF = RetryPolicy(backoff_base=0.0)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Upstream:
+    """Отдаёт заранее заданные ответы/исключения по очереди и считает запросы."""
+
+    def __init__(self, *outcomes: int | Exception, headers: dict[str, str] | None = None) -> None:
+        self.outcomes = list(outcomes)
+        self.headers = headers or {}
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json=[], headers=self.headers)
+
+
+def _client(
+    upstream: Callable[[httpx.Request], httpx.Response],
+    *,
+    retry: RetryPolicy | None = _NO_BACKOFF,
+    breaker: CircuitBreaker | None = None,
+    sleeps: list[float] | None = None,
+) -> httpx.AsyncClient:
+    async def sleep(delay: float) -> None:
+        if sleeps is not None:
+            sleeps.append(delay)
+
+    transport = ResilientTransport(
+        httpx.MockTransport(upstream),
+        service="sonarr",
+        retry=retry,
+        breaker=breaker,
+        sleep=sleep,
+    )
+    return httpx.AsyncClient(transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_get_retried_after_transport_error() -> None:
+    upstream = _Upstream(httpx.ConnectError("refused"), 200)
+
+    async with _client(upstream) as client:
+        response = await client.get(_URL)
+
+    assert response.status_code == 200
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [429, 502, 503, 504])
+async def test_get_retried_on_transient_status(status: int) -> None:
+    upstream = _Upstream(status, 200)
+
+    async with _client(upstream) as client:
+        response = await client.get(_URL)
+
+    assert response.status_code == 200
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [400, 401, 404, 500])
+async def test_non_transient_status_not_retried(status: int) -> None:
+    upstream = _Upstream(status)
+
+    async with _client(upstream) as client:
+        response = await client.get(_URL)
+
+    assert response.status_code == status
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_post_not_retried() -> None:
+    """Неидемпотентные запросы не повторяются."""
+    upstream = _Upstream(httpx.ConnectError("refused"), 200)
+
+    async with _client(upstream) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.post(_URL, json={})
+
+    assert upstream.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries() -> None:
+    upstream = _Upstream(httpx.ReadTimeout("slow"))
+
+    async with _client(upstream, retry=RetryPolicy(max_retries=2, backoff_base=0.0)) as client:
+        with pytest.raises(httpx.ReadTimeout):
+            await client.get(_URL)
+
+    assert upstream.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_last_transient_response_returned_when_retries_exhausted() -> None:
+    upstream = _Upstream(503)
+
+    async with _client(upstream, retry=RetryPolicy(max_retries=1, backoff_base=0.0)) as client:
+        response = await client.get(_URL)
+
+    assert response.status_code == 503
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_backoff_grows_exponentially_and_honours_retry_after() -> None:
+    sleeps: list[float] = []
+    upstream = _Upstream(503, 503, 429, 200)
+    policy = RetryPolicy(max_retries=3, backoff_base=1.0, backoff_max=10.0)
+
+    async with _client(upstream, retry=policy, sleeps=sleeps) as client:
+        await client.get(_URL)
+
+    assert len(sleeps) == 3
+    assert 0 <= sleeps[0] <= 1.0
+    assert 0 <= sleeps[1] <= 2.0
+    assert 0 <= sleeps[2] <= 4.0
+
+    sleeps.clear()
+    upstream = _Upstream(429, 200, headers={"Retry-After": "7"})
+    async with _client(upstream, retry=policy, sleeps=sleeps) as client:
+        await client.get(_URL)
+
+    assert sleeps == [7.0]
+
+
+def test_retry_after_capped_by_backoff_max() -> None:
+    assert RetryPolicy(backoff_base=0.0, backoff_max=10.0).delay(0, retry_after=3600) == 10.0
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [("12", 12.0), ("Wed, 01 Jan 2020 00:00:00 GMT", 0.0), ("later", None), (None, None)],
+)
+def test_retry_after_seconds(header: str | None, expected: float | None) -> None:
+    headers = {"Retry-After": header} if header is not None else {}
+    assert retry_after_seconds(httpx.Response(429, headers=headers)) == expected
+
+
+# --- circuit breaker ---
+
+
+def _breaker(clock: _Clock, threshold: int = 3) -> CircuitBreaker:
+    return CircuitBreaker(
+        "sonarr", BreakerPolicy(failure_threshold=threshold, recovery_timeout=30.0), clock
+    )
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_fails_fast() -> None:
+    """После N подряд неудачных попыток запросы отклоняются без обращения к сервису."""
+    clock = _Clock()
+    breaker = _breaker(clock)
+    upstream = _Upstream(httpx.ConnectTimeout("timeout"))
+
+    async with _client(upstream, retry=None, breaker=breaker) as client:
+        for _ in range(3):
+            with pytest.raises(httpx.ConnectTimeout):
+                await client.get(_URL)
+        assert breaker.state == CircuitState.OPEN
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await client.get(_URL)
+
+    assert upstream.calls == 3
+    assert isinstance(exc_info.value, httpx.RequestError)
+    assert "sonarr circuit is open" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_stops_retry_loop() -> None:
+    clock = _Clock()
+    breaker = _breaker(clock, threshold=2)
+    upstream = _Upstream(httpx.ConnectError("refused"))
+
+    async with _client(upstream, breaker=breaker) as client:
+        with pytest.raises(CircuitOpenError):
+            await client.get(_URL)
+
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_success_resets_failure_count() -> None:
+    clock = _Clock()
+    breaker = _breaker(clock)
+    upstream = _Upstream(503, 503, 200, 503, 503, 200)
+
+    async with _client(upstream, retry=None, breaker=breaker) as client:
+        for _ in range(6):
+            await client.get(_URL)
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_success_closes_breaker() -> None:
+    clock = _Clock()
+    breaker = _breaker(clock, threshold=1)
+    upstream = _Upstream(httpx.ConnectError("refused"), 200)
+
+    async with _client(upstream, retry=None, breaker=breaker) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get(_URL)
+        with pytest.raises(CircuitOpenError):
+            await client.get(_URL)
+
+        clock.now = 30.0
+        assert breaker.state == CircuitState.HALF_OPEN
+        response = await client.get(_URL)
+
+    assert response.status_code == 200
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_failure_reopens_breaker() -> None:
+    clock = _Clock()
+    breaker = _breaker(clock, threshold=1)
+    upstream = _Upstream(503)
+
+    async with _client(upstream, retry=None, breaker=breaker) as client:
+        await client.get(_URL)
+        clock.now = 30.0
+        await client.get(_URL)
+        assert breaker.state == CircuitState.OPEN
+
+        clock.now = 45.0
+        with pytest.raises(CircuitOpenError):
+            await client.get(_URL)
+
+    assert upstream.calls == 2
+
+
+def test_half_open_admits_single_probe() -> None:
+    clock = _Clock()
+    breaker = _breaker(clock, threshold=1)
+    request = httpx.Request("GET", _URL)
+    breaker.record_failure()
+    clock.now = 30.0
+
+    breaker.before_request(request)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(request)
+
+    # A probe that ended without a verdict (cancelled) frees the slot
+    breaker.release()
+    breaker.before_request(request)
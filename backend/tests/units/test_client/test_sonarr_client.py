@@ -7,8 +7,14 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
 import pytest
+from pytest_httpx import HTTPXMock
 
-from app.client.sonarr_client import SonarrClientError, fetch_sonarr_series
+from app.client.sonarr_client import (
+    SonarrClientError,
+    fetch_sonarr_series,
+    fetch_sonarr_series_item,
+    iter_sonarr_series,
+)
 from app.schemas.error_codes import SonarrErrorCode
 
 _URL = "http://localhost:8989"
@@ -25,7 +31,7 @@ async def test_fetch_sonarr_series_success() -> None:
 
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value.get.return_value = mock_response
+        mock_client_instance.get.return_value = mock_response
         mock_client.return_value = mock_client_instance
 
         result = await fetch_sonarr_series(url=_URL, api_key=_KEY)
@@ -77,7 +83,6 @@ async def test_fetch_sonarr_series_unexpected_error() -> None:
     """Unexpected exception raises SonarrClientError with INTERNAL_ERROR."""
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value = mock_client_instance
         mock_client_instance.get.side_effect = RuntimeError("Totally unexpected")
         mock_client.return_value = mock_client_instance
 
@@ -96,7 +101,7 @@ async def test_fetch_sonarr_series_sends_api_key_header() -> None:
 
     with patch("httpx.AsyncClient") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_get = mock_client_instance.__aenter__.return_value.get
+        mock_get = mock_client_instance.get
         mock_get.return_value = mock_response
         mock_client.return_value = mock_client_instance
 
@@ -104,3 +109,106 @@ async def test_fetch_sonarr_series_sends_api_key_header() -> None:
 
     headers = mock_get.call_args.kwargs.get("headers", {})
     assert headers.get("X-Api-Key") == "custom-sonarr-key"
+
+
+@pytest.mark.asyncio
+async def test_iter_sonarr_series_streams_trimmed_items(httpx_mock: HTTPXMock) -> None:
+    """Items are streamed one by one with only the fields the import reads."""
+    httpx_mock.add_response(
+        url=f"{_URL}/api/v3/series",
+        json=[
+            {
+                "id": 7,
+                "title": "Dark",
+                "tvdbId": 334824,
+                "statistics": {"sizeOnDisk": 1},
+                "overview": "Long text",
+            }
+        ],
+    )
+
+    result = [item async for item in iter_sonarr_series(url=_URL, api_key=_KEY)]
+
+    assert result == [{"id": 7, "title": "Dark", "tvdbId": 334824}]
+    assert httpx_mock.get_requests()[0].headers["X-Api-Key"] == _KEY
+
+
+@pytest.mark.asyncio
+async def test_iter_sonarr_series_http_error(httpx_mock: HTTPXMock) -> None:
+    """HTTP error while streaming raises SonarrClientError carrying the response body."""
+    httpx_mock.add_response(
+        url=f"{_URL}/api/v3/series", status_code=503, text="Service Unavailable"
+    )
+
+    with pytest.raises(SonarrClientError) as exc_info:
+        [item async for item in iter_sonarr_series(url=_URL, api_key=_KEY)]
+
+    assert exc_info.value.code == SonarrErrorCode.FETCH_FAILED
+    assert "Service Unavailable" in exc_info.value.message
+
+
+@pytest.mark.asyncio
+async def test_iter_sonarr_series_malformed_body(httpx_mock: HTTPXMock) -> None:
+    """A truncated body raises SonarrClientError with INTERNAL_ERROR."""
+    httpx_mock.add_response(url=f"{_URL}/api/v3/series", text='[{"id": 1}, {"id"')
+
+    with pytest.raises(SonarrClientError) as exc_info:
+        [item async for item in iter_sonarr_series(url=_URL, api_key=_KEY)]
+
+    assert exc_info.value.code == SonarrErrorCode.INTERNAL_ERROR
+
+
+@pytest.mark.asyncio
+async def test_iter_sonarr_series_retries_transient_network_error(httpx_mock: HTTPXMock) -> None:
+    """A single connection error no longer aborts the import: the GET is retried."""
+    httpx_mock.add_exception(httpx.ConnectError("Connection reset"), url=f"{_URL}/api/v3/series")
+    httpx_mock.add_response(url=f"{_URL}/api/v3/series", json=[{"id": 1, "title": "Show"}])
+
+    items = [item async for item in iter_sonarr_series(url=_URL, api_key=_KEY)]
+
+    assert items == [{"id": 1, "title": "Show"}]
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_sonarr_series_fails_fast_when_circuit_open(httpx_mock: HTTPXMock) -> None:
+    """Once Sonarr keeps failing, further calls fail at once with NETWORK_ERROR."""
+    httpx_mock.add_exception(httpx.ConnectTimeout("timed out"), url=f"{_URL}/api/v3/series")
+
+    for _ in range(2):
+        with pytest.raises(SonarrClientError):
+            await fetch_sonarr_series(url=_URL, api_key=_KEY)
+    requests_before = len(httpx_mock.get_requests())
+
+    with pytest.raises(SonarrClientError) as exc_info:
+        await fetch_sonarr_series(url=_URL, api_key=_KEY)
+
+    assert exc_info.value.code == SonarrErrorCode.NETWORK_ERROR
+    assert len(httpx_mock.get_requests()) == requests_before
+
+
+@pytest.mark.asyncio
+async def test_fetch_sonarr_series_item_returns_single_series(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(url=f"{_URL}/api/v3/series/7", json={"id": 7, "title": "Dark"})
+
+    result = await fetch_sonarr_series_item(url=_URL, api_key=_KEY, series_id=7)
+
+    assert result == {"id": 7, "title": "Dark"}
+
+
+@pytest.mark.asyncio
+async def test_fetch_sonarr_series_item_not_found_returns_none(httpx_mock: HTTPXMock) -> None:
+    """Сериал удалён из Sonarr — None вместо ошибки."""
+    httpx_mock.add_response(url=f"{_URL}/api/v3/series/7", status_code=404)
+
+    assert await fetch_sonarr_series_item(url=_URL, api_key=_KEY, series_id=7) is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_sonarr_series_item_http_error(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(url=f"{_URL}/api/v3/series/7", status_code=401, text="Unauthorized")
+
+    with pytest.raises(SonarrClientError) as exc_info:
+        await fetch_sonarr_series_item(url=_URL, api_key=_KEY, series_id=7)
+
+    assert exc_info.value.code == SonarrErrorCode.FETCH_FAILED
@@ -1,33 +1,51 @@
-"""Unit tests for fetch_tmdb_movie in app.client.tmdb_bridge_client."""
+"""Unit tests for fetch_tmdb_movie / fetch_tmdb_series in app.client.tmdb_bridge_client."""
 
 from unittest.mock import AsyncMock, Mock
 
 import httpx
 import pytest
 
-from app.client.tmdb_bridge_client import TmdbBridgeClientError, fetch_tmdb_movie
+from app.client.tmdb_bridge_client import (
+    BridgeValidators,
+    TmdbBridgeClientError,
+    fetch_tmdb_movie,
+    fetch_tmdb_series,
+)
 from app.schemas.error_codes import TmdbBridgeErrorCode
 
 _TMDB_ID = "123"
 _MOVIE_URL = "https://bridge.mediatrackr.org/tmdb/movie/123"
+_SERIES_URL = "https://bridge.mediatrackr.org/tmdb/tv/456"
+
+
+def _ok_response(body: dict, headers: dict | None = None) -> Mock:
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = body
+    response.headers = httpx.Headers(headers or {})
+    response.raise_for_status = Mock()
+    return response
 
 
 @pytest.mark.asyncio
 async def test_fetch_tmdb_movie_200() -> None:
-    """200 OK — returns parsed dict."""
+    """200 OK — returns parsed dict with validators and body digest."""
     body = {"tmdb_id": "123", "title": "Test Movie"}
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = body
-    mock_response.raise_for_status = Mock()
-
     mock_client = AsyncMock()
-    mock_client.get.return_value = mock_response
+    mock_client.get.return_value = _ok_response(
+        body, {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+    )
 
     result = await fetch_tmdb_movie(_TMDB_ID, client=mock_client)
 
-    assert result == body
-    mock_client.get.assert_called_once_with(_MOVIE_URL, timeout=15.0)
+    assert result is not None
+    assert result.data == body
+    assert result.url == _MOVIE_URL
+    assert result.validators == BridgeValidators(
+        etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT"
+    )
+    assert result.digest is not None
+    mock_client.get.assert_called_once_with(_MOVIE_URL, headers=None, timeout=15.0)
 
 
 @pytest.mark.asyncio
@@ -88,3 +106,99 @@ async def test_fetch_tmdb_movie_429_raises_rate_limit() -> None:
         await fetch_tmdb_movie(_TMDB_ID, client=mock_client)
 
     assert exc_info.value.code == TmdbBridgeErrorCode.RATE_LIMIT_ERROR
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("retry_after", "expected"),
+    [("7", 7.0), ("Wed, 01 Jan 2020 00:00:00 GMT", 0.0), ("soon", None)],
+)
+async def test_fetch_tmdb_movie_429_parses_retry_after(
+    retry_after: str, expected: float | None
+) -> None:
+    """Retry-After (seconds or HTTP date in the past) is exposed on the error."""
+    mock_response = Mock()
+    mock_response.status_code = 429
+    mock_response.headers = httpx.Headers({"Retry-After": retry_after})
+    error = httpx.HTTPStatusError("rate limited", request=Mock(), response=mock_response)
+    mock_response.raise_for_status = Mock(side_effect=error)
+
+    mock_client = AsyncMock()
+    mock_client.get.return_value = mock_response
+
+    with pytest.raises(TmdbBridgeClientError) as exc_info:
+        await fetch_tmdb_movie(_TMDB_ID, client=mock_client)
+
+    assert exc_info.value.code == TmdbBridgeErrorCode.RATE_LIMIT_ERROR
+    assert exc_info.value.retry_after == expected
+
+
+@pytest.mark.asyncio
+async def test_fetch_tmdb_movie_sends_conditional_headers() -> None:
+    """Known validators are sent as If-None-Match / If-Modified-Since."""
+    mock_client = AsyncMock()
+    mock_client.get.return_value = _ok_response({"tmdb_id": "123"})
+    validators = BridgeValidators(etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+    await fetch_tmdb_movie(_TMDB_ID, client=mock_client, validators=validators)
+
+    mock_client.get.assert_called_once_with(
+        _MOVIE_URL,
+        headers={
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+        },
+        timeout=15.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_tmdb_movie_304_not_modified() -> None:
+    """304 — short-circuits without reading the body, keeps the sent validators."""
+    mock_response = Mock()
+    mock_response.status_code = 304
+    mock_client = AsyncMock()
+    mock_client.get.return_value = mock_response
+    validators = BridgeValidators(etag='"v1"')
+
+    result = await fetch_tmdb_movie(_TMDB_ID, client=mock_client, validators=validators)
+
+    assert result is not None
+    assert result.not_modified is True
+    assert result.validators == validators
+    mock_response.json.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_tmdb_movie_digest_ignores_key_order() -> None:
+    """The body digest is computed over canonical JSON, so key order does not matter."""
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = [
+        _ok_response({"tmdb_id": "123", "title": "A"}),
+        _ok_response({"title": "A", "tmdb_id": "123"}),
+        _ok_response({"tmdb_id": "123", "title": "B"}),
+    ]
+
+    first = await fetch_tmdb_movie(_TMDB_ID, client=mock_client)
+    second = await fetch_tmdb_movie(_TMDB_ID, client=mock_client)
+    changed = await fetch_tmdb_movie(_TMDB_ID, client=mock_client)
+
+    assert first is not None and second is not None and changed is not None
+    assert first.digest == second.digest
+    assert first.digest != changed.digest
+
+
+@pytest.mark.asyncio
+async def test_fetch_tmdb_series_200_and_404() -> None:
+    """Series endpoint: 200 returns the payload, 404 returns None."""
+    not_found = Mock()
+    not_found.status_code = 404
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = [_ok_response({"tmdb_id": 456}), not_found]
+
+    found = await fetch_tmdb_series("456", client=mock_client)
+    missing = await fetch_tmdb_series("456", client=mock_client)
+
+    assert found is not None and found.data == {"tmdb_id": 456}
+    assert missing is None
+    assert mock_client.get.call_args_list[0].args == (_SERIES_URL,)
@@ -0,0 +1,267 @@
+"""Unit tests for targeted Radarr/Sonarr imports driven by Connect webhooks."""
+
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.schedule import ServiceType
+from app.services.arr_webhook_service import (
+    ArrWebhookEvent,
+    handle_arr_event,
+    parse_radarr_event,
+    parse_sonarr_event,
+)
+from app.services.movie_utils import MovieIndexes
+from app.services.radarr_service import detach_radarr_movie, import_radarr_movie
+from app.services.series_utils import SeriesIndexes
+from app.services.sonarr_service import import_sonarr_series_item
+from tests.factories import MovieFactory, SeriesFactory
+
+_RADARR_CONFIG = ("http://radarr:7878", "test-api-key")
+_SONARR_CONFIG = ("http://sonarr:8989", "test-api-key")
+
+
+# --- parsing ---
+
+
+@pytest.mark.parametrize(
+    ("event_type", "delete"),
+    [("MovieAdded", False), ("Download", False), ("Rename", False), ("MovieDelete", True)],
+)
+def test_parse_radarr_event(event_type: str, delete: bool) -> None:
+    event = parse_radarr_event({"eventType": event_type, "movie": {"id": 5, "title": "Dune"}})
+
+    assert event == ArrWebhookEvent(ServiceType.RADARR, event_type, 5, delete=delete)
+
+
+@pytest.mark.parametrize(
+    ("event_type", "delete"),
+    [("SeriesAdd", False), ("Download", False), ("Rename", False), ("SeriesDelete", True)],
+)
+def test_parse_sonarr_event(event_type: str, delete: bool) -> None:
+    event = parse_sonarr_event({"eventType": event_type, "series": {"id": 9}})
+
+    assert event == ArrWebhookEvent(ServiceType.SONARR, event_type, 9, delete=delete)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"eventType": "Test", "movie": {"id": 1}},
+        {"eventType": "Grab", "movie": {"id": 1}},
+        {"eventType": "MovieAdded"},
+        {"eventType": "MovieAdded", "movie": {"id": "1"}},
+    ],
+)
+def test_parse_radarr_event_ignores_irrelevant(payload: dict[str, Any]) -> None:
+    assert parse_radarr_event(payload) is None
+
+
+# --- dispatch ---
+
+
+def _factory(session: AsyncMock) -> Any:
+    @asynccontextmanager
+    async def factory() -> AsyncGenerator[AsyncMock, None]:
+        yield session
+
+    return factory
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("event", "target"),
+    [
+        (ArrWebhookEvent(ServiceType.RADARR, "MovieAdded", 1), "import_radarr_movie"),
+        (ArrWebhookEvent(ServiceType.RADARR, "MovieDelete", 1, True), "detach_radarr_movie"),
+        (ArrWebhookEvent(ServiceType.SONARR, "SeriesAdd", 1), "import_sonarr_series_item"),
+        (ArrWebhookEvent(ServiceType.SONARR, "SeriesDelete", 1, True), "detach_sonarr_series"),
+    ],
+)
+async def test_handle_arr_event_dispatches(
+    mock_session: AsyncMock, event: ArrWebhookEvent, target: str
+) -> None:
+    with patch(f"app.services.arr_webhook_service.{target}", new_callable=AsyncMock) as handler:
+        await handle_arr_event(event, _factory(mock_session))
+
+    handler.assert_awaited_once_with(mock_session, 1)
+
+
+@pytest.mark.asyncio
+async def test_handle_arr_event_swallows_errors(mock_session: AsyncMock) -> None:
+    """Ошибка фоновой обработки логируется, ответ вебхуку уже отправлен."""
+    event = ArrWebhookEvent(ServiceType.RADARR, "Download", 1)
+    with patch(
+        "app.services.arr_webhook_service.import_radarr_movie",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("radarr down"),
+    ):
+        await handle_arr_event(event, _factory(mock_session))
+
+
+# --- targeted imports ---
+
+
+@pytest.mark.asyncio
+async def test_import_radarr_movie_creates_single_movie(mock_session: AsyncMock) -> None:
+    movie_data = {"id": 42, "title": "Dune", "tmdbId": 438631, "status": "released"}
+    with (
+        patch(
+            "app.services.radarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=_RADARR_CONFIG,
+        ),
+        patch(
+            "app.services.radarr_service.fetch_radarr_movie",
+            new_callable=AsyncMock,
+            return_value=movie_data,
+        ) as mock_fetch,
+        patch(
+            "app.services.radarr_service.load_movie_indexes",
+            new_callable=AsyncMock,
+            return_value=MovieIndexes(),
+        ),
+    ):
+        result = await import_radarr_movie(mock_session, 42)
+
+    mock_fetch.assert_awaited_once_with(*_RADARR_CONFIG, 42)
+    assert result.imported_count == 1
+    assert result.updated_count == 0
+    assert mock_session.add.call_count == 2  # Media + Movie
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_import_radarr_movie_updates_existing(mock_session: AsyncMock) -> None:
+    existing = MovieFactory.build(id=1, radarr_id=42, tmdb_id="438631", status=None)
+    movie_data = {"id": 42, "title": existing.media.title, "status": "released"}
+    indexes = MovieIndexes()
+    indexes.add(existing)
+    with (
+        patch(
+            "app.services.radarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=_RADARR_CONFIG,
+        ),
+        patch(
+            "app.services.radarr_service.fetch_radarr_movie",
+            new_callable=AsyncMock,
+            return_value=movie_data,
+        ),
+        patch(
+            "app.services.radarr_service.load_movie_indexes",
+            new_callable=AsyncMock,
+            return_value=indexes,
+        ),
+    ):
+        result = await import_radarr_movie(mock_session, 42)
+
+    assert result.updated_count == 1
+    mock_session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_import_radarr_movie_gone_from_radarr(mock_session: AsyncMock) -> None:
+    with (
+        patch(
+            "app.services.radarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=_RADARR_CONFIG,
+        ),
+        patch(
+            "app.services.radarr_service.fetch_radarr_movie",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+    ):
+        result = await import_radarr_movie(mock_session, 42)
+
+    assert result.imported_count == 0
+    mock_session.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_detach_radarr_movie_keeps_movie(mock_session: AsyncMock) -> None:
+    movie = MovieFactory.build(id=1, radarr_id=42)
+    with patch(
+        "app.services.radarr_service.find_movie_by_radarr_id",
+        new_callable=AsyncMock,
+        return_value=movie,
+    ):
+        assert await detach_radarr_movie(mock_session, 42) is True
+
+    assert movie.radarr_id is None
+    mock_session.delete.assert_not_called()
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_import_sonarr_series_item_processes_one_series(mock_session: AsyncMock) -> None:
+    raw = {"id": 9, "title": "Dark", "tvdbId": 334824, "seasons": [{"seasonNumber": 1}]}
+    episodes = [{"id": 100, "seasonNumber": 1, "episodeNumber": 1, "title": "Secrets"}]
+    indexes = SeriesIndexes()
+    series = SeriesFactory.build(id=1, sonarr_id=9)
+    with (
+        patch(
+            "app.services.sonarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=_SONARR_CONFIG,
+        ),
+        patch(
+            "app.services.sonarr_service.fetch_sonarr_series_item",
+            new_callable=AsyncMock,
+            return_value=raw,
+        ),
+        patch(
+            "app.services.sonarr_service.fetch_sonarr_episodes",
+            new_callable=AsyncMock,
+            return_value=episodes,
+        ) as mock_episodes,
+        patch(
+            "app.services.sonarr_service.load_series_indexes",
+            new_callable=AsyncMock,
+            return_value=indexes,
+        ) as mock_load_indexes,
+        patch(
+            "app.services.sonarr_service._upsert_sonarr_series",
+            new_callable=AsyncMock,
+            return_value=(series, 1, 0),
+        ) as mock_upsert,
+        patch(
+            "app.services.sonarr_service._process_seasons_and_episodes",
+            new_callable=AsyncMock,
+            return_value=(1, 0),
+        ) as mock_episodes_writer,
+    ):
+        result = await import_sonarr_series_item(mock_session, 9)
+
+    mock_episodes.assert_awaited_once_with(*_SONARR_CONFIG, 9)
+    assert mock_load_indexes.await_args.kwargs["sonarr_ids"] == [9]
+    mock_upsert.assert_awaited_once_with(mock_session, raw, indexes)
+    mock_episodes_writer.assert_awaited_once_with(mock_session, [(series, raw, episodes)])
+    assert result.new_series == 1
+    assert result.new_episodes == 1
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_import_sonarr_series_item_rolls_back_on_error(mock_session: AsyncMock) -> None:
+    with (
+        patch(
+            "app.services.sonarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=_SONARR_CONFIG,
+        ),
+        patch(
+            "app.services.sonarr_service.fetch_sonarr_series_item",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("boom"),
+        ),
+        pytest.raises(RuntimeError),
+    ):
+        await import_sonarr_series_item(mock_session, 9)
+
+    mock_session.rollback.assert_awaited_once()
@@ -8,6 +8,7 @@ from app.services.import_jellyfin_movies_service import import_jellyfin_movies
 from app.services.radarr_service import import_radarr_movies
 from app.services.sonarr_service import import_sonarr_series
 from tests.factories import JellyfinMovieDictFactory, RadarrMovieDictFactory, SeriesDictFactory
+from tests.utils.async_iter import AsyncIterMock
 
 
 @pytest.mark.asyncio
@@ -24,7 +25,7 @@ async def test_import_radarr_movie_with_empty_title(mock_session):
             return_value=("http://radarr:7878", "test-api-key"),
         ),
         patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
+            "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
         ) as mock_fetch,
     ):
         mock_fetch.return_value = movies_data
@@ -54,7 +55,7 @@ async def test_import_radarr_movie_with_very_long_title(mock_session):
             return_value=("http://radarr:7878", "test-api-key"),
         ),
         patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
+            "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
         ) as mock_fetch,
     ):
         mock_fetch.return_value = movies_data
@@ -84,7 +85,7 @@ async def test_import_radarr_movie_with_unicode_and_emoji(mock_session):
             return_value=("http://radarr:7878", "test-api-key"),
         ),
         patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
+            "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
         ) as mock_fetch,
     ):
         mock_fetch.return_value = movies_data
@@ -114,7 +115,7 @@ async def test_import_radarr_movie_with_zero_year(mock_session):
             return_value=("http://radarr:7878", "test-api-key"),
         ),
         patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
+            "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
         ) as mock_fetch,
     ):
         mock_fetch.return_value = movies_data
@@ -143,7 +144,7 @@ async def test_import_radarr_movie_with_negative_id(mock_session):
             return_value=("http://radarr:7878", "test-api-key"),
         ),
         patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
+            "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
         ) as mock_fetch,
     ):
         mock_fetch.return_value = movies_data
@@ -172,7 +173,7 @@ async def test_import_sonarr_series_with_empty_title_skipped(mock_session):
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -205,7 +206,7 @@ async def test_import_sonarr_series_with_unicode_title(mock_session):
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -238,7 +239,7 @@ async def test_import_sonarr_series_with_very_long_title(mock_session):
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -271,7 +272,7 @@ async def test_import_sonarr_series_with_empty_overview(mock_session):
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -310,8 +311,9 @@ async def test_jellyfin_movie_with_empty_name(mock_session):
     ):
         mock_fetch.return_value = jellyfin_movies
 
+        # No known movies, then INSERT INTO media ... RETURNING id of the new one
         mock_session.execute.return_value = Mock(
-            scalar_one_or_none=Mock(return_value=None), scalars=Mock(return_value=[])
+            scalar_one_or_none=Mock(return_value=None), scalars=Mock(side_effect=[[], [1]])
         )
 
         result = await import_jellyfin_movies(mock_session)
@@ -343,8 +345,9 @@ async def test_jellyfin_movie_with_unicode_name(mock_session):
     ):
         mock_fetch.return_value = jellyfin_movies
 
+        # No known movies, then INSERT INTO media ... RETURNING id of the new one
         mock_session.execute.return_value = Mock(
-            scalar_one_or_none=Mock(return_value=None), scalars=Mock(return_value=[])
+            scalar_one_or_none=Mock(return_value=None), scalars=Mock(side_effect=[[], [1]])
         )
 
         result = await import_jellyfin_movies(mock_session)
@@ -376,8 +379,9 @@ async def test_jellyfin_movie_with_very_long_name(mock_session):
     ):
         mock_fetch.return_value = jellyfin_movies
 
+        # No known movies, then INSERT INTO media ... RETURNING id of the new one
         mock_session.execute.return_value = Mock(
-            scalar_one_or_none=Mock(return_value=None), scalars=Mock(return_value=[])
+            scalar_one_or_none=Mock(return_value=None), scalars=Mock(side_effect=[[], [1]])
         )
 
         result = await import_jellyfin_movies(mock_session)
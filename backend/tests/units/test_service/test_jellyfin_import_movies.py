@@ -1,24 +1,16 @@
-from unittest.mock import AsyncMock, patch
+from collections.abc import Generator
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from app.models.media import Media, Movie
+from app.services import import_jellyfin_movies_service
 from app.services.import_jellyfin_movies_service import import_jellyfin_movies
+from app.services.movie_utils import MovieIndexes
 
 
-@pytest.mark.asyncio
-async def test_import_jellyfin_movies_creates_new_movies(mock_session):
-    """Создаёт Media + Movie для каждого фильма."""
-    from tests.factories import JellyfinMovieDictFactory
-
-    movies = [
-        JellyfinMovieDictFactory.build(
-            Id="jf1", Name="Inception", ProviderIds={"Tmdb": "27205", "Imdb": "tt1375666"}
-        ),
-        JellyfinMovieDictFactory.build(
-            Id="jf2", Name="Matrix", ProviderIds={"Tmdb": "603", "Imdb": "tt0133093"}
-        ),
-    ]
-
+@pytest.fixture
+def mock_fetch() -> Generator[AsyncMock, None, None]:
     with (
         patch(
             "app.services.import_jellyfin_movies_service.get_decrypted_config",
@@ -29,213 +21,246 @@ async def test_import_jellyfin_movies_creates_new_movies(mock_session):
             "app.services.import_jellyfin_movies_service.fetch_jellyfin_movies",
             new_callable=AsyncMock,
         ) as mock_fetch,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_external_ids",
-            new_callable=AsyncMock,
-        ) as mock_find_external,
     ):
-        mock_fetch.return_value = movies
-        mock_find_jf.return_value = None
-        mock_find_external.return_value = None
+        yield mock_fetch
+
+
+@pytest.fixture
+def mock_load_indexes() -> Generator[AsyncMock, None, None]:
+    """По умолчанию в БД нет ни одного фильма; возвращает переданные индексы (into)."""
+
+    async def _load(session, **kwargs):
+        return kwargs.get("into") or MovieIndexes()
+
+    with patch(
+        "app.services.import_jellyfin_movies_service.load_movie_indexes",
+        new_callable=AsyncMock,
+        side_effect=_load,
+    ) as mock_load:
+        yield mock_load
 
-        result = await import_jellyfin_movies(mock_session)
 
-        assert result.imported_count == 2
-        assert result.updated_count == 0
+def _returning_ids(mock_session, ids: list[int]) -> None:
+    """INSERT INTO media ... RETURNING id отдаёт ids по порядку."""
+    mock_session.execute.return_value = Mock(scalars=Mock(return_value=iter(ids)))
 
-        # Media + Movie per film
-        assert mock_session.add.call_count == 4
-        assert mock_session.flush.call_count == 2
-        mock_session.commit.assert_called_once()
-        mock_session.rollback.assert_not_called()
+
+def _inserted_rows(mock_session, model: type) -> list[dict]:
+    for call in mock_session.execute.await_args_list:
+        statement, *params = call.args
+        if statement.table.name == model.__tablename__:
+            return params[0]
+    return []
 
 
 @pytest.mark.asyncio
-async def test_import_jellyfin_movie_updates_existing_by_jellyfin_id(
-    mock_session,
-    existing_movie_without_ids,
+async def test_import_jellyfin_movies_creates_new_movies(
+    mock_session, mock_fetch, mock_load_indexes
 ):
-    """Обновляет существующий фильм, найденный по jellyfin_id."""
+    """Создаёт Media + Movie для каждого фильма пакетными INSERT без flush на каждую строку."""
     from tests.factories import JellyfinMovieDictFactory
 
-    movie_data = JellyfinMovieDictFactory.build(
-        Id="jf123", Name="Inception", ProviderIds={"Tmdb": "27205", "Imdb": "tt1375666"}
-    )
-
-    with (
-        patch(
-            "app.services.import_jellyfin_movies_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://jellyfin:8096", "test-api-key"),
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(
+            Id="jf1", Name="Inception", ProviderIds={"Tmdb": "27205", "Imdb": "tt1375666"}
         ),
-        patch(
-            "app.services.import_jellyfin_movies_service.fetch_jellyfin_movies",
-            new_callable=AsyncMock,
-        ) as mock_fetch,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_external_ids",
-            new_callable=AsyncMock,
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [movie_data]
-        mock_find_jf.return_value = existing_movie_without_ids
-        mock_find_external.return_value = None
+        JellyfinMovieDictFactory.build(
+            Id="jf2", Name="Matrix", ProviderIds={"Tmdb": "603", "Imdb": "tt0133093"}
+        ),
+    ]
+    _returning_ids(mock_session, [11, 12])
+
+    result = await import_jellyfin_movies(mock_session)
 
-        result = await import_jellyfin_movies(mock_session)
+    assert result.imported_count == 2
+    assert result.updated_count == 0
 
-        assert result.imported_count == 0
-        assert result.updated_count == 1
-        mock_session.commit.assert_called_once()
+    # One multi-row INSERT for media, one for movies
+    assert mock_session.execute.await_count == 2
+    assert [r["title"] for r in _inserted_rows(mock_session, Media)] == ["Inception", "Matrix"]
+    movie_rows = _inserted_rows(mock_session, Movie)
+    assert [(r["id"], r["jellyfin_id"], r["tmdb_id"]) for r in movie_rows] == [
+        (11, "jf1", "27205"),
+        (12, "jf2", "603"),
+    ]
+    mock_session.add.assert_not_called()
+    mock_session.flush.assert_not_called()
+    mock_session.commit.assert_called_once()
+    mock_session.rollback.assert_not_called()
+
+    mock_load_indexes.assert_awaited_once()
+    kwargs = mock_load_indexes.await_args.kwargs
+    assert kwargs["jellyfin_ids"] == ["jf1", "jf2"]
+    assert kwargs["tmdb_ids"] == ["27205", "603"]
+    assert kwargs["imdb_ids"] == ["tt1375666", "tt0133093"]
 
 
 @pytest.mark.asyncio
-async def test_import_jellyfin_movie_updates_by_external_ids(mock_session):
-    """Test updating existing movie found by external IDs."""
-    from tests.factories import JellyfinMovieDictFactory, MovieFactory
+async def test_import_jellyfin_movies_loads_indexes_in_chunks(
+    mock_session, mock_fetch, mock_load_indexes, monkeypatch
+):
+    """Идентификаторы загружаются ограниченными по размеру IN-запросами в общий индекс."""
+    from tests.factories import JellyfinMovieDictFactory
 
-    # Create existing movie in DB
-    existing_movie = MovieFactory.build(
-        id=1, radarr_id=None, tmdb_id="27205", imdb_id=None, media__title="Inception"
-    )
-    mock_session.add(existing_movie.media)
+    monkeypatch.setattr(import_jellyfin_movies_service, "RESOLVE_BATCH_SIZE", 2)
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id=f"jf{i}", ProviderIds={}) for i in range(5)
+    ]
+    _returning_ids(mock_session, list(range(5)))
 
-    movie_data = JellyfinMovieDictFactory.build(
-        Id="jf999", Name="Inception", ProviderIds={"Tmdb": "27205"}
-    )
+    result = await import_jellyfin_movies(mock_session)
 
-    with (
-        patch(
-            "app.services.import_jellyfin_movies_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://jellyfin:8096", "test-api-key"),
+    assert result.imported_count == 5
+    calls = mock_load_indexes.await_args_list
+    assert [c.kwargs["jellyfin_ids"] for c in calls] == [["jf0", "jf1"], ["jf2", "jf3"], ["jf4"]]
+    assert len({id(c.kwargs["into"]) for c in calls}) == 1
+
+
+@pytest.mark.asyncio
+async def test_import_jellyfin_movies_duplicate_tmdb_creates_one_movie(
+    mock_session, mock_fetch, mock_load_indexes
+):
+    """Две записи Jellyfin с одним tmdb_id — один новый фильм, вторая его дополняет."""
+    from tests.factories import JellyfinMovieDictFactory
+
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id="jf1", Name="Dune", ProviderIds={"Tmdb": "438631"}),
+        JellyfinMovieDictFactory.build(
+            Id="jf2", Name="Dune", ProviderIds={"Tmdb": "438631", "Imdb": "tt1160419"}
         ),
-        patch(
-            "app.services.import_jellyfin_movies_service.fetch_jellyfin_movies",
-            new_callable=AsyncMock,
-        ) as mock_fetch,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_external_ids",
-            new_callable=AsyncMock,
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [movie_data]
-        mock_find_jf.return_value = None
-        mock_find_external.return_value = existing_movie
+    ]
+    _returning_ids(mock_session, [7])
 
-        result = await import_jellyfin_movies(mock_session)
+    result = await import_jellyfin_movies(mock_session)
 
-        assert result.imported_count == 0
-        assert result.updated_count == 1
+    assert result.imported_count == 1
+    assert result.updated_count == 1
+    (row,) = _inserted_rows(mock_session, Movie)
+    assert (row["jellyfin_id"], row["tmdb_id"], row["imdb_id"]) == ("jf1", "438631", "tt1160419")
 
 
 @pytest.mark.asyncio
-async def test_import_jellyfin_movie_without_any_ids_skipped(mock_session):
+async def test_import_jellyfin_movie_updates_existing_by_jellyfin_id(
+    mock_session, mock_fetch, mock_load_indexes, existing_movie_without_ids
+):
+    """Обновляет существующий фильм, найденный по jellyfin_id."""
     from tests.factories import JellyfinMovieDictFactory
 
-    movie_data = JellyfinMovieDictFactory.build(Id=None, Name="Unknown Movie", ProviderIds={})
+    indexes = MovieIndexes()
+    indexes.by_jellyfin_id["jf123"] = existing_movie_without_ids
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = indexes
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(
+            Id="jf123", Name="Inception", ProviderIds={"Tmdb": "27205", "Imdb": "tt1375666"}
+        )
+    ]
 
-    with (
-        patch(
-            "app.services.import_jellyfin_movies_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://jellyfin:8096", "test-api-key"),
-        ),
-        patch(
-            "app.services.import_jellyfin_movies_service.fetch_jellyfin_movies",
-            new_callable=AsyncMock,
-        ) as mock_fetch,
-    ):
-        mock_fetch.return_value = [movie_data]
+    result = await import_jellyfin_movies(mock_session)
+
+    assert result.imported_count == 0
+    assert result.updated_count == 1
+    assert existing_movie_without_ids.tmdb_id == "27205"
+    mock_session.execute.assert_not_called()
+    mock_session.commit.assert_called_once()
 
-        result = await import_jellyfin_movies(mock_session)
 
-        assert result.imported_count == 0
-        assert result.updated_count == 0
-        mock_session.add.assert_not_called()
+@pytest.mark.asyncio
+async def test_import_jellyfin_movie_updates_by_external_ids(
+    mock_session, mock_fetch, mock_load_indexes
+):
+    """Test updating existing movie found by external IDs."""
+    from tests.factories import JellyfinMovieDictFactory, MovieFactory
+
+    # Create existing movie in DB
+    existing_movie = MovieFactory.build(
+        id=1,
+        radarr_id=None,
+        jellyfin_id=None,
+        tmdb_id="27205",
+        imdb_id=None,
+        media__title="Inception",
+    )
+    indexes = MovieIndexes()
+    indexes.add(existing_movie)
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = indexes
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id="jf999", Name="Inception", ProviderIds={"Tmdb": "27205"})
+    ]
+
+    result = await import_jellyfin_movies(mock_session)
+
+    assert result.imported_count == 0
+    assert result.updated_count == 1
+    assert existing_movie.jellyfin_id == "jf999"
 
 
 @pytest.mark.asyncio
-async def test_import_jellyfin_movies_flush_failure_rollbacks(mock_session):
+async def test_import_jellyfin_movie_without_any_ids_skipped(mock_session, mock_fetch):
     from tests.factories import JellyfinMovieDictFactory
 
-    movie_data = JellyfinMovieDictFactory.build(Id="jf1", Name="Movie", ProviderIds={"Tmdb": "1"})
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id=None, Name="Unknown Movie", ProviderIds={})
+    ]
 
-    with (
-        patch(
-            "app.services.import_jellyfin_movies_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://jellyfin:8096", "test-api-key"),
-        ),
-        patch(
-            "app.services.import_jellyfin_movies_service.fetch_jellyfin_movies",
-            new_callable=AsyncMock,
-        ) as mock_fetch,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_external_ids",
-            new_callable=AsyncMock,
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [movie_data]
-        mock_find_jf.return_value = None
-        mock_find_external.return_value = None
+    result = await import_jellyfin_movies(mock_session)
 
-        mock_session.flush.side_effect = Exception("Flush failed")
+    assert result.imported_count == 0
+    assert result.updated_count == 0
+    mock_session.add.assert_not_called()
+    mock_session.execute.assert_not_called()
 
-        with pytest.raises(Exception, match="Flush failed"):
-            await import_jellyfin_movies(mock_session)
 
-        mock_session.rollback.assert_called_once()
-        mock_session.commit.assert_not_called()
+@pytest.mark.asyncio
+async def test_import_jellyfin_movies_insert_failure_rollbacks(
+    mock_session, mock_fetch, mock_load_indexes
+):
+    from tests.factories import JellyfinMovieDictFactory
+
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id="jf1", Name="Movie", ProviderIds={"Tmdb": "1"})
+    ]
+    mock_session.execute.side_effect = Exception("Insert failed")
+
+    with pytest.raises(Exception, match="Insert failed"):
+        await import_jellyfin_movies(mock_session)
+
+    mock_session.rollback.assert_called_once()
+    mock_session.commit.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_import_jellyfin_movies_commit_failure(mock_session):
+async def test_import_jellyfin_movies_missing_returned_id_rollbacks(
+    mock_session, mock_fetch, mock_load_indexes
+):
+    """RETURNING вернул меньше id, чем строк: ошибка, а не Movie без id."""
     from tests.factories import JellyfinMovieDictFactory
 
-    movie_data = JellyfinMovieDictFactory.build(Id="jf1", Name="Movie", ProviderIds={"Tmdb": "1"})
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id="jf1", Name="Movie 1", ProviderIds={"Tmdb": "1"}),
+        JellyfinMovieDictFactory.build(Id="jf2", Name="Movie 2", ProviderIds={"Tmdb": "2"}),
+    ]
+    _returning_ids(mock_session, [1])
+
+    with pytest.raises(ValueError, match="zip"):
+        await import_jellyfin_movies(mock_session)
+
+    mock_session.rollback.assert_called_once()
+    assert _inserted_rows(mock_session, Movie) == []
 
-    with (
-        patch(
-            "app.services.import_jellyfin_movies_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://jellyfin:8096", "test-api-key"),
-        ),
-        patch(
-            "app.services.import_jellyfin_movies_service.fetch_jellyfin_movies",
-            new_callable=AsyncMock,
-        ) as mock_fetch,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
-        patch(
-            "app.services.import_jellyfin_movies_service.find_movie_by_external_ids",
-            new_callable=AsyncMock,
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [movie_data]
-        mock_find_jf.return_value = None
-        mock_find_external.return_value = None
 
-        mock_session.commit.side_effect = Exception("Commit failed")
+@pytest.mark.asyncio
+async def test_import_jellyfin_movies_commit_failure(mock_session, mock_fetch, mock_load_indexes):
+    from tests.factories import JellyfinMovieDictFactory
+
+    mock_fetch.return_value = [
+        JellyfinMovieDictFactory.build(Id="jf1", Name="Movie", ProviderIds={"Tmdb": "1"})
+    ]
+    _returning_ids(mock_session, [1])
+    mock_session.commit.side_effect = Exception("Commit failed")
 
-        with pytest.raises(Exception, match="Commit failed"):
-            await import_jellyfin_movies(mock_session)
+    with pytest.raises(Exception, match="Commit failed"):
+        await import_jellyfin_movies(mock_session)
 
-        mock_session.rollback.assert_called_once()
+    mock_session.rollback.assert_called_once()
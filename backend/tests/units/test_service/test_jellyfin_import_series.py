@@ -1,9 +1,27 @@
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from app.models.schedule import SyncJobType
 from app.schemas.jellyfin import JellyfinImportSeriesResponse
-from app.services.import_jellyfin_series_service import import_jellyfin_series
+from app.services.import_jellyfin_series_service import (
+    _fetch_episodes_by_series,
+    import_jellyfin_series,
+)
+from app.services.series_utils import SeriesIndexes
+from app.services.sync_watermark_repository import SyncWindow
+from tests.factories import MediaFactory, SeriesFactory
+
+
+def _iter_pages(*pages):
+    """Подменяет постраничный итератор Jellyfin: отдаёт заданные страницы."""
+
+    async def _iter(*args, **kwargs):
+        for page in pages:
+            yield page
+
+    return _iter
 
 
 @pytest.mark.asyncio
@@ -35,17 +53,17 @@ async def test_import_jellyfin_series_creates_new_series(mock_session):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
+            "app.services.import_jellyfin_series_service._fetch_episodes_by_series",
             new_callable=AsyncMock,
-        ) as mock_fetch,
+            return_value={},
+        ),
         patch(
-            "app.services.import_jellyfin_series_service._find_series_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
+            "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        ) as mock_fetch,
         patch(
-            "app.services.import_jellyfin_series_service.find_series_by_external_ids",
+            "app.services.import_jellyfin_series_service.load_series_indexes",
             new_callable=AsyncMock,
-        ) as mock_find_external,
+        ) as mock_load_indexes,
         patch(
             "app.services.import_jellyfin_series_service.create_new_series",
             new_callable=AsyncMock,
@@ -55,9 +73,8 @@ async def test_import_jellyfin_series_creates_new_series(mock_session):
             new_callable=AsyncMock,
         ) as mock_process,
     ):
-        mock_fetch.return_value = series_data
-        mock_find_jf.return_value = None
-        mock_find_external.return_value = None
+        mock_fetch.side_effect = _iter_pages(series_data)
+        mock_load_indexes.return_value = SeriesIndexes()
         mock_create.return_value = fake_series
         mock_process.return_value = (0, 0)
 
@@ -72,7 +89,15 @@ async def test_import_jellyfin_series_creates_new_series(mock_session):
 
         mock_create.assert_awaited_once()
         mock_process.assert_awaited_once()
-        mock_session.commit.assert_called_once()
+        mock_load_indexes.assert_awaited_once_with(
+            mock_session,
+            jellyfin_ids=["jf-series-1"],
+            tvdb_ids=["81189"],
+            imdb_ids=["tt0903747"],
+            tmdb_ids=["1396"],
+        )
+        # страница + фиксация водяного знака
+        assert mock_session.commit.await_count == 2
         mock_session.rollback.assert_not_called()
 
 
@@ -100,29 +125,226 @@ async def test_import_jellyfin_series_updates_existing_by_jellyfin_id(
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.import_jellyfin_series_service.fetch_jellyfin_series",
+            "app.services.import_jellyfin_series_service._fetch_episodes_by_series",
             new_callable=AsyncMock,
-        ) as mock_fetch,
+            return_value={},
+        ),
         patch(
-            "app.services.import_jellyfin_series_service._find_series_by_jellyfin_id",
-            new_callable=AsyncMock,
-        ) as mock_find_jf,
+            "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+        ) as mock_fetch,
         patch(
-            "app.services.import_jellyfin_series_service.find_series_by_external_ids",
+            "app.services.import_jellyfin_series_service.load_series_indexes",
             new_callable=AsyncMock,
-        ) as mock_find_external,
+        ) as mock_load_indexes,
         patch(
             "app.services.import_jellyfin_series_service._process_seasons_and_episodes",
             new_callable=AsyncMock,
         ) as mock_process,
     ):
-        mock_fetch.return_value = series_data
-        mock_find_jf.return_value = existing_series_without_ids
-        mock_find_external.return_value = None
+        mock_fetch.side_effect = _iter_pages(series_data)
+        indexes = SeriesIndexes()
+        indexes.by_jellyfin_id["jf-123"] = existing_series_without_ids
+        mock_load_indexes.return_value = indexes
         mock_process.return_value = (0, 0)
 
         result = await import_jellyfin_series(mock_session)
 
         assert result.new_series == 0
         assert result.updated_series == 1
-        mock_session.commit.assert_called_once()
+        # страница + фиксация водяного знака
+        assert mock_session.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_import_jellyfin_series_commits_each_page(mock_session):
+    """Каждая страница сериалов коммитится отдельно"""
+    pages = [[{"Id": f"jf-{i}", "Name": f"Series {i}", "ProviderIds": {}}] for i in range(3)]
+
+    with (
+        patch(
+            "app.services.import_jellyfin_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service._fetch_episodes_by_series",
+            new_callable=AsyncMock,
+            return_value={},
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+            side_effect=_iter_pages(*pages),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service.load_series_indexes",
+            new_callable=AsyncMock,
+            side_effect=lambda *args, **kwargs: SeriesIndexes(),
+        ) as mock_load_indexes,
+        patch(
+            "app.services.import_jellyfin_series_service.create_new_series",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service._process_seasons_and_episodes",
+            new_callable=AsyncMock,
+            return_value=(0, 0),
+        ),
+    ):
+        result = await import_jellyfin_series(mock_session)
+
+    assert result.new_series == 3
+    # по коммиту на страницу + фиксация водяного знака
+    assert mock_session.commit.await_count == 4
+    # один поиск известных сериалов на страницу
+    assert mock_load_indexes.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_episodes_by_series_groups_pages_by_series_id():
+    """Эпизоды всех страниц группируются по SeriesId, лишние поля отбрасываются"""
+    pages = [
+        [
+            {"Id": "e1", "SeriesId": "s1", "IndexNumber": 1, "UserData": {"Played": True}},
+            {"Id": "e2", "SeriesId": "s2", "IndexNumber": 1},
+        ],
+        [
+            {"Id": "e3", "SeriesId": "s1", "IndexNumber": 2},
+            {"Id": "orphan", "SeriesId": None, "IndexNumber": 1},
+        ],
+    ]
+
+    with patch(
+        "app.services.import_jellyfin_series_service.iter_jellyfin_library_episodes",
+        side_effect=_iter_pages(*pages),
+    ) as mock_iter:
+        result = await _fetch_episodes_by_series("http://jellyfin:8096", "test-api-key")
+
+    mock_iter.assert_called_once_with(
+        "http://jellyfin:8096", "test-api-key", min_date_last_saved=None
+    )
+    assert [ep["Id"] for ep in result["s1"]] == ["e1", "e3"]
+    assert [ep["Id"] for ep in result["s2"]] == ["e2"]
+    assert set(result) == {"s1", "s2"}
+    assert "UserData" not in result["s1"][0]
+    assert "SeriesId" not in result["s1"][0]
+
+
+@pytest.mark.asyncio
+async def test_import_jellyfin_series_passes_grouped_episodes(mock_session):
+    """Каждый сериал получает свои эпизоды из общей выборки, без запроса на сериал;
+    сезоны и эпизоды страницы пишутся одним вызовом"""
+    series_page = [
+        {"Id": "jf-1", "Name": "First", "ProviderIds": {}},
+        {"Id": "jf-2", "Name": "Second", "ProviderIds": {}},
+    ]
+    episodes_by_series = {"jf-1": [{"Id": "e1"}, {"Id": "e2"}]}
+    created = [SeriesFactory.build(jellyfin_id="jf-1"), SeriesFactory.build(jellyfin_id="jf-2")]
+
+    with (
+        patch(
+            "app.services.import_jellyfin_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service._fetch_episodes_by_series",
+            new_callable=AsyncMock,
+            return_value=episodes_by_series,
+        ) as mock_fetch_episodes,
+        patch(
+            "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+            side_effect=_iter_pages(series_page),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service.load_series_indexes",
+            new_callable=AsyncMock,
+            side_effect=lambda *args, **kwargs: SeriesIndexes(),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service.create_new_series",
+            new_callable=AsyncMock,
+            side_effect=created,
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service._process_seasons_and_episodes",
+            new_callable=AsyncMock,
+            return_value=(0, 0),
+        ) as mock_process,
+    ):
+        await import_jellyfin_series(mock_session)
+
+    mock_fetch_episodes.assert_awaited_once()
+    mock_process.assert_awaited_once_with(
+        mock_session, [(created[0], [{"Id": "e1"}, {"Id": "e2"}]), (created[1], [])]
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_jellyfin_series_incremental_run(mock_session, full_sync_window):
+    """Инкрементальный прогон: запросы с MinDateLastSaved, эпизоды неизменённых сериалов
+    применяются отдельно, водяной знак фиксируется после всех страниц"""
+    since = datetime(2026, 1, 1, tzinfo=UTC)
+    window = SyncWindow(started_at=datetime(2026, 1, 2, tzinfo=UTC), since=since)
+    full_sync_window.side_effect = None
+    full_sync_window.return_value = window
+    unchanged_series = SeriesFactory.build(jellyfin_id="jf-old", media=MediaFactory.build())
+    mock_session.scalars = AsyncMock(return_value=[unchanged_series])
+
+    with (
+        patch(
+            "app.services.import_jellyfin_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service._fetch_episodes_by_series",
+            new_callable=AsyncMock,
+            return_value={"jf-old": [{"Id": "e-new"}]},
+        ) as mock_fetch_episodes,
+        patch(
+            "app.services.import_jellyfin_series_service.iter_jellyfin_series",
+            side_effect=_iter_pages(),
+        ) as mock_iter,
+        patch(
+            "app.services.import_jellyfin_series_service._process_seasons_and_episodes",
+            new_callable=AsyncMock,
+            return_value=(1, 0),
+        ) as mock_process,
+        patch(
+            "app.services.import_jellyfin_series_service.complete_sync",
+            new_callable=AsyncMock,
+        ) as mock_complete,
+    ):
+        result = await import_jellyfin_series(mock_session)
+
+    mock_fetch_episodes.assert_awaited_once_with("http://jellyfin:8096", "test-api-key", since)
+    assert mock_iter.call_args.kwargs == {"min_date_last_saved": since}
+    mock_process.assert_awaited_once_with(mock_session, [(unchanged_series, [{"Id": "e-new"}])])
+    assert result.new_episodes == 1
+    mock_complete.assert_awaited_once_with(mock_session, SyncJobType.JELLYFIN_SERIES_IMPORT, window)
+
+
+@pytest.mark.asyncio
+async def test_import_jellyfin_series_failure_keeps_watermark(mock_session):
+    """Ошибка посреди импорта не сдвигает водяной знак"""
+    with (
+        patch(
+            "app.services.import_jellyfin_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service._fetch_episodes_by_series",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("Jellyfin down"),
+        ),
+        patch(
+            "app.services.import_jellyfin_series_service.complete_sync",
+            new_callable=AsyncMock,
+        ) as mock_complete,
+        pytest.raises(RuntimeError),
+    ):
+        await import_jellyfin_series(mock_session)
+
+    mock_complete.assert_not_awaited()
+    mock_session.rollback.assert_awaited_once()
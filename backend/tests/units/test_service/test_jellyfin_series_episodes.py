@@ -1,133 +1,128 @@
-from unittest.mock import AsyncMock, patch
+from datetime import UTC, datetime
 
 import pytest
 
 from app.services.import_jellyfin_series_service import _process_seasons_and_episodes
+from tests.factories import SeriesFactory
+from tests.utils.season_episode_writer import FakeSeasonEpisodeWriter
+
+
+@pytest.fixture
+def writer():
+    with FakeSeasonEpisodeWriter().patched("app.services.import_jellyfin_series_service") as fake:
+        yield fake
+
+
+@pytest.fixture
+def series():
+    return SeriesFactory.build(id=1, jellyfin_id="jf-series")
+
+
+def _episode(ep_id, season, number, name, premiere=None, season_id="season1"):
+    return {
+        "Id": ep_id,
+        "ParentIndexNumber": season,
+        "IndexNumber": number,
+        "Name": name,
+        "PremiereDate": premiere,
+        "SeasonId": season_id,
+    }
 
 
 @pytest.mark.asyncio
-async def test_process_seasons_no_episodes(mock_session, series):
+async def test_process_seasons_no_episodes(mock_session, series, writer):
     """нет эпизодов → ничего не делаем"""
-    with patch(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        new_callable=AsyncMock,
-    ) as mock_fetch:
-        mock_fetch.return_value = []
-
-        result = await _process_seasons_and_episodes(
-            mock_session,
-            series,
-            "jf-series",
-            "http://jellyfin:8096",
-            "test-api-key",
-        )
+    result = await _process_seasons_and_episodes(mock_session, [(series, [])])
 
-        assert result == (0, 0)
-        mock_session.add.assert_not_called()
-        mock_session.flush.assert_not_called()
+    assert result == (0, 0)
+    assert writer.season_rows == []
+    assert writer.episode_rows == []
+    mock_session.add.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_process_seasons_creates_season_and_episodes(mock_session, series, empty_scalars):
-    """создаётся 1 сезон и 2 эпизода"""
+async def test_process_seasons_creates_season_and_episodes(mock_session, series, writer):
+    """создаётся 1 сезон и 2 эпизода одним upsert-ом на пачку"""
     episodes = [
-        {
-            "Id": "ep1",
-            "ParentIndexNumber": 1,
-            "IndexNumber": 1,
-            "Name": "Pilot",
-            "PremiereDate": "2020-01-01T00:00:00Z",
-            "SeasonId": "season1",
-        },
-        {
-            "Id": "ep2",
-            "ParentIndexNumber": 1,
-            "IndexNumber": 2,
-            "Name": "Episode 2",
-            "PremiereDate": "2020-01-08T00:00:00Z",
-            "SeasonId": "season1",
-        },
+        _episode("ep2", 1, 2, "Episode 2", "2020-01-08T00:00:00Z"),
+        _episode("ep1", 1, 1, "Pilot", "2020-01-01T00:00:00Z"),
     ]
 
-    with patch(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        new_callable=AsyncMock,
-    ) as mock_fetch:
-        mock_fetch.return_value = episodes
+    new_cnt, upd_cnt = await _process_seasons_and_episodes(mock_session, [(series, episodes)])
 
-        mock_session.scalars.side_effect = [
-            [],  # seasons
-            [],  # episodes
-        ]
+    assert new_cnt == 2
+    assert upd_cnt == 0
 
-        new_cnt, upd_cnt = await _process_seasons_and_episodes(
-            mock_session,
-            series,
-            "jf-series",
-            "http://jellyfin:8096",
-            "test-api-key",
-        )
+    # Release date of the season is the earliest premiere among its episodes
+    assert writer.season_rows == [
+        {
+            "series_id": 1,
+            "number": 1,
+            "jellyfin_id": "season1",
+            "release_date": datetime(2020, 1, 1, tzinfo=UTC),
+        }
+    ]
+    assert [(r["jellyfin_id"], r["season_id"], r["number"]) for r in writer.episode_rows] == [
+        ("ep2", 1000, 2),
+        ("ep1", 1000, 1),
+    ]
+    mock_session.add.assert_not_called()
 
-        assert new_cnt == 2
-        assert upd_cnt == 0
 
-        # Season + 2 Episodes
-        assert mock_session.add.call_count == 3
-        mock_session.flush.assert_called()
+@pytest.mark.asyncio
+async def test_process_seasons_updates_existing_episode(mock_session, series, writer):
+    """существующий эпизод находится по jellyfin_id и обновляется по id"""
+    writer.existing_seasons = {(1, 1): 10}
+    writer.existing_episodes = [(77, 10, 1, "ep1")]
+    episodes = [_episode("ep1", 1, 1, "New title", "2020-01-01T00:00:00Z")]
 
+    new_cnt, upd_cnt = await _process_seasons_and_episodes(mock_session, [(series, episodes)])
 
-@pytest.mark.asyncio
-async def test_process_seasons_updates_existing_episode(mock_session, series):
-    """обновляется существующий эпизод"""
-    existing_season = AsyncMock()
-    existing_season.id = 10
-    existing_season.number = 1
-    existing_season.jellyfin_id = "season1"
-    existing_season.release_date = None
-
-    existing_episode = AsyncMock()
-    existing_episode.jellyfin_id = "ep1"
-    existing_episode.number = 1
-    existing_episode.title = "Old title"
-    existing_episode.air_date = None
+    assert new_cnt == 0
+    assert upd_cnt == 1
+    (row,) = writer.episode_rows
+    assert row["id"] == 77
+    assert row["title"] == "New title"
 
-    episodes = [
-        {
-            "Id": "ep1",
-            "ParentIndexNumber": 1,
-            "IndexNumber": 1,
-            "Name": "New title",
-            "PremiereDate": "2020-01-01T00:00:00Z",
-            "SeasonId": "season1",
-        }
-    ]
 
-    with patch(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        new_callable=AsyncMock,
-    ) as mock_fetch:
-        mock_fetch.return_value = episodes
+@pytest.mark.asyncio
+async def test_process_seasons_matches_existing_episode_by_number(mock_session, series, writer):
+    """эпизод без jellyfin_id (например, из Sonarr) находится по (season_id, number)"""
+    writer.existing_seasons = {(1, 1): 10}
+    writer.existing_episodes = [(77, 10, 3, None)]
+    episodes = [_episode("ep3", 1, 3, "Third")]
 
-        mock_session.scalars.side_effect = [
-            [existing_season],
-            [existing_episode],
-        ]
+    new_cnt, upd_cnt = await _process_seasons_and_episodes(mock_session, [(series, episodes)])
 
-        new_cnt, upd_cnt = await _process_seasons_and_episodes(
-            mock_session,
-            series,
-            "jf-series",
-            "http://jellyfin:8096",
-            "test-api-key",
-        )
+    assert (new_cnt, upd_cnt) == (0, 1)
+    (row,) = writer.episode_rows
+    assert (row["id"], row["jellyfin_id"]) == (77, "ep3")
 
-        assert new_cnt == 0
-        assert upd_cnt == 1
-        mock_session.flush.assert_called()
+
+@pytest.mark.asyncio
+async def test_process_seasons_batches_several_series(mock_session, writer):
+    """сезоны и эпизоды нескольких сериалов пишутся вместе"""
+    first = SeriesFactory.build(id=1)
+    second = SeriesFactory.build(id=2)
+
+    new_cnt, _ = await _process_seasons_and_episodes(
+        mock_session,
+        [
+            (first, [_episode("a1", 1, 1, "A1", season_id="sa")]),
+            (second, [_episode("b1", 1, 1, "B1", season_id="sb")]),
+        ],
+    )
+
+    assert new_cnt == 2
+    assert [(r["series_id"], r["jellyfin_id"]) for r in writer.season_rows] == [
+        (1, "sa"),
+        (2, "sb"),
+    ]
+    assert len({r["season_id"] for r in writer.episode_rows}) == 2
 
 
 @pytest.mark.asyncio
-async def test_process_seasons_skips_invalid_episode(mock_session, series):
+async def test_process_seasons_skips_invalid_episode(mock_session, series, writer):
     """битые эпизоды пропускаются"""
     episodes = [
         {
@@ -138,22 +133,44 @@ async def test_process_seasons_skips_invalid_episode(mock_session, series):
         }
     ]
 
-    with patch(
-        "app.services.import_jellyfin_series_service.fetch_jellyfin_episodes",
-        new_callable=AsyncMock,
-    ) as mock_fetch:
-        mock_fetch.return_value = episodes
-
-        mock_session.scalars.return_value = []
-
-        new_cnt, upd_cnt = await _process_seasons_and_episodes(
-            mock_session,
-            series,
-            "jf-series",
-            "http://jellyfin:8096",
-            "test-api-key",
-        )
-
-        assert new_cnt == 0
-        assert upd_cnt == 0
-        mock_session.add.assert_not_called()
+    new_cnt, upd_cnt = await _process_seasons_and_episodes(mock_session, [(series, episodes)])
+
+    assert new_cnt == 0
+    assert upd_cnt == 0
+    assert writer.season_rows == []
+    mock_session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_seasons_refreshes_progress_of_series_with_new_episodes(
+    mock_session, series, writer, series_progress_refresh
+):
+    """новые эпизоды меняют total в series_progress сериалов пачки"""
+    await _process_seasons_and_episodes(mock_session, [(series, [_episode("ep1", 1, 1, "Pilot")])])
+
+    series_progress_refresh.assert_awaited_once_with(mock_session, {1})
+
+
+@pytest.mark.asyncio
+async def test_process_seasons_refreshes_progress_of_series_episodes_move_from(
+    mock_session, series, writer, series_progress_refresh
+):
+    """эпизод, найденный по jellyfin_id под другим сериалом, уменьшает total того сериала"""
+    writer.episode_series = {"ep1": 2}
+
+    await _process_seasons_and_episodes(mock_session, [(series, [_episode("ep1", 1, 1, "Pilot")])])
+
+    series_progress_refresh.assert_awaited_once_with(mock_session, {1, 2})
+
+
+@pytest.mark.asyncio
+async def test_process_seasons_updated_episodes_keep_progress(
+    mock_session, series, writer, series_progress_refresh
+):
+    """обновление существующих эпизодов не меняет их число"""
+    writer.existing_seasons = {(1, 1): 10}
+    writer.existing_episodes = [(77, 10, 1, "ep1")]
+
+    await _process_seasons_and_episodes(mock_session, [(series, [_episode("ep1", 1, 1, "New")])])
+
+    series_progress_refresh.assert_not_called()
@@ -1,6 +1,7 @@
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from app.services.jellyfin_users_service import import_jellyfin_users
 
@@ -20,11 +21,22 @@ def jellyfin_users_update():
     ]
 
 
+def _db(mock_session, existing: list[tuple[str, str]], returned: list[tuple[str, bool]]) -> None:
+    """1-й execute — текущие имена по jellyfin_user_id, 2-й — INSERT ... RETURNING."""
+    loaded = Mock()
+    loaded.tuples.return_value.all.return_value = existing
+    mock_session.execute.side_effect = [loaded, returned]
+
+
+def _upsert_params(mock_session) -> dict:
+    statement = mock_session.execute.await_args_list[1].args[0]
+    return statement.compile().params
+
+
 @pytest.mark.asyncio
 async def test_import_jellyfin_users_creates_new_users(
-    mock_session, jellyfin_users_basic, mock_scalar_result
+    mock_session, jellyfin_users_basic, series_progress_refresh
 ):
-    # Mock the fetch_jellyfin_users function
     with (
         patch(
             "app.services.jellyfin_users_service.get_decrypted_config",
@@ -36,35 +48,50 @@ async def test_import_jellyfin_users_creates_new_users(
         ) as mock_fetch,
     ):
         mock_fetch.return_value = jellyfin_users_basic
-
-        # Configure mock_session.execute to return the mock_scalar_result directly
-        mock_session.execute.return_value = mock_scalar_result(None)
+        _db(mock_session, existing=[], returned=[("user1", True, 1), ("user2", True, 2)])
 
         # Act
         result = await import_jellyfin_users(mock_session)
 
-        # Assert
+        # Assert: one multi-row upsert instead of a SELECT + flush per user
         assert result.imported_count == 2
-        assert mock_session.add.call_count == 2
+        assert result.updated_count == 0
+        assert mock_session.execute.await_count == 2
+        mock_session.add.assert_not_called()
+        mock_session.flush.assert_not_called()
         mock_session.commit.assert_called_once()
+        # New users get their series_progress rows
+        series_progress_refresh.assert_awaited_once_with(mock_session, user_ids=[1, 2])
 
 
 @pytest.mark.asyncio
-async def test_import_jellyfin_users_updates_existing_user(mock_session, jellyfin_users_update):
-    """Should update username if changed"""
-    # Existing user
-    existing_user = Mock()
-    existing_user.username = "Alice"
-    existing_user.jellyfin_user_id = "user1"
+async def test_import_jellyfin_users_upsert_statement(mock_session, jellyfin_users_basic):
+    """Переименование — ON CONFLICT (jellyfin_user_id) DO UPDATE только при другом имени"""
+    with (
+        patch(
+            "app.services.jellyfin_users_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.jellyfin_users_service.fetch_jellyfin_users", new_callable=AsyncMock
+        ) as mock_fetch,
+    ):
+        mock_fetch.return_value = jellyfin_users_basic
+        _db(mock_session, existing=[], returned=[])
+
+        await import_jellyfin_users(mock_session)
 
-    mock_result = Mock()
-    mock_scalar = Mock()
-    mock_scalar.first.return_value = existing_user
-    mock_result.scalars.return_value = mock_scalar
+    statement = mock_session.execute.await_args_list[1].args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (jellyfin_user_id) DO UPDATE SET username = excluded.username" in sql
+    assert "WHERE users.username IS DISTINCT FROM excluded.username" in sql
+    assert "RETURNING users.jellyfin_user_id, xmax = 0, users.id" in sql
 
-    mock_session.execute.return_value = mock_result
 
-    # Mock the fetch_jellyfin_users function
+@pytest.mark.asyncio
+async def test_import_jellyfin_users_updates_existing_user(mock_session, jellyfin_users_update):
+    """Should update username if changed"""
     with (
         patch(
             "app.services.jellyfin_users_service.get_decrypted_config",
@@ -76,14 +103,37 @@ async def test_import_jellyfin_users_updates_existing_user(mock_session, jellyfi
         ) as mock_fetch,
     ):
         mock_fetch.return_value = jellyfin_users_update
+        _db(mock_session, existing=[("user1", "Alice")], returned=[("user1", False, 1)])
 
         result = await import_jellyfin_users(mock_session)
 
         assert result.imported_count == 0
         assert result.updated_count == 1
-        assert existing_user.username == "Alice Updated"
-        mock_session.add.assert_called_once_with(existing_user)
-        mock_session.flush.assert_called_once()
+        assert _upsert_params(mock_session)["username_m0"] == "Alice Updated"
+        mock_session.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_import_jellyfin_users_skips_up_to_date(mock_session, jellyfin_users_basic):
+    """Пользователи с тем же именем не попадают в INSERT"""
+    with (
+        patch(
+            "app.services.jellyfin_users_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.jellyfin_users_service.fetch_jellyfin_users", new_callable=AsyncMock
+        ) as mock_fetch,
+    ):
+        mock_fetch.return_value = jellyfin_users_basic
+        _db(mock_session, existing=[("user1", "Alice"), ("user2", "Bob")], returned=[])
+
+        result = await import_jellyfin_users(mock_session)
+
+        assert result.imported_count == 0
+        assert result.updated_count == 0
+        assert mock_session.execute.await_count == 1
         mock_session.commit.assert_called_once()
 
 
@@ -103,10 +153,11 @@ async def test_import_jellyfin_users_skips_no_id(mock_session):
         ) as mock_fetch,
     ):
         mock_fetch.return_value = users
+        _db(mock_session, existing=[], returned=[])
 
         result = await import_jellyfin_users(mock_session)
 
         assert result.imported_count == 0
         assert result.updated_count == 0
-        mock_session.add.assert_not_called()
+        assert mock_session.execute.await_count == 1
         mock_session.commit.assert_called_once()
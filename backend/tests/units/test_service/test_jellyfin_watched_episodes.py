@@ -1,3 +1,4 @@
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -6,6 +7,7 @@ from app.models.user import WatchStatus
 from app.services.sync_jellyfin_watched_series_service import (
     sync_jellyfin_watched_series,
 )
+from app.services.sync_watermark_repository import SyncWindow
 from tests.factories import EpisodeFactory, SeasonFactory, SeriesFactory, UserFactory
 
 
@@ -26,11 +28,10 @@ async def test_sync_watched_episodes_no_episodes(mock_session, user):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
         ) as mock_fetch,
     ):
-        mock_fetch.return_value = []
+        mock_fetch.side_effect = _iter_pages()
 
         result = await sync_jellyfin_watched_series(mock_session)
 
@@ -41,7 +42,9 @@ async def test_sync_watched_episodes_no_episodes(mock_session, user):
 
 
 @pytest.mark.asyncio
-async def test_sync_watched_episodes_add_new(mock_session, user, episode, season, series):
+async def test_sync_watched_episodes_add_new(
+    mock_session, user, episode, season, series, series_progress_refresh
+):
     episode.season = season
     season.series_id = series.id
 
@@ -63,7 +66,8 @@ async def test_sync_watched_episodes_add_new(mock_session, user, episode, season
             _make_scalars_all([season]),  # seasons
             _make_scalars_all([episode]),  # episodes
             _make_scalars_iter([]),  # watch history
-            MagicMock(),  # insert
+            _rowcount(1),  # insert
+            _rowcount(0),  # dropped update
         ]
     )
 
@@ -74,9 +78,8 @@ async def test_sync_watched_episodes_add_new(mock_session, user, episode, season
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[episode_data],
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([episode_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
@@ -94,6 +97,12 @@ async def test_sync_watched_episodes_add_new(mock_session, user, episode, season
         assert result.watched_updated == 0
         assert result.unwatched_marked == 0
         mock_session.commit.assert_called()
+        # Progress of the page's series is recomputed for the user
+        assert series_progress_refresh.await_args_list[0].args == (
+            mock_session,
+            {series.id},
+            [user.id],
+        )
 
 
 @pytest.mark.asyncio
@@ -126,6 +135,7 @@ async def test_sync_watched_episodes_update_existing(
             _make_scalars_all([season]),
             _make_scalars_all([episode]),
             _make_scalars_iter([existing_watch]),
+            _rowcount(0),  # dropped update
         ]
     )
 
@@ -136,9 +146,8 @@ async def test_sync_watched_episodes_update_existing(
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[episode_data],
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([episode_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
@@ -187,6 +196,7 @@ async def test_sync_watched_episodes_mark_unwatched(
             _make_scalars_all([season]),
             _make_scalars_all([episode]),
             _make_scalars_iter([existing_watch]),
+            _rowcount(0),  # dropped update
         ]
     )
 
@@ -197,9 +207,8 @@ async def test_sync_watched_episodes_mark_unwatched(
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[episode_data],
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([episode_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
@@ -214,6 +223,71 @@ async def test_sync_watched_episodes_mark_unwatched(
         mock_session.commit.assert_called()
 
 
+@pytest.mark.asyncio
+async def test_sync_dropped_episodes_refresh_their_series(
+    mock_session, user, episode, season, series, series_progress_refresh
+):
+    episode.season = season
+    season.series_id = series.id
+
+    episode_data = {
+        "Id": episode.jellyfin_id,
+        "SeriesId": series.jellyfin_id,
+        "ParentIndexNumber": season.number,
+        "IndexNumber": episode.number,
+        "UserData": {"Played": False},
+    }
+
+    mock_session.execute = AsyncMock(
+        side_effect=[
+            _make_scalars_all([user]),
+            _make_scalars_all([series]),
+            _make_scalars_all([season]),
+            _make_scalars_all([episode]),
+            _make_scalars_iter([]),
+            _make_scalars_all([42, 42, 43]),  # dropped update RETURNING media_id
+        ]
+    )
+
+    with (
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([episode_data]),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
+            new_callable=AsyncMock,
+            return_value=[{"Id": series.jellyfin_id, "ProviderIds": {}}],
+        ),
+    ):
+        result = await sync_jellyfin_watched_series(mock_session)
+
+    assert result.unwatched_marked == 3
+    series_progress_refresh.assert_awaited_with(mock_session, {42, 43}, [user.id])
+
+
+def _iter_pages(*pages):
+    """Helper: stand-in for the paged Jellyfin iterator yielding the given pages"""
+
+    async def _iter(*args, **kwargs):
+        for page in pages:
+            yield page
+
+    return _iter
+
+
+def _rowcount(count):
+    """Helper: mock result of insert/update with .rowcount"""
+    result = MagicMock()
+    result.rowcount = count
+    return result
+
+
 def _make_scalars_all(items):
     """Helper: mock result supporting .scalars().all()"""
     scalars = MagicMock()
@@ -255,7 +329,7 @@ async def test_sync_heals_series_jellyfin_id_on_tvdb_match(mock_session):
         "UserData": {"Played": True, "LastPlayedDate": "2024-03-01T10:00:00Z"},
     }
 
-    # SQL order: users → series lookup → seasons → episodes → watch_history → insert
+    # SQL order: users → series lookup → seasons → episodes → watch_history → insert → dropped
     users_result = _make_scalars_all([user])
     series_result = _make_scalars_all([series])
     seasons_result = _make_scalars_all([season])
@@ -269,7 +343,8 @@ async def test_sync_heals_series_jellyfin_id_on_tvdb_match(mock_session):
             seasons_result,  # 3. select(Season)
             episodes_result,  # 4. select(Episode)
             wh_result,  # 5. select(WatchHistory)
-            MagicMock(),  # 6. insert(WatchHistory)
+            _rowcount(1),  # 6. insert(WatchHistory)
+            _rowcount(0),  # 7. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -280,9 +355,8 @@ async def test_sync_heals_series_jellyfin_id_on_tvdb_match(mock_session):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[ep_data],
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([ep_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
@@ -335,7 +409,8 @@ async def test_sync_heals_episode_jellyfin_id_on_season_ep_match(mock_session):
             seasons_result,
             episodes_result,
             wh_result,
-            MagicMock(),  # insert
+            _rowcount(1),  # insert
+            _rowcount(0),  # dropped update
         ]
     )
 
@@ -346,9 +421,8 @@ async def test_sync_heals_episode_jellyfin_id_on_season_ep_match(mock_session):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[ep_data],
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([ep_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
@@ -389,7 +463,6 @@ async def test_sync_series_not_found_skips_all_episodes(mock_session):
     series_result = _make_scalars_all([])
     seasons_result = _make_scalars_all([])
     episodes_result = _make_scalars_all([])
-    wh_result = _make_scalars_iter([])
 
     mock_session.execute = AsyncMock(
         side_effect=[
@@ -397,7 +470,8 @@ async def test_sync_series_not_found_skips_all_episodes(mock_session):
             series_result,
             seasons_result,
             episodes_result,
-            wh_result,
+            # no watch history query: nothing on the page was matched
+            _rowcount(0),  # dropped update
         ]
     )
 
@@ -408,9 +482,8 @@ async def test_sync_series_not_found_skips_all_episodes(mock_session):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_episodes_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[ep_data],
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([ep_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
@@ -418,8 +491,113 @@ async def test_sync_series_not_found_skips_all_episodes(mock_session):
             # Empty list — no provider IDs available, series can't be resolved
             return_value=[],
         ),
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.complete_sync",
+            new_callable=AsyncMock,
+        ) as mock_complete,
     ):
         result = await sync_jellyfin_watched_series(mock_session)
 
     assert result.watched_added == 0
     assert result.watched_updated == 0
+    # the episode is asked for again once its series is imported
+    assert mock_complete.await_args.kwargs == {"pending": {"ep-x"}}
+
+
+@pytest.mark.asyncio
+async def test_sync_incremental_run_asks_again_for_unresolved_episodes(
+    mock_session, full_sync_window
+):
+    """Эпизоды, не найденные прошлым прогоном, запрашиваются по id после изменённых."""
+    user = UserFactory.build(id=1, jellyfin_user_id="jf-user-4")
+    since = datetime(2026, 1, 1, tzinfo=UTC)
+    window = SyncWindow(
+        started_at=datetime(2026, 1, 2, tzinfo=UTC), since=since, pending=("ep-a", "ep-b")
+    )
+    full_sync_window.side_effect = None
+    full_sync_window.return_value = window
+    mock_session.execute = AsyncMock(side_effect=[_make_scalars_all([user])])
+
+    with (
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages(),
+        ) as mock_iter,
+    ):
+        await sync_jellyfin_watched_series(mock_session)
+
+    assert [c.kwargs for c in mock_iter.call_args_list] == [
+        {"min_date_last_saved_for_user": since},
+        {"ids": ["ep-a", "ep-b"]},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_resolves_series_once_across_pages(mock_session):
+    """
+    Episodes of one series arrive on two pages. The series is resolved on the
+    first page only; each page loads its own seasons/episodes/watch history
+    and is committed on its own.
+    """
+    user = UserFactory.build(id=1, jellyfin_user_id="jf-user-4")
+    series = SeriesFactory.build(id=12, jellyfin_id="jf-series-2", tvdb_id=None, imdb_id=None)
+    season = SeasonFactory.build(id=7, series_id=series.id, number=1)
+    ep1 = EpisodeFactory.build(id=30, season_id=season.id, number=1, jellyfin_id="ep-1")
+    ep2 = EpisodeFactory.build(id=31, season_id=season.id, number=2, jellyfin_id="ep-2")
+    ep1.season = season
+    ep2.season = season
+
+    def _ep_data(jf_id, number):
+        return {
+            "Id": jf_id,
+            "SeriesId": "jf-series-2",
+            "ParentIndexNumber": 1,
+            "IndexNumber": number,
+            "UserData": {"Played": True},
+        }
+
+    mock_session.execute = AsyncMock(
+        side_effect=[
+            _make_scalars_all([user]),  # users
+            # page 1
+            _make_scalars_all([series]),  # series lookup
+            _make_scalars_all([season]),  # seasons
+            _make_scalars_all([ep1, ep2]),  # episodes
+            _make_scalars_iter([]),  # watch history
+            _rowcount(1),  # insert
+            # page 2 — series already resolved, no lookup
+            _make_scalars_all([season]),  # seasons
+            _make_scalars_all([ep1, ep2]),  # episodes
+            _make_scalars_iter([]),  # watch history
+            _rowcount(1),  # insert
+            _rowcount(0),  # dropped update
+        ]
+    )
+
+    with (
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.iter_jellyfin_episodes_for_user",
+            side_effect=_iter_pages([_ep_data("ep-1", 1)], [_ep_data("ep-2", 2)]),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_series_service.fetch_jellyfin_series_by_ids",
+            new_callable=AsyncMock,
+            return_value=[{"Id": "jf-series-2", "ProviderIds": {}}],
+        ) as mock_series_by_ids,
+    ):
+        result = await sync_jellyfin_watched_series(mock_session)
+
+    assert result.watched_added == 2
+    assert result.total_episodes_processed == 2
+    mock_series_by_ids.assert_awaited_once()
+    assert mock_session.commit.await_count == 3  # two pages + dropped detection
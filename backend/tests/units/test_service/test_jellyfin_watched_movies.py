@@ -1,9 +1,29 @@
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
+from sqlalchemy.sql.dml import Update
 
+from app.models.schedule import SyncJobType
 from app.models.user import WatchStatus
 from app.services.sync_jellyfin_watched_movies_service import sync_jellyfin_watched_movies
+from app.services.sync_watermark_repository import SyncWindow
+
+
+def _iter_pages(*pages):
+    """Подменяет постраничный итератор Jellyfin: отдаёт заданные страницы."""
+
+    async def _iter(*args, **kwargs):
+        for page in pages:
+            yield page
+
+    return _iter
+
+
+def _rowcount(count):
+    result_mock = MagicMock()
+    result_mock.rowcount = count
+    return result_mock
 
 
 @pytest.mark.asyncio
@@ -24,11 +44,10 @@ async def test_sync_watched_movies_no_movies(mock_session, user):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         ) as mock_fetch,
     ):
-        mock_fetch.return_value = []
+        mock_fetch.side_effect = _iter_pages()
 
         result = await sync_jellyfin_watched_movies(mock_session)
 
@@ -77,10 +96,11 @@ async def test_sync_watched_movies_add_new(mock_session, user, movie):
     mock_session.execute = AsyncMock(
         side_effect=[
             users_result_mock,  # 1. select(User)
-            wh_result_mock,  # 2. select(WatchHistory)
-            empty_result_mock,  # 3. select(Movie).where(jellyfin_id.in_(...))
-            movies_result_mock,  # 4. select(Movie).where(tmdb_id.in_(...))
-            empty_result_mock,  # 5. select(Movie).where(imdb_id.in_(...))
+            empty_result_mock,  # 2. select(Movie).where(jellyfin_id.in_(...))
+            movies_result_mock,  # 3. select(Movie).where(tmdb_id.in_(...))
+            # no imdb query: ProviderIds has no Imdb → imdb_ids is empty
+            wh_result_mock,  # 4. select(WatchHistory) for the page
+            _rowcount(0),  # 5. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -91,15 +111,14 @@ async def test_sync_watched_movies_add_new(mock_session, user, movie):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         ) as mock_fetch,
         patch(
             "app.services.sync_jellyfin_watched_movies_service.parse_datetime",
             return_value="parsed-date",
         ),
     ):
-        mock_fetch.return_value = [movie_data]
+        mock_fetch.side_effect = _iter_pages([movie_data])
 
         result = await sync_jellyfin_watched_movies(mock_session)
 
@@ -148,10 +167,11 @@ async def test_sync_watched_movies_update_existing(mock_session, user, movie, ex
     mock_session.execute = AsyncMock(
         side_effect=[
             users_result_mock,  # 1. select(User).where(...)
-            wh_result_mock,  # 2. select(WatchHistory).where(...)
-            empty_result,  # 3. select(Movie).where(jellyfin_id.in_(...))
-            movies_result_mock,  # 4. select(Movie).where(tmdb_id.in_(...))
-            empty_result,  # 5. select(Movie).where(imdb_id.in_(...))
+            empty_result,  # 2. select(Movie).where(jellyfin_id.in_(...))
+            movies_result_mock,  # 3. select(Movie).where(tmdb_id.in_(...))
+            # no imdb query: ProviderIds has no Imdb → imdb_ids is empty
+            wh_result_mock,  # 4. select(WatchHistory) for the page
+            _rowcount(0),  # 5. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -162,15 +182,14 @@ async def test_sync_watched_movies_update_existing(mock_session, user, movie, ex
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         ) as mock_fetch,
         patch(
             "app.services.sync_jellyfin_watched_movies_service.parse_datetime",
             return_value="2024-01-02T10:00:00",
         ),
     ):
-        mock_fetch.return_value = [movie_data]
+        mock_fetch.side_effect = _iter_pages([movie_data])
 
         result = await sync_jellyfin_watched_movies(mock_session)
 
@@ -220,10 +239,11 @@ async def test_sync_watched_movies_mark_unwatched(mock_session, user, movie, exi
     mock_session.execute = AsyncMock(
         side_effect=[
             users_result,  # 1. select(User).where(...)
-            watch_history_result,  # 2. select(WatchHistory).where(...)
-            empty_result,  # 3. select(Movie).where(jellyfin_id.in_(...))
-            movies_result,  # 4. select(Movie).where(tmdb_id.in_(...))
-            empty_result,  # 5. select(Movie).where(imdb_id.in_(...))
+            empty_result,  # 2. select(Movie).where(jellyfin_id.in_(...))
+            movies_result,  # 3. select(Movie).where(tmdb_id.in_(...))
+            # no imdb query: ProviderIds has no Imdb → imdb_ids is empty
+            watch_history_result,  # 4. select(WatchHistory) for the page
+            _rowcount(0),  # 5. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -234,11 +254,10 @@ async def test_sync_watched_movies_mark_unwatched(mock_session, user, movie, exi
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
         ) as mock_fetch,
     ):
-        mock_fetch.return_value = [movie_data]
+        mock_fetch.side_effect = _iter_pages([movie_data])
 
         result = await sync_jellyfin_watched_movies(mock_session)
 
@@ -289,10 +308,11 @@ async def test_sync_heals_jellyfin_id_on_tmdb_match(mock_session, user, movie):
     mock_session.execute = AsyncMock(
         side_effect=[
             _make_scalars_all([user]),  # 1. select(User)
-            _make_scalars_iter([]),  # 2. select(WatchHistory)
-            _make_scalars_iter([]),  # 3. select(Movie).where(jellyfin_id.in_("new-jf-id")) → miss
-            _make_scalars_iter([movie]),  # 4. select(Movie).where(tmdb_id.in_("123")) → hit
-            # no 5th call: ProviderIds has no Imdb → imdb_ids is empty
+            _make_scalars_iter([]),  # 2. select(Movie).where(jellyfin_id.in_("new-jf-id")) → miss
+            _make_scalars_iter([movie]),  # 3. select(Movie).where(tmdb_id.in_("123")) → hit
+            # no imdb query: ProviderIds has no Imdb → imdb_ids is empty
+            _make_scalars_iter([]),  # 4. select(WatchHistory) for the page
+            _rowcount(0),  # 5. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -303,9 +323,8 @@ async def test_sync_heals_jellyfin_id_on_tmdb_match(mock_session, user, movie):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[movie_data],
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
+            side_effect=_iter_pages([movie_data]),
         ),
         patch(
             "app.services.sync_jellyfin_watched_movies_service.parse_datetime",
@@ -334,10 +353,11 @@ async def test_sync_movie_not_found_logs_warning(mock_session, user, caplog):
     mock_session.execute = AsyncMock(
         side_effect=[
             _make_scalars_all([user]),  # 1. select(User)
-            _make_scalars_iter([]),  # 2. select(WatchHistory)
-            _make_scalars_iter([]),  # 3. select(Movie).where(jellyfin_id.in_(...))
-            _make_scalars_iter([]),  # 4. select(Movie).where(tmdb_id.in_(...))
-            _make_scalars_iter([]),  # 5. select(Movie).where(imdb_id.in_(...))
+            _make_scalars_iter([]),  # 2. select(Movie).where(jellyfin_id.in_(...))
+            _make_scalars_iter([]),  # 3. select(Movie).where(tmdb_id.in_(...))
+            _make_scalars_iter([]),  # 4. select(Movie).where(imdb_id.in_(...))
+            # no WatchHistory query: nothing on the page was resolved
+            _rowcount(0),  # 5. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -348,9 +368,8 @@ async def test_sync_movie_not_found_logs_warning(mock_session, user, caplog):
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[movie_data],
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
+            side_effect=_iter_pages([movie_data]),
         ),
     ):
         import logging
@@ -373,18 +392,13 @@ async def test_sync_movie_not_found_logs_warning(mock_session, user, caplog):
 async def test_sync_dropped_detection_uses_resolved_ids(mock_session, user, movie):
     """
     WatchHistory с status=PLANNED для фильма, которого нет в Jellyfin.
-    Jellyfin возвращает другой фильм с неизвестными ID — movie из WatchHistory
-    не попадает в jellyfin_media_ids, поэтому его статус должен стать DROPPED.
+    Jellyfin возвращает другой фильм с неизвестными ID — ни один фильм не
+    разрешён, поэтому dropped-детекция одним UPDATE помечает запись как DROPPED.
     """
     movie.jellyfin_id = "db-movie-jf"
     movie.tmdb_id = "db-tmdb"
     movie.imdb_id = None
 
-    planned_watch = MagicMock()
-    planned_watch.media_id = movie.id
-    planned_watch.status = WatchStatus.PLANNED
-    planned_watch.is_manual = False
-
     # Jellyfin returns a completely different movie (IDs not in DB)
     jellyfin_movie_data = {
         "Id": "unknown-jf-id",
@@ -394,16 +408,15 @@ async def test_sync_dropped_detection_uses_resolved_ids(mock_session, user, movi
     }
 
     # DB queries for the unknown Jellyfin movie's IDs return empty results.
-    # imdb_ids is empty so there are only 4 execute calls (no 5th for imdb).
+    # imdb_ids is empty so there is no imdb query, nothing resolved → no WatchHistory query.
     empty_iter = _make_scalars_iter([])
 
     mock_session.execute = AsyncMock(
         side_effect=[
             _make_scalars_all([user]),  # 1. select(User)
-            _make_scalars_iter([planned_watch]),  # 2. select(WatchHistory)
-            empty_iter,  # 3. select(Movie).where(jellyfin_id.in_(...))
-            empty_iter,  # 4. select(Movie).where(tmdb_id.in_(...))
-            # no 5th call: imdb_ids is empty → no query
+            empty_iter,  # 2. select(Movie).where(jellyfin_id.in_(...))
+            empty_iter,  # 3. select(Movie).where(tmdb_id.in_(...))
+            _rowcount(1),  # 4. update(WatchHistory) — dropped detection
         ]
     )
 
@@ -414,12 +427,135 @@ async def test_sync_dropped_detection_uses_resolved_ids(mock_session, user, movi
             return_value=("http://jellyfin:8096", "test-api-key"),
         ),
         patch(
-            "app.services.sync_jellyfin_watched_movies_service.fetch_jellyfin_movies_for_user_all",
-            new_callable=AsyncMock,
-            return_value=[jellyfin_movie_data],
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
+            side_effect=_iter_pages([jellyfin_movie_data]),
         ),
     ):
         result = await sync_jellyfin_watched_movies(mock_session)
 
     assert result.unwatched_marked == 1
-    assert planned_watch.status == WatchStatus.DROPPED
+    dropped_stmt = mock_session.execute.call_args_list[-1].args[0]
+    assert isinstance(dropped_stmt, Update)
+    assert dropped_stmt.table.name == "watch_history"
+
+
+@pytest.mark.asyncio
+async def test_sync_incremental_run_skips_dropped_detection(
+    mock_session, user, movie, full_sync_window
+):
+    """
+    Инкрементальный прогон запрашивает только изменённые с водяного знака фильмы
+    (MinDateLastSavedForUser) и не помечает остальные как DROPPED — список неполный.
+    """
+    since = datetime(2026, 1, 1, tzinfo=UTC)
+    window = SyncWindow(started_at=datetime(2026, 1, 2, tzinfo=UTC), since=since)
+    full_sync_window.side_effect = None
+    full_sync_window.return_value = window
+
+    jellyfin_movie_data = {
+        "Id": "unknown-jf-id",
+        "Name": "Unknown Movie",
+        "ProviderIds": {"Tmdb": "unknown-tmdb"},
+        "UserData": {"Played": False},
+    }
+    empty_iter = _make_scalars_iter([])
+    mock_session.execute = AsyncMock(
+        side_effect=[
+            _make_scalars_all([user]),  # 1. select(User)
+            empty_iter,  # 2. select(Movie).where(jellyfin_id.in_(...))
+            empty_iter,  # 3. select(Movie).where(tmdb_id.in_(...))
+        ]
+    )
+
+    with (
+        patch(
+            "app.services.sync_jellyfin_watched_movies_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
+            side_effect=_iter_pages([jellyfin_movie_data]),
+        ) as mock_iter,
+        patch(
+            "app.services.sync_jellyfin_watched_movies_service.complete_sync",
+            new_callable=AsyncMock,
+        ) as mock_complete,
+    ):
+        result = await sync_jellyfin_watched_movies(mock_session)
+
+    assert mock_iter.call_args.kwargs == {"min_date_last_saved_for_user": since}
+    assert result.unwatched_marked == 0
+    assert mock_session.execute.await_count == 3
+    full_sync_window.assert_awaited_once_with(
+        mock_session, SyncJobType.JELLYFIN_MOVIE_WATCH_HISTORY, user.jellyfin_user_id
+    )
+    # the movie is not imported yet: it is asked for again next run
+    mock_complete.assert_awaited_once_with(
+        mock_session,
+        SyncJobType.JELLYFIN_MOVIE_WATCH_HISTORY,
+        window,
+        user.jellyfin_user_id,
+        pending={"unknown-jf-id"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_incremental_run_asks_again_for_unresolved_movies(
+    mock_session, user, movie, full_sync_window
+):
+    """
+    Фильм, не найденный прошлым прогоном, запрашивается по id: его user data не меняется,
+    когда фильм позже импортируют, поэтому по MinDateLastSavedForUser он не придёт.
+    """
+    since = datetime(2026, 1, 1, tzinfo=UTC)
+    window = SyncWindow(
+        started_at=datetime(2026, 1, 2, tzinfo=UTC), since=since, pending=("jf-late", "jf-seen")
+    )
+    full_sync_window.side_effect = None
+    full_sync_window.return_value = window
+    movie.jellyfin_id = "jf-late"
+
+    late_movie_data = {
+        "Id": "jf-late",
+        "Name": "Imported Later",
+        "UserData": {"Played": True, "LastPlayedDate": "2025-12-01T10:00:00Z"},
+    }
+    seen_movie_data = {"Id": "jf-seen", "Name": "Still Unknown", "UserData": {}}
+    mock_session.execute = AsyncMock(
+        side_effect=[
+            _make_scalars_all([user]),  # select(User)
+            _make_scalars_iter([]),  # changed page: select(Movie) by jellyfin_id
+            _make_scalars_iter([movie]),  # pending page: select(Movie) by jellyfin_id
+            _make_scalars_iter([]),  # pending page: select(WatchHistory)
+        ]
+    )
+    pages = {None: [[seen_movie_data]], ("jf-late",): [[late_movie_data]]}
+
+    def iter_movies(*args, ids=None, **kwargs):  # type: ignore[no-untyped-def]
+        return _iter_pages(*pages[tuple(ids) if ids is not None else None])()
+
+    with (
+        patch(
+            "app.services.sync_jellyfin_watched_movies_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://jellyfin:8096", "test-api-key"),
+        ),
+        patch(
+            "app.services.sync_jellyfin_watched_movies_service.iter_jellyfin_movies_for_user",
+            side_effect=iter_movies,
+        ) as mock_iter,
+        patch(
+            "app.services.sync_jellyfin_watched_movies_service.complete_sync",
+            new_callable=AsyncMock,
+        ) as mock_complete,
+    ):
+        result = await sync_jellyfin_watched_movies(mock_session)
+
+    # jf-seen came with the changed movies, only jf-late is asked for by id
+    assert [c.kwargs for c in mock_iter.call_args_list] == [
+        {"min_date_last_saved_for_user": since},
+        {"ids": ["jf-late"]},
+    ]
+    assert result.watched_added == 1
+    assert mock_complete.await_args.kwargs == {"pending": {"jf-seen"}}
@@ -0,0 +1,285 @@
+"""Unit tests for the Jellyfin webhook service (parsing, upserts, coalescing queue)."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.user import WatchStatus
+from app.services.jellyfin_webhook_service import (
+    JellyfinWatchEvent,
+    WatchEventQueue,
+    apply_watch_events,
+    parse_webhook_event,
+)
+
+USER_ID = "a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6"
+MOVIE_ID = "0f1e2d3c4b5a69788796a5b4c3d2e1f0"
+EPISODE_ID = "11112222333344445555666677778888"
+
+
+def _event(**kwargs: Any) -> JellyfinWatchEvent:
+    defaults: dict[str, Any] = {
+        "jellyfin_user_id": USER_ID,
+        "item_id": MOVIE_ID,
+        "item_type": "Movie",
+        "played": True,
+    }
+    return JellyfinWatchEvent(**{**defaults, **kwargs})
+
+
+def _rows(rows: list[tuple[Any, ...]]) -> MagicMock:
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+def _sql(stmt: Any) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+# --- parse_webhook_event ---
+
+
+def test_parse_playback_stop_played_to_completion() -> None:
+    event = parse_webhook_event(
+        {
+            "NotificationType": "PlaybackStop",
+            "ItemType": "Movie",
+            "UserId": "A1B2C3D4-E5F6-A7B8-C9D0-E1F2A3B4C5D6",
+            "ItemId": MOVIE_ID,
+            "PlayedToCompletion": True,
+            "UtcTimestamp": "2026-01-02T21:00:00Z",
+        }
+    )
+
+    assert event is not None
+    assert event.jellyfin_user_id == USER_ID  # dashes and case normalized
+    assert event.status == WatchStatus.WATCHED
+    assert event.last_played_at == datetime(2026, 1, 2, 21, 0, tzinfo=UTC)
+
+
+def test_parse_playback_stop_midway_is_in_progress() -> None:
+    """Остановка на середине: статус «смотрю», а played неизвестен."""
+    event = parse_webhook_event(
+        {
+            "NotificationType": "PlaybackStop",
+            "ItemType": "Episode",
+            "UserId": USER_ID,
+            "ItemId": EPISODE_ID,
+            "PlayedToCompletion": False,
+            "PlaybackPositionTicks": 12_000_000_000,
+        }
+    )
+
+    assert event is not None
+    assert event.played is None
+    assert event.status == WatchStatus.WATCHING
+
+
+def test_parse_user_data_saved_unplayed() -> None:
+    event = parse_webhook_event(
+        {
+            "NotificationType": "UserDataSaved",
+            "ItemType": "Movie",
+            "UserId": USER_ID,
+            "ItemId": MOVIE_ID,
+            "Played": False,
+            "PlaybackPositionTicks": 0,
+        }
+    )
+
+    assert event is not None
+    assert event.status == WatchStatus.PLANNED
+
+
+@pytest.mark.parametrize("ticks", ["abc", "1.5", {"value": 1}, [1]])
+def test_parse_malformed_ticks_count_as_no_position(ticks: Any) -> None:
+    """Нечисловой PlaybackPositionTicks не роняет вебхук в 500, а считается нулём."""
+    payload = {
+        "NotificationType": "UserDataSaved",
+        "ItemType": "Movie",
+        "UserId": USER_ID,
+        "ItemId": MOVIE_ID,
+        "Played": True,
+        "PlaybackPositionTicks": ticks,
+    }
+
+    event = parse_webhook_event(payload)
+
+    assert event is not None
+    assert event.playback_position_ticks == 0
+    assert event.status == WatchStatus.WATCHED
+    # A stop with a malformed position and no completion has nothing to record
+    assert parse_webhook_event({**payload, "NotificationType": "PlaybackStop"}) is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"NotificationType": "ItemAdded", "ItemType": "Movie", "UserId": USER_ID, "ItemId": "x"},
+        {"NotificationType": "PlaybackStop", "ItemType": "Audio", "UserId": USER_ID, "ItemId": "x"},
+        {"NotificationType": "PlaybackStop", "ItemType": "Movie", "ItemId": "x"},
+        # stopped right at the start: nothing to record
+        {
+            "NotificationType": "PlaybackStop",
+            "ItemType": "Movie",
+            "UserId": USER_ID,
+            "ItemId": "x",
+            "PlaybackPositionTicks": 0,
+        },
+    ],
+)
+def test_parse_ignores_irrelevant_payloads(payload: dict[str, Any]) -> None:
+    assert parse_webhook_event(payload) is None
+
+
+# --- apply_watch_events ---
+
+
+@pytest.mark.asyncio
+async def test_apply_upserts_movie_and_episode(
+    mock_session: AsyncMock, series_progress_refresh: AsyncMock
+) -> None:
+    mock_session.execute.side_effect = [
+        _rows([(USER_ID, 1)]),
+        _rows([(MOVIE_ID, 10)]),
+        _rows([(EPISODE_ID, 20, 200)]),
+        MagicMock(),
+        MagicMock(),
+    ]
+    events = [_event(), _event(item_id=EPISODE_ID, item_type="Episode", played=True)]
+
+    applied = await apply_watch_events(mock_session, events)
+
+    assert applied == 2
+    movie_sql = _sql(mock_session.execute.call_args_list[3].args[0])
+    assert "INSERT INTO watch_history" in movie_sql
+    assert "ON CONFLICT (user_id, media_id) WHERE episode_id IS NULL DO UPDATE" in movie_sql
+    assert "WHERE watch_history.is_manual IS false" in movie_sql
+    episode_sql = _sql(mock_session.execute.call_args_list[4].args[0])
+    assert "ON CONFLICT ON CONSTRAINT uq_watch_history_user_media_episode" in episode_sql
+    # Only the episode's series progress changes
+    series_progress_refresh.assert_awaited_once_with(mock_session, {20}, {1})
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_apply_midway_stop_does_not_downgrade_watched(mock_session: AsyncMock) -> None:
+    mock_session.execute.side_effect = [_rows([(USER_ID, 1)]), _rows([(MOVIE_ID, 10)]), MagicMock()]
+
+    await apply_watch_events(mock_session, [_event(played=None, playback_position_ticks=5)])
+
+    sql = _sql(mock_session.execute.call_args_list[2].args[0])
+    assert "CASE WHEN (watch_history.status = %(status_1)s)" in sql
+
+
+@pytest.mark.asyncio
+async def test_apply_unplayed_only_updates_existing_row(mock_session: AsyncMock) -> None:
+    mock_session.execute.side_effect = [_rows([(USER_ID, 1)]), _rows([(MOVIE_ID, 10)]), MagicMock()]
+
+    await apply_watch_events(mock_session, [_event(played=False)])
+
+    sql = _sql(mock_session.execute.call_args_list[2].args[0])
+    assert sql.startswith("UPDATE watch_history")
+    assert "watch_history.episode_id IS NULL" in sql
+
+
+@pytest.mark.asyncio
+async def test_apply_skips_unknown_user_and_item(mock_session: AsyncMock) -> None:
+    mock_session.execute.side_effect = [_rows([(USER_ID, 1)]), _rows([])]
+    events = [_event(), _event(jellyfin_user_id="unknown")]
+
+    applied = await apply_watch_events(mock_session, events)
+
+    assert applied == 0
+    assert mock_session.execute.await_count == 2  # users + movies lookups only
+
+
+# --- WatchEventQueue ---
+
+
+def _queue(session: AsyncMock) -> WatchEventQueue:
+    @asynccontextmanager
+    async def factory() -> AsyncGenerator[AsyncMock, None]:
+        yield session
+
+    return WatchEventQueue(factory, flush_delay=0.01)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_queue_coalesces_events_per_user_and_item(mock_session: AsyncMock) -> None:
+    """Несколько событий по одному элементу сводятся к одной записи с последним состоянием."""
+    queue = _queue(mock_session)
+    with patch(
+        "app.services.jellyfin_webhook_service.apply_watch_events",
+        new_callable=AsyncMock,
+        return_value=2,
+    ) as apply:
+        queue.put(_event(played=None, playback_position_ticks=1))
+        queue.put(_event(played=None, playback_position_ticks=2))
+        queue.put(_event(item_id=EPISODE_ID, item_type="Episode"))
+        assert queue.pending == 2
+        await queue.aclose()
+
+    events = apply.await_args.args[1]
+    assert [e.playback_position_ticks for e in events] == [2, 0]
+    assert queue.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_keeps_played_verdict_of_earlier_event(mock_session: AsyncMock) -> None:
+    queue = _queue(mock_session)
+    queue.put(_event(played=True))
+    queue.put(_event(played=None, playback_position_ticks=7))
+
+    with patch(
+        "app.services.jellyfin_webhook_service.apply_watch_events", new_callable=AsyncMock
+    ) as apply:
+        await queue.aclose()
+
+    (event,) = apply.await_args.args[1]
+    assert event.played is True
+    assert event.playback_position_ticks == 7
+
+
+@pytest.mark.asyncio
+async def test_queue_worker_flushes_in_background(mock_session: AsyncMock) -> None:
+    queue = _queue(mock_session)
+    with patch(
+        "app.services.jellyfin_webhook_service.apply_watch_events",
+        new_callable=AsyncMock,
+        return_value=1,
+    ) as apply:
+        queue.put(_event())
+        for _ in range(50):
+            if apply.await_count:
+                break
+            await asyncio.sleep(0.01)
+        await queue.aclose()
+
+    apply.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_queue_worker_survives_failed_batch(mock_session: AsyncMock) -> None:
+    """Ошибка одной пачки не останавливает обработчик очереди."""
+    queue = _queue(mock_session)
+    with patch(
+        "app.services.jellyfin_webhook_service.apply_watch_events",
+        new_callable=AsyncMock,
+        side_effect=[RuntimeError("db down"), 1],
+    ) as apply:
+        queue.put(_event())
+        await asyncio.sleep(0.05)
+        queue.put(_event(item_id=EPISODE_ID, item_type="Episode"))
+        await asyncio.sleep(0.05)
+        await queue.aclose()
+
+    assert apply.await_count == 2
+    mock_session.rollback.assert_awaited_once()
@@ -1,14 +1,24 @@
-from unittest.mock import AsyncMock, Mock, patch
+from collections.abc import Generator
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from app.models.media import Movie
+from app.services import radarr_service
+from app.services.movie_utils import MovieIndexes
 from app.services.radarr_service import import_radarr_movies
+from tests.utils.async_iter import AsyncIterMock
 
 
-@pytest.mark.asyncio
-async def test_import_radarr_movies_creates_both_entities(mock_session, radarr_movies_basic):
-    """Test service creates both Media and Movie entities for each movie."""
-    # Arrange
+def _indexes(*movies: Movie) -> MovieIndexes:
+    indexes = MovieIndexes()
+    for movie in movies:
+        indexes.add(movie)
+    return indexes
+
+
+@pytest.fixture
+def mock_fetch() -> Generator[AsyncIterMock, None, None]:
     with (
         patch(
             "app.services.radarr_service.get_decrypted_config",
@@ -16,96 +26,132 @@ async def test_import_radarr_movies_creates_both_entities(mock_session, radarr_m
             return_value=("http://radarr:7878", "test-api-key"),
         ),
         patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
+            "app.services.radarr_service.iter_radarr_movies", new_callable=AsyncIterMock
+        ) as mock_iter,
     ):
-        mock_fetch.return_value = radarr_movies_basic
+        yield mock_iter
+
+
+@pytest.fixture
+def mock_load_indexes() -> Generator[AsyncMock, None, None]:
+    """По умолчанию в БД нет ни одного фильма."""
+    with patch(
+        "app.services.radarr_service.load_movie_indexes",
+        new_callable=AsyncMock,
+        side_effect=lambda *args, **kwargs: MovieIndexes(),
+    ) as mock_load:
+        yield mock_load
+
+
+@pytest.mark.asyncio
+async def test_import_radarr_movies_creates_both_entities(
+    mock_session, mock_fetch, mock_load_indexes, radarr_movies_basic
+):
+    """Test service creates both Media and Movie entities for each movie."""
+    # Arrange
+    mock_fetch.return_value = radarr_movies_basic
+    expected_movies_count = len(radarr_movies_basic)
+
+    # Act
+    result = await import_radarr_movies(mock_session)
+
+    # Assert
+    assert (
+        result.imported_count == expected_movies_count
+    ), f"Expected to import {expected_movies_count} movies, but got {result}"
+
+    # Verify add and flush calls for entity creation
+    expected_add_calls = 2 * expected_movies_count  # Media + Movie per film
+    assert (
+        mock_session.add.call_count == expected_add_calls
+    ), f"Expected {expected_add_calls} add calls, but got {mock_session.add.call_count}"
+
+    assert (
+        mock_session.flush.call_count == expected_movies_count
+    ), f"Expected {expected_movies_count} flush calls, but got {mock_session.flush.call_count}"
+
+    mock_session.commit.assert_called_once()
+    mock_session.rollback.assert_not_called()
 
-        # All movies not found by radarr_id or external_ids
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = None
+    # One set-based lookup for the whole batch, not one per movie
+    mock_load_indexes.assert_awaited_once()
+    kwargs = mock_load_indexes.await_args.kwargs
+    assert kwargs["radarr_ids"] == [1, 2, 3]
+    assert len(kwargs["tmdb_ids"]) == expected_movies_count
 
-        expected_movies_count = len(radarr_movies_basic)
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+@pytest.mark.asyncio
+async def test_import_radarr_movies_resolves_in_batches(
+    mock_session, mock_fetch, mock_load_indexes, monkeypatch
+):
+    """Поток фильмов разбивается на пачки; на каждую — один запрос к БД."""
+    from tests.factories import RadarrMovieDictFactory
+
+    monkeypatch.setattr(radarr_service, "RESOLVE_BATCH_SIZE", 2)
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(id=i, tmdbId=1000 + i) for i in range(1, 6)
+    ]
 
-        # Assert
-        assert (
-            result.imported_count == expected_movies_count
-        ), f"Expected to import {expected_movies_count} movies, but got {result}"
+    result = await import_radarr_movies(mock_session)
 
-        # Verify add and flush calls for entity creation
-        expected_add_calls = 2 * expected_movies_count  # Media + Movie per film
-        assert (
-            mock_session.add.call_count == expected_add_calls
-        ), f"Expected {expected_add_calls} add calls, but got {mock_session.add.call_count}"
+    assert result.imported_count == 5
+    assert [c.kwargs["radarr_ids"] for c in mock_load_indexes.await_args_list] == [
+        [1, 2],
+        [3, 4],
+        [5],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_radarr_movies_duplicate_in_batch_created_once(
+    mock_session, mock_fetch, mock_load_indexes
+):
+    """Созданный фильм сразу попадает в индекс — дубликат в той же пачке его обновляет."""
+    from tests.factories import RadarrMovieDictFactory
 
-        assert (
-            mock_session.flush.call_count == expected_movies_count
-        ), f"Expected {expected_movies_count} flush calls, but got {mock_session.flush.call_count}"
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(id=7, title="Dune", tmdbId=438631, status="inCinemas"),
+        RadarrMovieDictFactory.build(id=7, title="Dune", tmdbId=438631, status="released"),
+    ]
 
-        mock_session.commit.assert_called_once()
-        mock_session.rollback.assert_not_called()
+    result = await import_radarr_movies(mock_session)
 
-        # Verify search functions were called for each movie
-        assert mock_find_radarr.call_count == expected_movies_count
-        assert mock_find_external.call_count == expected_movies_count
+    assert result.imported_count == 1
+    assert result.updated_count == 1
+    assert mock_session.add.call_count == 2  # Media + Movie once
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movie_without_radarr_id_updates_by_tmdb(mock_session):
+async def test_import_radarr_movie_without_radarr_id_updates_by_tmdb(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Movie without radarr_id but with tmdb_id → finds and updates."""
     # Arrange
     from tests.factories import MovieFactory, RadarrMovieDictFactory
 
     # Create existing movie in DB
     existing_movie = MovieFactory.build(id=1, radarr_id=None, tmdb_id="27205", imdb_id=None)
-    mock_session.add(existing_movie.media)
-
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [
-            RadarrMovieDictFactory.build(
-                id=None, title="Inception", tmdbId=27205, imdbId="tt1375666"
-            )
-        ]
-
-        # radarr_id = None → find_movie_by_radarr_id not called
-        mock_find_radarr.return_value = None
-        # Found by external_ids
-        mock_find_external.return_value = existing_movie
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = _indexes(existing_movie)
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(id=None, title="Inception", tmdbId=27205, imdbId="tt1375666")
+    ]
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+    # Act
+    result = await import_radarr_movies(mock_session)
 
-        # Assert
-        assert result.imported_count == 0
-        assert result.updated_count == 1
+    # Assert
+    assert result.imported_count == 0
+    assert result.updated_count == 1
+    assert existing_movie.imdb_id == "tt1375666"
+    # radarr_id = None → not part of the lookup
+    assert mock_load_indexes.await_args.kwargs["radarr_ids"] == []
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movie_without_radarr_id_updates_by_imdb(mock_session):
+async def test_import_radarr_movie_without_radarr_id_updates_by_imdb(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Movie without radarr_id but with imdb_id → finds and updates."""
     # Arrange
     from tests.factories import MovieFactory, RadarrMovieDictFactory
@@ -114,43 +160,25 @@ async def test_import_radarr_movie_without_radarr_id_updates_by_imdb(mock_sessio
     existing_movie = MovieFactory.build(
         id=2, radarr_id=None, tmdb_id=None, imdb_id="tt0133093", media__title="The Matrix"
     )
-    mock_session.add(existing_movie.media)
-
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [
-            RadarrMovieDictFactory.build(
-                id=None, title="The Matrix", tmdbId=603, imdbId="tt0133093"
-            )
-        ]
-
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = existing_movie
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = _indexes(existing_movie)
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(id=None, title="The Matrix", tmdbId=603, imdbId="tt0133093")
+    ]
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+    # Act
+    result = await import_radarr_movies(mock_session)
 
-        # Assert
-        assert result.imported_count == 0
-        assert result.updated_count == 1
+    # Assert
+    assert result.imported_count == 0
+    assert result.updated_count == 1
+    assert existing_movie.tmdb_id == "603"
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movie_with_radarr_id_updates_existing_by_tmdb(mock_session):
+async def test_import_radarr_movie_with_radarr_id_updates_existing_by_tmdb(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Movie with radarr_id but already exists by tmdb → updates radarr_id."""
     # Arrange
     from tests.factories import MovieFactory, RadarrMovieDictFactory
@@ -159,84 +187,69 @@ async def test_import_radarr_movie_with_radarr_id_updates_existing_by_tmdb(mock_
     existing_movie = MovieFactory.build(
         id=1, radarr_id=None, tmdb_id="27205", imdb_id=None, media__title="Inception"
     )
-    mock_session.add(existing_movie.media)
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = _indexes(existing_movie)
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(id=123, title="Inception", tmdbId=27205, imdbId="tt1375666")
+    ]
 
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [
-            RadarrMovieDictFactory.build(
-                id=123, title="Inception", tmdbId=27205, imdbId="tt1375666"
-            )
-        ]
+    # Act
+    result = await import_radarr_movies(mock_session)
+
+    # Assert
+    assert result.imported_count == 0
+    assert result.updated_count == 1
+    assert existing_movie.radarr_id == 123
+
+
+@pytest.mark.asyncio
+async def test_import_radarr_movie_prefers_radarr_id_over_external_ids(
+    mock_session, mock_fetch, mock_load_indexes
+):
+    from tests.factories import MovieFactory, RadarrMovieDictFactory
 
-        # Not found by radarr_id, but found by external_ids
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = existing_movie
+    by_radarr = MovieFactory.build(id=1, radarr_id=5, tmdb_id=None, imdb_id=None, status=None)
+    by_tmdb = MovieFactory.build(id=2, radarr_id=None, tmdb_id="27205", imdb_id=None)
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = _indexes(by_radarr, by_tmdb)
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(id=5, tmdbId=27205, imdbId=None, status="released")
+    ]
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+    result = await import_radarr_movies(mock_session)
 
-        # Assert
-        assert result.imported_count == 0
-        assert result.updated_count == 1
+    assert result.updated_count == 1
+    assert by_radarr.tmdb_id == "27205"
+    assert by_tmdb.radarr_id is None
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movie_without_ids_skips_creation(mock_session):
+async def test_import_radarr_movie_without_ids_skips_creation(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Movie without radarr_id and without tmdb/imdb → skips creation."""
     # Arrange
     from tests.factories import RadarrMovieDictFactory
 
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [
-            RadarrMovieDictFactory.build(
-                id=None, title="Unknown Movie", no_external_ids=True, no_date=True
-            )
-        ]
-
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = None
+    mock_fetch.return_value = [
+        RadarrMovieDictFactory.build(
+            id=None, title="Unknown Movie", no_external_ids=True, no_date=True
+        )
+    ]
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+    # Act
+    result = await import_radarr_movies(mock_session)
 
-        # Assert
-        assert result.imported_count == 0
-        assert result.updated_count == 0
-        mock_session.add.assert_not_called()
+    # Assert
+    assert result.imported_count == 0
+    assert result.updated_count == 0
+    mock_session.add.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movie_without_radarr_id_already_complete_skips_update(mock_session):
+async def test_import_radarr_movie_without_radarr_id_already_complete_skips_update(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Movie without radarr_id, but DB entry is complete → skips update."""
     # Arrange
     from datetime import UTC, datetime
@@ -252,210 +265,128 @@ async def test_import_radarr_movie_without_radarr_id_already_complete_skips_upda
         media__title="Inception",
         media__release_date=datetime(2010, 7, 16, tzinfo=UTC),
     )
-    mock_session.add(existing_movie.media)
-
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [
-            RadarrMovieDictFactory.build(
-                id=None, title="Inception", tmdbId=27205, imdbId="tt1375666", no_date=True
-            )
-        ]
-
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = existing_movie
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = _indexes(existing_movie)
+    movie_data = RadarrMovieDictFactory.build(
+        id=None, title="Inception", tmdbId=27205, imdbId="tt1375666", no_date=True
+    )
+    # Same metadata as already stored → nothing to update
+    existing_movie.status = radarr_service.map_radarr_status(movie_data.get("status"))
+    existing_movie.poster_url = radarr_service.extract_poster(movie_data.get("images", []))
+    existing_movie.year = movie_data.get("year")
+    existing_movie.genres = movie_data.get("genres")
+    existing_movie.rating_value = movie_data.get("ratings", {}).get("value")
+    existing_movie.rating_votes = movie_data.get("ratings", {}).get("votes")
+    mock_fetch.return_value = [movie_data]
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+    # Act
+    result = await import_radarr_movies(mock_session)
 
-        # Assert
-        assert result.imported_count == 0
-        assert result.updated_count == 0
+    # Assert
+    assert result.imported_count == 0
+    assert result.updated_count == 0
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movies_skips_existing_movies(mock_session):
+async def test_import_radarr_movies_skips_existing_movies(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Test service skips movies that already exist in database."""
     # Arrange
-    from tests.factories import RadarrMovieDictFactory
+    from tests.factories import MovieFactory, RadarrMovieDictFactory
 
     sample_movies_mixed = [
-        RadarrMovieDictFactory.build(id=1, title="Existing Movie"),
-        RadarrMovieDictFactory.build(id=2, title="New Movie"),
+        RadarrMovieDictFactory.build(id=1, title="Existing Movie", tmdbId=1001),
+        RadarrMovieDictFactory.build(id=2, title="New Movie", tmdbId=1002),
     ]
+    existing_movie = MovieFactory.build(id=10, radarr_id=None, tmdb_id="1001")
+    mock_load_indexes.side_effect = None
+    mock_load_indexes.return_value = _indexes(existing_movie)
 
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = sample_movies_mixed
+    mock_fetch.return_value = sample_movies_mixed
 
-        # First movie exists, second is new
-        mock_find_radarr.side_effect = [None, None]  # Both not found by radarr_id
-        mock_find_external.side_effect = [Mock(), None]  # First found by external, second not
+    expected_imported_count = 1
 
-        expected_imported_count = 1
+    # Act
+    result = await import_radarr_movies(mock_session)
 
-        # Act
-        result = await import_radarr_movies(mock_session)
-
-        # Assert
-        assert result.imported_count == expected_imported_count
+    # Assert
+    assert result.imported_count == expected_imported_count
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movies_handles_partial_insert_failure(mock_session):
+async def test_import_radarr_movies_handles_partial_insert_failure(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Test service performs transaction rollback when flush fails during movie import."""
     # Arrange
     from tests.factories import RadarrMovieDictFactory
 
-    movies_with_tmdb = [
+    mock_fetch.return_value = [
         RadarrMovieDictFactory.build(id=1, title="Movie 1", tmdbId=1001),
         RadarrMovieDictFactory.build(id=2, title="Movie 2", tmdbId=1002),
     ]
 
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = movies_with_tmdb
-
-        # Both movies not found → should create new
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = None
+    flush_call_count = 0
 
-        flush_call_count = 0
+    async def mock_flush():
+        nonlocal flush_call_count
+        flush_call_count += 1
+        if flush_call_count == 2:  # Fail on second flush
+            raise Exception("Flush failed")
 
-        async def mock_flush():
-            nonlocal flush_call_count
-            flush_call_count += 1
-            if flush_call_count == 2:  # Fail on second flush
-                raise Exception("Flush failed")
+    mock_session.flush.side_effect = mock_flush
 
-        mock_session.flush.side_effect = mock_flush
+    # Act & Assert
+    with pytest.raises(Exception, match="Flush failed"):
+        await import_radarr_movies(mock_session)
 
-        # Act & Assert
-        with pytest.raises(Exception, match="Flush failed"):
-            await import_radarr_movies(mock_session)
-
-        # Assert
-        assert flush_call_count == 2, f"Expected 2 flush calls, got {flush_call_count}"
-        mock_session.rollback.assert_called_once()
-        mock_session.commit.assert_not_called()
+    # Assert
+    assert flush_call_count == 2, f"Expected 2 flush calls, got {flush_call_count}"
+    mock_session.rollback.assert_called_once()
+    mock_session.commit.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_import_radarr_movies_handles_commit_failure(mock_session):
+async def test_import_radarr_movies_handles_commit_failure(
+    mock_session, mock_fetch, mock_load_indexes
+):
     """Test service handles commit failure."""
     # Arrange
     from tests.factories import RadarrMovieDictFactory
 
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = [RadarrMovieDictFactory.build(id=1, title="Movie 1", tmdbId=1001)]
+    mock_fetch.return_value = [RadarrMovieDictFactory.build(id=1, title="Movie 1", tmdbId=1001)]
 
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = None
+    # Simulate commit failure
+    mock_session.commit.side_effect = Exception("Commit failed")
 
-        # Simulate commit failure
-        mock_session.commit.side_effect = Exception("Commit failed")
+    # Act & Assert
+    with pytest.raises(Exception, match="Commit failed"):
+        await import_radarr_movies(mock_session)
 
-        # Act & Assert
-        with pytest.raises(Exception, match="Commit failed"):
-            await import_radarr_movies(mock_session)
-
-        mock_session.rollback.assert_called_once()
+    mock_session.rollback.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_import_radarr_movies_skips_movies_without_id(
     mock_session,
+    mock_fetch,
+    mock_load_indexes,
     radarr_movies_without_radarr_id,
 ):
     """Test service skips movies without Radarr ID or with invalid data."""
     # Arrange
-    with (
-        patch(
-            "app.services.radarr_service.get_decrypted_config",
-            new_callable=AsyncMock,
-            return_value=("http://radarr:7878", "test-api-key"),
-        ),
-        patch(
-            "app.services.radarr_service.fetch_radarr_movies", new_callable=AsyncMock
-        ) as mock_fetch,
-        patch(
-            "app.services.radarr_service.find_movie_by_radarr_id", new_callable=AsyncMock
-        ) as mock_find_radarr,
-        patch(
-            "app.services.radarr_service.find_movie_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
-    ):
-        mock_fetch.return_value = radarr_movies_without_radarr_id
-
-        mock_find_radarr.return_value = None
-        mock_find_external.return_value = None
+    mock_fetch.return_value = radarr_movies_without_radarr_id
 
-        # Act
-        result = await import_radarr_movies(mock_session)
+    # Act
+    result = await import_radarr_movies(mock_session)
 
-        # Assert
-        assert result.imported_count == 1, (
-            f"Expected 1 imported movie, got {result.imported_count}. "
-            f"Movies data: {radarr_movies_without_radarr_id}"
-        )
-        assert result.updated_count == 0
+    # Assert
+    assert result.imported_count == 1, (
+        f"Expected 1 imported movie, got {result.imported_count}. "
+        f"Movies data: {radarr_movies_without_radarr_id}"
+    )
+    assert result.updated_count == 0
 
-        # Verify add was called for the valid movie
-        assert mock_session.add.call_count == 2  # Media + Movie for one film
+    # Verify add was called for the valid movie
+    assert mock_session.add.call_count == 2  # Media + Movie for one film
@@ -1,4 +1,8 @@
-from app.services.movie_utils import resolve_movie_from_indexes
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.movie_utils import MovieIndexes, load_movie_indexes, resolve_movie_from_indexes
 from tests.factories import MovieFactory
 
 
@@ -111,3 +115,38 @@ def test_resolve_with_all_none_ids() -> None:
     )
 
     assert result is None
+
+
+def test_movie_indexes_prefers_radarr_id() -> None:
+    """radarr_id проверяется раньше внешних идентификаторов."""
+    by_radarr = MovieFactory.build(radarr_id=5, tmdb_id=None, imdb_id=None, jellyfin_id=None)
+    by_tmdb = MovieFactory.build(radarr_id=None, tmdb_id="tmdb-5", imdb_id=None, jellyfin_id=None)
+    indexes = MovieIndexes()
+    indexes.add(by_radarr)
+    indexes.add(by_tmdb)
+
+    assert indexes.resolve(radarr_id=5, tmdb_id="tmdb-5") is by_radarr
+    assert indexes.resolve(radarr_id=6, tmdb_id="tmdb-5") is by_tmdb
+    assert indexes.resolve(radarr_id=6) is None
+
+
+def test_movie_indexes_add_keeps_first_movie_per_id() -> None:
+    """Повторный add с тем же tmdb_id не перезаписывает уже проиндексированный Movie."""
+    first = MovieFactory.build(tmdb_id="tmdb-1", imdb_id=None, jellyfin_id=None)
+    second = MovieFactory.build(tmdb_id="tmdb-1", imdb_id="tt-2", jellyfin_id=None)
+    indexes = MovieIndexes()
+    indexes.add(first)
+    indexes.add(second)
+
+    assert indexes.resolve(tmdb_id="tmdb-1") is first
+    assert indexes.resolve(imdb_id="tt-2") is second
+
+
+@pytest.mark.asyncio
+async def test_load_movie_indexes_without_ids_skips_query() -> None:
+    session = AsyncMock()
+
+    indexes = await load_movie_indexes(session, radarr_ids=[], tmdb_ids=())
+
+    session.execute.assert_not_called()
+    assert indexes.by_tmdb_id == {}
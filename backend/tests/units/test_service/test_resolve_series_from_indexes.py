@@ -1,4 +1,4 @@
-from app.services.series_utils import resolve_series_from_indexes
+from app.services.series_utils import SeriesIndexes, resolve_series_from_indexes
 from tests.factories import SeriesFactory
 
 
@@ -96,3 +96,35 @@ def test_resolve_with_all_none_ids() -> None:
     )
 
     assert result is None
+
+
+def test_series_indexes_resolve_order() -> None:
+    """sonarr_id проверяется первым, tmdb_id — последним."""
+    by_sonarr = SeriesFactory.build(
+        sonarr_id=7, jellyfin_id=None, tvdb_id=None, imdb_id=None, tmdb_id=None
+    )
+    by_tvdb = SeriesFactory.build(
+        sonarr_id=None, jellyfin_id=None, tvdb_id="tvdb-7", imdb_id=None, tmdb_id=None
+    )
+    by_tmdb = SeriesFactory.build(
+        sonarr_id=None, jellyfin_id=None, tvdb_id=None, imdb_id=None, tmdb_id="tmdb-7"
+    )
+    indexes = SeriesIndexes()
+    for series in (by_sonarr, by_tvdb, by_tmdb):
+        indexes.add(series)
+
+    assert indexes.resolve(sonarr_id=7, tvdb_id="tvdb-7") is by_sonarr
+    assert indexes.resolve(sonarr_id=8, tvdb_id="tvdb-7", tmdb_id="tmdb-7") is by_tvdb
+    assert indexes.resolve(sonarr_id=8, tmdb_id="tmdb-7") is by_tmdb
+    assert indexes.resolve(sonarr_id=8, imdb_id="tt-none") is None
+
+
+def test_series_indexes_add_keeps_first_series_per_id() -> None:
+    first = SeriesFactory.build(jellyfin_id="jf-1", tvdb_id="tvdb-1")
+    second = SeriesFactory.build(jellyfin_id="jf-2", tvdb_id="tvdb-1")
+    indexes = SeriesIndexes()
+    indexes.add(first)
+    indexes.add(second)
+
+    assert indexes.resolve(tvdb_id="tvdb-1") is first
+    assert indexes.resolve(jellyfin_id="jf-2") is second
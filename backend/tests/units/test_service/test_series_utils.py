@@ -4,7 +4,7 @@ from app.services.series_utils import update_existing_series
 
 def _make_series(poster_url: str | None = None) -> Series:
     media = Media(media_type=MediaType.SERIES, title="Test Series")
-    series = Series(id=1, poster_url=poster_url)
+    series = Series(id=1, poster_url=poster_url, tmdb_metadata_digest="applied")
     series.media = media
     return series
 
@@ -23,6 +23,8 @@ def test_update_existing_series_updates_poster_url_when_changed() -> None:
     updated = update_existing_series(series, "Test Series", poster_url="http://new.jpg")
     assert updated is True
     assert series.poster_url == "http://new.jpg"
+    # The import overwrote TMDB values, so the next TMDB pass applies its body again
+    assert series.tmdb_metadata_digest is None
 
 
 def test_update_existing_series_skips_poster_url_when_same() -> None:
@@ -31,3 +33,4 @@ def test_update_existing_series_skips_poster_url_when_same() -> None:
     updated = update_existing_series(series, "Test Series", poster_url="http://same.jpg")
     assert updated is False
     assert series.poster_url == "http://same.jpg"
+    assert series.tmdb_metadata_digest == "applied"
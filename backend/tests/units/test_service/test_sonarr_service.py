@@ -1,24 +1,34 @@
+import asyncio
+from contextlib import aclosing
 from datetime import UTC, datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from app.exceptions.client_errors import ClientError
-from app.models.media import Episode, Media, MediaType, Season, Series, SeriesStatus
+from app.models.media import Episode, Media, MediaType, Series, SeriesStatus
 from app.schemas.error_codes import SonarrErrorCode
 from app.schemas.sonarr import SonarrImportResponse
-from app.services.sonarr_service import import_sonarr_series
+from app.services import sonarr_service
+from app.services.series_utils import SeriesIndexes
+from app.services.sonarr_service import _iter_series_with_episodes, import_sonarr_series
+from tests.utils.async_iter import AsyncIterMock
+from tests.utils.season_episode_writer import FakeSeasonEpisodeWriter
+
+
+@pytest.fixture(autouse=True)
+def writer():
+    """Сезоны и эпизоды пишутся пакетными upsert-ами; в unit-тестах запоминаем строки."""
+    with FakeSeasonEpisodeWriter().patched("app.services.sonarr_service") as fake:
+        yield fake
 
 
 @pytest.mark.asyncio
 async def test_import_sonarr_series_creates_entities(
-    mock_session, sonarr_series_basic, sonarr_episodes_basic
+    mock_session, sonarr_series_basic, sonarr_episodes_basic, writer, series_progress_refresh
 ):
     """Test service creates Media, Series, Season, and Episode entities for new series."""
 
-    async def return_none(*args, **kwargs):
-        return None
-
     with (
         patch(
             "app.services.sonarr_service.get_decrypted_config",
@@ -26,17 +36,16 @@ async def test_import_sonarr_series_creates_entities(
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
         ) as mock_fetch_episodes,
         patch(
-            "app.services.sonarr_service._find_series_by_sonarr_id", new_callable=AsyncMock
-        ) as mock_find_sonarr,
-        patch(
-            "app.services.sonarr_service.find_series_by_external_ids", new_callable=AsyncMock
-        ) as mock_find_external,
+            "app.services.sonarr_service.load_series_indexes",
+            new_callable=AsyncMock,
+            return_value=SeriesIndexes(),
+        ) as mock_load_indexes,
     ):
         # --- Данные ---
         single_series = sonarr_series_basic[0].copy()
@@ -52,10 +61,6 @@ async def test_import_sonarr_series_creates_entities(
         mock_fetch_series.return_value = [single_series]
         mock_fetch_episodes.return_value = sonarr_episodes_basic
 
-        # --- КРИТИЧНО: возвращаем None как результат await ---
-        mock_find_sonarr.side_effect = return_none
-        mock_find_external.side_effect = return_none
-
         # --- Сохраняем add ---
         added_entities = []
 
@@ -74,16 +79,104 @@ async def test_import_sonarr_series_creates_entities(
         assert result.new_episodes == 2
         assert result.updated_episodes == 0
 
-        assert len(added_entities) == 5
-        assert {type(e).__name__ for e in added_entities} == {
-            "Media",
-            "Series",
-            "Season",
-            "Episode",
-        }
+        # Media and Series go through the ORM, seasons and episodes through bulk upserts
+        assert {type(e).__name__ for e in added_entities} == {"Media", "Series"}
+        assert [(r["number"], r["release_date"]) for r in writer.season_rows] == [
+            (1, datetime(2020, 1, 1, tzinfo=UTC))
+        ]
+        assert [(r["sonarr_id"], r["season_id"], r["title"]) for r in writer.episode_rows] == [
+            (101, 1000, "Pilot"),
+            (102, 1000, "Episode 2"),
+        ]
 
         mock_session.flush.assert_awaited()
         mock_session.commit.assert_awaited_once()
+        # New episodes change the totals in series_progress, once per batch
+        series_progress_refresh.assert_awaited_once()
+        assert len(series_progress_refresh.await_args.args[1]) == 1
+
+        # One lookup for the whole batch with every id of the series
+        mock_load_indexes.assert_awaited_once()
+        kwargs = mock_load_indexes.await_args.kwargs
+        assert kwargs["tvdb_ids"] == ["123456"]
+        assert kwargs["imdb_ids"] == ["tt1234567"]
+        assert kwargs["tmdb_ids"] == ["12345"]
+
+
+@pytest.mark.asyncio
+async def test_process_seasons_refreshes_progress_of_series_episodes_move_from(
+    mock_session, writer, series_progress_refresh
+):
+    """Эпизод, переехавший по sonarr_id из другого сериала, пересчитывает и тот сериал."""
+    series = Series(id=1)
+    writer.episode_series = {501: 2}
+    episode = {"id": 501, "seasonNumber": 1, "episodeNumber": 1, "title": "Pilot"}
+
+    await sonarr_service._process_seasons_and_episodes(
+        mock_session, [(series, {"seasons": [{"seasonNumber": 1}]}, [episode])]
+    )
+
+    series_progress_refresh.assert_awaited_once_with(mock_session, {1, 2})
+
+
+@pytest.mark.asyncio
+async def test_process_seasons_forgets_applied_tmdb_digest_when_seasons_written(
+    mock_session, writer
+):
+    """Записанные Sonarr сезоны затирают данные TMDB — следующий проход применит их заново."""
+    series = Series(id=1, tmdb_metadata_digest="applied")
+
+    await sonarr_service._process_seasons_and_episodes(
+        mock_session, [(series, {"seasons": [{"seasonNumber": 1}]}, [])]
+    )
+
+    assert series.tmdb_metadata_digest is None
+
+
+@pytest.mark.asyncio
+async def test_process_seasons_keeps_applied_tmdb_digest_when_nothing_written(mock_session, writer):
+    series = Series(id=1, tmdb_metadata_digest="applied")
+    writer.existing_seasons = {(1, 1): 1000}
+
+    await sonarr_service._process_seasons_and_episodes(
+        mock_session, [(series, {"seasons": [{"seasonNumber": 1}]}, [])]
+    )
+
+    assert series.tmdb_metadata_digest == "applied"
+
+
+@pytest.mark.asyncio
+async def test_import_sonarr_series_resolves_in_batches(
+    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes, monkeypatch
+):
+    """Сериалы из потока ищутся в БД пачками: один запрос на пачку, созданные попадают в индекс."""
+    monkeypatch.setattr(sonarr_service, "RESOLVE_BATCH_SIZE", 2)
+    mock_fetch_sonarr_series.return_value = [
+        {"id": i, "title": f"Series {i}", "tvdbId": 1000 + i, "seasons": []} for i in range(1, 6)
+    ]
+    mock_fetch_sonarr_episodes.return_value = []
+
+    with (
+        patch(
+            "app.services.sonarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://sonarr:8989", "test-api-key"),
+        ),
+        patch(
+            "app.services.sonarr_service.load_series_indexes",
+            new_callable=AsyncMock,
+            side_effect=lambda *args, **kwargs: SeriesIndexes(),
+        ) as mock_load_indexes,
+    ):
+        result = await import_sonarr_series(mock_session)
+
+    assert result.new_series == 5
+    assert [c.kwargs["sonarr_ids"] for c in mock_load_indexes.await_args_list] == [
+        [1, 2],
+        [3, 4],
+        [5],
+    ]
+    mock_session.commit.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -159,7 +252,7 @@ async def test_import_sonarr_series_real_data(mock_session):
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -175,24 +268,9 @@ async def test_import_sonarr_series_real_data(mock_session):
         def execute_side_effect(query):
             query_str = str(query)
 
-            # _find_series_by_sonarr_id
-            if "sonarr_id" in query_str and "series" in query_str:
-                import re
-
-                match = re.search(r"sonarr_id = (\d+)", query_str)
-                if match:
-                    sonarr_id = int(match.group(1))
-                    processed_series.append(f"find_by_sonarr_id:{sonarr_id}")
-                return Mock(scalar_one_or_none=Mock(return_value=None))
-
-            # _find_series_by_external_ids
-            elif "or_" in query_str and "series" in query_str:
-                if "tt" in query_str:
-                    processed_series.append("find_by_external_ids:has_imdb")
-                return Mock(scalar_one_or_none=Mock(return_value=None))
-
-            # select(Season)
-            elif "season" in query_str and "series_id" in query_str:
+            # load_series_indexes: one lookup by every id of the batch
+            if "series.sonarr_id IN" in query_str:
+                processed_series.append("load_series_indexes")
                 return Mock(scalars=Mock(return_value=[]))
 
             return Mock(scalars=Mock(return_value=[]), scalar_one_or_none=Mock(return_value=None))
@@ -205,6 +283,7 @@ async def test_import_sonarr_series_real_data(mock_session):
         # Assert
         assert result.new_series == series_count
         assert result.updated_series == 0
+        assert processed_series == ["load_series_indexes"]
 
         mock_session.commit.assert_called_once()
 
@@ -239,7 +318,7 @@ async def test_import_sonarr_series_prioritizes_sonarr_id_and_preserves_imdb_tvd
     mock_session.add(existing_series)
 
     mock_result = Mock()
-    mock_result.scalar_one_or_none.return_value = existing_series
+    mock_result.scalars.return_value = [existing_series]
     mock_session.execute.return_value = mock_result
 
     mock_fetch_sonarr_series.return_value = [sonarr_series_basic[0]]
@@ -297,13 +376,10 @@ async def test_import_sonarr_series_finds_by_tvdb_id_when_no_sonarr_id(
     )
     existing_series.media = media
 
-    mock_result_external = Mock()
-    mock_result_external.scalar_one_or_none.return_value = existing_series
+    mock_result_indexes = Mock()
+    mock_result_indexes.scalars.return_value = [existing_series]
 
-    mock_session.execute.side_effect = [
-        Mock(scalar_one_or_none=Mock(return_value=None)),
-        mock_result_external,
-    ]
+    mock_session.execute.side_effect = [mock_result_indexes]
 
     mock_fetch_sonarr_series.return_value = [series_no_sonarr]
     mock_fetch_sonarr_episodes.return_value = []
@@ -326,7 +402,7 @@ async def test_import_sonarr_series_finds_by_tvdb_id_when_no_sonarr_id(
 
 @pytest.mark.asyncio
 async def test_import_sonarr_series_creates_seasons_from_seasons_array(
-    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes
+    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes, writer
 ):
     """
     All season numbers listed in the ``seasons`` array are created
@@ -352,20 +428,10 @@ async def test_import_sonarr_series_creates_seasons_from_seasons_array(
         "year": 2016,
     }
 
-    mock_result_sonarr = Mock()
-    mock_result_sonarr.scalar_one_or_none.return_value = None
-
-    mock_result_external = Mock()
-    mock_result_external.scalar_one_or_none.return_value = None
-
-    mock_result_seasons = Mock()
-    mock_result_seasons.scalars.return_value = Mock()
+    mock_result_indexes = Mock()
+    mock_result_indexes.scalars.return_value = []
 
-    mock_session.execute.side_effect = [
-        mock_result_sonarr,
-        mock_result_external,
-        mock_result_seasons,
-    ]
+    mock_session.execute.side_effect = [mock_result_indexes]
 
     mock_fetch_sonarr_series.return_value = [series_data]
     mock_fetch_sonarr_episodes.return_value = []
@@ -381,16 +447,12 @@ async def test_import_sonarr_series_creates_seasons_from_seasons_array(
     # Assert
     assert result.new_series == 1
 
-    added_seasons = [
-        call[0][0] for call in mock_session.add.call_args_list if isinstance(call[0][0], Season)
-    ]
-    assert len(added_seasons) == 4
-    assert {s.number for s in added_seasons} == {1, 2, 3, 4}
+    assert sorted(r["number"] for r in writer.season_rows) == [1, 2, 3, 4]
 
 
 @pytest.mark.asyncio
 async def test_import_sonarr_series_creates_seasons_from_seasons_array_existing_series(
-    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes
+    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes, writer
 ):
     """
     All season numbers listed in the ``seasons`` array are created
@@ -426,15 +488,9 @@ async def test_import_sonarr_series_creates_seasons_from_seasons_array_existing_
     existing_series.media = media
 
     mock_result_sonarr = Mock()
-    mock_result_sonarr.scalar_one_or_none.return_value = existing_series
+    mock_result_sonarr.scalars.return_value = [existing_series]
 
-    mock_result_seasons = Mock()
-    mock_result_seasons.scalars.return_value = Mock()
-
-    mock_session.execute.side_effect = [
-        mock_result_sonarr,
-        mock_result_seasons,
-    ]
+    mock_session.execute.side_effect = [mock_result_sonarr]
 
     mock_fetch_sonarr_series.return_value = [series_data]
     mock_fetch_sonarr_episodes.return_value = []
@@ -451,20 +507,17 @@ async def test_import_sonarr_series_creates_seasons_from_seasons_array_existing_
     assert result.updated_series == 1
     assert result.new_series == 0
 
-    added_seasons = [
-        call[0][0] for call in mock_session.add.call_args_list if isinstance(call[0][0], Season)
-    ]
-    assert len(added_seasons) == 4
-    assert {s.number for s in added_seasons} == {1, 2, 3, 4}
+    assert sorted(r["number"] for r in writer.season_rows) == [1, 2, 3, 4]
+    assert {r["series_id"] for r in writer.season_rows} == {5}
 
 
 @pytest.mark.asyncio
 async def test_import_sonarr_series_sets_season_release_date_from_first_episode(
-    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes
+    mock_session, mock_fetch_sonarr_series, mock_fetch_sonarr_episodes, writer
 ):
     """
     ``Season.release_date`` is set to the earliest ``airDateUtc`` of its episodes,
-    but only when the field is ``NULL``.
+    but only when the field is ``NULL`` (filled by the upsert, see season_episode_repository).
     """
     # Arrange
     series_data = {
@@ -504,22 +557,12 @@ async def test_import_sonarr_series_sets_season_release_date_from_first_episode(
     series = Series(id=999, sonarr_id=10)
     series.media = media
 
-    existing_season = Season(id=1, series_id=999, number=1, release_date=None)
+    writer.existing_seasons = {(999, 1): 1}
 
     mock_result_sonarr = Mock()
-    mock_result_sonarr.scalar_one_or_none.return_value = series
+    mock_result_sonarr.scalars.return_value = [series]
 
-    mock_result_seasons = Mock()
-    mock_result_seasons.scalars.return_value = [existing_season]
-
-    mock_result_episodes = Mock()
-    mock_result_episodes.scalars.return_value = []
-
-    mock_session.execute.side_effect = [
-        mock_result_sonarr,
-        mock_result_seasons,
-        mock_result_episodes,
-    ]
+    mock_session.execute.side_effect = [mock_result_sonarr]
 
     mock_fetch_sonarr_series.return_value = [series_data]
     mock_fetch_sonarr_episodes.return_value = episodes
@@ -533,15 +576,13 @@ async def test_import_sonarr_series_sets_season_release_date_from_first_episode(
         await import_sonarr_series(mock_session)
 
     # Assert
-    assert mock_session.flush.called
-
-    from app.utils.datetime_utils import parse_iso_datetime
-
-    earliest_date = parse_iso_datetime("2005-03-24T00:00:00Z")
-    assert earliest_date is not None
-    assert earliest_date.year == 2005
-    assert earliest_date.month == 3
-    assert earliest_date.day == 24
+    (season_row,) = writer.season_rows
+    assert season_row == {
+        "series_id": 999,
+        "number": 1,
+        "release_date": datetime(2005, 3, 24, tzinfo=UTC),
+    }
+    assert {r["season_id"] for r in writer.episode_rows} == {1}
 
 
 @pytest.mark.asyncio
@@ -625,7 +666,7 @@ async def test_import_sonarr_series_no_changes_when_all_match(
     existing_series.media = media
 
     mock_result_sonarr = Mock()
-    mock_result_sonarr.scalar_one_or_none.return_value = existing_series
+    mock_result_sonarr.scalars.return_value = [existing_series]
 
     mock_result_seasons = Mock()
     mock_result_seasons.scalars.return_value = []
@@ -677,7 +718,7 @@ async def test_import_sonarr_series_failure_connection_timeout(mock_session):
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
     ):
         mock_fetch_series.side_effect = ClientError(
@@ -691,7 +732,8 @@ async def test_import_sonarr_series_failure_connection_timeout(mock_session):
         assert exc_info.value.code == SonarrErrorCode.NETWORK_ERROR
         assert "connect" in exc_info.value.message.lower()
 
-        mock_session.rollback.assert_not_called()
+        # the stream fails inside the import transaction, so it is rolled back
+        mock_session.rollback.assert_awaited_once()
         mock_session.commit.assert_not_called()
 
 
@@ -754,7 +796,7 @@ async def test_import_sonarr_series_skips_invalid(
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -794,7 +836,7 @@ async def test_import_sonarr_series_invalid_date(
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -848,7 +890,7 @@ async def test_import_sonarr_series_no_identifiers_skipped(mock_session, sonarr_
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -893,7 +935,7 @@ async def test_import_sonarr_series_invalid_episode_date(
             return_value=("http://sonarr:8989", "test-api-key"),
         ),
         patch(
-            "app.services.sonarr_service.fetch_sonarr_series", new_callable=AsyncMock
+            "app.services.sonarr_service.iter_sonarr_series", new_callable=AsyncIterMock
         ) as mock_fetch_series,
         patch(
             "app.services.sonarr_service.fetch_sonarr_episodes", new_callable=AsyncMock
@@ -928,3 +970,172 @@ async def test_import_sonarr_series_invalid_episode_date(
         assert result == exp_result
 
         mock_session.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_iter_series_with_episodes_prefetches_concurrently_in_order(monkeypatch):
+    """Episodes for upcoming series are fetched concurrently, but pairs are yielded in order."""
+    monkeypatch.setattr(sonarr_service, "EPISODE_FETCH_CONCURRENCY", 3)
+    series = [{"id": i, "title": f"Series {i}"} for i in range(1, 7)]
+    in_flight = max_in_flight = 0
+
+    async def fake_fetch(url, api_key, series_id):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later series answer first, so ordering must come from the queue, not completion
+        await asyncio.sleep(0.001 * (10 - series_id))
+        in_flight -= 1
+        return [{"id": series_id * 100}]
+
+    with (
+        patch(
+            "app.services.sonarr_service.iter_sonarr_series",
+            new_callable=AsyncIterMock,
+            return_value=series,
+        ),
+        patch("app.services.sonarr_service.fetch_sonarr_episodes", side_effect=fake_fetch),
+    ):
+        async with aclosing(_iter_series_with_episodes("http://sonarr", "key")) as stream:
+            result = [(raw["id"], episodes) async for raw, episodes in stream]
+
+    assert result == [(i, [{"id": i * 100}]) for i in range(1, 7)]
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_import_sonarr_series_prefetches_next_batch_while_writing(mock_session):
+    """Пока пишется пачка, эпизоды всей следующей пачки уже скачиваются."""
+    batch_size = sonarr_service.RESOLVE_BATCH_SIZE
+    series = [{"id": i, "title": f"Series {i}"} for i in range(1, 2 * batch_size + 1)]
+    requested: list[int] = []
+    requested_during_writes: list[int] = []
+
+    async def fake_fetch(url, api_key, series_id):
+        requested.append(series_id)
+        return []
+
+    async def fake_write(session, batch):
+        # let the producer and the fetches run while the batch is "written"
+        for _ in range(10 * batch_size):
+            await asyncio.sleep(0)
+        requested_during_writes.append(len(requested))
+        return 0, 0, 0, 0
+
+    with (
+        patch(
+            "app.services.sonarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://sonarr:8989", "test-api-key"),
+        ),
+        patch(
+            "app.services.sonarr_service.iter_sonarr_series",
+            new_callable=AsyncIterMock,
+            return_value=series,
+        ),
+        patch("app.services.sonarr_service.fetch_sonarr_episodes", side_effect=fake_fetch),
+        patch("app.services.sonarr_service._upsert_sonarr_batch", side_effect=fake_write),
+    ):
+        await import_sonarr_series(mock_session)
+
+    assert batch_size <= sonarr_service.EPISODE_PREFETCH_DEPTH
+    assert requested_during_writes == [2 * batch_size, 2 * batch_size]
+
+
+@pytest.mark.asyncio
+async def test_iter_series_with_episodes_skips_fetch_without_sonarr_id():
+    """Series without a Sonarr id or title are passed through with no episode request."""
+    series = [{"id": None, "title": "No id"}, {"id": 5, "title": None}, {"id": 7, "title": "Ok"}]
+
+    with (
+        patch(
+            "app.services.sonarr_service.iter_sonarr_series",
+            new_callable=AsyncIterMock,
+            return_value=series,
+        ),
+        patch(
+            "app.services.sonarr_service.fetch_sonarr_episodes",
+            new_callable=AsyncMock,
+            return_value=[{"id": 1}],
+        ) as mock_fetch_episodes,
+    ):
+        async with aclosing(_iter_series_with_episodes("http://sonarr", "key")) as stream:
+            result = [episodes async for _, episodes in stream]
+
+    assert result == [[], [], [{"id": 1}]]
+    mock_fetch_episodes.assert_awaited_once_with("http://sonarr", "key", 7)
+
+
+@pytest.mark.asyncio
+async def test_iter_series_with_episodes_cancels_prefetch_on_close():
+    """Closing the stream early cancels the episode requests still in flight."""
+    series = [{"id": i, "title": f"Series {i}"} for i in range(1, 5)]
+    cancelled: list[int] = []
+
+    async def fake_fetch(url, api_key, series_id):
+        if series_id == 1:
+            return []
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(series_id)
+            raise
+        return []
+
+    with (
+        patch(
+            "app.services.sonarr_service.iter_sonarr_series",
+            new_callable=AsyncIterMock,
+            return_value=series,
+        ),
+        patch("app.services.sonarr_service.fetch_sonarr_episodes", side_effect=fake_fetch),
+    ):
+        async with aclosing(_iter_series_with_episodes("http://sonarr", "key")) as stream:
+            async for raw, _ in stream:
+                assert raw["id"] == 1
+                await asyncio.sleep(0)  # let the producer start the remaining requests
+                break
+
+    assert sorted(cancelled) == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_import_sonarr_series_stream_failure_after_queued_series(mock_session):
+    """
+    A failure of the series stream surfaces with rollback; the batch collected before it
+    is never written.
+    """
+
+    async def failing_stream(url, api_key):
+        yield {"id": 1, "title": "First"}
+        raise ClientError(code=SonarrErrorCode.NETWORK_ERROR, message="Connection reset")
+
+    with (
+        patch(
+            "app.services.sonarr_service.get_decrypted_config",
+            new_callable=AsyncMock,
+            return_value=("http://sonarr:8989", "test-api-key"),
+        ),
+        patch("app.services.sonarr_service.iter_sonarr_series", side_effect=failing_stream),
+        patch(
+            "app.services.sonarr_service.fetch_sonarr_episodes",
+            new_callable=AsyncMock,
+            return_value=[],
+        ) as mock_fetch_episodes,
+        patch(
+            "app.services.sonarr_service.load_series_indexes", new_callable=AsyncMock
+        ) as mock_load_indexes,
+        patch(
+            "app.services.sonarr_service._process_seasons_and_episodes",
+            new_callable=AsyncMock,
+            return_value=(0, 0),
+        ),
+        pytest.raises(ClientError) as exc_info,
+    ):
+        await import_sonarr_series(mock_session)
+
+    assert exc_info.value.code == SonarrErrorCode.NETWORK_ERROR
+    mock_fetch_episodes.assert_awaited_once()
+    mock_load_indexes.assert_not_awaited()
+    mock_session.rollback.assert_awaited_once()
+    mock_session.commit.assert_not_called()
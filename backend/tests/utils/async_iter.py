@@ -0,0 +1,25 @@
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+from unittest.mock import MagicMock
+
+
+async def _aiter(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+class AsyncIterMock(MagicMock):
+    """
+    Мок async-генератора (iter_radarr_movies, iter_sonarr_series, ...).
+
+    Вызов возвращает асинхронный итератор по ``return_value``, поэтому тесты
+    задают данные так же, как для обычного AsyncMock. ``side_effect`` работает
+    как у MagicMock: исключение выбрасывается при вызове.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("side_effect", lambda *_, **__: _aiter(self.return_value))
+        super().__init__(*args, **kwargs)
+
+    def _get_child_mock(self, **kwargs: Any) -> MagicMock:
+        return MagicMock(**kwargs)
@@ -0,0 +1,66 @@
+import json
+from datetime import UTC, datetime
+from typing import Any
+
+from httpx import AsyncClient, Response
+
+from app.utils.security import sign_webhook_payload
+
+JELLYFIN_WEBHOOK_PATH = "/api/v1/webhooks/jellyfin"
+
+
+class FakeJellyfinWebhookSender:
+    """
+    Имитация плагина Jellyfin Webhook: собирает уведомления в его формате
+    и отправляет их в API, подписывая тело общим секретом.
+    """
+
+    def __init__(self, client: AsyncClient, secret: str) -> None:
+        self.client = client
+        self.secret = secret
+
+    @staticmethod
+    def payload(
+        notification_type: str,
+        *,
+        user_id: str,
+        item_id: str,
+        item_type: str = "Movie",
+        **fields: Any,
+    ) -> dict[str, Any]:
+        return {
+            "NotificationType": notification_type,
+            "UserId": user_id,
+            "ItemId": item_id,
+            "ItemType": item_type,
+            "UtcTimestamp": datetime.now(UTC).isoformat(),
+            **fields,
+        }
+
+    async def send(
+        self, payload: dict[str, Any] | bytes, *, signature: str | bytes | None = None
+    ) -> Response:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Signature": signature or sign_webhook_payload(body, self.secret),
+        }
+        return await self.client.post(JELLYFIN_WEBHOOK_PATH, content=body, headers=headers)
+
+    async def playback_stop(
+        self, *, user_id: str, item_id: str, item_type: str = "Movie", **fields: Any
+    ) -> Response:
+        return await self.send(
+            self.payload(
+                "PlaybackStop", user_id=user_id, item_id=item_id, item_type=item_type, **fields
+            )
+        )
+
+    async def user_data_saved(
+        self, *, user_id: str, item_id: str, item_type: str = "Movie", **fields: Any
+    ) -> Response:
+        return await self.send(
+            self.payload(
+                "UserDataSaved", user_id=user_id, item_id=item_id, item_type=item_type, **fields
+            )
+        )
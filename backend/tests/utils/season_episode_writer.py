@@ -0,0 +1,78 @@
+import importlib
+from collections.abc import Generator, Iterable, Mapping
+from contextlib import ExitStack, contextmanager
+from typing import Any
+from unittest.mock import patch
+
+from app.services.season_episode_repository import UpsertResult
+
+
+class FakeSeasonEpisodeWriter:
+    """
+    Подмена season_episode_repository для unit-тестов импорта сезонов и эпизодов.
+
+    Запоминает строки, переданные в upsert_seasons / bulk_upsert, и раздаёт сезонам id.
+    Строки с конфликтом по ``id`` (уже найденные эпизоды) считаются обновлёнными,
+    остальные — новыми. ``existing_seasons`` и ``existing_episodes`` — то, что «лежит в БД»,
+    ``episode_series`` — сериал, под которым сейчас лежит эпизод с данным sonarr_id/jellyfin_id.
+    """
+
+    def __init__(self) -> None:
+        self.existing_seasons: dict[tuple[int, int], int] = {}
+        self.existing_episodes: list[tuple[int, int, int, str | None]] = []
+        self.episode_series: dict[Any, int] = {}
+        self.season_rows: list[dict[str, Any]] = []
+        self.episode_rows: list[dict[str, Any]] = []
+
+    async def upsert_seasons(
+        self, session: Any, rows: list[Mapping[str, Any]], *, fill: Iterable[str] = ()
+    ) -> UpsertResult:
+        self.season_rows.extend(dict(row) for row in rows)
+        result = UpsertResult(ids=dict(self.existing_seasons))
+        for row in rows:
+            key = (row["series_id"], row["number"])
+            if key not in result.ids:
+                result.ids[key] = 1000 + len(result.ids)
+                result.inserted += 1
+        return result
+
+    async def load_episode_keys(
+        self, session: Any, season_ids: Iterable[int]
+    ) -> list[tuple[int, int, int, str | None]]:
+        wanted = set(season_ids)
+        return [key for key in self.existing_episodes if key[1] in wanted]
+
+    async def load_episode_series_ids(
+        self, session: Any, column: Any, keys: Iterable[Any]
+    ) -> set[int]:
+        return {self.episode_series[key] for key in keys if key in self.episode_series}
+
+    async def bulk_upsert(
+        self,
+        session: Any,
+        model: type,
+        rows: Iterable[Mapping[str, Any]],
+        *,
+        index_elements: Iterable[str],
+        **modes: Any,
+    ) -> UpsertResult:
+        written = [dict(row) for row in rows]
+        self.episode_rows.extend(written)
+        if tuple(index_elements) == ("id",):
+            return UpsertResult(updated=len(written))
+        return UpsertResult(inserted=len(written))
+
+    @contextmanager
+    def patched(self, module: str) -> Generator["FakeSeasonEpisodeWriter", None, None]:
+        """Подменяет функции репозитория, импортированные в ``module``."""
+        with ExitStack() as stack:
+            target = importlib.import_module(module)
+            for name in (
+                "upsert_seasons",
+                "load_episode_keys",
+                "load_episode_series_ids",
+                "bulk_upsert",
+            ):
+                if hasattr(target, name):
+                    stack.enter_context(patch.object(target, name, side_effect=getattr(self, name)))
+            yield self